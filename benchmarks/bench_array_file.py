@@ -0,0 +1,60 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks loading a large array from a binary file against parsing it from text input.
+"""
+
+import os
+import random
+import tempfile
+
+from common import report, run_program
+
+ROWS = 1000
+COLUMNS = 200
+
+
+def build_program(path: str) -> str:
+    """Builds a program that reads a two-dimensional array, from the input if `path` is empty, and sums a column."""
+    if path:
+        read = f"    array_load(a, \"{path}\");\n"
+    else:
+        read = f"    for (int i = 0; i < {ROWS}; i += 1) scan_ints(a[i], {COLUMNS});\n"
+    return (f"int main() {{\n"
+            f"    int a[{ROWS}][{COLUMNS}];\n"
+            f"{read}"
+            f"    int total = 0;\n"
+            f"    for (int i = 0; i < {ROWS}; i += 1) total += a[i][0];\n"
+            f"    print((string) total);\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    rows = [[random.randint(-10 ** 9, 10 ** 9) for _ in range(COLUMNS)] for _ in range(ROWS)]
+    program_input = "".join(" ".join(map(str, row)) + "\n" for row in rows)
+    array_file, path = tempfile.mkstemp(suffix=".bin")
+    os.close(array_file)
+    path = path.replace("\\", "/")
+
+    try:
+        # Converts the text input to a binary file once.
+        save = (f"int main() {{\n"
+                f"    int a[{ROWS}][{COLUMNS}];\n"
+                f"    for (int i = 0; i < {ROWS}; i += 1) scan_ints(a[i], {COLUMNS});\n"
+                f"    array_save(a, \"{path}\");\n"
+                f"    return 0;\n"
+                f"}}\n")
+        run_program(save, program_input)
+
+        text_time, text_output = run_program(build_program(""), program_input)
+        binary_time, binary_output = run_program(build_program(path))
+        assert text_output == binary_output == str(sum(row[0] for row in rows))
+        report(f"parse text ({ROWS}x{COLUMNS} ints)", text_time)
+        report(f"array_load ({ROWS}x{COLUMNS} ints)", binary_time, text_time)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the array math built-ins against the same work done with loops in interpreted PYC.
+"""
+
+import random
+
+from common import report, run_program
+
+MATRIX_SIZE = 30
+PREFIX_SIZE = 20000
+
+
+def matrix_program(builtin: bool) -> str:
+    """Returns a program that multiplies two matrices read from the input and prints the trace of the product."""
+    if builtin:
+        multiply = "    matmul(c, a, b);\n"
+    else:
+        multiply = ("    for (int i = 0; i < n; i += 1) {\n"
+                    "        for (int j = 0; j < n; j += 1) {\n"
+                    "            int s = 0;\n"
+                    "            for (int k = 0; k < n; k += 1) {\n"
+                    "                s += a[i][k] * b[k][j];\n"
+                    "            }\n"
+                    "            c[i][j] = s;\n"
+                    "        }\n"
+                    "    }\n")
+    return (f"int main() {{\n"
+            f"    int n = {MATRIX_SIZE};\n"
+            f"    int a[n][n];\n"
+            f"    int b[n][n];\n"
+            f"    int c[n][n];\n"
+            f"    for (int i = 0; i < n; i += 1) {{\n"
+            f"        scan_ints(a[i], n);\n"
+            f"    }}\n"
+            f"    for (int i = 0; i < n; i += 1) {{\n"
+            f"        scan_ints(b[i], n);\n"
+            f"    }}\n"
+            f"{multiply}"
+            f"    int trace = 0;\n"
+            f"    for (int i = 0; i < n; i += 1) {{\n"
+            f"        trace += c[i][i];\n"
+            f"    }}\n"
+            f"    print((string) trace + \"\\n\");\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def prefix_program(builtin: bool) -> str:
+    """Returns a program that prints the last prefix sum and the smallest prefix sum of an array read from the input."""
+    if builtin:
+        compute = ("    prefix_sum(a, a);\n"
+                   "    int smallest = array_min(a);\n")
+    else:
+        compute = ("    int smallest = a[0];\n"
+                   "    for (int i = 1; i < n; i += 1) {\n"
+                   "        a[i] += a[i - 1];\n"
+                   "        if (a[i] < smallest) {\n"
+                   "            smallest = a[i];\n"
+                   "        }\n"
+                   "    }\n")
+    return (f"int main() {{\n"
+            f"    int n = {PREFIX_SIZE};\n"
+            f"    int a[n];\n"
+            f"    scan_ints(a, n);\n"
+            f"{compute}"
+            f"    print((string) a[n - 1] + \" \" + (string) smallest + \"\\n\");\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    # Multiplies two random matrices.
+    a = [[random.randint(-100, 100) for _ in range(MATRIX_SIZE)] for _ in range(MATRIX_SIZE)]
+    b = [[random.randint(-100, 100) for _ in range(MATRIX_SIZE)] for _ in range(MATRIX_SIZE)]
+    program_input = "\n".join(" ".join(map(str, row)) for row in a + b) + "\n"
+    trace = sum(a[i][k] * b[k][i] for i in range(MATRIX_SIZE) for k in range(MATRIX_SIZE))
+    loop_time, loop_output = run_program(matrix_program(False), program_input)
+    builtin_time, builtin_output = run_program(matrix_program(True), program_input)
+    assert loop_output == builtin_output == f"{trace}\n"
+    report(f"matmul with loops ({MATRIX_SIZE}x{MATRIX_SIZE})", loop_time)
+    report(f"matmul built-in ({MATRIX_SIZE}x{MATRIX_SIZE})", builtin_time, loop_time)
+
+    # Computes the prefix sums of a random array.
+    numbers = [random.randint(-1000, 1000) for _ in range(PREFIX_SIZE)]
+    program_input = " ".join(map(str, numbers)) + "\n"
+    loop_time, loop_output = run_program(prefix_program(False), program_input)
+    builtin_time, builtin_output = run_program(prefix_program(True), program_input)
+    assert loop_output == builtin_output
+    report(f"prefix sums with a loop ({PREFIX_SIZE} ints)", loop_time)
+    report(f"prefix_sum + array_min ({PREFIX_SIZE} ints)", builtin_time, loop_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the memory used by arrays, and the time taken to access the elements of one and two-dimensional
+arrays.
+"""
+
+import tracemalloc
+
+from common import report, run_program
+from tokens import TokenType
+from value import ArrayValue, IntValue, InitializerListValue
+
+ROWS = 100
+COLUMNS = 100
+NUM_PASSES = 2
+
+
+def nested_list_array(rows: int, columns: int) -> InitializerListValue:
+    """Builds a two-dimensional array the way it was stored before arrays had a flat buffer."""
+    return InitializerListValue(TokenType.ARRAYL, [
+        InitializerListValue(TokenType.ARRAYL, [IntValue(TokenType.INTL, 0) for _ in range(columns)])
+        for _ in range(rows)])
+
+
+def measure_memory(build) -> int:
+    """Returns the number of bytes allocated while building an array."""
+    tracemalloc.start()
+    array = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del array
+    return size
+
+
+def build_program(two_dimensional: bool) -> str:
+    """Builds a program that writes then reads every element of an array."""
+    if two_dimensional:
+        declaration = f"int a[{ROWS}][{COLUMNS}];"
+        write = f"for (int i = 0; i < {ROWS}; i += 1) for (int j = 0; j < {COLUMNS}; j += 1) a[i][j] = i + j;"
+        read = f"for (int i = 0; i < {ROWS}; i += 1) for (int j = 0; j < {COLUMNS}; j += 1) total += a[i][j];"
+    else:
+        declaration = f"int a[{ROWS * COLUMNS}];"
+        write = f"for (int i = 0; i < {ROWS * COLUMNS}; i += 1) a[i] = i;"
+        read = f"for (int i = 0; i < {ROWS * COLUMNS}; i += 1) total += a[i];"
+    return (f"int main() {{\n"
+            f"    {declaration}\n"
+            f"    int total = 0;\n"
+            f"    for (int k = 0; k < {NUM_PASSES}; k += 1) {{\n"
+            f"        {write}\n"
+            f"        {read}\n"
+            f"    }}\n"
+            f"    print((string) total);\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    nested_size = measure_memory(lambda: nested_list_array(ROWS, COLUMNS))
+    flat_size = measure_memory(lambda: ArrayValue.create(TokenType.INTL, (ROWS, COLUMNS)))
+    print(f"{'nested list of values':<40} {nested_size:>9} bytes")
+    print(f"{'flat buffer':<40} {flat_size:>9} bytes  ({nested_size / flat_size:.1f}x smaller)")
+
+    for two_dimensional in (False, True):
+        seconds, _ = run_program(build_program(two_dimensional))
+        name = f"{ROWS}x{COLUMNS}" if two_dimensional else f"{ROWS * COLUMNS}"
+        report(f"write + read int a[{name}]", seconds)
+
+
+if __name__ == "__main__":
+    main()
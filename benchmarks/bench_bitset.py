@@ -0,0 +1,57 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks a sieve of Eratosthenes on a bitset against the same sieve on an int array.
+"""
+
+from common import report, run_program
+
+ARRAY_SIZE = 2 * 10 ** 4
+BITSET_SIZES = (ARRAY_SIZE, 10 ** 7)
+
+# The number of primes up to each size.
+PRIME_COUNTS = {ARRAY_SIZE: 2262, 10 ** 7: 664579}
+
+ARRAY_PROGRAM = ("int main() {\n"
+                 "    int n = (int) scan();\n"
+                 "    int composite[n + 1];\n"
+                 "    int count = 0;\n"
+                 "    for (int p = 2; p <= n; p += 1) {\n"
+                 "        if (composite[p] == 0) {\n"
+                 "            count += 1;\n"
+                 "            for (int m = p * p; m <= n; m += p) {\n"
+                 "                composite[m] = 1;\n"
+                 "            }\n"
+                 "        }\n"
+                 "    }\n"
+                 "    print((string) count + \"\\n\");\n"
+                 "    return 0;\n"
+                 "}\n")
+
+BITSET_PROGRAM = ("int main() {\n"
+                  "    int n = (int) scan();\n"
+                  "    bitset prime[n + 1];\n"
+                  "    bs_set_stride(prime, 2, 1);\n"
+                  "    for (int p = 2; p * p <= n; p += 1) {\n"
+                  "        if (bs_test(prime, p)) {\n"
+                  "            bs_clear_stride(prime, p * p, p);\n"
+                  "        }\n"
+                  "    }\n"
+                  "    print((string) bs_count(prime) + \"\\n\");\n"
+                  "    return 0;\n"
+                  "}\n")
+
+
+def main():
+    array_time, array_output = run_program(ARRAY_PROGRAM, f"{ARRAY_SIZE}\n")
+    assert array_output == f"{PRIME_COUNTS[ARRAY_SIZE]}\n"
+    report(f"int array sieve (n = {ARRAY_SIZE})", array_time)
+
+    for size in BITSET_SIZES:
+        bitset_time, bitset_output = run_program(BITSET_PROGRAM, f"{size}\n")
+        assert bitset_output == f"{PRIME_COUNTS[size]}\n"
+        report(f"bitset sieve (n = {size})", bitset_time, array_time if size == ARRAY_SIZE else None)
+
+
+if __name__ == "__main__":
+    main()
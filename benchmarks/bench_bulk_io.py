@@ -0,0 +1,40 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks reading and printing an array one element at a time against `scan_ints` and `print_array`.
+"""
+
+import random
+
+from common import report, run_program
+
+SIZE = 5000
+
+
+def build_program(bulk: bool) -> str:
+    """Builds a program that reads an array of ints and prints it back out."""
+    if bulk:
+        body = ("    scan_ints(a, n);\n"
+                "    print_array(a, \" \");\n")
+    else:
+        body = ("    for (int i = 0; i < n; i += 1) a[i] = (int) scan();\n"
+                "    for (int i = 0; i < n; i += 1) print((string) a[i] + \" \");\n")
+    return (f"int main() {{\n"
+            f"    int n = {SIZE};\n"
+            f"    int a[n];\n"
+            f"{body}"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    program_input = " ".join(str(random.randint(-10 ** 9, 10 ** 9)) for _ in range(SIZE)) + "\n"
+    loop_time, loop_output = run_program(build_program(False), program_input)
+    bulk_time, bulk_output = run_program(build_program(True), program_input)
+    assert loop_output.split() == bulk_output.split()
+    report(f"scan + print loops ({SIZE} ints)", loop_time)
+    report(f"scan_ints + print_array ({SIZE} ints)", bulk_time, loop_time)
+
+
+if __name__ == "__main__":
+    main()
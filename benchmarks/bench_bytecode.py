@@ -0,0 +1,69 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the bytecode engine against the tree-walking interpreter, on every program in `examples/` and on
+a program whose time is spent in loops and calls between small functions.
+"""
+
+import os
+
+from bench_engines import EXAMPLES_DIR, example_inputs
+from common import report, run_program
+from vm import VirtualMachine
+
+SIEVE_SIZE = 30000
+FIB_N = 18
+
+LOOPS_PROGRAM = f"""
+int fib(int n) {{
+    if (n < 2) {{
+        return n;
+    }}
+    return fib(n - 1) + fib(n - 2);
+}}
+
+int main() {{
+    int n = {SIEVE_SIZE};
+    int composite[{SIEVE_SIZE + 1}];
+    int count = 0;
+    for (int i = 2; i <= n; i += 1) {{
+        if (composite[i] == 0) {{
+            count += 1;
+            for (int j = i * 2; j <= n; j += i) {{
+                composite[j] = 1;
+            }}
+        }}
+    }}
+    print((string) count + " " + (string) fib({FIB_N}) + "\\n");
+    return 0;
+}}
+"""
+
+
+def main():
+    inputs = example_inputs()
+    tree_total = bytecode_total = 0
+    for name in sorted(os.listdir(EXAMPLES_DIR)):
+        if not name.endswith(".pysc"):
+            continue
+        with open(os.path.join(EXAMPLES_DIR, name)) as file:
+            code = file.read()
+        tree_time, tree_output = run_program(code, inputs.get(name, ""))
+        bytecode_time, bytecode_output = run_program(code, inputs.get(name, ""), VirtualMachine)
+        assert tree_output == bytecode_output
+        report(f"{name} (tree)", tree_time)
+        report(f"{name} (bytecode)", bytecode_time, tree_time)
+        tree_total += tree_time
+        bytecode_total += bytecode_time
+    report("all examples (tree)", tree_total)
+    report("all examples (bytecode)", bytecode_total, tree_total)
+
+    tree_time, tree_output = run_program(LOOPS_PROGRAM)
+    bytecode_time, bytecode_output = run_program(LOOPS_PROGRAM, "", VirtualMachine)
+    assert tree_output == bytecode_output
+    report("sieve and fib (tree)", tree_time)
+    report("sieve and fib (bytecode)", bytecode_time, tree_time)
+
+
+if __name__ == "__main__":
+    main()
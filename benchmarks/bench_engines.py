@@ -0,0 +1,58 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the closure engine against the tree-walking interpreter on every program in `examples/`. The
+programs that read input are given enough of it to do some work.
+"""
+
+import os
+import random
+
+from common import report, run_program
+from closure import ClosureInterpreter
+
+MERGE_SORT_SIZE = 500
+NUM_NODES = 40
+NUM_EDGES = 300
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+
+def example_inputs():
+    """Returns the input fed to each example, by file name. Examples that are not listed read no input."""
+    numbers = [random.randint(-10 ** 9, 10 ** 9) for _ in range(MERGE_SORT_SIZE)]
+    edges = [(random.randrange(NUM_NODES), random.randrange(NUM_NODES), random.randint(1, 100))
+             for _ in range(NUM_EDGES)]
+    graph = "\n".join([str(NUM_NODES), str(NUM_EDGES)] + [f"{a} {b} {w}" for a, b, w in edges] +
+                      ["0", str(NUM_NODES - 1)]) + "\n"
+    return {
+        "io.pysc": "blue\n7\n",
+        "merge_sort.pysc": f"{MERGE_SORT_SIZE}\n{' '.join(map(str, numbers))}\n",
+        "dijkstra.pysc": graph,
+        "dijkstra_pq.pysc": graph,
+        # Player 1 fills the top row while player 2 plays in the middle row.
+        "tictactoe.pysc": "1\n4\n2\n5\n3\n",
+    }
+
+
+def main():
+    inputs = example_inputs()
+    tree_total = closure_total = 0
+    for name in sorted(os.listdir(EXAMPLES_DIR)):
+        if not name.endswith(".pysc"):
+            continue
+        with open(os.path.join(EXAMPLES_DIR, name)) as file:
+            code = file.read()
+        tree_time, tree_output = run_program(code, inputs.get(name, ""))
+        closure_time, closure_output = run_program(code, inputs.get(name, ""), ClosureInterpreter)
+        assert tree_output == closure_output
+        report(f"{name} (tree)", tree_time)
+        report(f"{name} (closure)", closure_time, tree_time)
+        tree_total += tree_time
+        closure_total += closure_time
+    report("all examples (tree)", tree_total)
+    report("all examples (closure)", closure_total, tree_total)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks calling a python function registered through the foreign function interface against calling
+the same function written in PYC.
+"""
+
+from common import report, run_program
+import ffi
+
+NUM_CALLS = 2 * 10 ** 4
+
+PROGRAM = ("{declaration}"
+           "int main() {{\n"
+           "    int total = 0;\n"
+           "    for (int i = 0; i < {calls}; i += 1) {{\n"
+           "        total = clamp_add(total, i);\n"
+           "    }}\n"
+           "    print((string) total + \"\\n\");\n"
+           "    return 0;\n"
+           "}}\n")
+
+PYC_FUNCTION = ("int clamp_add(int a, int b) {\n"
+                "    if (a + b > 1000000) {\n"
+                "        return 0;\n"
+                "    }\n"
+                "    return a + b;\n"
+                "}\n")
+
+
+def clamp_add(a: int, b: int) -> int:
+    """Adds two ints, wrapping around to 0 past a million."""
+    return 0 if a + b > 1000000 else a + b
+
+
+def main():
+    expected = 0
+    for i in range(NUM_CALLS):
+        expected = clamp_add(expected, i)
+
+    pyc_time, pyc_output = run_program(PROGRAM.format(declaration=PYC_FUNCTION, calls=NUM_CALLS))
+    assert pyc_output == f"{expected}\n"
+    report(f"PYC function ({NUM_CALLS} calls)", pyc_time)
+
+    ffi.register("int clamp_add(int a, int b)")(clamp_add)
+    try:
+        ffi_time, ffi_output = run_program(PROGRAM.format(declaration="", calls=NUM_CALLS))
+    finally:
+        ffi.unregister("clamp_add")
+    assert ffi_output == f"{expected}\n"
+    report(f"python function ({NUM_CALLS} calls)", ffi_time, pyc_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the graph built-ins against Dijkstra's algorithm written in PYC with an adjacency matrix and a
+priority queue, like `examples/dijkstra_pq.pysc`.
+"""
+
+import heapq
+import random
+
+from common import report, run_program
+
+MATRIX_NODES = 40
+GRAPH_NODES = (MATRIX_NODES, 10 ** 5)
+EDGES_PER_NODE = 5
+MAX_WEIGHT = 100
+
+# Both programs print the sum of the distances from node 0 to every node it can reach. The graph program sums them with
+# `array_sum`, so the -1 of each node that cannot be reached is included in its sum.
+MATRIX_PROGRAM = ("int main() {\n"
+                  "    int INF = 5000000000;\n"
+                  "    int n = (int) scan();\n"
+                  "    int m = (int) scan();\n"
+                  "    int adj[n][n];\n"
+                  "    for (int i = 0; i < n; i += 1) {\n"
+                  "        for (int j = 0; j < n; j += 1) {\n"
+                  "            adj[i][j] = INF;\n"
+                  "        }\n"
+                  "    }\n"
+                  "    for (int i = 0; i < m; i += 1) {\n"
+                  "        int a = (int) scan();\n"
+                  "        int b = (int) scan();\n"
+                  "        int w = (int) scan();\n"
+                  "        if (w < adj[a][b]) {\n"
+                  "            adj[a][b] = w;\n"
+                  "        }\n"
+                  "    }\n"
+                  "    int dist[n];\n"
+                  "    for (int i = 0; i < n; i += 1) dist[i] = INF;\n"
+                  "    int visited[n];\n"
+                  "    priority_queue queue;\n"
+                  "    pq_push(queue, 0, 0);\n"
+                  "    dist[0] = 0;\n"
+                  "    while (pq_size(queue) != 0) {\n"
+                  "        int curr_dist = pq_peek_priority(queue);\n"
+                  "        int node = pq_pop(queue);\n"
+                  "        if (visited[node]) continue;\n"
+                  "        visited[node] = 1;\n"
+                  "        for (int i = 0; i < n; i += 1) {\n"
+                  "            if (adj[node][i] == INF) continue;\n"
+                  "            if (dist[i] > curr_dist + adj[node][i]) {\n"
+                  "                dist[i] = curr_dist + adj[node][i];\n"
+                  "                pq_push(queue, dist[i], i);\n"
+                  "            }\n"
+                  "        }\n"
+                  "    }\n"
+                  "    int total = 0;\n"
+                  "    for (int i = 0; i < n; i += 1) {\n"
+                  "        if (dist[i] != INF) total += dist[i];\n"
+                  "    }\n"
+                  "    print((string) total + \"\\n\");\n"
+                  "    return 0;\n"
+                  "}\n")
+
+GRAPH_PROGRAM = ("int main() {\n"
+                 "    int n = (int) scan();\n"
+                 "    int m = (int) scan();\n"
+                 "    int from[m];\n"
+                 "    int to[m];\n"
+                 "    int w[m];\n"
+                 "    scan_ints(from, m);\n"
+                 "    scan_ints(to, m);\n"
+                 "    scan_ints(w, m);\n"
+                 "    graph g;\n"
+                 "    graph_build(g, n, from, to, w);\n"
+                 "    int dist[n];\n"
+                 "    dijkstra(g, 0, dist);\n"
+                 "    print((string) array_sum(dist) + \"\\n\");\n"
+                 "    return 0;\n"
+                 "}\n")
+
+
+def random_graph(n: int):
+    """
+    Returns a random graph with `n` nodes, as the input of each program, the sum of the distances to the nodes that can
+    be reached and the number of nodes that cannot be reached.
+    """
+    edges = [(random.randrange(n), random.randrange(n), random.randint(1, MAX_WEIGHT))
+             for _ in range(n * EDGES_PER_NODE)]
+    adjacency = [[] for _ in range(n)]
+    for a, b, w in edges:
+        adjacency[a].append((b, w))
+
+    # Finds the expected distances with a plain python Dijkstra.
+    dist = {0: 0}
+    heap = [(0, 0)]
+    done = set()
+    while heap:
+        d, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        for v, w in adjacency[u]:
+            if d + w < dist.get(v, d + w + 1):
+                dist[v] = d + w
+                heapq.heappush(heap, (d + w, v))
+
+    # The matrix program reads one edge per line, and the graph program reads a line for each edge array.
+    header = f"{n} {len(edges)}\n"
+    matrix_input = header + "".join(f"{a} {b} {w}\n" for a, b, w in edges)
+    graph_input = header + "".join(" ".join(str(edge[i]) for edge in edges) + "\n" for i in range(3))
+    return matrix_input, graph_input, sum(dist.values()), n - len(dist)
+
+
+def main():
+    matrix_input, graph_input, total, unreached = random_graph(MATRIX_NODES)
+    matrix_time, matrix_output = run_program(MATRIX_PROGRAM, matrix_input)
+    assert matrix_output == f"{total}\n"
+    report(f"matrix dijkstra in PYC (n = {MATRIX_NODES})", matrix_time)
+
+    for n in GRAPH_NODES:
+        if n != MATRIX_NODES:
+            _, graph_input, total, unreached = random_graph(n)
+        graph_time, graph_output = run_program(GRAPH_PROGRAM, graph_input)
+        assert graph_output == f"{total - unreached}\n"
+        report(f"graph dijkstra (n = {n})", graph_time, matrix_time if n == MATRIX_NODES else None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the throughput of reading tokens and lines from stdin, in MB/s.
+"""
+
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401 (adds the interpreter modules to the path)
+from streams import InputReader
+
+NUM_INTEGERS = 200000
+
+
+def char_by_char_token() -> str:
+    """Reads a token one character at a time, the way stdin was read before it was buffered."""
+    token = ""
+    while True:
+        c = sys.stdin.read(1)
+        if not c.isspace():
+            token += c
+            break
+    while True:
+        c = sys.stdin.read(1)
+        if c.isspace():
+            break
+        token += c
+    return token
+
+
+def char_by_char_line() -> str:
+    """Reads a line one character at a time, the way stdin was read before it was buffered."""
+    line = ""
+    while True:
+        c = sys.stdin.read(1)
+        if c == "\n":
+            break
+        line += c
+    return line
+
+
+def throughput(stdin, read) -> float:
+    """Reads every integer from a stream, and returns the number of megabytes read per second."""
+    sys.stdin = stdin
+    try:
+        start = time.perf_counter()
+        total = sum(int(read()) for _ in range(NUM_INTEGERS))
+        elapsed = time.perf_counter() - start
+    finally:
+        sys.stdin = sys.__stdin__
+    assert total == EXPECTED_TOTAL
+    return SIZE_MB / elapsed
+
+
+numbers = [random.randint(-10 ** 9, 10 ** 9) for _ in range(NUM_INTEGERS)]
+EXPECTED_TOTAL = sum(numbers)
+DATA = "".join(f"{number}\n" for number in numbers)
+SIZE_MB = len(DATA) / 10 ** 6
+
+
+def main():
+    file_descriptor, path = tempfile.mkstemp(suffix=".in")
+    with os.fdopen(file_descriptor, "w") as file:
+        file.write(DATA)
+
+    print(f"{NUM_INTEGERS} integers, {SIZE_MB:.2f} MB")
+    try:
+        for kind, old_read, method in (("tokens", char_by_char_token, InputReader.next_token),
+                                       ("lines", char_by_char_line, InputReader.next_line)):
+            with open(path, "r") as file:
+                old = throughput(file, old_read)
+            reader = InputReader()
+            buffered = throughput(io.TextIOWrapper(io.BytesIO(DATA.encode("utf-8"))), lambda: method(reader))
+            reader = InputReader()
+            with open(path, "r") as file:
+                mapped = throughput(file, lambda: method(reader))
+
+            print(f"{kind + ', read(1) per character':<40} {old:>9.2f} MB/s")
+            print(f"{kind + ', buffered stream':<40} {buffered:>9.2f} MB/s  ({buffered / old:.1f}x)")
+            print(f"{kind + ', memory-mapped file':<40} {mapped:>9.2f} MB/s  ({mapped / old:.1f}x)")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
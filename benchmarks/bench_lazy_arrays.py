@@ -0,0 +1,53 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks declaring a large array that is only partly written to, with and without lazy allocation.
+"""
+
+import array
+import time
+import tracemalloc
+
+from common import report, run_program
+from tokens import TokenType
+from value import ArrayValue
+
+SIZE = 10000000
+NUM_WRITES = 2000
+
+
+def measure(build) -> tuple:
+    """Returns the number of seconds taken and the number of bytes allocated while building an array."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, size
+
+
+def main():
+    eager_time, eager_size = measure(lambda: array.array("q", bytes(SIZE * 8)))
+    lazy_time, lazy_size = measure(lambda: ArrayValue.create(TokenType.INTL, (SIZE,)))
+    report(f"eager int a[{SIZE}]", eager_time)
+    report(f"lazy int a[{SIZE}]", lazy_time, eager_time)
+    print(f"{'eager memory':<40} {eager_size:>9} bytes")
+    print(f"{'lazy memory':<40} {lazy_size:>9} bytes")
+
+    # Writes to a small part of the array, like a sieve over a range much smaller than the declared size.
+    code = (f"int main() {{\n"
+            f"    int a[{SIZE}];\n"
+            f"    for (int i = 0; i < {NUM_WRITES}; i += 1) a[i * 97] = i;\n"
+            f"    int total = 0;\n"
+            f"    for (int i = 0; i < {NUM_WRITES}; i += 1) total += a[i * 97];\n"
+            f"    print((string) total);\n"
+            f"    return 0;\n"
+            f"}}\n")
+    seconds, _ = run_program(code)
+    report(f"{NUM_WRITES} writes to int a[{SIZE}]", seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks counting keys with a map against a linear scan of an array of the keys seen so far.
+"""
+
+import random
+
+from common import report, run_program
+
+NUM_KEYS = 500
+NUM_DISTINCT = 80
+
+
+def build_program(use_map: bool) -> str:
+    """Builds a program that reads keys and prints the number of times the most common key was seen."""
+    if use_map:
+        declarations = "    map<int, int> counts;\n"
+        body = ("        if (map_contains(counts, key)) map_put(counts, key, map_get(counts, key) + 1);\n"
+                "        else map_put(counts, key, 1);\n"
+                "        int c = map_get(counts, key);\n")
+    else:
+        declarations = (f"    int keys[{NUM_DISTINCT}];\n"
+                        f"    int counts[{NUM_DISTINCT}];\n"
+                        f"    int num_seen = 0;\n")
+        body = ("        int j = 0;\n"
+                "        while (j < num_seen) {\n"
+                "            if (keys[j] == key) break;\n"
+                "            j += 1;\n"
+                "        }\n"
+                "        if (j == num_seen) {\n"
+                "            keys[j] = key;\n"
+                "            num_seen += 1;\n"
+                "        }\n"
+                "        counts[j] += 1;\n"
+                "        int c = counts[j];\n")
+    return (f"int main() {{\n"
+            f"{declarations}"
+            f"    int best = 0;\n"
+            f"    for (int i = 0; i < {NUM_KEYS}; i += 1) {{\n"
+            f"        int key = (int) scan();\n"
+            f"{body}"
+            f"        if (c > best) best = c;\n"
+            f"    }}\n"
+            f"    print((string) best + \"\\n\");\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    distinct = random.sample(range(10 ** 9), NUM_DISTINCT)
+    program_input = " ".join(str(random.choice(distinct)) for _ in range(NUM_KEYS)) + "\n"
+    scan_time, scan_output = run_program(build_program(False), program_input)
+    map_time, map_output = run_program(build_program(True), program_input)
+    assert scan_output == map_output
+    report(f"array scan ({NUM_KEYS} keys, {NUM_DISTINCT} distinct)", scan_time)
+    report(f"map ({NUM_KEYS} keys, {NUM_DISTINCT} distinct)", map_time, scan_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks printing many short lines with buffered and unbuffered output.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import report
+
+NUM_LINES = 20000
+
+PROGRAM = (f"int main() {{\n"
+           f"    for (int i = 0; i < {NUM_LINES}; i += 1) print(\"line\\n\");\n"
+           f"    return 0;\n"
+           f"}}\n")
+
+
+def run(*flags: str) -> float:
+    """Runs the program in a new process with its output going to a file, and returns the time taken."""
+    main_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyc", "__main__.py")
+    with tempfile.TemporaryFile() as output_file:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, main_file, *flags, "-c", PROGRAM], stdout=output_file, check=True)
+        elapsed = time.perf_counter() - start
+        output_file.seek(0)
+        assert output_file.read() == b"line\n" * NUM_LINES
+    return elapsed
+
+
+def main():
+    unbuffered_time = run("-u")
+    buffered_time = run()
+    report(f"unbuffered ({NUM_LINES} lines)", unbuffered_time)
+    report(f"buffered ({NUM_LINES} lines)", buffered_time, unbuffered_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks printing formatted numbers with `printf` against casting them to strings for `print`.
+"""
+
+from common import report, run_program
+
+SIZE = 5000
+
+
+def build_program(formatted: bool) -> str:
+    """Builds a program that prints a line with an int and a float for each number up to `SIZE`."""
+    if formatted:
+        body = "        printf(\"%d %f\\n\", i, x);\n"
+    else:
+        body = "        print((string) i + \" \" + (string) x + \"\\n\");\n"
+    return (f"int main() {{\n"
+            f"    for (int i = 0; i < {SIZE}; i += 1) {{\n"
+            f"        float x = (float) i / 4;\n"
+            f"{body}"
+            f"    }}\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    cast_time, cast_output = run_program(build_program(False), "")
+    printf_time, printf_output = run_program(build_program(True), "")
+    assert [float(x) for x in cast_output.split()] == [float(x) for x in printf_output.split()]
+    report(f"print with casts ({SIZE} lines)", cast_time)
+    report(f"printf ({SIZE} lines)", printf_time, cast_time)
+
+
+if __name__ == "__main__":
+    main()
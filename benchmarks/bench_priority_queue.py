@@ -0,0 +1,55 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks `examples/dijkstra.pysc`, which uses a binary heap written in PYC, against
+`examples/dijkstra_pq.pysc`, which uses the built-in priority queue.
+"""
+
+import heapq
+import os
+import random
+
+from common import report, run_program
+
+NUM_NODES = 40
+NUM_EDGES = 1000
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+
+def shortest_distance(edges, start: int, end: int) -> int:
+    """Finds the length of the shortest path between two nodes in Python, to check the output of the programs."""
+    adjacent = [[] for _ in range(NUM_NODES)]
+    for a, b, w in edges:
+        adjacent[a].append((b, w))
+    dist = [None] * NUM_NODES
+    queue = [(0, start)]
+    while len(queue) != 0:
+        d, node = heapq.heappop(queue)
+        if dist[node] is not None:
+            continue
+        dist[node] = d
+        for neighbour, w in adjacent[node]:
+            heapq.heappush(queue, (d + w, neighbour))
+    return dist[end]
+
+
+def main():
+    edges = [(random.randrange(NUM_NODES), random.randrange(NUM_NODES), random.randint(1, 100))
+             for _ in range(NUM_EDGES)]
+    program_input = "\n".join([str(NUM_NODES), str(NUM_EDGES)] + [f"{a} {b} {w}" for a, b, w in edges] +
+                              ["0", str(NUM_NODES - 1)]) + "\n"
+    expected = shortest_distance(edges, 0, NUM_NODES - 1)
+
+    with open(os.path.join(EXAMPLES_DIR, "dijkstra.pysc")) as file:
+        heap_time, heap_output = run_program(file.read(), program_input)
+    with open(os.path.join(EXAMPLES_DIR, "dijkstra_pq.pysc")) as file:
+        queue_time, queue_output = run_program(file.read(), program_input)
+    assert heap_output == queue_output
+    assert expected is None or f"Minimum distance: {expected}\n" in queue_output
+    report(f"PYC binary heap ({NUM_NODES} nodes, {NUM_EDGES} edges)", heap_time)
+    report(f"priority_queue ({NUM_NODES} nodes, {NUM_EDGES} edges)", queue_time, heap_time)
+
+
+if __name__ == "__main__":
+    main()
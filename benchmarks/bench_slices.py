@@ -0,0 +1,70 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks merge sort written with array slices against merge sort that copies each half into a new array.
+"""
+
+import random
+
+from common import report, run_program
+
+SIZE = 256
+
+MERGE = """
+    int i = 0;
+    int j = 0;
+    for (int k = 0; k < n; k += 1) {
+        int take_left = j >= n - m;
+        if (i < m && j < n - m) take_left = left[i] <= right[j];
+        if (take_left) {
+            a[k] = left[i];
+            i += 1;
+        } else {
+            a[k] = right[j];
+            j += 1;
+        }
+    }
+"""
+
+
+def build_program(use_slices: bool) -> str:
+    """Builds a program that reads an array and sorts it with merge sort."""
+    if use_slices:
+        # The halves are sorted in place, and only copied once into the temporary arrays used by the merge.
+        split = ("    merge_sort(a[:m], m);\n"
+                 "    merge_sort(a[m:], n - m);\n"
+                 "    int left[] = a[:m];\n"
+                 "    int right[] = a[m:];\n")
+    else:
+        split = ("    int left[m];\n"
+                 "    int right[n - m];\n"
+                 "    for (int k = 0; k < m; k += 1) left[k] = a[k];\n"
+                 "    for (int k = m; k < n; k += 1) right[k - m] = a[k];\n"
+                 "    merge_sort(left, m);\n"
+                 "    merge_sort(right, n - m);\n")
+    return (f"void merge_sort(int a[], int n) {{\n"
+            f"    if (n < 2) return;\n"
+            f"    int m = n / 2;\n"
+            f"{split}"
+            f"{MERGE}"
+            f"}}\n"
+            f"int main() {{\n"
+            f"    int a[{SIZE}];\n"
+            f"    for (int i = 0; i < {SIZE}; i += 1) a[i] = (int) scan();\n"
+            f"    merge_sort(a, {SIZE});\n"
+            f"    for (int i = 0; i < {SIZE}; i += 1) print((string) a[i] + \" \");\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    program_input = "".join(f"{random.randint(0, 10 ** 6)}\n" for _ in range(SIZE))
+    copy_time, copy_output = run_program(build_program(False), program_input)
+    slice_time, slice_output = run_program(build_program(True), program_input)
+    assert copy_output == slice_output
+    report(f"merge sort copying halves ({SIZE})", copy_time)
+    report(f"merge sort with slices ({SIZE})", slice_time, copy_time)
+
+
+if __name__ == "__main__":
+    main()
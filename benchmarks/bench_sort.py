@@ -0,0 +1,47 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the `sort` built-in against `examples/merge_sort.pysc`, which sorts in interpreted PYC.
+"""
+
+import os
+import random
+
+from common import report, run_program
+
+NATIVE_SIZE = 10 ** 6
+MERGE_SORT_SIZE = 1000
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "examples")
+
+NATIVE_PROGRAM = (f"int main() {{\n"
+                  f"    int n = {NATIVE_SIZE};\n"
+                  f"    int a[n];\n"
+                  f"    scan_ints(a, n);\n"
+                  f"    sort(a, n);\n"
+                  f"    print((string) a[0] + \" \" + (string) a[n / 2] + \" \" + (string) a[n - 1] + \"\\n\");\n"
+                  f"    return 0;\n"
+                  f"}}\n")
+
+
+def main():
+    # Times the merge sort example on a small array.
+    numbers = [random.randint(-10 ** 9, 10 ** 9) for _ in range(MERGE_SORT_SIZE)]
+    with open(os.path.join(EXAMPLES_DIR, "merge_sort.pysc")) as file:
+        merge_time, merge_output = run_program(file.read(), f"{MERGE_SORT_SIZE}\n{' '.join(map(str, numbers))}\n")
+    assert " ".join(map(str, sorted(numbers))) in merge_output
+    report(f"merge_sort.pysc ({MERGE_SORT_SIZE} ints)", merge_time)
+
+    # Times the built-in on a large array, and subtracts the time taken to read the input.
+    numbers = [random.randint(-10 ** 9, 10 ** 9) for _ in range(NATIVE_SIZE)]
+    program_input = " ".join(map(str, numbers)) + "\n"
+    read_time, _ = run_program(NATIVE_PROGRAM.replace("    sort(a, n);\n", ""), program_input)
+    sort_time, sort_output = run_program(NATIVE_PROGRAM, program_input)
+    numbers.sort()
+    assert sort_output == f"{numbers[0]} {numbers[NATIVE_SIZE // 2]} {numbers[-1]}\n"
+    report(f"scan_ints + sort ({NATIVE_SIZE} ints)", sort_time)
+    report(f"sort only ({NATIVE_SIZE} ints)", sort_time - read_time)
+
+
+if __name__ == "__main__":
+    main()
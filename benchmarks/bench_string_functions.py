@@ -0,0 +1,58 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks parsing lines of ints with `getline` and `split_ints` against reading them one `scan` at a time.
+"""
+
+import random
+
+from common import report, run_program
+
+NUM_LINES = 200
+INTS_PER_LINE = 50
+
+SCAN_PROGRAM = ("int main() {\n"
+                "    int lines = (int) scan();\n"
+                "    int per_line = (int) scan();\n"
+                "    int values[per_line];\n"
+                "    int total = 0;\n"
+                "    for (int line = 0; line < lines; line += 1) {\n"
+                "        for (int i = 0; i < per_line; i += 1) {\n"
+                "            values[i] = (int) scan();\n"
+                "        }\n"
+                "        total += values[per_line - 1];\n"
+                "    }\n"
+                "    print((string) total + \"\\n\");\n"
+                "    return 0;\n"
+                "}\n")
+
+SPLIT_PROGRAM = ("int main() {\n"
+                 "    int lines = to_int(getline());\n"
+                 "    int per_line = to_int(getline());\n"
+                 "    int values[per_line];\n"
+                 "    int total = 0;\n"
+                 "    for (int line = 0; line < lines; line += 1) {\n"
+                 "        split_ints(getline(), values);\n"
+                 "        total += values[per_line - 1];\n"
+                 "    }\n"
+                 "    print((string) total + \"\\n\");\n"
+                 "    return 0;\n"
+                 "}\n")
+
+
+def main():
+    rows = [[random.randint(-10 ** 9, 10 ** 9) for _ in range(INTS_PER_LINE)] for _ in range(NUM_LINES)]
+    program_input = f"{NUM_LINES}\n{INTS_PER_LINE}\n" + "".join(" ".join(map(str, row)) + "\n" for row in rows)
+    expected_output = f"{sum(row[-1] for row in rows)}\n"
+
+    scan_time, scan_output = run_program(SCAN_PROGRAM, program_input)
+    assert scan_output == expected_output
+    report(f"scan per int ({NUM_LINES * INTS_PER_LINE} ints)", scan_time)
+
+    split_time, split_output = run_program(SPLIT_PROGRAM, program_input)
+    assert split_output == expected_output
+    report(f"split_ints per line ({NUM_LINES * INTS_PER_LINE} ints)", split_time, scan_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks building a 1 MB string with `+`, using ropes and using flat strings that are copied on every
+concatenation.
+"""
+
+from common import report, run_program
+from tokens import TokenType
+from value import StringValue
+
+PIECE_LENGTH = 100
+NUM_PIECES = 10000
+
+PROGRAM = (f"int main() {{\n"
+           f"    string piece = \"{'x' * (PIECE_LENGTH - 1)}\";\n"
+           f"    string s = \"\";\n"
+           f"    for (int i = 0; i < {NUM_PIECES}; i += 1) s = s + piece + (string) (i % 10);\n"
+           f"    print(s);\n"
+           f"    return 0;\n"
+           f"}}\n")
+
+
+def main():
+    rope_time, rope_output = run_program(PROGRAM)
+
+    # Copies the whole string on every concatenation, the way strings were concatenated before ropes.
+    concatenate = StringValue.concatenate
+    StringValue.concatenate = lambda self, obj: StringValue(TokenType.STRINGL, self.value + obj.value)
+    try:
+        flat_time, flat_output = run_program(PROGRAM)
+    finally:
+        StringValue.concatenate = concatenate
+
+    assert rope_output == flat_output and len(rope_output) == PIECE_LENGTH * NUM_PIECES
+    report(f"flat strings ({len(rope_output) / 10 ** 6:.0f} MB)", flat_time)
+    report(f"ropes ({len(rope_output) / 10 ** 6:.0f} MB)", rope_time, flat_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks sorting records stored in an array of structs against the same records in parallel arrays.
+"""
+
+from common import report, run_program
+
+RECORD_COUNT = 100
+
+# Records are read as (key, weight, price), and sorted by key with an insertion sort.
+PARALLEL_PROGRAM = ("int main() {\n"
+                    "    int n = (int) scan();\n"
+                    "    int keys[n];\n"
+                    "    int weights[n];\n"
+                    "    float prices[n];\n"
+                    "    for (int i = 0; i < n; i += 1) {\n"
+                    "        keys[i] = (int) scan();\n"
+                    "        weights[i] = (int) scan();\n"
+                    "        prices[i] = (float) scan();\n"
+                    "    }\n"
+                    "    for (int i = 1; i < n; i += 1) {\n"
+                    "        for (int j = i; j > 0; j -= 1) {\n"
+                    "            if (keys[j - 1] <= keys[j]) {\n"
+                    "                break;\n"
+                    "            }\n"
+                    "            int key = keys[j];\n"
+                    "            keys[j] = keys[j - 1];\n"
+                    "            keys[j - 1] = key;\n"
+                    "            int weight = weights[j];\n"
+                    "            weights[j] = weights[j - 1];\n"
+                    "            weights[j - 1] = weight;\n"
+                    "            float price = prices[j];\n"
+                    "            prices[j] = prices[j - 1];\n"
+                    "            prices[j - 1] = price;\n"
+                    "        }\n"
+                    "    }\n"
+                    "    print((string) keys[0] + \" \" + (string) weights[n - 1] + \"\\n\");\n"
+                    "    return 0;\n"
+                    "}\n")
+
+STRUCT_PROGRAM = ("struct Record {\n"
+                  "    int key;\n"
+                  "    int weight;\n"
+                  "    float price;\n"
+                  "};\n"
+                  "int main() {\n"
+                  "    int n = (int) scan();\n"
+                  "    Record records[n];\n"
+                  "    for (int i = 0; i < n; i += 1) {\n"
+                  "        records[i].key = (int) scan();\n"
+                  "        records[i].weight = (int) scan();\n"
+                  "        records[i].price = (float) scan();\n"
+                  "    }\n"
+                  "    for (int i = 1; i < n; i += 1) {\n"
+                  "        for (int j = i; j > 0; j -= 1) {\n"
+                  "            if (records[j - 1].key <= records[j].key) {\n"
+                  "                break;\n"
+                  "            }\n"
+                  "            Record temp = records[j];\n"
+                  "            records[j] = records[j - 1];\n"
+                  "            records[j - 1] = temp;\n"
+                  "        }\n"
+                  "    }\n"
+                  "    print((string) records[0].key + \" \" + (string) records[n - 1].weight + \"\\n\");\n"
+                  "    return 0;\n"
+                  "}\n")
+
+
+def main():
+    # Keys count down so that every record moves to the other end of the array.
+    records = "".join(f"{RECORD_COUNT - i} {i} {i}.5\n" for i in range(RECORD_COUNT))
+    program_input = f"{RECORD_COUNT}\n{records}"
+    expected_output = "1 0\n"
+
+    parallel_time, parallel_output = run_program(PARALLEL_PROGRAM, program_input)
+    assert parallel_output == expected_output
+    report(f"parallel arrays insertion sort (n = {RECORD_COUNT})", parallel_time)
+
+    struct_time, struct_output = run_program(STRUCT_PROGRAM, program_input)
+    assert struct_output == expected_output
+    report(f"struct array insertion sort (n = {RECORD_COUNT})", struct_time, parallel_time)
+
+
+if __name__ == "__main__":
+    main()
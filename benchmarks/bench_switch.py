@@ -0,0 +1,40 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks a switch statement against the equivalent if-else chain.
+"""
+
+from common import report, run_program
+
+NUM_CASES = 32
+NUM_ITERATIONS = 5000
+
+
+def build_program(use_switch: bool) -> str:
+    """Builds a program that dispatches on every case label in turn."""
+    if use_switch:
+        cases = "".join(f"            case {i}: total += {i}; break;\n" for i in range(NUM_CASES))
+        dispatch = f"        switch (i % {NUM_CASES}) {{\n{cases}        }}\n"
+    else:
+        cases = " else ".join(f"if (i % {NUM_CASES} == {i}) {{ total += {i}; }}" for i in range(NUM_CASES))
+        dispatch = f"        {cases}\n"
+    return (f"int main() {{\n"
+            f"    int total = 0;\n"
+            f"    for (int i = 0; i < {NUM_ITERATIONS}; i += 1) {{\n"
+            f"{dispatch}"
+            f"    }}\n"
+            f"    print((string) total);\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    if_else_time, if_else_output = run_program(build_program(False))
+    switch_time, switch_output = run_program(build_program(True))
+    assert if_else_output == switch_output
+    report(f"if-else chain ({NUM_CASES} cases)", if_else_time)
+    report(f"switch ({NUM_CASES} cases)", switch_time, if_else_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks the tiered engine against the tree-walking interpreter and the bytecode engine, on every program
+in `examples/` and on a program whose time is spent in hot loops and a recursive function.
+"""
+
+import os
+
+from bench_bytecode import LOOPS_PROGRAM
+from bench_engines import EXAMPLES_DIR, example_inputs
+from common import report, run_program
+from tiered import TieredInterpreter
+from vm import VirtualMachine
+
+
+def main():
+    inputs = example_inputs()
+    tree_total = tiered_total = 0
+    for name in sorted(os.listdir(EXAMPLES_DIR)):
+        if not name.endswith(".pysc"):
+            continue
+        with open(os.path.join(EXAMPLES_DIR, name)) as file:
+            code = file.read()
+        tree_time, tree_output = run_program(code, inputs.get(name, ""))
+        tiered_time, tiered_output = run_program(code, inputs.get(name, ""), TieredInterpreter)
+        assert tree_output == tiered_output
+        report(f"{name} (tree)", tree_time)
+        report(f"{name} (tiered)", tiered_time, tree_time)
+        tree_total += tree_time
+        tiered_total += tiered_time
+    report("all examples (tree)", tree_total)
+    report("all examples (tiered)", tiered_total, tree_total)
+
+    tree_time, tree_output = run_program(LOOPS_PROGRAM)
+    bytecode_time, bytecode_output = run_program(LOOPS_PROGRAM, "", VirtualMachine)
+    tiered_time, tiered_output = run_program(LOOPS_PROGRAM, "", TieredInterpreter)
+    assert tree_output == bytecode_output == tiered_output
+    report("sieve and fib (tree)", tree_time)
+    report("sieve and fib (bytecode)", bytecode_time, tree_time)
+    report("sieve and fib (tiered)", tiered_time, tree_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+ICS3U
+Paul Chen
+This file benchmarks pushing elements onto a vector against writing them into an array that is allocated in advance.
+It runs at two sizes, so that the time per push can be compared as the vector grows.
+"""
+
+from common import report, run_program
+
+SIZES = (2000, 8000)
+
+
+def build_program(size: int, use_vector: bool) -> str:
+    """Builds a program that stores `size` ints, then prints their sum."""
+    if use_vector:
+        declaration = "    vector<int> a;\n"
+        store = "        vec_push(a, i * 3);\n"
+    else:
+        declaration = (f"    int a[{size}];\n"
+                       f"    int n = 0;\n")
+        store = ("        a[n] = i * 3;\n"
+                 "        n += 1;\n")
+    return (f"int main() {{\n"
+            f"{declaration}"
+            f"    for (int i = 0; i < {size}; i += 1) {{\n"
+            f"{store}"
+            f"    }}\n"
+            f"    int total = 0;\n"
+            f"    for (int i = 0; i < {size}; i += 1) total += a[i];\n"
+            f"    print((string) total + \"\\n\");\n"
+            f"    return 0;\n"
+            f"}}\n")
+
+
+def main():
+    for size in SIZES:
+        array_time, array_output = run_program(build_program(size, False))
+        vector_time, vector_output = run_program(build_program(size, True))
+        assert array_output == vector_output == f"{3 * size * (size - 1) // 2}\n"
+        report(f"preallocated array ({size} ints)", array_time)
+        report(f"vector ({size} ints)", vector_time, array_time)
+
+
+if __name__ == "__main__":
+    main()
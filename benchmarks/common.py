@@ -0,0 +1,56 @@
+"""
+ICS3U
+Paul Chen
+This file holds the helper functions that are shared by all the benchmarks.
+"""
+
+import io
+import os
+import sys
+import time
+from typing import Tuple, Type
+
+# Lets the benchmarks import the interpreter modules the same way `pyc/__main__.py` does.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pyc"))
+
+from interpreter import Interpreter
+from lexer import Lexer
+from parser import Parser
+
+
+def run_program(code: str, program_input: str = "",
+                interpreter_class: Type[Interpreter] = Interpreter) -> Tuple[float, str]:
+    """
+    Runs a PYC program and measures how long it takes.
+    Args:
+        code (str): the program source code.
+        program_input (str): the text that is fed to the program through stdin.
+        interpreter_class (Type[Interpreter]): the engine that runs the program.
+    Returns:
+        Tuple[float, str]: the number of seconds the program took to run, and the output of the program.
+    """
+    sys.stdin = io.StringIO(program_input)
+    sys.stdout = io.StringIO()
+    try:
+        start = time.perf_counter()
+        interpreter_class(Parser(Lexer(code))).interpret()
+        elapsed = time.perf_counter() - start
+        output = sys.stdout.getvalue()
+    finally:
+        sys.stdin = sys.__stdin__
+        sys.stdout = sys.__stdout__
+    return elapsed, output
+
+
+def report(name: str, seconds: float, baseline: float = None) -> None:
+    """
+    Prints the result of a benchmark.
+    Args:
+        name (str): the name of the benchmark.
+        seconds (float): the time taken by the benchmark.
+        baseline (float): the time taken by the benchmark that this one is compared against.
+    """
+    if baseline is None:
+        print(f"{name:<40} {seconds:>9.3f}s")
+    else:
+        print(f"{name:<40} {seconds:>9.3f}s  ({baseline / seconds:.1f}x)")
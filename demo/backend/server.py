@@ -25,7 +25,7 @@ async def websocket_endpoint(websocket: WebSocket):
 
         # Start a new subprocess to execute the code.
         proc = await asyncio.create_subprocess_exec(
-            "python", "pyc", "-c", source_code,
+            "python", "pyc", "-u", "-c", source_code,
             stdin=asyncio.subprocess.PIPE,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.STDOUT,  # Redirect stderr to stdout
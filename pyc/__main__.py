@@ -4,34 +4,137 @@ Paul Chen
 This file is the main entry point into the program.
 """
 
+import argparse
 import sys
 
-from interpreter import Interpreter
+import ffi
+from bytecode import disassemble
+from closure import ClosureInterpreter
+from interpreter import Interpreter, ProfilingInterpreter
 from lexer import Lexer
 from parser import Parser
+from passes import PassManager
+from profiler import Profile
+from streams import output
+from tiered import COMPILE_THRESHOLD, TieredInterpreter
+from vm import VirtualMachine
+
+# The engines that can run a program, by the name given to --engine.
+ENGINES = {"tree": Interpreter, "closure": ClosureInterpreter, "bytecode": VirtualMachine, "tiered": TieredInterpreter}
 
 
 # Main function
 def main():
-    # Check if the user provided a source file.
-    if len(sys.argv) <= 1:
-        raise FileNotFoundError("No source file provided")
-    
-    if sys.argv[1] == "-c":
+    # Reads the command line arguments.
+    arg_parser = argparse.ArgumentParser(prog="pyc", description="Runs a PYC program.")
+    arg_parser.add_argument("file", nargs="?", help="the source file to run")
+    arg_parser.add_argument("-c", dest="code", help="run the code passed in as a string")
+    arg_parser.add_argument("-O", dest="level", type=int, choices=(0, 1, 2), default=0,
+                            help="optimization level (default: 0)")
+    arg_parser.add_argument("--time-passes", action="store_true",
+                            help="print the time taken by each optimization pass to stderr")
+    arg_parser.add_argument("--remarks", action="store_true",
+                            help="print the optimizations made by the optimization passes to stderr")
+    arg_parser.add_argument("-u", "--unbuffered", action="store_true",
+                            help="write the output of the program immediately instead of buffering it")
+    arg_parser.add_argument("--engine", choices=tuple(ENGINES), default="tree",
+                            help="run the program by walking the syntax tree, by compiling it into closures, by "
+                                 "compiling it into bytecode for a virtual machine, or by walking the syntax tree and "
+                                 "compiling its hot loops and functions into python code (default: tree)")
+    arg_parser.add_argument("--bytecode-cache", metavar="FILE",
+                            help="with --engine=bytecode, save the compiled program to FILE and load it on later runs "
+                                 "of the same program")
+    arg_parser.add_argument("--hot-threshold", metavar="N", type=int, default=COMPILE_THRESHOLD,
+                            help="with --engine=tiered, compile a loop or function once it has run N iterations or "
+                                 f"calls (default: {COMPILE_THRESHOLD})")
+    arg_parser.add_argument("--tier-report", action="store_true",
+                            help="with --engine=tiered, print the loops and functions that were compiled to stderr")
+    arg_parser.add_argument("--disassemble", action="store_true",
+                            help="print the bytecode that the program compiles to, instead of running it")
+    arg_parser.add_argument("--plugin", metavar="MODULE", action="append", default=[],
+                            help="load the functions registered by a python module or file (can be repeated)")
+    profile_group = arg_parser.add_mutually_exclusive_group()
+    profile_group.add_argument("--profile-out", metavar="FILE", help="record a profile of the run into FILE")
+    profile_group.add_argument("--profile-in", metavar="FILE",
+                               help="optimize the program using a profile recorded with --profile-out")
+    args = arg_parser.parse_args()
+
+    # A profile is recorded by walking the tree as it was parsed, so that its nodes are numbered the same way as the
+    # tree that the profile is later loaded for. The options that change how the program is run cannot apply to it.
+    if args.profile_out is not None:
+        ignored = [option for option, given in (
+            ("--engine", args.engine != "tree"),
+            ("-O", args.level != 0),
+            ("--time-passes", args.time_passes),
+            ("--remarks", args.remarks),
+            ("--tier-report", args.tier_report),
+            ("--bytecode-cache", args.bytecode_cache is not None),
+            ("--hot-threshold", args.hot_threshold != COMPILE_THRESHOLD),
+        ) if given]
+        if ignored:
+            arg_parser.error(f"--profile-out cannot be used with {', '.join(ignored)}")
+
+    if args.code is not None:
         # Pulls source code from command line argument.
-        if len(sys.argv) <= 2:
-            raise FileNotFoundError("No code provided")
-        code = sys.argv[2]
-    else:
+        code = args.code
+    elif args.file is not None:
         # Read the source code into a variable.
-        file = open(sys.argv[1], "r")
+        file = open(args.file, "r")
         code = file.read()
+    else:
+        # Check if the user provided a source file.
+        raise FileNotFoundError("No source file provided")
+
+    # Loads the profile of a previous run, ignoring it if it cannot be read or was recorded from a different program.
+    profile = None
+    if args.profile_in is not None:
+        profile = Profile.load(args.profile_in)
+        if profile is None:
+            print(f"Warning: the profile '{args.profile_in}' could not be read and will be ignored", file=sys.stderr)
+        elif not profile.matches(code):
+            print(f"Warning: the profile '{args.profile_in}' was recorded from a different program and will be "
+                  f"ignored", file=sys.stderr)
+            profile = None
+
+    output.unbuffered = args.unbuffered
+
+    # Loads the plugins given on the command line. Plugins installed as packages are loaded by the interpreter.
+    for plugin in args.plugin:
+        ffi.load_plugin(plugin)
 
     # Starts the interpreter.
     lexer = Lexer(code)
     parser = Parser(lexer)
-    interpreter = Interpreter(parser)
-    exit_code = interpreter.interpret()
+    if args.disassemble:
+        # Compiles the program without running it.
+        pass_manager = PassManager(args.level, profile)
+        virtual_machine = VirtualMachine(parser, pass_manager, args.bytecode_cache)
+        print(disassemble(virtual_machine.compile(pass_manager.run(parser.parse()))))
+        exit(0)
+    elif args.profile_out is not None:
+        interpreter = ProfilingInterpreter(parser)
+        try:
+            exit_code = interpreter.interpret()
+        finally:
+            interpreter.recording.save(args.profile_out)
+    else:
+        pass_manager = PassManager(args.level, profile)
+        if args.engine == "bytecode":
+            interpreter = VirtualMachine(parser, pass_manager, args.bytecode_cache)
+        elif args.engine == "tiered":
+            interpreter = TieredInterpreter(parser, pass_manager, args.hot_threshold)
+        else:
+            interpreter = ENGINES[args.engine](parser, pass_manager)
+        try:
+            exit_code = interpreter.interpret()
+        finally:
+            # Prints the reports of the optimization passes.
+            if args.time_passes:
+                print(pass_manager.timing_report(), file=sys.stderr)
+            if args.remarks:
+                print(pass_manager.remark_report(), file=sys.stderr)
+            if args.tier_report and args.engine == "tiered":
+                print("\n".join(interpreter.log), file=sys.stderr)
     exit(exit_code)
 
 
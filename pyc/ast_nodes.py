@@ -4,7 +4,7 @@ Paul Chen
 This file holds the code for an abstract syntax tree that the code will be parsed into.
 """
 
-from typing import List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
 from tokens import Token, TokenType
 
@@ -50,6 +50,8 @@ class VariableNode(ASTNode):
         indices (Optional[List[ASTNode]]): a list of indices for this variable (for arrays).
             Ex. `a[0][0]` would give `indices=[0, 0]`.
         token (Optional[Token]): the token that is printed when an error is thrown.
+        unchecked_dimensions (FrozenSet[int]): the indices that are known to be in bounds, which do not need to
+            be checked when the variable is accessed.
     """
 
     def __init__(self, token_type: TokenType, name: str, indices: Optional[List[ASTNode]] = None,
@@ -60,6 +62,76 @@ class VariableNode(ASTNode):
         self.name = name
         self.indices = indices
         self.token = token
+        self.unchecked_dimensions = frozenset()
+
+
+class SliceNode(ASTNode):
+    """
+    Node that represents a slice of an array, used as the last index of a variable. Ex. `a[lo:hi]`.
+
+    Attributes:
+        lower (Optional[ASTNode]): the first index of the slice, or None to start at the beginning of the array.
+        upper (Optional[ASTNode]): the index after the end of the slice, or None to end at the end of the array.
+        token (Optional[Token]): the token that is printed when an error is thrown.
+    """
+
+    def __init__(self, lower: Optional[ASTNode], upper: Optional[ASTNode], token: Optional[Token] = None) -> None:
+        self.lower = lower
+        self.upper = upper
+        self.token = token
+
+
+class StructDefinition(object):
+    """
+    Class that holds the layout of a struct, declared with `struct Name { int a; float b; };`. The fields of an
+    instance are stored in a list, in the order in which they were declared, so the position of every field is known
+    when the program is parsed.
+
+    Attributes:
+        name (str): the name of the struct.
+        field_types (List[TokenType]): the type of each field, as a literal type (ex. INTL).
+        offsets (Dict[str, int]): maps the name of each field to its position in the list.
+    """
+
+    def __init__(self, name: str, field_names: List[str], field_types: List[TokenType]) -> None:
+        self.name = name
+        self.field_types = field_types
+        self.offsets = {field_name: i for i, field_name in enumerate(field_names)}
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "StructDefinition":
+        """Definitions never change, so copies of the tree share them."""
+        return self
+
+
+class FieldAccessNode(ASTNode):
+    """
+    Node that represents a field of a struct instance. Ex. `p.x` or `a[i].x`.
+
+    Attributes:
+        record (VariableNode): the struct instance, or element of an array of structs.
+        field (str): the name of the field.
+        layouts (Dict[str, Tuple[int, TokenType]]): the position and type of the field in every struct that has a
+            field with this name, keyed by the name of the struct. They are found when the program is parsed, so
+            reading a field only has to check which struct the instance belongs to.
+        token (Optional[Token]): the token that is printed when an error is thrown.
+    """
+
+    def __init__(self, record: VariableNode, field: str, layouts: Dict[str, Tuple[int, TokenType]],
+                 token: Optional[Token] = None) -> None:
+        self.record = record
+        self.field = field
+        self.layouts = layouts
+        self.token = token
+
+    @property
+    def name(self) -> str:
+        """The name of the variable holding the instance, so that assigning to a field counts as changing it."""
+        return self.record.name
+
+    @property
+    def indices(self) -> List[ASTNode]:
+        """The indices of the instance in its array."""
+        return self.record.indices
 
 
 class UnaryOperatorNode(ASTNode):
@@ -97,6 +169,28 @@ class BinaryOperatorNode(ASTNode):
         self.token = token
 
 
+class SpecializedBinaryOperatorNode(BinaryOperatorNode):
+    """
+    Node that represents a binary operator whose operand types are known in advance (for example, from a profile of
+    a previous run). If the operands have the expected types, the result is computed directly by `function`,
+    otherwise the operator is run like a normal `BinaryOperatorNode`.
+
+    Attributes:
+        left_type (TokenType): the expected type of the left-side operand.
+        right_type (TokenType): the expected type of the right-side operand.
+        result_type (TokenType): the type of the result.
+        function (Callable): function that computes the result from the values held by the two operands.
+    """
+
+    def __init__(self, node: BinaryOperatorNode, left_type: TokenType, right_type: TokenType,
+                 result_type: TokenType, function: Callable) -> None:
+        super().__init__(node.left_operand, node.operator, node.right_operand, node.token)
+        self.left_type = left_type
+        self.right_type = right_type
+        self.result_type = result_type
+        self.function = function
+
+
 class CastOperatorNode(ASTNode):
     """
     Node that represents a cast operator.
@@ -121,12 +215,17 @@ class DeclarationStatementNode(ASTNode):
         type (TokenType): the type of variable that is declared.
         variable (VariableNode): node that holds information about the variable.
         expression (ASTNode): the expression assigned to the variable.
+        type_arguments (Optional[Tuple[Union[TokenType, StructDefinition], ...]]): the type arguments of a container,
+            ex. `(INT, STRING)` for `map<int, string>` or `(FLOAT,)` for `vector<float>`, or the definition of a struct.
+            None if the type has no type arguments.
     """
 
-    def __init__(self, token_type: TokenType, variable: VariableNode, expression: ASTNode) -> None:
+    def __init__(self, token_type: TokenType, variable: VariableNode, expression: ASTNode,
+                 type_arguments: Optional[Tuple[Union[TokenType, StructDefinition], ...]] = None) -> None:
         self.type = token_type
         self.variable = variable
         self.expression = expression
+        self.type_arguments = type_arguments
 
 
 class AssignmentStatementNode(ASTNode):
@@ -176,6 +275,36 @@ class IfElseStatementNode(ASTNode):
         self.otherwise = otherwise
 
 
+class SwitchStatementNode(ASTNode):
+    """
+    Node that represents a switch statement. The statements of every case are stored in one flat list, so
+    that falling through a case is simply continuing on to the next statement in the list.
+
+    Attributes:
+        expression (ASTNode): the expression whose value selects the case to run.
+        cases (list[tuple[ASTNode, int]]): list of case labels and the index of the first statement
+            that runs when the label matches.
+        default (Optional[int]): index of the first statement of the default case. This is `None` if
+            there is no default case.
+        statements (list[ASTNode]): list of all the statements in the switch body.
+        jump_table (Optional[dict]): maps each case label to the index of its first statement. This is
+            `None` if any of the case labels is not a compile-time constant.
+        label_types (tuple[TokenType, ...]): the types of values that can be looked up in `jump_table`.
+        token (Optional[Token]): the "switch" token, used when printing error messages.
+    """
+
+    def __init__(self, expression: ASTNode, cases: List[Tuple[ASTNode, int]], default: Optional[int],
+                 statements: List[ASTNode], jump_table: Optional[Dict[Union[int, float, str], int]] = None,
+                 label_types: Tuple[TokenType, ...] = (), token: Optional[Token] = None) -> None:
+        self.expression = expression
+        self.cases = cases
+        self.default = default
+        self.statements = statements
+        self.jump_table = jump_table
+        self.label_types = label_types
+        self.token = token
+
+
 class ForLoopNode(ASTNode):
     """
     Node that represents a for loop.
@@ -185,13 +314,16 @@ class ForLoopNode(ASTNode):
         condition (ASTNode): condition that determines whether the loop continues running after reaching the end.
         increment (ASTNode): statement that runs at the end of a for loop.
         block (ASTNode): code to loop through.
+        token (Optional[Token]): the "for" token, used when printing error messages.
     """
 
-    def __init__(self, initialization: ASTNode, condition: ASTNode, increment: ASTNode, block: ASTNode) -> None:
+    def __init__(self, initialization: ASTNode, condition: ASTNode, increment: ASTNode, block: ASTNode,
+                 token: Optional[Token] = None) -> None:
         self.initialization = initialization
         self.condition = condition
         self.increment = increment
         self.block = block
+        self.token = token
 
 
 class WhileLoopNode(ASTNode):
@@ -201,11 +333,13 @@ class WhileLoopNode(ASTNode):
     Attributes:
         condition (ASTNode): condition that determines whether the loop continues running after reaching the end.
         block (ASTNode): code to loop through.
+        token (Optional[Token]): the "while" token, used when printing error messages.
     """
 
-    def __init__(self, condition: ASTNode, block: ASTNode) -> None:
+    def __init__(self, condition: ASTNode, block: ASTNode, token: Optional[Token] = None) -> None:
         self.condition = condition
         self.block = block
+        self.token = token
 
 
 class DoWhileLoopNode(ASTNode):
@@ -215,11 +349,67 @@ class DoWhileLoopNode(ASTNode):
     Attributes:
         condition (ASTNode): condition that determines whether the loop continues running after reaching the end.
         block (ASTNode): code to loop through.
+        token (Optional[Token]): the "do" token, used when printing error messages.
     """
 
-    def __init__(self, condition: ASTNode, block: ASTNode) -> None:
+    def __init__(self, condition: ASTNode, block: ASTNode, token: Optional[Token] = None) -> None:
         self.condition = condition
         self.block = block
+        self.token = token
+
+
+class LoopInvariantNode(ASTNode):
+    """
+    Node that represents an expression which has been hoisted out of a loop. The expression is evaluated once by
+    the HoistedLoopNode that encloses the loop, and visiting this node returns the stored result.
+
+    Attributes:
+        expression (ASTNode): the hoisted expression.
+        value (Optional[Value]): the result of the expression, set each time the enclosing loop is entered.
+    """
+
+    def __init__(self, expression: ASTNode) -> None:
+        self.expression = expression
+        self.value = None
+
+
+class HoistedLoopNode(ASTNode):
+    """
+    Node that represents a loop whose loop-invariant expressions are evaluated once, before the loop runs.
+
+    Attributes:
+        invariants (List[LoopInvariantNode]): the expressions that have been hoisted out of the loop.
+        loop (ASTNode): the loop.
+    """
+
+    def __init__(self, invariants: List[LoopInvariantNode], loop: ASTNode) -> None:
+        self.invariants = invariants
+        self.loop = loop
+
+
+class VersionedLoopNode(ASTNode):
+    """
+    Node that represents a for loop with two versions: one that checks every array access, and one that skips the
+    checks which are known to pass. The faster version runs if, before the loop starts, the start and the limit of
+    the loop counter fit inside the accessed dimension of every array.
+
+    Attributes:
+        start (ASTNode): the expression that the loop counter starts at.
+        limit (ASTNode): the expression that the loop counter stays below.
+        inclusive (bool): whether the loop counter can be equal to the limit.
+        arrays (List[Tuple[str, int]]): the names of the accessed arrays and the dimension indexed by the counter.
+        checked_loop (ForLoopNode): the loop with all bounds checks.
+        unchecked_loop (ForLoopNode): the loop without the bounds checks on the loop counter.
+    """
+
+    def __init__(self, start: ASTNode, limit: ASTNode, inclusive: bool, arrays: List[Tuple[str, int]],
+                 checked_loop: ASTNode, unchecked_loop: ASTNode) -> None:
+        self.start = start
+        self.limit = limit
+        self.inclusive = inclusive
+        self.arrays = arrays
+        self.checked_loop = checked_loop
+        self.unchecked_loop = unchecked_loop
 
 
 class BreakStatementNode(ASTNode):
@@ -265,15 +455,27 @@ class FunctionArgument:
     Class to store information about a function argument.
 
     Attributes:
-        token_type (TokenType): the type of the function argument.
+        token_type (Union[TokenType, Tuple[TokenType, ...]]): the type of the function argument. Arguments of library
+            functions can accept several types, given as a tuple.
         name (str): the name of the function argument.
-        num_dimensions (int): the number of dimensions held by the function argument (needed for arrays).
+        num_dimensions (Optional[int]): the number of dimensions held by the function argument (needed for arrays).
+            Arguments of library functions can accept arrays with any number of dimensions, given as None.
+        type_arguments (Optional[Tuple[Union[TokenType, StructDefinition], ...]]): the type arguments of a container
+            argument, ex. the key and value types of a map, or the definition of a struct. Arguments of library
+            functions can accept containers with any type arguments, given as None.
     """
 
-    def __init__(self, token_type: TokenType, name: str, num_dimensions: int = 0):
+    def __init__(self, token_type: Union[TokenType, Tuple[TokenType, ...]], name: str,
+                 num_dimensions: Optional[int] = 0,
+                 type_arguments: Optional[Tuple[Union[TokenType, StructDefinition], ...]] = None):
         self.type = token_type
         self.name = name
         self.num_dimensions = num_dimensions
+        self.type_arguments = type_arguments
+
+    def accepts(self, token_type: TokenType) -> bool:
+        """Checks if a value of the given type (ex. TokenType.INT) can be passed as the argument."""
+        return token_type in self.type if isinstance(self.type, tuple) else token_type == self.type
 
 
 class FunctionDeclarationStatementNode(ASTNode):
@@ -311,6 +513,20 @@ class FunctionCallStatementNode(ASTNode):
         self.token = token
 
 
+class InlinedFunctionCallStatementNode(FunctionCallStatementNode):
+    """
+    Node that represents a call to a function whose body is a single return statement. The returned expression is
+    copied into the node, so the call evaluates it directly instead of running the function body.
+
+    Attributes:
+        expression (ASTNode): a copy of the expression returned by the function.
+    """
+
+    def __init__(self, node: FunctionCallStatementNode, expression: ASTNode) -> None:
+        super().__init__(node.name, node.args, node.token)
+        self.expression = expression
+
+
 class BuiltInFunctionCallStatementNode(ASTNode):
     """
     Node that represents a built-in function call statement.
@@ -339,3 +555,62 @@ class ProgramNode(ASTNode):
 class NoOperationStatementNode(ASTNode):
     """Node that does nothing."""
     pass
+
+
+def iter_child_nodes(node: ASTNode) -> Iterator[ASTNode]:
+    """
+    Yields the direct children of a node, in the order in which their attributes were declared.
+    Args:
+        node (ASTNode): the parent node.
+    Returns:
+        Iterator[ASTNode]: the child nodes.
+    """
+    def children(value: Any) -> Iterator[ASTNode]:
+        if isinstance(value, ASTNode):
+            yield value
+        elif isinstance(value, (list, tuple)):
+            for element in value:
+                yield from children(element)
+
+    for attribute in vars(node).values():
+        yield from children(attribute)
+
+
+def walk(node: ASTNode) -> Iterator[ASTNode]:
+    """
+    Yields a node and all of its descendants in pre-order. The order is the same every time the same program is
+    parsed, so the position of a node in this order can be used to identify it.
+    Args:
+        node (ASTNode): the root node.
+    Returns:
+        Iterator[ASTNode]: the nodes in the tree.
+    """
+    stack = [node]
+    while len(stack) != 0:
+        curr = stack.pop()
+        yield curr
+        stack.extend(reversed(list(iter_child_nodes(curr))))
+
+
+def transform(node: ASTNode, function: Callable[[ASTNode], ASTNode]) -> ASTNode:
+    """
+    Rebuilds a tree from the bottom up. The children of each node are transformed first, then `function` is called
+    on the node itself, and its return value replaces the node in its parent.
+    Args:
+        node (ASTNode): the root node.
+        function (Callable[[ASTNode], ASTNode]): function that returns the node which replaces the given node.
+    Returns:
+        ASTNode: the new root node.
+    """
+    def transform_value(value: Any) -> Any:
+        if isinstance(value, ASTNode):
+            return transform(value, function)
+        elif isinstance(value, list):
+            return [transform_value(element) for element in value]
+        elif isinstance(value, tuple):
+            return tuple(transform_value(element) for element in value)
+        return value
+
+    for name, attribute in vars(node).items():
+        setattr(node, name, transform_value(attribute))
+    return function(node)
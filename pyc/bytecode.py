@@ -0,0 +1,285 @@
+"""
+ICS3U
+Paul Chen
+This file holds the instruction set of the bytecode engine, and the classes that hold a compiled program. The functions
+of a program are compiled by `compiler.py` into lists of instructions, which are run by the virtual machine in `vm.py`.
+
+An instruction is an opcode and a list of operands. Operands are plain python values (ints, floats, strings, None and
+lists of them), and tokens are stored once per function and referred to by their index, so that a compiled program
+can be saved to a JSON file and loaded again instead of being compiled on every run.
+
+Local variables are held in numbered slots in the frame of their function, and values are passed between
+instructions on an operand stack. Ints and floats whose type is known when a function is compiled are held as python
+values, called raw values, so that typed instructions can work on them directly. Every other value is held as a
+`Value`, as it is in the tree-walking interpreter. Operands named `raw` give the type of a raw operand, or None if the
+operand is a `Value`.
+"""
+
+import json
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+from profiler import Profile
+from tokens import Token, TokenType
+
+# The version of the bytecode format. Programs saved with another version are compiled again.
+BYTECODE_VERSION = 1
+
+
+class Opcode(Enum):
+    """Class holding the opcodes of the virtual machine. The operands of each opcode are listed in `OPERANDS`."""
+
+    # Constants and variables.
+    LOAD_CONST = 0
+    LOAD_SLOT = 1
+    STORE_SLOT = 2
+    LOAD_GLOBAL = 3
+    ASSIGN_GLOBAL = 4
+    POP = 5
+    BOX = 6
+    UNBOX = 7
+    INDEX = 8
+    CONVERT = 9
+
+    # Operators. The typed versions only run on operands whose types were checked by the compiler.
+    BINARY = 10
+    BINARY_GENERIC = 11
+    UNARY = 12
+    UNARY_GENERIC = 13
+    CAST = 14
+    CAST_GENERIC = 15
+    UPDATE_SLOT = 16
+    UPDATE_SLOT_GENERIC = 17
+
+    # Arrays.
+    LOAD_ELEMENT = 18
+    LOAD_ELEMENT_RAW = 19
+    STORE_ELEMENT = 20
+    STORE_ELEMENT_RAW = 21
+    UPDATE_ELEMENT_RAW = 22
+    NEW_ARRAY = 23
+    BUILD_LIST = 24
+
+    # Control flow.
+    JUMP = 25
+    JUMP_IF_FALSE = 26
+    JUMP_IF_TRUE = 27
+    COMPARE_JUMP_IF_FALSE = 28
+    COMPARE_JUMP_IF_TRUE = 29
+    SWITCH_TABLE = 30
+    CASE_JUMP = 31
+    RAISE = 32
+
+    # Functions.
+    LOAD_FUNCTION = 33
+    CALL = 34
+    BIND = 35
+    CHECK_RETURN = 36
+    RETURN = 37
+
+
+"""
+The operands of each opcode, by name. Operands named `token` or ending in `_token` are indices into the tokens of the
+function, and operands named `target` are the index of the instruction to jump to.
+"""
+OPERANDS = {
+    # Pushes a constant: a raw int or float, a string, or a NullValue for None.
+    Opcode.LOAD_CONST: ("value",),
+    Opcode.LOAD_SLOT: ("slot",),
+    # Pops a value into a slot.
+    Opcode.STORE_SLOT: ("slot",),
+    # Pushes a global variable or function, unboxing it if `unbox` is true.
+    Opcode.LOAD_GLOBAL: ("name", "token", "unbox"),
+    # Pops a value and assigns it to a global variable with an assignment operator.
+    Opcode.ASSIGN_GLOBAL: ("name", "operator", "variable_token", "token", "raw"),
+    Opcode.POP: (),
+    # Replaces a raw value with a `Value` of the given type.
+    Opcode.BOX: ("type",),
+    # Replaces a `Value` with its python value.
+    Opcode.UNBOX: (),
+    # Replaces a `Value` used as an array index with its python value, which must be an int or None.
+    Opcode.INDEX: ("token",),
+    # Replaces a value with the value held by a variable of the given type after the value is stored in it.
+    Opcode.CONVERT: ("type", "token", "raw"),
+
+    # Pops two operands of the given types and pushes the result of the operator.
+    Opcode.BINARY: ("operator", "left", "right"),
+    Opcode.BINARY_GENERIC: ("operator", "token", "left_raw", "right_raw"),
+    Opcode.UNARY: ("operator", "operand"),
+    Opcode.UNARY_GENERIC: ("operator", "token", "raw"),
+    Opcode.CAST: ("operator", "operand"),
+    Opcode.CAST_GENERIC: ("operator", "token", "raw"),
+    # Pops a value and applies an assignment operator (ex. +=) to a slot with it.
+    Opcode.UPDATE_SLOT: ("slot", "operator", "left", "right"),
+    Opcode.UPDATE_SLOT_GENERIC: ("slot", "operator", "token", "variable_token", "type", "raw"),
+
+    # Pops `count` indices and an array, and pushes the element or sub-array at the indices.
+    Opcode.LOAD_ELEMENT: ("count", "token"),
+    # Pops an index and a one-dimensional int or float array, and pushes the raw element.
+    Opcode.LOAD_ELEMENT_RAW: ("token",),
+    # Pops `count` indices, an array and a value, and assigns the value to the element at the indices.
+    Opcode.STORE_ELEMENT: ("count", "name", "operator", "variable_token", "token", "raw"),
+    Opcode.STORE_ELEMENT_RAW: ("token", "variable_token"),
+    Opcode.UPDATE_ELEMENT_RAW: ("operator", "left", "right", "token", "variable_token"),
+    # Pops `count` dimensions and an initializer list (or NullValue), and pushes a new array.
+    Opcode.NEW_ARRAY: ("element_type", "count", "token", "raw"),
+    # Pops one value for each type in `raw_types`, and pushes an initializer list holding them.
+    Opcode.BUILD_LIST: ("raw_types",),
+
+    Opcode.JUMP: ("target",),
+    # Pops a raw value and jumps if it is false (or true).
+    Opcode.JUMP_IF_FALSE: ("target",),
+    Opcode.JUMP_IF_TRUE: ("target",),
+    # Pops two operands of the given types, compares them and jumps if the comparison is false (or true).
+    Opcode.COMPARE_JUMP_IF_FALSE: ("operator", "left", "right", "target"),
+    Opcode.COMPARE_JUMP_IF_TRUE: ("operator", "left", "right", "target"),
+    # Pops the value of a switch statement whose labels are constants, and jumps to the matching case.
+    Opcode.SWITCH_TABLE: ("cases", "label_types", "default", "token", "raw"),
+    # Pops a case label and the value of a switch statement, and jumps if they are equal.
+    Opcode.CASE_JUMP: ("token", "raw", "target"),
+    Opcode.RAISE: ("error", "token"),
+
+    # Pushes the function called by the next CALL instruction.
+    Opcode.LOAD_FUNCTION: ("name", "token"),
+    # Pops the arguments and the function, calls it, and pushes the value it returns. If `verified` is true, the
+    # compiler has checked that the arguments match the function.
+    Opcode.CALL: ("name", "count", "token", "raw_types", "verified", "unbox"),
+    # Checks a value passed to an argument of an inlined function.
+    Opcode.BIND: ("name", "index", "token", "raw"),
+    # Checks the value returned by a function of the given type.
+    Opcode.CHECK_RETURN: ("type", "token", "raw"),
+    # Pops the value returned by the function and returns to the caller.
+    Opcode.RETURN: (),
+}
+
+
+class CodeObject(object):
+    """
+    Class that holds a compiled function.
+
+    Attributes:
+        name (str): the name of the function.
+        instructions (List[Tuple[Opcode, List[Any]]]): the instructions, each an opcode and its operands.
+        tokens (List[Optional[Token]]): the tokens used to report errors, referred to by their index.
+        num_slots (int): the number of slots in a frame of the function. The arguments are held in the first slots.
+        argument_types (List[Optional[str]]): the name of the raw type of each argument, or None if the argument is
+            held as a `Value`.
+        return_type (Optional[str]): the name of the raw type of the value returned, or None if it is a `Value`.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.instructions = []
+        self.tokens = []
+        self.num_slots = 0
+        self.argument_types = []
+        self.return_type = None
+
+    def to_json(self) -> Dict[str, Any]:
+        """Converts the function into a dictionary that can be saved as JSON."""
+        return {
+            "name": self.name,
+            "instructions": [[opcode.name, operands] for opcode, operands in self.instructions],
+            "tokens": [None if token is None else [token.type.name, token.value, token.line, token.column]
+                       for token in self.tokens],
+            "num_slots": self.num_slots,
+            "argument_types": self.argument_types,
+            "return_type": self.return_type,
+        }
+
+    @staticmethod
+    def from_json(data: Dict[str, Any]) -> "CodeObject":
+        """Rebuilds a function saved with `to_json`."""
+        code = CodeObject(data["name"])
+        code.instructions = [(Opcode[opcode], operands) for opcode, operands in data["instructions"]]
+        code.tokens = [None if token is None else Token(TokenType[token[0]], *token[1:]) for token in data["tokens"]]
+        code.num_slots = data["num_slots"]
+        code.argument_types = data["argument_types"]
+        code.return_type = data["return_type"]
+        return code
+
+
+class BytecodeProgram(object):
+    """
+    Class that holds the compiled functions of a program.
+
+    Attributes:
+        key (str): identifies the source code and optimization passes that the program was compiled from.
+        functions (Dict[str, CodeObject]): the compiled functions, by name.
+        unsupported (Dict[str, str]): the functions that could not be compiled, with the reason. They are run by the
+            tree-walking interpreter.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.functions = {}
+        self.unsupported = {}
+
+    @staticmethod
+    def make_key(code: str, pass_names: List[str]) -> str:
+        """Returns the key of a program compiled from the given source code after the given passes ran on it."""
+        return Profile.hash_source("\n".join([code] + pass_names))
+
+    def save(self, path: str) -> None:
+        """Saves the program to a JSON file."""
+        with open(path, "w") as file:
+            json.dump({
+                "version": BYTECODE_VERSION,
+                "key": self.key,
+                "functions": [code.to_json() for code in self.functions.values()],
+                "unsupported": self.unsupported,
+            }, file)
+
+    @staticmethod
+    def load(path: str) -> Optional["BytecodeProgram"]:
+        """
+        Loads a program from a JSON file, returning None if it was saved with another version of the format, or if it
+        cannot be read (ex. it is truncated or is not a saved program), so that the program is compiled again.
+        """
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+            if data.get("version") != BYTECODE_VERSION:
+                return None
+            program = BytecodeProgram(data["key"])
+            for function in data["functions"]:
+                code = CodeObject.from_json(function)
+                program.functions[code.name] = code
+            program.unsupported = data["unsupported"]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError, IndexError):
+            return None
+        return program
+
+
+def format_operands(code: CodeObject, opcode: Opcode, operands: List[Any]) -> str:
+    """Formats the operands of an instruction, showing tokens by their position and jump targets with an arrow."""
+    parts = []
+    for name, operand in zip(OPERANDS[opcode], operands):
+        if (name == "token" or name.endswith("_token")) and operand is not None:
+            token = code.tokens[operand]
+            parts.append(f"{name}={token.line}:{token.column}")
+        elif name in ("target", "default"):
+            parts.append(f"-> {operand}")
+        elif name == "cases":
+            parts.append("{" + ", ".join(f"{label!r}: -> {target}" for label, target in operand) + "}")
+        elif name == "value":
+            parts.append(repr(operand))
+        elif operand is not None:
+            parts.append(f"{name}={operand}" if isinstance(operand, (bool, list)) else str(operand))
+    return " ".join(parts)
+
+
+def disassemble(program: BytecodeProgram) -> str:
+    """
+    Returns a readable listing of the instructions of every compiled function, followed by the functions that are
+    run by the tree-walking interpreter.
+    """
+    lines = []
+    for code in program.functions.values():
+        lines.append(f"function {code.name} ({len(code.argument_types)} arguments, {code.num_slots} slots):")
+        for i, (opcode, operands) in enumerate(code.instructions):
+            lines.append(f"{i:>6}  {opcode.name:<24}{format_operands(code, opcode, operands)}".rstrip())
+        lines.append("")
+    for name, reason in program.unsupported.items():
+        lines.append(f"function {name}: run by the tree-walking interpreter ({reason})")
+    return "\n".join(lines).rstrip("\n")
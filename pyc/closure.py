@@ -0,0 +1,614 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `ClosureInterpreter` class, a second execution engine. Instead of looking up a visit method every
+time it reaches a node, it compiles each node once into a python closure and then only runs the closures. A closure
+holds the closures of its children directly, and is specialized for its node: the operator is chosen when the closure
+is built, and the operand types are remembered the first time it runs, so that later runs with the same types compute
+the result directly from the python values.
+
+Nodes that are rare, or whose work is done by a library function, are not compiled. Their closure calls the visit
+method of the `Interpreter`, which visits their children through the closures again. Errors are thrown by the same
+checks as the tree-walking interpreter, so both engines give the same `ErrorCode` for a program.
+"""
+
+import operator
+from typing import Callable, Dict, List, Optional, Tuple
+
+import ffi
+from ast_nodes import ASTNode, ValueLiteralNode, VariableNode, SliceNode, UnaryOperatorNode, BinaryOperatorNode, \
+    CastOperatorNode, DeclarationStatementNode, AssignmentStatementNode, BlockStatementNode, IfElseStatementNode, \
+    ForLoopNode, WhileLoopNode, DoWhileLoopNode, BreakStatementNode, ContinueStatementNode, ReturnStatementNode, \
+    FunctionCallStatementNode, BuiltInFunctionCallStatementNode, NoOperationStatementNode, LoopInvariantNode
+from control_exceptions import BreakException, ContinueException, ReturnException
+from error import ErrorCode, LibraryError
+from interpreter import Interpreter
+from library import LIBRARY_FUNCTIONS
+from linked_dict import LinkedDict
+from parser import Parser
+from passes import PassManager
+from tokens import Token, TokenType
+from value import Function, Value, SPECIALIZED_BINARY_OPERATORS, VALUE_CLASSES, build_value
+
+# A compiled node. It takes no arguments, and returns what visiting the node would return.
+Closure = Callable[[], Optional[Value]]
+
+# The types of the values that can be held by a variable that is not a container.
+SCALAR_TYPES = (TokenType.INTL, TokenType.FLOATL, TokenType.STRINGL)
+
+# The operators whose result is only used as a condition, mapped to a function that computes whether it is true. They
+# skip building the int that the operator would return. `&&` and `||` give the int of the last operand evaluated, as
+# the tree-walking interpreter does, so `1 && 0.5` is false.
+CONDITIONS = {
+    TokenType.LOGICAL_AND: lambda a, b: int(a and b),
+    TokenType.LOGICAL_OR: lambda a, b: int(a or b),
+    TokenType.EQUAL: operator.eq,
+    TokenType.NOT_EQUAL: operator.ne,
+    TokenType.LESS: operator.lt,
+    TokenType.GREATER: operator.gt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.GREATER_EQUAL: operator.ge,
+}
+
+# Maps a unary operator and the type of its operand to the type of the result and the function that computes it.
+UNARY_OPERATORS = {
+    (TokenType.MINUS, TokenType.INTL): (TokenType.INTL, operator.neg),
+    (TokenType.MINUS, TokenType.FLOATL): (TokenType.FLOATL, operator.neg),
+    (TokenType.LOGICAL_NOT, TokenType.INTL): (TokenType.INTL, lambda a: int(not a)),
+    (TokenType.LOGICAL_NOT, TokenType.FLOATL): (TokenType.INTL, lambda a: int(not a)),
+    (TokenType.BIT_NOT, TokenType.INTL): (TokenType.INTL, operator.invert),
+}
+
+# Maps a cast to the type of the result and the function that converts the value of an int, float or string.
+CASTS = {
+    TokenType.INT: (TokenType.INTL, int),
+    TokenType.FLOAT: (TokenType.FLOATL, float),
+    TokenType.STRING: (TokenType.STRINGL, str),
+}
+
+# Maps each assignment operator to the binary operator that it applies.
+ASSIGNMENT_OPERATORS = {
+    TokenType.PLUS_ASSIGN: TokenType.PLUS,
+    TokenType.MINUS_ASSIGN: TokenType.MINUS,
+    TokenType.MUL_ASSIGN: TokenType.MUL,
+    TokenType.DIV_ASSIGN: TokenType.DIV,
+    TokenType.MOD_ASSIGN: TokenType.MOD,
+    TokenType.BIT_AND_ASSIGN: TokenType.BIT_AND,
+    TokenType.BIT_OR_ASSIGN: TokenType.BIT_OR,
+    TokenType.BIT_XOR_ASSIGN: TokenType.BIT_XOR,
+    TokenType.BIT_LSHIFT_ASSIGN: TokenType.BIT_LSHIFT,
+    TokenType.BIT_RSHIFT_ASSIGN: TokenType.BIT_RSHIFT,
+}
+
+# The type of the value that a function of each type returns.
+RETURN_TYPES = {
+    TokenType.VOID: TokenType.VOIDL,
+    TokenType.INT: TokenType.INTL,
+    TokenType.FLOAT: TokenType.FLOATL,
+    TokenType.STRING: TokenType.STRINGL,
+}
+
+NULL = build_value(TokenType.VOIDL)
+
+
+def find_scope(stack: LinkedDict, name: str) -> Optional[Dict]:
+    """Returns the hashmap of the lowest scope that holds a name, or None if no scope holds it."""
+    scope = stack.top
+    while scope.prev is not None:
+        if name in scope.hmap:
+            return scope.hmap
+        scope = scope.prev
+    return None
+
+
+def assignment_operation(operator_type: TokenType, left_type: TokenType,
+                         right_type: TokenType) -> Optional[Tuple[TokenType, Callable]]:
+    """
+    Finds the function that applies an assignment operator (ex. +=) to python values, if the result can be stored back
+    into the variable. Returns None if the operation has to go through the general checks.
+    """
+    operation = SPECIALIZED_BINARY_OPERATORS.get((ASSIGNMENT_OPERATORS.get(operator_type), left_type, right_type))
+    if operation is None or operation[0] != left_type:
+        return None
+    return operation
+
+
+class ClosureInterpreter(Interpreter):
+    """
+    Interpreter that compiles the abstract syntax tree into closures before running it.
+
+    Attributes:
+        closures (Dict[ASTNode, Closure]): the closure compiled from each node that has been run.
+    """
+
+    def __init__(self, parser: Parser, pass_manager: Optional[PassManager] = None) -> None:
+        """
+        Inits closure interpreter class.
+        Args:
+            parser (Parser): the parser.
+            pass_manager (Optional[PassManager]): the pass manager, or None to run the tree as it was parsed.
+        """
+        super().__init__(parser, pass_manager)
+        self.closures = {}
+
+    def visit(self, node: ASTNode) -> Optional[Value]:
+        """Runs the closure of a node, compiling it first if it has not been run before."""
+        return self.closure(node)()
+
+    def closure(self, node: ASTNode) -> Closure:
+        """Returns the closure of a node, compiling it if it has not been compiled yet."""
+        closure = self.closures.get(node)
+        if closure is None:
+            compiler = getattr(self, "compile_" + type(node).__name__, self.compile_with_visitor)
+            closure = self.closures[node] = compiler(node)
+        return closure
+
+    def compile_with_visitor(self, node: ASTNode) -> Closure:
+        """Compiles a node into a closure that runs the visit method of the tree-walking interpreter."""
+        visitor = getattr(self, "visit_" + type(node).__name__, self.generic_visit)
+        return lambda: visitor(node)
+
+    def compile_condition(self, node: ASTNode) -> Callable[[], bool]:
+        """
+        Compiles an expression that is used as the condition of an if statement or a loop. The closure returns whether
+        the condition is true, instead of the value of the expression.
+        """
+        if not isinstance(node, BinaryOperatorNode) or node.operator not in CONDITIONS:
+            evaluate = self.closure(node)
+            return lambda: evaluate().value
+
+        evaluate_left = self.closure(node.left_operand)
+        evaluate_right = self.closure(node.right_operand)
+        compare = CONDITIONS[node.operator]
+        left_type = right_type = None
+
+        def condition() -> bool:
+            nonlocal left_type, right_type
+            left = evaluate_left()
+            right = evaluate_right()
+            if left.type is left_type and right.type is right_type:
+                return compare(left.value, right.value)
+
+            # Remembers the types of the operands if the operator is defined for them.
+            if (node.operator, left.type, right.type) in SPECIALIZED_BINARY_OPERATORS:
+                left_type, right_type = left.type, right.type
+                return compare(left.value, right.value)
+            return self.binary_operation(node, left, right).value
+        return condition
+
+    def compile_ValueLiteralNode(self, node: ValueLiteralNode) -> Closure:
+        """Compiles a ValueLiteralNode. Values are never changed in place, so the same value is returned every time."""
+        if node.type not in SCALAR_TYPES:
+            return self.compile_with_visitor(node)
+        value = build_value(node.type, node.value)
+        return lambda: value
+
+    def compile_NoOperationStatementNode(self, node: NoOperationStatementNode) -> Closure:
+        """Compiles a NoOperationStatementNode."""
+        return lambda: NULL
+
+    def compile_LoopInvariantNode(self, node: LoopInvariantNode) -> Closure:
+        """Compiles a LoopInvariantNode, whose value is set each time the hoisted loop holding it starts."""
+        return lambda: node.value
+
+    def compile_VariableNode(self, node: VariableNode) -> Closure:
+        """Compiles a VariableNode."""
+        name = node.name
+        token = node.token
+        stack = self.stack
+
+        if len(node.indices) == 0:
+            # Finds the variable with a single walk up the scopes, since this is the most common node.
+            def variable() -> Value:
+                scope = stack.top
+                while scope.prev is not None:
+                    if name in scope.hmap:
+                        return scope.hmap[name]
+                    scope = scope.prev
+                self.error(ErrorCode.ID_NOT_FOUND, token)
+            return variable
+
+        # Slices are rare, so they are left to the tree-walking interpreter.
+        if isinstance(node.indices[-1], SliceNode):
+            return self.compile_with_visitor(node)
+
+        unchecked_dimensions = node.unchecked_dimensions
+        scope_of_variable = self.compile_scope_lookup(name, token)
+
+        if len(node.indices) != 1:
+            evaluate_indices = self.compile_indices(node, token)
+
+            def element() -> Value:
+                obj = scope_of_variable()[name]
+                indices = evaluate_indices()
+                offset = self.array_offset(obj, indices, unchecked_dimensions, token)
+
+                # Returns the element if all the dimensions are indexed, otherwise a view of the sub-array.
+                if len(indices) == len(obj.shape):
+                    return obj.element(offset)
+                return obj.view(offset, len(indices))
+            return element
+
+        evaluate_index = self.closure(node.indices[0])
+        unchecked = 0 in unchecked_dimensions
+
+        def first_dimension_element() -> Value:
+            obj = scope_of_variable()[name]
+            index = evaluate_index()
+
+            # Reads an element of a one-dimensional array directly if the index is an int within its bounds.
+            if index.type is TokenType.INTL and obj.type is TokenType.ARRAYL and len(obj.shape) == 1 and \
+                    (unchecked or 0 <= index.value < obj.shape[0]):
+                return obj.element(obj.offset + index.value * obj.strides[0])
+            if index.type is not TokenType.INTL and index.type is not TokenType.VOIDL:
+                self.error(ErrorCode.MISMATCHED_TYPE, token)
+            offset = self.array_offset(obj, [index.value], unchecked_dimensions, token)
+            return obj.element(offset) if len(obj.shape) == 1 else obj.view(offset, 1)
+        return first_dimension_element
+
+    def compile_scope_lookup(self, name: str, token: Token) -> Callable[[], Dict]:
+        """
+        Compiles the lookup of a variable. The closure returns the hashmap of the scope that holds the variable, and
+        throws an error at `token` if there is none.
+        """
+        stack = self.stack
+
+        def scope_of_variable() -> Dict:
+            scope = find_scope(stack, name)
+            if scope is None:
+                self.error(ErrorCode.ID_NOT_FOUND, token)
+            return scope
+        return scope_of_variable
+
+    def compile_indices(self, node: VariableNode, token: Token) -> Callable[[], List[Optional[int]]]:
+        """
+        Compiles the subscript indices of a variable. The closure evaluates them in order, returning their values, and
+        throws an error at `token` as soon as one is not an int.
+        """
+        closures = [self.closure(index) for index in node.indices]
+
+        def indices() -> List[Optional[int]]:
+            values = []
+            for evaluate in closures:
+                index = evaluate()
+                if index.type is not TokenType.INTL and index.type is not TokenType.VOIDL:
+                    self.error(ErrorCode.MISMATCHED_TYPE, token)
+                values.append(index.value)
+            return values
+        return indices
+
+    def compile_UnaryOperatorNode(self, node: UnaryOperatorNode) -> Closure:
+        """Compiles a UnaryOperatorNode."""
+        evaluate = self.closure(node.operand)
+        operand_type = result_type = function = None
+
+        def unary() -> Value:
+            nonlocal operand_type, result_type, function
+            operand = evaluate()
+            if operand.type is not operand_type:
+                operation = UNARY_OPERATORS.get((node.operator, operand.type))
+                if operation is None:
+                    value = operand.unary_operator(node.operator)
+                    if value is None:
+                        self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+                    return value()
+                operand_type = operand.type
+                result_type, function = operation
+            return VALUE_CLASSES[result_type](result_type, function(operand.value))
+        return unary
+
+    def compile_BinaryOperatorNode(self, node: BinaryOperatorNode) -> Closure:
+        """Compiles a BinaryOperatorNode."""
+        evaluate_left = self.closure(node.left_operand)
+        evaluate_right = self.closure(node.right_operand)
+        left_type = right_type = result_type = result_class = function = None
+
+        def binary() -> Value:
+            nonlocal left_type, right_type, result_type, result_class, function
+            left = evaluate_left()
+            right = evaluate_right()
+            if left.type is left_type and right.type is right_type:
+                return result_class(result_type, function(left.value, right.value))
+
+            # Remembers the types of the operands if the operator can be applied to their python values.
+            operation = SPECIALIZED_BINARY_OPERATORS.get((node.operator, left.type, right.type))
+            if operation is None:
+                return self.binary_operation(node, left, right)
+            left_type, right_type = left.type, right.type
+            result_type, function = operation
+            result_class = VALUE_CLASSES[result_type]
+            return result_class(result_type, function(left.value, right.value))
+        return binary
+
+    # The types that a SpecializedBinaryOperatorNode expects are found by the closure when it first runs.
+    compile_SpecializedBinaryOperatorNode = compile_BinaryOperatorNode
+
+    def compile_CastOperatorNode(self, node: CastOperatorNode) -> Closure:
+        """Compiles a CastOperatorNode."""
+        if node.operator not in CASTS:
+            return self.compile_with_visitor(node)
+        evaluate = self.closure(node.operand)
+        result_type, convert = CASTS[node.operator]
+        result_class = VALUE_CLASSES[result_type]
+
+        def cast() -> Value:
+            operand = evaluate()
+            if operand.type in SCALAR_TYPES:
+                return result_class(result_type, convert(operand.value))
+            self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+        return cast
+
+    def compile_DeclarationStatementNode(self, node: DeclarationStatementNode) -> Closure:
+        """Compiles a DeclarationStatementNode. Only ints, floats and strings are compiled."""
+        if node.type not in CASTS or len(node.variable.indices) != 0:
+            return self.compile_with_visitor(node)
+        evaluate = self.closure(node.expression)
+        value_type = CASTS[node.type][0]
+        name = node.variable.name
+        token = node.variable.token
+        stack = self.stack
+
+        def declaration() -> None:
+            expression = evaluate()
+            scope = stack.top.hmap
+            if name in scope:
+                self.error(ErrorCode.DUPLICATE_ID, token)
+            scope[name] = expression if expression.type is value_type else \
+                self.converted_value(value_type, expression, token)
+        return declaration
+
+    def compile_AssignmentStatementNode(self, node: AssignmentStatementNode) -> Closure:
+        """Compiles an AssignmentStatementNode. Fields of structs are assigned by the tree-walking interpreter."""
+        if not isinstance(node.variable, VariableNode):
+            return self.compile_with_visitor(node)
+        evaluate = self.closure(node.expression)
+        name = node.variable.name
+        scope_of_variable = self.compile_scope_lookup(name, node.token)
+        left_type = right_type = result_class = function = None
+
+        if len(node.variable.indices) == 0 and node.operator == TokenType.ASSIGN:
+            def assignment() -> None:
+                val = evaluate()
+                scope = scope_of_variable()
+                current = scope[name].type
+                if val.type is current and current in SCALAR_TYPES:
+                    scope[name] = val
+                else:
+                    self.assign_variable(node, val)
+            return assignment
+
+        if len(node.variable.indices) == 0:
+            def operator_assignment() -> None:
+                nonlocal left_type, right_type, result_class, function
+                val = evaluate()
+                scope = scope_of_variable()
+                current = scope[name]
+                if current.type is not left_type or val.type is not right_type:
+                    operation = assignment_operation(node.operator, current.type, val.type)
+                    if operation is None:
+                        self.assign_variable(node, val)
+                        return
+                    left_type, right_type = current.type, val.type
+                    result_class, function = VALUE_CLASSES[operation[0]], operation[1]
+                scope[name] = result_class(left_type, function(current.value, val.value))
+            return operator_assignment
+
+        evaluate_indices = self.compile_indices(node.variable, node.token)
+        unchecked = 0 in node.variable.unchecked_dimensions
+        token = node.variable.token
+
+        def element_assignment() -> None:
+            nonlocal left_type, right_type, function
+            val = evaluate()
+            target = scope_of_variable()[name]
+            indices = evaluate_indices()
+
+            # Stores an int, float or string into a one-dimensional array directly if the index is within its bounds.
+            if len(indices) != 1 or target.type is not TokenType.ARRAYL or len(target.shape) != 1 or \
+                    indices[0] is None or not (unchecked or 0 <= indices[0] < target.shape[0]):
+                self.assign_element(node, target, indices, val)
+                return
+            offset = target.offset + indices[0] * target.strides[0]
+            if node.operator == TokenType.ASSIGN:
+                if val.type is not target.element_type or val.type not in SCALAR_TYPES:
+                    self.assign_element(node, target, indices, val)
+                    return
+                value = val.value
+            else:
+                if target.element_type is not left_type or val.type is not right_type:
+                    operation = assignment_operation(node.operator, target.element_type, val.type)
+                    if operation is None:
+                        self.assign_element(node, target, indices, val)
+                        return
+                    left_type, right_type, function = target.element_type, val.type, operation[1]
+                value = function(target.buffer[offset], val.value)
+            try:
+                target.buffer[offset] = value
+            except (OverflowError, ValueError):
+                self.error(ErrorCode.OVERFLOW, token)
+        return element_assignment
+
+    def compile_BlockStatementNode(self, node: BlockStatementNode) -> Closure:
+        """Compiles a BlockStatementNode."""
+        statements = [self.closure(statement) for statement in node.statements]
+        stack = self.stack
+
+        def block() -> None:
+            stack.push()
+            try:
+                for statement in statements:
+                    statement()
+            finally:
+                stack.pop()
+        return block
+
+    def compile_IfElseStatementNode(self, node: IfElseStatementNode) -> Closure:
+        """Compiles an IfElseStatementNode."""
+        branches = [(self.compile_condition(condition), self.closure(block)) for condition, block in node.conditional]
+        otherwise = self.closure(node.otherwise) if node.otherwise is not None else None
+
+        if len(branches) == 1 and otherwise is None:
+            condition, run_block = branches[0]
+
+            def if_statement() -> None:
+                if condition():
+                    run_block()
+            return if_statement
+
+        def if_else_statement() -> None:
+            for condition, block in branches:
+                if condition():
+                    block()
+                    return
+            if otherwise is not None:
+                otherwise()
+        return if_else_statement
+
+    def compile_ForLoopNode(self, node: ForLoopNode) -> Closure:
+        """Compiles a ForLoopNode."""
+        initialization = self.closure(node.initialization)
+        condition = self.compile_condition(node.condition)
+        increment = self.closure(node.increment)
+        block = self.closure(node.block)
+        stack = self.stack
+
+        def for_loop() -> None:
+            stack.push()
+            initialization()
+            while condition():
+                try:
+                    block()
+                except BreakException:
+                    break
+                except ContinueException:
+                    pass
+                increment()
+            stack.pop()
+        return for_loop
+
+    def compile_WhileLoopNode(self, node: WhileLoopNode) -> Closure:
+        """Compiles a WhileLoopNode."""
+        condition = self.compile_condition(node.condition)
+        block = self.closure(node.block)
+
+        def while_loop() -> None:
+            while condition():
+                try:
+                    block()
+                except BreakException:
+                    break
+                except ContinueException:
+                    pass
+        return while_loop
+
+    def compile_DoWhileLoopNode(self, node: DoWhileLoopNode) -> Closure:
+        """Compiles a DoWhileLoopNode."""
+        condition = self.compile_condition(node.condition)
+        block = self.closure(node.block)
+
+        def do_while_loop() -> None:
+            # Runs the block once before checking the condition.
+            try:
+                block()
+            except BreakException:
+                return
+            except ContinueException:
+                pass
+            while condition():
+                try:
+                    block()
+                except BreakException:
+                    break
+                except ContinueException:
+                    pass
+        return do_while_loop
+
+    def compile_BreakStatementNode(self, node: BreakStatementNode) -> Closure:
+        """Compiles a BreakStatementNode."""
+        def break_statement() -> None:
+            raise BreakException(node.token)
+        return break_statement
+
+    def compile_ContinueStatementNode(self, node: ContinueStatementNode) -> Closure:
+        """Compiles a ContinueStatementNode."""
+        def continue_statement() -> None:
+            raise ContinueException(node.token)
+        return continue_statement
+
+    def compile_ReturnStatementNode(self, node: ReturnStatementNode) -> Closure:
+        """Compiles a ReturnStatementNode."""
+        evaluate = self.closure(node.expression)
+
+        def return_statement() -> None:
+            raise ReturnException(evaluate(), node.token)
+        return return_statement
+
+    def compile_BuiltInFunctionCallStatementNode(self, node: BuiltInFunctionCallStatementNode) -> Closure:
+        """Compiles a BuiltInFunctionCallStatementNode."""
+        run = LIBRARY_FUNCTIONS[node.name].run
+        stack = self.stack
+        return lambda: run(stack)
+
+    def compile_FunctionCallStatementNode(self, node: FunctionCallStatementNode) -> Closure:
+        """
+        Compiles a FunctionCallStatementNode. The closure remembers the last function that it called, along with the
+        closure of its body and the types of the values that its arguments and return value can hold without
+        conversion, so that calling the same function again skips most of the checks.
+        """
+        arguments = [self.closure(arg) for arg in node.args]
+        stack = self.stack
+        called = run_body = None
+        argument_types = []
+        return_type = None
+
+        def call() -> Value:
+            nonlocal called, run_body, argument_types, return_type
+            scope = find_scope(stack, node.name)
+            if scope is None:
+                self.error(ErrorCode.ID_NOT_FOUND, node.token)
+            function = scope[node.name]
+            if not isinstance(function, Function):
+                self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+            values = [evaluate() for evaluate in arguments]
+
+            # Python functions are called directly, without creating a scope.
+            if isinstance(function, ffi.ForeignFunction):
+                return self.call_foreign_function(function, node, values)
+
+            if function is not called:
+                called = function
+                run_body = self.closure(function.block)
+                argument_types = [CASTS[arg.type][0] if arg.num_dimensions == 0 and arg.type in CASTS else None
+                                  for arg in function.args]
+                return_type = RETURN_TYPES.get(function.type) if not isinstance(function.type, tuple) else None
+
+            # Runs the function in a new scope from the bottom, so that it cannot see the variables of the caller.
+            top = stack.top
+            stack.top = stack.bottom
+            stack.push()
+
+            # Adds the arguments to the new scope, checking them in full unless they already have the right type.
+            if function.variadic is not None or len(function.args) != len(values):
+                self.bind_arguments(function, node, values)
+            else:
+                for arg, arg_type, value in zip(function.args, argument_types, values):
+                    stack.insert(arg.name, value if value.type is arg_type else self.bind_argument(arg, value, node))
+
+            ret_val = NULL
+            ret_token = None
+            try:
+                run_body()
+            except (BreakException, ContinueException) as ex:
+                self.error(ErrorCode.BREAK_OR_CONTINUE_WITHOUT_LOOP, ex.token)
+            except ReturnException as ex:
+                ret_val = ex.value
+                ret_token = ex.token
+            except LibraryError as ex:
+                self.error(ex.error_code, node.token)
+
+            stack.pop()
+            stack.top = top
+            if ret_val.type is return_type:
+                return ret_val
+            return self.check_return_value(function, ret_val, ret_token)
+        return call
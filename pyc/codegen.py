@@ -0,0 +1,1094 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `PythonGenerator` class, which translates a hot loop or function into the source code of a python
+function for the tiered engine in `tiered.py`. The generated code is specialized on the types of the variables that
+it uses: ints and floats are held as python numbers, and the buffer, offset, strides and shape of each array are held
+in python variables, so that most operations become python operators. The types of local variables come from their
+declarations, and the types of the variables that a loop reads from the scopes of the interpreter are the ones they
+had when the loop became hot.
+
+A compiled loop checks those types each time it starts, and returns `GUARD_FAILED` without running anything if one of
+them has changed, so that the tree-walking interpreter can run the loop instead. Operations whose types are not known
+call the same methods as the tree-walking interpreter, so both engines throw the same errors. Loops and functions that
+use a node without a translation (ex. switch statements, containers, structs or slices) are not compiled.
+"""
+
+import math
+import re
+from collections import namedtuple
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+
+from ast_nodes import ASTNode, ValueLiteralNode, InitializerListLiteralNode, VariableNode, SliceNode, \
+    UnaryOperatorNode, BinaryOperatorNode, CastOperatorNode, DeclarationStatementNode, AssignmentStatementNode, \
+    BlockStatementNode, IfElseStatementNode, ForLoopNode, WhileLoopNode, DoWhileLoopNode, LoopInvariantNode, \
+    HoistedLoopNode, VersionedLoopNode, BreakStatementNode, ContinueStatementNode, ReturnStatementNode, \
+    FunctionCallStatementNode, InlinedFunctionCallStatementNode, NoOperationStatementNode, iter_child_nodes, walk
+from closure import CASTS, UNARY_OPERATORS, ASSIGNMENT_OPERATORS, RETURN_TYPES, SCALAR_TYPES, NULL, find_scope
+from compiler import ArrayType, StaticType, RAW_TYPES, VARIABLE_TYPES, DEFAULT_VALUES, UnsupportedNode, \
+    declared_type, binary_result
+from control_exceptions import ReturnException
+from error import ErrorCode
+from linked_dict import LinkedDict
+from passes import calls_user_function
+from tokens import Token, TokenType
+from value import Function, ArrayValue, IntValue, FloatValue, StringValue, InitializerListValue, \
+    identifier_to_object
+
+# The tiered interpreter imports this module, so its class is only imported for the type annotations.
+if TYPE_CHECKING:
+    from tiered import TieredInterpreter
+
+# Returned by a compiled loop, instead of running, when a variable no longer has the type it was compiled for.
+GUARD_FAILED = object()
+
+# The python operator that computes each binary operator on raw operands, when `binary_result` allows it.
+PYTHON_SYMBOLS = {
+    TokenType.PLUS: "+",
+    TokenType.MINUS: "-",
+    TokenType.MUL: "*",
+    TokenType.DIV: "/",
+    TokenType.MOD: "%",
+    TokenType.BIT_AND: "&",
+    TokenType.BIT_OR: "|",
+    TokenType.BIT_XOR: "^",
+    TokenType.BIT_LSHIFT: "<<",
+    TokenType.BIT_RSHIFT: ">>",
+    TokenType.EQUAL: "==",
+    TokenType.NOT_EQUAL: "!=",
+    TokenType.LESS: "<",
+    TokenType.GREATER: ">",
+    TokenType.LESS_EQUAL: "<=",
+    TokenType.GREATER_EQUAL: ">=",
+}
+
+# The comparison operators, whose result is an int that is 1 if the comparison holds.
+COMPARISONS = (TokenType.EQUAL, TokenType.NOT_EQUAL, TokenType.LESS, TokenType.GREATER, TokenType.LESS_EQUAL,
+               TokenType.GREATER_EQUAL)
+
+# The operators that cannot throw an error on raw operands, so an operand built from them can be skipped by `and`.
+SAFE_OPERATORS = COMPARISONS + (TokenType.LOGICAL_AND, TokenType.LOGICAL_OR)
+
+# Matches code that is a name or a non-negative int, which can be used twice without being evaluated twice.
+SIMPLE_CODE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|[0-9]+")
+
+# A translated expression: its python source code and its static type.
+Expression = namedtuple("Expression", ["code", "type"])
+
+
+def logical_and(left: Any, right: Any) -> int:
+    """Computes `&&` on raw operands after both have been evaluated, as the tree-walking interpreter does."""
+    return int(left and right)
+
+
+def logical_or(left: Any, right: Any) -> int:
+    """Computes `||` on raw operands after both have been evaluated, as the tree-walking interpreter does."""
+    return int(left or right)
+
+
+def describe_loop(node: ASTNode) -> str:
+    """Returns the name of a loop used in reports, ex. "for loop at 12:5"."""
+    kinds = {ForLoopNode: "for loop", WhileLoopNode: "while loop", DoWhileLoopNode: "do-while loop"}
+    if node.token is None:
+        return kinds[type(node)]
+    return f"{kinds[type(node)]} at {node.token.line}:{node.token.column}"
+
+
+def contains_continue(node: ASTNode) -> bool:
+    """Checks if a node holds a continue statement that continues the loop whose body is the node."""
+    if isinstance(node, ContinueStatementNode):
+        return True
+    if isinstance(node, (ForLoopNode, WhileLoopNode, DoWhileLoopNode, HoistedLoopNode, VersionedLoopNode)):
+        return False
+    return any(contains_continue(child) for child in iter_child_nodes(node))
+
+
+def is_safe(node: ASTNode) -> bool:
+    """
+    Checks if an expression is only made of literals, variables that are not indexed and operators that cannot throw
+    an error on raw operands. If its static type is raw, skipping it cannot change what the program does.
+    """
+    if isinstance(node, (ValueLiteralNode, LoopInvariantNode)):
+        return True
+    if isinstance(node, VariableNode):
+        return len(node.indices) == 0
+    if isinstance(node, UnaryOperatorNode):
+        return is_safe(node.operand)
+    if isinstance(node, BinaryOperatorNode):
+        return node.operator in SAFE_OPERATORS and is_safe(node.left_operand) and is_safe(node.right_operand)
+    return False
+
+
+class Variable(object):
+    """
+    A variable used by the generated code.
+
+    Attributes:
+        name (str): the name of the python variable that holds it. An array also has python variables for its buffer
+            (`name_b`), offset (`name_o`), strides (`name_s0`, `name_s1`...) and shape (`name_n0`, `name_n1`...).
+        type (StaticType): the static type of the variable, or None if it is held as a `Value` of any type.
+        key (str): the name of the variable in PYC.
+        scope (Optional[str]): for a variable read from the scopes of the interpreter, the name of the python variable
+            holding the dictionary of its scope.
+        cached (bool): whether the variable is held in its python variable while the code runs. Otherwise it is read
+            from, and assigned to, its scope every time, since a function that it calls could change it.
+        assigned (bool): whether the code assigns to the variable, in which case a cached variable read from a scope
+            is written back to the scope when the code finishes.
+    """
+
+    def __init__(self, name: str, static_type: StaticType, key: str, scope: Optional[str] = None,
+                 cached: bool = True) -> None:
+        self.name = name
+        self.type = static_type
+        self.key = key
+        self.scope = scope
+        self.cached = cached
+        self.assigned = False
+
+
+class LoopExits(object):
+    """
+    The python statements that leave a loop, which depend on whether its body is wrapped in an inner loop.
+
+    Attributes:
+        break_lines (List[str]): the statements compiled from a break statement.
+        continue_lines (List[str]): the statements compiled from a continue statement.
+    """
+
+    def __init__(self, break_lines: List[str], continue_lines: List[str]) -> None:
+        self.break_lines = break_lines
+        self.continue_lines = continue_lines
+
+
+class CompiledRegion(object):
+    """
+    A loop or function that was compiled into a python function.
+
+    Attributes:
+        description (str): what was compiled, ex. "for loop at 12:5" or "function fib".
+        source (str): the generated python source code.
+        function (Callable): the python function. A loop takes the scopes of the interpreter (LinkedDict), runs from
+            its next condition check until it ends, and returns `GUARD_FAILED` if it could not run. A function takes
+            its arguments and returns the value of the function, raw values being passed and returned raw.
+        argument_types (List[StaticType]): for a function, the static type of each argument.
+        return_type (Optional[TokenType]): for a function, the type of the value it returns.
+    """
+
+    def __init__(self, description: str, source: str, function: Callable,
+                 argument_types: Optional[List[StaticType]] = None, return_type: Optional[TokenType] = None) -> None:
+        self.description = description
+        self.source = source
+        self.function = function
+        self.argument_types = argument_types
+        self.return_type = return_type
+
+
+class PythonGenerator(object):
+    """
+    Generator that translates one loop or function into the source code of a python function.
+
+    Attributes:
+        interpreter (TieredInterpreter): the interpreter that runs the program. Its methods are called by the
+            generated code for the operations whose types are not known.
+        global_scope (Dict[str, Any]): the scope that holds the global variables and the functions.
+        loads_arrays (bool): whether the program calls `array_load`, which replaces the buffer of an array.
+        stack (Optional[LinkedDict]): for a loop, the scopes of the interpreter when the loop became hot, where the
+            variables that the loop reads are found.
+        namespace (Dict[str, Any]): the global variables of the generated code.
+        constants (Dict[int, str]): maps the `id` of each object in the namespace to its name.
+        num_names (int): the number of python names made so far, used to make each name unique.
+        lines (List[Tuple[int, str]]): the generated statements of the body, with their indentation level.
+        indent (int): the indentation level of the next statement.
+        prologue (List[str]): the statements that read the variables from their scopes and check their types.
+        scopes (List[Dict[str, Variable]]): the local variables in each scope that encloses the node being translated.
+        inputs (Dict[str, Variable]): the variables read from the scopes of the interpreter, by name.
+        global_inputs (Dict[str, Variable]): the global variables read by a function, or by an inlined function
+            call, by name.
+        checked_functions (Set[str]): the names of the functions that a loop checks are not hidden by a variable.
+        only_globals (bool): whether names that are not local variables refer to global variables, as they do in a
+            function, rather than to the variables in the scopes of the interpreter.
+        calls_functions (bool): whether the code calls any function.
+        calls_user_functions (bool): whether the code calls a function that could change global variables.
+        loops (List[LoopExits]): the loops that enclose the node being translated.
+        invariants (Dict[LoopInvariantNode, Expression]): the python variable holding each hoisted expression.
+        function (Optional[Function]): the function being compiled, if it is a function.
+        function_name (str): the name of the generated python function.
+        argument_types (List[StaticType]): the static types of the arguments of the function being compiled.
+        return_type (Optional[TokenType]): the type returned by the function being compiled.
+    """
+
+    def __init__(self, interpreter: "TieredInterpreter", loads_arrays: bool) -> None:
+        """
+        Inits python generator class.
+        Args:
+            interpreter (TieredInterpreter): the interpreter that runs the program.
+            loads_arrays (bool): whether the program calls `array_load`.
+        """
+        self.interpreter = interpreter
+        self.global_scope = interpreter.stack.bottom.hmap
+        self.loads_arrays = loads_arrays
+        self.stack = None
+        self.namespace = {
+            "IntValue": IntValue,
+            "FloatValue": FloatValue,
+            "StringValue": StringValue,
+            "InitializerListValue": InitializerListValue,
+            "ArrayValue": ArrayValue,
+            "INTL": TokenType.INTL,
+            "FLOATL": TokenType.FLOATL,
+            "STRINGL": TokenType.STRINGL,
+            "ARRAYL": TokenType.ARRAYL,
+            "NULL": NULL,
+            "GUARD_FAILED": GUARD_FAILED,
+            "ReturnException": ReturnException,
+            "ErrorCode": ErrorCode,
+            "find_scope": find_scope,
+            "logical_and": logical_and,
+            "logical_or": logical_or,
+            "error": interpreter.error,
+            "unary": interpreter.unary_operation,
+            "binary": interpreter.binary_operation,
+            "cast": interpreter.cast_operation,
+            "updated": interpreter.assignment_operation,
+            "element": interpreter.element_value,
+            "assign_element": interpreter.assign_element,
+            "converted": interpreter.converted_value,
+            "new_array": interpreter.new_array,
+            "call": interpreter.call_function,
+            "call_inlined": interpreter.call_inlined_function,
+            "check_return": interpreter.check_return_value,
+            "_g": self.global_scope,
+        }
+        self.constants = {}
+        self.num_names = 0
+        self.lines = []
+        self.indent = 0
+        self.prologue = []
+        self.scopes = [{}]
+        self.inputs = {}
+        self.global_inputs = {}
+        self.checked_functions = set()
+        self.only_globals = False
+        self.calls_functions = False
+        self.calls_user_functions = False
+        self.loops = []
+        self.invariants = {}
+        self.function = None
+        self.function_name = ""
+        self.argument_types = []
+        self.return_type = None
+
+    def compile_loop(self, node: ASTNode, stack: LinkedDict) -> CompiledRegion:
+        """
+        Compiles a for, while or do-while loop into a function that runs it from its next condition check, which is
+        where the interpreter is when the loop becomes hot. The initialization of a for loop has already run, and the
+        first iteration of a do-while loop has too. Throws an UnsupportedNode error if the loop cannot be compiled.
+        """
+        self.stack = stack
+        self.start(node)
+        self.function_name = self.new_name("loop")
+        condition = self.condition(node.condition)
+        self.emit_loop(condition, node.block, node.increment if isinstance(node, ForLoopNode) else None)
+        return CompiledRegion(describe_loop(node), *self.finish("stack"))
+
+    def compile_function(self, name: str, function: Function) -> CompiledRegion:
+        """Compiles a user function, throwing an UnsupportedNode error if it cannot be compiled."""
+        self.function = function
+        self.only_globals = True
+        self.start(function.block)
+        self.function_name = self.new_name(name)
+        self.return_type = RETURN_TYPES.get(function.type)
+        if self.return_type is None:
+            raise UnsupportedNode(f"returns a {function.type.name.lower()}")
+
+        # Arrays and raw values are passed as they are held in local variables. Other arguments are passed as values.
+        parameters = []
+        for argument in function.args:
+            if argument.name in self.scopes[0]:
+                raise UnsupportedNode(f"argument `{argument.name}` is declared twice")
+            argument_type = declared_type(argument.type, argument.num_dimensions)
+            variable = self.declare(argument.name, argument_type)
+            self.argument_types.append(argument_type)
+            parameters.append(variable.name)
+            if isinstance(argument_type, ArrayType):
+                self.bind_array(variable)
+
+        self.statement(function.block)
+
+        # A void function returns when it reaches its end, but any other function must return a value.
+        if self.return_type == TokenType.VOIDL:
+            self.line("return NULL")
+        else:
+            self.line("error(ErrorCode.MISMATCHED_TYPE, None)")
+        return CompiledRegion(f"function {name}", *self.finish(", ".join(parameters)), self.argument_types,
+                              self.return_type)
+
+    def start(self, node: ASTNode) -> None:
+        """Finds out which functions the loop or function calls, which decides how it can hold variables."""
+        self.calls_functions = any(isinstance(child, FunctionCallStatementNode) for child in walk(node))
+        self.calls_user_functions = calls_user_function(node)
+        self.indent = 1
+
+    def finish(self, parameters: str) -> Tuple[str, Callable]:
+        """
+        Puts the generated function together and compiles it.
+        Args:
+            parameters (str): the parameters of the python function.
+        Returns:
+            Tuple[str, Callable]: the source code and the compiled function.
+        """
+        # Cached variables read from a scope are written back to it when the function finishes, however it finishes.
+        write_backs = [f"{variable.scope}[{variable.key!r}] = {self.box(Expression(variable.name, variable.type))}"
+                       for variable in list(self.inputs.values()) + list(self.global_inputs.values())
+                       if variable.cached and variable.assigned]
+        source = [f"def {self.function_name}({parameters}):"]
+        source.extend("    " + line for line in self.prologue)
+        extra = 1 if len(write_backs) != 0 else 0
+        if extra:
+            source.append("    try:")
+        source.extend("    " * (indent + extra) + line for indent, line in self.lines)
+        if extra:
+            source.append("    finally:")
+            source.extend("        " + line for line in write_backs)
+        source = "\n".join(source) + "\n"
+
+        try:
+            code = compile(source, f"<{self.function_name}>", "exec")
+        except (SyntaxError, RecursionError, MemoryError) as ex:
+            raise UnsupportedNode(f"is too large for python to compile ({ex})")
+        exec(code, self.namespace)
+        return source, self.namespace[self.function_name]
+
+    def line(self, text: str) -> None:
+        """Adds a statement to the body at the current indentation level."""
+        self.lines.append((self.indent, text))
+
+    def new_name(self, prefix: str) -> str:
+        """Returns a new python name that starts with `prefix`."""
+        self.num_names += 1
+        return f"{prefix}_{self.num_names}"
+
+    def constant(self, obj: Any) -> str:
+        """Returns the name of an object (ex. a token, node or function) in the namespace, adding it if needed."""
+        if id(obj) not in self.constants:
+            self.constants[id(obj)] = f"_c{len(self.constants)}"
+            self.namespace[self.constants[id(obj)]] = obj
+        return self.constants[id(obj)]
+
+    def token(self, token: Optional[Token]) -> str:
+        """Returns the code for a token used to report an error."""
+        return "None" if token is None else self.constant(token)
+
+    def declare(self, name: str, static_type: StaticType) -> Variable:
+        """Declares a local variable in the innermost scope."""
+        variable = Variable(self.new_name(name), static_type, name)
+        self.scopes[-1][name] = variable
+        return variable
+
+    def bind_array(self, variable: Variable) -> None:
+        """Generates the statements that load the buffer, offset, strides and shape of an array into variables."""
+        # `array_load` can replace the buffer of an array during any call.
+        if self.loads_arrays and self.calls_functions:
+            raise UnsupportedNode("uses arrays and calls functions in a program that loads arrays from files")
+        name = variable.name
+        dimensions = range(variable.type.num_dimensions)
+        self.line(f"{name}_b = {name}.buffer")
+        self.line(f"{name}_o = {name}.offset")
+        self.line("".join(f"{name}_s{d}, " for d in dimensions) + f"= {name}.strides")
+        self.line("".join(f"{name}_n{d}, " for d in dimensions) + f"= {name}.shape")
+
+    @staticmethod
+    def observed_type(value: Any) -> StaticType:
+        """Returns the static type of a value found in a scope, or None if it is held as a `Value` of any type."""
+        if type(value) is ArrayValue and value.element_type in SCALAR_TYPES:
+            return ArrayType(value.element_type, len(value.shape))
+        if type(value) in (IntValue, FloatValue, StringValue):
+            return value.type
+        return None
+
+    def guard(self, check: str) -> None:
+        """Adds a check to the prologue that makes the function return GUARD_FAILED if it is true."""
+        self.prologue.append(f"if {check}:")
+        self.prologue.append("    return GUARD_FAILED")
+
+    def load_input(self, variable: Variable, holder: str) -> None:
+        """Adds the statements that load a cached variable from the python variable `holder` to the prologue."""
+        if variable.type in RAW_TYPES:
+            self.prologue.append(f"{variable.name} = {holder}.value")
+        elif holder != variable.name:
+            self.prologue.append(f"{variable.name} = {holder}")
+        if isinstance(variable.type, ArrayType):
+            lines, indent = self.lines, self.indent
+            self.lines, self.indent = [], 0
+            self.bind_array(variable)
+            self.prologue.extend(line for _, line in self.lines)
+            self.lines, self.indent = lines, indent
+
+    def input_variable(self, name: str) -> Variable:
+        """Returns a variable that a loop reads from the scopes of the interpreter, adding it to the prologue."""
+        if name in self.inputs:
+            return self.inputs[name]
+        scope = find_scope(self.stack, name)
+        if scope is None:
+            raise UnsupportedNode(f"uses `{name}` before it is declared")
+        value = scope[name]
+        if isinstance(value, Function):
+            raise UnsupportedNode(f"uses the function `{name}` as a variable")
+        static_type = self.observed_type(value)
+
+        # A global variable could be assigned by a function that the loop calls, so it is not cached. Arrays cannot be
+        # assigned to.
+        is_global = scope is self.global_scope
+        assignable = self.calls_user_functions and not isinstance(static_type, ArrayType)
+        cached = not (is_global and assignable)
+        variable = Variable(self.new_name(name), static_type, name, self.new_name("_s"), cached)
+        self.inputs[name] = variable
+
+        self.prologue.append(f"{variable.scope} = find_scope(stack, {name!r})")
+        self.guard(f"{variable.scope} is None")
+        if cached and assignable:
+            # The variable is cached because the functions that the loop calls cannot see it.
+            self.guard(f"{variable.scope} is _g")
+        holder = variable.name
+        self.prologue.append(f"{holder} = {variable.scope}[{name!r}]")
+        if isinstance(static_type, ArrayType):
+            self.guard(f"type({holder}) is not ArrayValue or {holder}.element_type is not "
+                       f"{static_type.element_type.name} or len({holder}.shape) != {static_type.num_dimensions}")
+        elif static_type is not None:
+            self.guard(f"{holder}.type is not {static_type.name}")
+        if cached:
+            self.load_input(variable, holder)
+        return variable
+
+    def global_variable(self, name: str) -> Variable:
+        """Returns a global variable read by a function or an inlined function call, adding it to the prologue."""
+        if name in self.global_inputs:
+            return self.global_inputs[name]
+        value = self.global_scope.get(name)
+        if value is None:
+            raise UnsupportedNode(f"uses `{name}` before it is declared")
+        if isinstance(value, Function):
+            raise UnsupportedNode(f"uses the function `{name}` as a variable")
+
+        # Global variables keep the same type, and arrays are never replaced, so they do not need guards.
+        static_type = self.observed_type(value)
+        cached = not (self.calls_user_functions and not isinstance(static_type, ArrayType))
+        variable = Variable(self.new_name(name), static_type, name, "_g", cached)
+        self.global_inputs[name] = variable
+        if cached:
+            self.load_input(variable, f"_g[{name!r}]")
+        return variable
+
+    def lookup(self, name: str) -> Variable:
+        """Returns the variable that a name refers to."""
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        if self.only_globals:
+            return self.global_variable(name)
+        return self.input_variable(name)
+
+    def lookup_function(self, node: FunctionCallStatementNode) -> Function:
+        """Returns the function called by a node, which must be the same every time the code runs."""
+        if any(node.name in scope for scope in self.scopes):
+            raise UnsupportedNode(f"calls `{node.name}`, which is hidden by a variable")
+        if self.only_globals:
+            function = self.global_scope.get(node.name)
+        else:
+            # A loop checks that no variable in the scopes of the interpreter hides the function.
+            scope = find_scope(self.stack, node.name)
+            if scope is not self.global_scope:
+                raise UnsupportedNode(f"calls `{node.name}`, which is hidden by a variable")
+            function = scope[node.name]
+            if node.name not in self.checked_functions:
+                self.checked_functions.add(node.name)
+                self.guard(f"find_scope(stack, {node.name!r}) is not _g")
+        if not isinstance(function, Function):
+            raise UnsupportedNode(f"calls `{node.name}`, which is not a function")
+        return function
+
+    def read(self, variable: Variable) -> str:
+        """Returns the code that reads a variable."""
+        if variable.cached:
+            return variable.name
+        code = f"{variable.scope}[{variable.key!r}]"
+        return f"{code}.value" if variable.type in RAW_TYPES else code
+
+    def write(self, variable: Variable, code: str) -> None:
+        """Generates the statement that assigns a value, held as the variable holds it, to a variable."""
+        if variable.cached:
+            self.line(f"{variable.name} = {code}")
+            variable.assigned = True
+        else:
+            self.line(f"{variable.scope}[{variable.key!r}] = {self.box(Expression(code, variable.type))}")
+
+    @staticmethod
+    def box(expression: Expression) -> str:
+        """Returns the code for the value of an expression as a `Value`."""
+        if expression.type == TokenType.INTL:
+            return f"IntValue(INTL, {expression.code})"
+        if expression.type == TokenType.FLOATL:
+            return f"FloatValue(FLOATL, {expression.code})"
+        return expression.code
+
+    def convert(self, expression: Expression, token_type: TokenType, token: Optional[Token]) -> str:
+        """Returns the code for the value that a variable of type `token_type` holds once the expression is stored."""
+        if expression.type == token_type:
+            return expression.code
+        code = f"converted({token_type.name}, {self.box(expression)}, {self.token(token)})"
+        return f"{code}.value" if token_type in RAW_TYPES else code
+
+    def temporary(self, code: str) -> str:
+        """Stores the result of some code in a new python variable, unless the code is simple enough to repeat."""
+        if SIMPLE_CODE.fullmatch(code):
+            return code
+        name = self.new_name("_t")
+        self.line(f"{name} = {code}")
+        return name
+
+    def statement(self, node: ASTNode, in_block: bool = False) -> None:
+        """
+        Translates a statement.
+        Args:
+            node (ASTNode): the statement.
+            in_block (bool): whether the statement is directly in a block, where it can declare a variable.
+        """
+        if isinstance(node, NoOperationStatementNode):
+            return
+        if isinstance(node, FunctionCallStatementNode):
+            self.line(self.expression(node).code)
+            return
+
+        # A declaration that is not in a block declares the variable in whichever scope is innermost when it runs.
+        if isinstance(node, DeclarationStatementNode) and not in_block:
+            raise UnsupportedNode("declares a variable outside of a block")
+        translator = getattr(self, "translate_" + type(node).__name__, None)
+        if translator is None:
+            raise UnsupportedNode(f"uses a {type(node).__name__}")
+        translator(node)
+
+    def body(self, node: ASTNode) -> None:
+        """Translates the body of an if statement or loop, one level further in."""
+        self.indent += 1
+        start = len(self.lines)
+        self.statement(node)
+        if len(self.lines) == start:
+            self.line("pass")
+        self.indent -= 1
+
+    def expression(self, node: ASTNode) -> Expression:
+        """Translates an expression. The code of an expression never needs parentheses to be used as an operand."""
+        translator = getattr(self, "translate_" + type(node).__name__, None)
+        if translator is None:
+            raise UnsupportedNode(f"uses a {type(node).__name__}")
+        return translator(node)
+
+    def condition(self, node: ASTNode) -> str:
+        """Translates a condition into python code that is true when the condition holds."""
+        if isinstance(node, BinaryOperatorNode):
+            expression = self.binary(node, self.expression(node.left_operand), self.expression(node.right_operand),
+                                     True)
+        else:
+            expression = self.expression(node)
+        return expression.code if expression.type in RAW_TYPES else f"{expression.code}.value"
+
+    def translate_NoOperationStatementNode(self, node: NoOperationStatementNode) -> Expression:
+        """Translates a NoOperationStatementNode used as an expression, which evaluates to null."""
+        return Expression("NULL", TokenType.VOIDL)
+
+    def translate_ValueLiteralNode(self, node: ValueLiteralNode) -> Expression:
+        """Translates a ValueLiteralNode."""
+        if node.type == TokenType.INTL:
+            return Expression(repr(node.value) if node.value >= 0 else f"({node.value!r})", node.type)
+        if node.type == TokenType.FLOATL and math.isfinite(node.value):
+            return Expression(repr(node.value) if node.value >= 0 else f"({node.value!r})", node.type)
+        if node.type == TokenType.FLOATL:
+            return Expression(self.constant(node.value), node.type)
+        if node.type == TokenType.STRINGL:
+            # Strings are never changed in place, so every run can share one value.
+            return Expression(self.constant(StringValue(TokenType.STRINGL, node.value)), node.type)
+        raise UnsupportedNode(f"uses a {node.type.name.lower()} literal")
+
+    def translate_InitializerListLiteralNode(self, node: InitializerListLiteralNode) -> Expression:
+        """Translates an InitializerListLiteralNode."""
+        elements = ", ".join(self.box(self.expression(element)) for element in node.value)
+        return Expression(f"InitializerListValue(ARRAYL, [{elements}])", None)
+
+    def translate_LoopInvariantNode(self, node: LoopInvariantNode) -> Expression:
+        """Translates a LoopInvariantNode."""
+        if node in self.invariants:
+            return self.invariants[node]
+
+        # The expression was hoisted out of a loop that encloses the compiled loop, so it keeps its value while the
+        # compiled loop runs.
+        if self.stack is None or node.value is None:
+            raise UnsupportedNode("uses a hoisted expression outside of its loop")
+        static_type = node.value.type if type(node.value) in (IntValue, FloatValue, StringValue) else None
+        name = self.new_name("_inv")
+        self.prologue.append(f"{name} = {self.constant(node)}.value")
+        if static_type is not None:
+            self.guard(f"{name}.type is not {static_type.name}")
+        if static_type in RAW_TYPES:
+            self.prologue.append(f"{name} = {name}.value")
+        self.invariants[node] = Expression(name, static_type)
+        return self.invariants[node]
+
+    def index(self, node: ASTNode) -> str:
+        """Translates an array index, which must be an int."""
+        if isinstance(node, SliceNode):
+            raise UnsupportedNode("uses a slice")
+        index = self.expression(node)
+        if index.type != TokenType.INTL:
+            raise UnsupportedNode("indexes an array with a value that is not an int")
+        return index.code
+
+    def array_variable(self, node: VariableNode) -> Variable:
+        """Returns the array indexed by a VariableNode."""
+        variable = self.lookup(node.name)
+        if variable.type is not None and (not isinstance(variable.type, ArrayType) or
+                                          len(node.indices) > variable.type.num_dimensions):
+            raise UnsupportedNode(f"indexes `{node.name}` as an array that it is not")
+
+        # The indices are evaluated before the variable is read, so a function that they call must not assign to it.
+        if not variable.cached and any(isinstance(child, FunctionCallStatementNode) for index in node.indices
+                                       for child in walk(index)):
+            raise UnsupportedNode(f"calls a function in the indices of `{node.name}`")
+        return variable
+
+    def translate_VariableNode(self, node: VariableNode) -> Expression:
+        """Translates a VariableNode."""
+        if len(node.indices) == 0:
+            variable = self.lookup(node.name)
+            return Expression(self.read(variable), variable.type)
+
+        variable = self.array_variable(node)
+        name = variable.name
+        indices = [self.index(index) for index in node.indices]
+
+        # Other containers that can be indexed (ex. vectors) are indexed by the interpreter.
+        if variable.type is None:
+            return Expression(f"element({self.read(variable)}, [{', '.join(indices)}], {self.constant(node)})", None)
+        checked = [d for d in range(len(indices)) if d not in node.unchecked_dimensions]
+
+        # Every index is evaluated before any bounds check, as in the tree-walking interpreter.
+        if len(checked) == 0 or all(SIMPLE_CODE.fullmatch(index) for index in indices):
+            check = " and ".join(f"0 <= {indices[d]} < {name}_n{d}" for d in checked)
+        elif len(indices) == 1:
+            temporary = self.new_name("_i")
+            check = f"0 <= ({temporary} := {indices[0]}) < {name}_n0"
+            indices = [temporary]
+        else:
+            assignments = []
+            for d, index in enumerate(indices):
+                if not SIMPLE_CODE.fullmatch(index):
+                    temporary = self.new_name("_i")
+                    assignments.append(f"({temporary} := {index})")
+                    indices[d] = temporary
+            check = f"({', '.join(assignments)},) and " + " and ".join(f"0 <= {indices[d]} < {name}_n{d}"
+                                                                         for d in checked)
+        position = f"{name}_o + " + " + ".join(f"{index} * {name}_s{d}" for d, index in enumerate(indices))
+
+        # Indexing fewer dimensions than the array has gives a view of a sub-array.
+        array_type = variable.type
+        if len(indices) < array_type.num_dimensions:
+            code = f"{name}.view({position}, {len(indices)})"
+            result = Expression(code, ArrayType(array_type.element_type, array_type.num_dimensions - len(indices)))
+        elif array_type.element_type == TokenType.STRINGL:
+            result = Expression(f"StringValue(STRINGL, {name}_b[{position}])", TokenType.STRINGL)
+        else:
+            result = Expression(f"{name}_b[{position}]", array_type.element_type)
+        if len(checked) == 0:
+            return result
+        return Expression(f"({result.code} if {check} else error(ErrorCode.OUT_OF_BOUNDS, {self.token(node.token)}))",
+                          result.type)
+
+    def translate_UnaryOperatorNode(self, node: UnaryOperatorNode) -> Expression:
+        """Translates a UnaryOperatorNode."""
+        operand = self.expression(node.operand)
+        operation = UNARY_OPERATORS.get((node.operator, operand.type))
+        if operation is None:
+            return Expression(f"unary({self.constant(node)}, {self.box(operand)})", None)
+        if node.operator == TokenType.MINUS:
+            return Expression(f"(-{operand.code})", operation[0])
+        if node.operator == TokenType.BIT_NOT:
+            return Expression(f"(~{operand.code})", operation[0])
+        return Expression(f"(0 if {operand.code} else 1)", operation[0])
+
+    def typed_binary(self, operator_type: TokenType, left: Expression, right: Expression, right_is_safe: bool = False,
+                     as_condition: bool = False) -> Optional[Expression]:
+        """
+        Translates a binary operator applied to two translated operands whose types have a typed operation.
+        Args:
+            operator_type (TokenType): the operator.
+            left (Expression): the left operand.
+            right (Expression): the right operand.
+            right_is_safe (bool): whether evaluating the right operand can be skipped, as decided by `is_safe`.
+            as_condition (bool): whether the result is only used as a condition, in which case a comparison can give
+                a python bool instead of an int.
+        Returns:
+            Optional[Expression]: the result, or None if the operand types have no typed operation.
+        """
+        result_type = binary_result(operator_type, left.type, right.type)
+        if result_type is None:
+            return None
+
+        if left.type == right.type == TokenType.STRINGL:
+            if operator_type == TokenType.PLUS:
+                return Expression(f"{left.code}.concatenate({right.code})", result_type)
+            left, right = Expression(f"{left.code}.value", None), Expression(f"{right.code}.value", None)
+        if operator_type in COMPARISONS:
+            comparison = f"{left.code} {PYTHON_SYMBOLS[operator_type]} {right.code}"
+            return Expression(f"({comparison})" if as_condition else f"(1 if {comparison} else 0)", result_type)
+
+        # Both operands are always evaluated, so the right one is only skipped when skipping it changes nothing. The
+        # result is the int of the last operand evaluated, so `0.5 && 1` is 1 but `1 && 0.5` is 0.
+        if operator_type in (TokenType.LOGICAL_AND, TokenType.LOGICAL_OR):
+            keyword = "and" if operator_type == TokenType.LOGICAL_AND else "or"
+            if right_is_safe:
+                if as_condition and left.type == right.type == TokenType.INTL:
+                    return Expression(f"({left.code} {keyword} {right.code})", result_type)
+                return Expression(f"int({left.code} {keyword} {right.code})", result_type)
+            return Expression(f"logical_{keyword}({left.code}, {right.code})", result_type)
+
+        if operator_type == TokenType.DIV and result_type == TokenType.INTL:
+            return Expression(f"int({left.code} / {right.code})", result_type)
+        return Expression(f"({left.code} {PYTHON_SYMBOLS[operator_type]} {right.code})", result_type)
+
+    def binary(self, node: BinaryOperatorNode, left: Expression, right: Expression,
+               as_condition: bool = False) -> Expression:
+        """Translates a BinaryOperatorNode applied to its two translated operands."""
+        result = self.typed_binary(node.operator, left, right, is_safe(node.right_operand), as_condition)
+        if result is None:
+            return Expression(f"binary({self.constant(node)}, {self.box(left)}, {self.box(right)})", None)
+        return result
+
+    def translate_BinaryOperatorNode(self, node: BinaryOperatorNode) -> Expression:
+        """Translates a BinaryOperatorNode."""
+        return self.binary(node, self.expression(node.left_operand), self.expression(node.right_operand))
+
+    # The operand types of a SpecializedBinaryOperatorNode are checked when it is translated, like any other operator.
+    translate_SpecializedBinaryOperatorNode = translate_BinaryOperatorNode
+
+    def translate_CastOperatorNode(self, node: CastOperatorNode) -> Expression:
+        """Translates a CastOperatorNode."""
+        operand = self.expression(node.operand)
+        if node.operator in CASTS and operand.type in SCALAR_TYPES:
+            result_type = CASTS[node.operator][0]
+            if operand.type == result_type:
+                return operand
+            value = operand.code if operand.type in RAW_TYPES else f"{operand.code}.value"
+            if result_type == TokenType.STRINGL:
+                return Expression(f"StringValue(STRINGL, str({value}))", result_type)
+            return Expression(f"{CASTS[node.operator][1].__name__}({value})", result_type)
+
+        code = f"cast({self.constant(node)}, {self.box(operand)})"
+        if node.operator not in CASTS:
+            return Expression(code, None)
+        result_type = CASTS[node.operator][0]
+        return Expression(f"{code}.value" if result_type in RAW_TYPES else code, result_type)
+
+    def translate_DeclarationStatementNode(self, node: DeclarationStatementNode) -> None:
+        """Translates a DeclarationStatementNode."""
+        if not isinstance(node.type, TokenType) or node.type not in VARIABLE_TYPES:
+            raise UnsupportedNode(f"declares a {node.type.name.lower()}")
+        name = node.variable.name
+        token = node.variable.token
+        element_type = identifier_to_object(node.type)
+        indices = node.variable.indices
+        if name in self.scopes[-1]:
+            raise UnsupportedNode(f"declares `{name}` twice in the same scope")
+
+        # The value is evaluated before the variable is declared, so it cannot refer to the variable.
+        has_value = not isinstance(node.expression, NoOperationStatementNode)
+        value = self.expression(node.expression) if has_value else None
+        if len(indices) == 0:
+            if has_value:
+                code = self.convert(value, element_type, token)
+            elif element_type == TokenType.STRINGL:
+                code = self.constant(StringValue(TokenType.STRINGL, DEFAULT_VALUES[element_type]))
+            else:
+                code = repr(DEFAULT_VALUES[element_type])
+            self.line(f"{self.declare(name, element_type).name} = {code}")
+            return
+
+        # The dimensions are evaluated after the initializer list. An empty dimension is taken from the list.
+        initializer = self.temporary(self.box(value)) if has_value else "NULL"
+        dimensions = []
+        for index in indices:
+            if isinstance(index, NoOperationStatementNode):
+                dimensions.append("None")
+            else:
+                dimensions.append(self.index(index))
+        variable = self.declare(name, ArrayType(element_type, len(indices)))
+        self.line(f"{variable.name} = new_array({element_type.name}, [{', '.join(dimensions)}], {initializer}, "
+                  f"{self.token(token)})")
+        self.bind_array(variable)
+
+    def translate_AssignmentStatementNode(self, node: AssignmentStatementNode) -> None:
+        """Translates an AssignmentStatementNode."""
+        if not isinstance(node.variable, VariableNode):
+            raise UnsupportedNode("assigns to a field of a struct")
+        value = self.expression(node.expression)
+        if len(node.variable.indices) != 0:
+            self.assign_element(node, value)
+            return
+
+        variable = self.lookup(node.variable.name)
+        variable_type = variable.type
+        if variable_type not in SCALAR_TYPES:
+            raise UnsupportedNode(f"assigns to `{node.variable.name}`, which is not an int, float or string")
+        if node.operator == TokenType.ASSIGN:
+            self.write(variable, self.convert(value, variable_type, node.variable.token))
+            return
+
+        # The value is evaluated before the variable is read, since a function that it calls could change it.
+        if any(isinstance(child, FunctionCallStatementNode) for child in walk(node.expression)):
+            value = Expression(self.temporary(value.code), value.type)
+        current = Expression(self.read(variable), variable_type)
+        operator_type = ASSIGNMENT_OPERATORS.get(node.operator)
+        if binary_result(operator_type, variable_type, value.type) == variable_type:
+            self.write(variable, self.typed_binary(operator_type, current, value).code)
+            return
+        code = self.convert(Expression(f"updated({self.constant(node)}, {self.box(current)}, {self.box(value)})",
+                                       None), variable_type, node.variable.token)
+        self.write(variable, code)
+
+    def assign_element(self, node: AssignmentStatementNode, value: Expression) -> None:
+        """Translates an assignment to an element of an array."""
+        variable = self.array_variable(node.variable)
+        name = variable.name
+        value = Expression(self.temporary(value.code), value.type)
+        if variable.type is None:
+            indices = ", ".join(self.index(index) for index in node.variable.indices)
+            self.line(f"assign_element({self.constant(node)}, {self.read(variable)}, [{indices}], {self.box(value)})")
+            return
+        element_type = variable.type.element_type
+        if len(node.variable.indices) != variable.type.num_dimensions:
+            raise UnsupportedNode(f"assigns to a sub-array of `{node.variable.name}`")
+
+        # The indices are evaluated, then checked, before the element is read or written.
+        indices = [self.temporary(self.index(index)) for index in node.variable.indices]
+        checks = [f"0 <= {index} < {name}_n{d}" for d, index in enumerate(indices)
+                  if d not in node.variable.unchecked_dimensions]
+        if len(checks) != 0:
+            self.line(f"if not ({' and '.join(checks)}):")
+            self.line(f"    error(ErrorCode.OUT_OF_BOUNDS, {self.token(node.token)})")
+        position = self.temporary(f"{name}_o + " + " + ".join(f"{index} * {name}_s{d}"
+                                                               for d, index in enumerate(indices)))
+        element = Expression(f"{name}_b[{position}]", element_type)
+        if element_type == TokenType.STRINGL:
+            element = Expression(f"StringValue(STRINGL, {element.code})", element_type)
+
+        operator_type = ASSIGNMENT_OPERATORS.get(node.operator)
+        if node.operator == TokenType.ASSIGN:
+            result = Expression(self.convert(value, element_type, node.variable.token), element_type)
+        elif binary_result(operator_type, element_type, value.type) == element_type:
+            result = self.typed_binary(operator_type, element, value)
+        else:
+            result = Expression(self.convert(Expression(f"updated({self.constant(node)}, {self.box(element)}, "
+                                                        f"{self.box(value)})", None),
+                                             element_type, node.variable.token), element_type)
+        stored = result.code if element_type in RAW_TYPES else f"{result.code}.value"
+
+        # Ints that do not fit in 64 bits cannot be stored in the buffer.
+        if element_type != TokenType.INTL:
+            self.line(f"{name}_b[{position}] = {stored}")
+            return
+        stored = self.temporary(stored)
+        self.line("try:")
+        self.line(f"    {name}_b[{position}] = {stored}")
+        self.line("except (OverflowError, ValueError):")
+        self.line(f"    error(ErrorCode.OVERFLOW, {self.token(node.variable.token)})")
+
+    def translate_BlockStatementNode(self, node: BlockStatementNode) -> None:
+        """Translates a BlockStatementNode."""
+        self.scopes.append({})
+        for statement in node.statements:
+            self.statement(statement, True)
+        self.scopes.pop()
+
+    def translate_IfElseStatementNode(self, node: IfElseStatementNode) -> None:
+        """Translates an IfElseStatementNode."""
+        for i, (condition, block) in enumerate(node.conditional):
+            self.line(f"{'if' if i == 0 else 'elif'} {self.condition(condition)}:")
+            self.body(block)
+        if node.otherwise is not None:
+            self.line("else:")
+            self.body(node.otherwise)
+
+    def emit_loop(self, condition: str, block: ASTNode, increment: Optional[ASTNode] = None,
+                  tail_condition: Optional[ASTNode] = None) -> None:
+        """
+        Generates a loop.
+        Args:
+            condition (str): the code of the condition checked before each iteration.
+            block (ASTNode): the body of the loop.
+            increment (Optional[ASTNode]): the statement that runs after each iteration of a for loop.
+            tail_condition (Optional[ASTNode]): the condition checked after each iteration of a do-while loop.
+        """
+        self.line(f"while {condition}:")
+        self.indent += 1
+        start = len(self.lines)
+
+        # A continue statement must still run the increment or the condition at the end of the iteration, so such a
+        # body runs inside an inner loop that it can leave with break.
+        if (increment is not None or tail_condition is not None) and contains_continue(block):
+            broke = self.new_name("_broke")
+            self.line(f"{broke} = False")
+            self.line("while True:")
+            self.loops.append(LoopExits([f"{broke} = True", "break"], ["break"]))
+            self.body(block)
+            self.indent += 1
+            self.line("break")
+            self.indent -= 1
+            self.line(f"if {broke}:")
+            self.line("    break")
+        else:
+            self.loops.append(LoopExits(["break"], ["continue"]))
+            self.statement(block)
+        self.loops.pop()
+
+        if increment is not None:
+            self.statement(increment)
+        if tail_condition is not None:
+            self.line(f"if not {self.condition(tail_condition)}:")
+            self.line("    break")
+        if len(self.lines) == start:
+            self.line("pass")
+        self.indent -= 1
+
+    def translate_ForLoopNode(self, node: ForLoopNode) -> None:
+        """Translates a ForLoopNode."""
+        self.scopes.append({})
+        self.statement(node.initialization, True)
+        self.emit_loop(self.condition(node.condition), node.block, node.increment)
+        self.scopes.pop()
+
+    def translate_WhileLoopNode(self, node: WhileLoopNode) -> None:
+        """Translates a WhileLoopNode."""
+        self.emit_loop(self.condition(node.condition), node.block)
+
+    def translate_DoWhileLoopNode(self, node: DoWhileLoopNode) -> None:
+        """Translates a DoWhileLoopNode."""
+        self.emit_loop("True", node.block, tail_condition=node.condition)
+
+    def translate_HoistedLoopNode(self, node: HoistedLoopNode) -> None:
+        """Translates a HoistedLoopNode, storing each hoisted expression in a variable before the loop runs."""
+        for invariant in node.invariants:
+            value = self.expression(invariant.expression)
+            name = self.new_name("_inv")
+            self.line(f"{name} = {value.code}")
+            self.invariants[invariant] = Expression(name, value.type)
+        self.statement(node.loop)
+
+    def translate_VersionedLoopNode(self, node: VersionedLoopNode) -> None:
+        """
+        Translates a VersionedLoopNode. Only the checked version of the loop is translated, since a bounds check in
+        python costs little next to the rest of an array access.
+        """
+        for bound in (node.start, node.limit):
+            self.line(self.expression(bound).code)
+        self.statement(node.checked_loop)
+
+    def translate_BreakStatementNode(self, node: BreakStatementNode) -> None:
+        """Translates a BreakStatementNode."""
+        if len(self.loops) == 0:
+            self.line(f"error(ErrorCode.BREAK_OR_CONTINUE_WITHOUT_LOOP, {self.token(node.token)})")
+            return
+        for line in self.loops[-1].break_lines:
+            self.line(line)
+
+    def translate_ContinueStatementNode(self, node: ContinueStatementNode) -> None:
+        """Translates a ContinueStatementNode."""
+        if len(self.loops) == 0:
+            self.line(f"error(ErrorCode.BREAK_OR_CONTINUE_WITHOUT_LOOP, {self.token(node.token)})")
+            return
+        for line in self.loops[-1].continue_lines:
+            self.line(line)
+
+    def translate_ReturnStatementNode(self, node: ReturnStatementNode) -> None:
+        """Translates a ReturnStatementNode."""
+        value = self.expression(node.expression)
+
+        # A loop returns from the function that the interpreter is running, which checks the value.
+        if self.function is None:
+            self.line(f"raise ReturnException({self.box(value)}, {self.token(node.token)})")
+            return
+        if value.type == self.return_type:
+            self.line(f"return {value.code}")
+            return
+        code = f"check_return({self.constant(self.function)}, {self.box(value)}, {self.token(node.token)})"
+        self.line(f"return {code}.value" if self.return_type in RAW_TYPES else f"return {code}")
+
+    def result_type(self, function: Function) -> StaticType:
+        """Returns the type of the value returned by a function, if it always returns the same type."""
+        if isinstance(function.type, tuple):
+            return None
+        return RETURN_TYPES.get(function.type)
+
+    def direct_call(self, function: Function, arguments: List[Expression]) -> Optional[str]:
+        """
+        Returns the name of the compiled python function that a call can call directly, skipping the interpreter,
+        or None if there is none. The arguments must have the types that the compiled function takes.
+        """
+        if function is self.function:
+            name, parameter_types = self.function_name, self.argument_types
+        else:
+            region = self.interpreter.regions.get(function)
+            if region is None or region.argument_types is None:
+                return None
+            name, parameter_types = self.constant(region.function), region.argument_types
+        if len(arguments) != len(parameter_types) or \
+                any(parameter is None or argument.type != parameter
+                    for argument, parameter in zip(arguments, parameter_types)):
+            return None
+        return name
+
+    def translate_FunctionCallStatementNode(self, node: FunctionCallStatementNode) -> Expression:
+        """Translates a FunctionCallStatementNode."""
+        function = self.lookup_function(node)
+        arguments = [self.expression(argument) for argument in node.args]
+        result_type = self.result_type(function)
+        if type(function.block) is BlockStatementNode:
+            name = self.direct_call(function, arguments)
+            if name is not None:
+                return Expression(f"{name}({', '.join(argument.code for argument in arguments)})", result_type)
+
+        code = f"call({self.constant(function)}, {self.constant(node)}, " \
+               f"[{', '.join(self.box(argument) for argument in arguments)}])"
+        return Expression(f"{code}.value" if result_type in RAW_TYPES else code, result_type)
+
+    def translate_InlinedFunctionCallStatementNode(self, node: InlinedFunctionCallStatementNode) -> Expression:
+        """
+        Translates an InlinedFunctionCallStatementNode. When the arguments have the types of the parameters, they are
+        stored in new variables and the returned expression is translated in place.
+        """
+        function = self.lookup_function(node)
+        arguments = [self.expression(argument) for argument in node.args]
+        return_type = self.result_type(function)
+        parameter_types = [declared_type(argument.type, argument.num_dimensions) for argument in function.args]
+        if type(function.block) is not BlockStatementNode or return_type is None or \
+                len(arguments) != len(parameter_types) or \
+                len({argument.name for argument in function.args}) != len(function.args) or \
+                any(parameter not in SCALAR_TYPES or argument.type != parameter
+                    for argument, parameter in zip(arguments, parameter_types)):
+            code = f"call_inlined({self.constant(function)}, {self.constant(node)}, " \
+                   f"[{', '.join(self.box(argument) for argument in arguments)}])"
+            return Expression(f"{code}.value" if return_type in RAW_TYPES else code, return_type)
+
+        # The expression can only see the arguments and the global variables.
+        scope = {argument.name: Variable(self.new_name("_a"), parameter_type, argument.name)
+                 for argument, parameter_type in zip(function.args, parameter_types)}
+        scopes, only_globals = self.scopes, self.only_globals
+        self.scopes, self.only_globals = [scope], True
+        value = self.expression(node.expression)
+        self.scopes, self.only_globals = scopes, only_globals
+
+        if value.type != return_type:
+            code = f"check_return({self.constant(function)}, {self.box(value)}, {self.token(node.token)})"
+            value = Expression(f"{code}.value" if return_type in RAW_TYPES else code, return_type)
+        if len(arguments) == 0:
+            return value
+        assignments = "".join(f"({variable.name} := {argument.code}), "
+                              for variable, argument in zip(scope.values(), arguments))
+        return Expression(f"({assignments}{value.code})[-1]", return_type)
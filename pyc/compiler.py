@@ -0,0 +1,734 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `BytecodeCompiler` class, which compiles the functions of a program into the instructions described
+in `bytecode.py`. Each local variable is given a slot when its function is compiled, so the scope that holds a name is
+found once instead of every time the name is used.
+
+The compiler also follows the static type of every expression that it can know from the declarations of the program
+(ex. a variable declared as an int always holds an int). Where the types are known it uses the typed instructions,
+which skip the checks made by the tree-walking interpreter. Everywhere else it uses the generic instructions, which
+make the same checks, so both engines throw the same errors. Functions that use a feature without an instruction
+(ex. containers, structs or slices) are left to the tree-walking interpreter.
+"""
+
+from collections import namedtuple
+from typing import Optional, Tuple, Union
+
+from ast_nodes import ASTNode, ValueLiteralNode, InitializerListLiteralNode, VariableNode, SliceNode, \
+    UnaryOperatorNode, BinaryOperatorNode, CastOperatorNode, DeclarationStatementNode, AssignmentStatementNode, \
+    BlockStatementNode, IfElseStatementNode, SwitchStatementNode, ForLoopNode, WhileLoopNode, DoWhileLoopNode, \
+    LoopInvariantNode, HoistedLoopNode, VersionedLoopNode, BreakStatementNode, ContinueStatementNode, \
+    ReturnStatementNode, FunctionDeclarationStatementNode, FunctionCallStatementNode, \
+    InlinedFunctionCallStatementNode, NoOperationStatementNode, ProgramNode
+from bytecode import Opcode, OPERANDS, CodeObject, BytecodeProgram
+from closure import CONDITIONS, UNARY_OPERATORS, CASTS, ASSIGNMENT_OPERATORS, RETURN_TYPES, SCALAR_TYPES
+from error import ErrorCode
+from library import LIBRARY_FUNCTIONS
+from tokens import Token, TokenType
+from value import SPECIALIZED_BINARY_OPERATORS, identifier_to_object
+
+# The static type of an array: the type of its elements and its number of dimensions.
+ArrayType = namedtuple("ArrayType", ["element_type", "num_dimensions"])
+
+# The static type of an expression: the type of its value (ex. TokenType.INTL), an ArrayType, or None if the type is
+# not known when the function is compiled.
+StaticType = Optional[Union[TokenType, ArrayType]]
+
+# The types of values that are held raw, as python ints and floats.
+RAW_TYPES = (TokenType.INTL, TokenType.FLOATL)
+
+# The types of the variables that can be held in a slot, or passed to a compiled function.
+VARIABLE_TYPES = (TokenType.INT, TokenType.FLOAT, TokenType.STRING)
+
+# The default value of a variable declared without a value.
+DEFAULT_VALUES = {
+    TokenType.INTL: 0,
+    TokenType.FLOATL: 0.0,
+    TokenType.STRINGL: "",
+}
+
+
+class UnsupportedNode(Exception):
+    """Error thrown when a function uses a node that cannot be compiled. The function is run by the interpreter."""
+    pass
+
+
+def raw_name(static_type: StaticType) -> Optional[str]:
+    """Returns the name of a static type if its values are held raw, otherwise None."""
+    return static_type.name if static_type in RAW_TYPES else None
+
+
+def declared_type(token_type: TokenType, num_dimensions: Optional[int]) -> StaticType:
+    """Returns the static type of a variable or argument, or None if it cannot be held in a slot."""
+    if not isinstance(token_type, TokenType) or token_type not in VARIABLE_TYPES or num_dimensions is None:
+        return None
+    element_type = identifier_to_object(token_type)
+    return element_type if num_dimensions == 0 else ArrayType(element_type, num_dimensions)
+
+
+def binary_result(operator: Optional[TokenType], left: StaticType, right: StaticType) -> Optional[TokenType]:
+    """Returns the type of the result of a binary operator if it has a typed instruction for its operands."""
+    if operator == TokenType.PLUS and left == right == TokenType.STRINGL:
+        return TokenType.STRINGL
+    operation = SPECIALIZED_BINARY_OPERATORS.get((operator, left, right))
+    return None if operation is None else operation[0]
+
+
+class Loop(object):
+    """
+    The jumps that leave a loop or switch statement, which are patched once the place they jump to is compiled.
+
+    Attributes:
+        is_switch (bool): whether it is a switch statement, which can be left with break but not continue.
+        breaks (List[int]): the jumps compiled from break statements.
+        continues (List[int]): the jumps compiled from continue statements.
+    """
+
+    def __init__(self, is_switch: bool = False) -> None:
+        self.is_switch = is_switch
+        self.breaks = []
+        self.continues = []
+
+
+class BytecodeCompiler(object):
+    """
+    Compiler that converts the functions of an abstract syntax tree into bytecode.
+
+    Attributes:
+        functions (Dict[str, FunctionDeclarationStatementNode]): the functions declared by the program, by name.
+        global_types (Dict[str, StaticType]): the static type of each global variable.
+        code (Optional[CodeObject]): the function being compiled.
+        function_type (Optional[TokenType]): the declared type of the function being compiled.
+        scopes (List[Dict[str, Tuple[int, StaticType]]]): the slot and static type of each local variable, in each
+            scope that encloses the node being compiled.
+        loops (List[Loop]): the loops and switch statements that enclose the node being compiled.
+        invariants (Dict[LoopInvariantNode, Tuple[int, StaticType]]): the slot holding each hoisted expression.
+        token_indices (Dict[int, int]): maps the `id` of each token to its index in the tokens of the function.
+    """
+
+    def __init__(self, tree: ProgramNode) -> None:
+        """
+        Inits bytecode compiler class.
+        Args:
+            tree (ProgramNode): the abstract syntax tree, after the optimization passes ran on it.
+        """
+        self.functions = {}
+        self.global_types = {}
+        # A name that is declared twice is an error when the second declaration runs, so the first one is used.
+        for node in tree.functions:
+            if isinstance(node, FunctionDeclarationStatementNode):
+                self.functions.setdefault(node.variable.name, node)
+            elif isinstance(node, DeclarationStatementNode):
+                self.global_types.setdefault(node.variable.name,
+                                             declared_type(node.type, len(node.variable.indices)))
+        self.code = None
+        self.function_type = None
+        self.scopes = []
+        self.loops = []
+        self.invariants = {}
+        self.token_indices = {}
+
+    def compile(self, key: str) -> BytecodeProgram:
+        """
+        Compiles every function that can be compiled.
+        Args:
+            key (str): identifies the source code and optimization passes that the tree was built from.
+        Returns:
+            BytecodeProgram: the compiled program.
+        """
+        program = BytecodeProgram(key)
+        for name, node in self.functions.items():
+            try:
+                program.functions[name] = self.compile_function(node)
+            except UnsupportedNode as ex:
+                program.unsupported[name] = str(ex)
+        return program
+
+    def compile_function(self, node: FunctionDeclarationStatementNode) -> CodeObject:
+        """Compiles a function, throwing an UnsupportedNode error if it uses a node that cannot be compiled."""
+        self.code = CodeObject(node.variable.name)
+        self.function_type = node.type
+        self.scopes = [{}]
+        self.loops = []
+        self.invariants = {}
+        self.token_indices = {}
+
+        return_type = RETURN_TYPES.get(node.type)
+        if return_type is None or len(node.variable.indices) != 0:
+            raise UnsupportedNode(f"returns a {node.type.name.lower()}")
+
+        # The arguments are held in the first slots, in order.
+        for argument in node.args:
+            argument_type = declared_type(argument.type, argument.num_dimensions)
+            if argument_type is None:
+                raise UnsupportedNode(f"argument `{argument.name}` is a {argument.type.name.lower()}")
+            if argument.name in self.scopes[0]:
+                raise UnsupportedNode(f"argument `{argument.name}` is declared twice")
+            self.declare(argument.name, argument_type)
+            self.code.argument_types.append(raw_name(argument_type))
+        self.code.return_type = raw_name(return_type)
+
+        self.compile_statement(node.body, True)
+
+        # A void function returns when it reaches its end, but any other function must return a value.
+        if return_type == TokenType.VOIDL:
+            self.emit(Opcode.LOAD_CONST, None)
+            self.emit(Opcode.RETURN)
+        else:
+            self.emit(Opcode.RAISE, ErrorCode.MISMATCHED_TYPE.name, None)
+        return self.code
+
+    def emit(self, opcode: Opcode, *operands) -> int:
+        """Adds an instruction to the function, and returns its index."""
+        self.code.instructions.append((opcode, list(operands)))
+        return len(self.code.instructions) - 1
+
+    def here(self) -> int:
+        """Returns the index of the next instruction."""
+        return len(self.code.instructions)
+
+    def patch(self, index: int, target: Optional[int] = None) -> None:
+        """Sets the target of a jump, which defaults to the next instruction."""
+        opcode, operands = self.code.instructions[index]
+        operands[OPERANDS[opcode].index("target")] = self.here() if target is None else target
+
+    def token(self, token: Optional[Token]) -> Optional[int]:
+        """Returns the index of a token in the tokens of the function, adding it if it is not there yet."""
+        if token is None:
+            return None
+        if id(token) not in self.token_indices:
+            self.token_indices[id(token)] = len(self.code.tokens)
+            self.code.tokens.append(token)
+        return self.token_indices[id(token)]
+
+    def error(self, error_code: ErrorCode, token: Optional[Token]) -> None:
+        """Compiles an instruction that throws an error."""
+        self.emit(Opcode.RAISE, error_code.name, self.token(token))
+
+    def new_slot(self) -> int:
+        """Adds a slot to the frame of the function, and returns its number."""
+        self.code.num_slots += 1
+        return self.code.num_slots - 1
+
+    def declare(self, name: str, static_type: StaticType) -> int:
+        """Declares a local variable in the innermost scope, and returns its slot."""
+        slot = self.new_slot()
+        self.scopes[-1][name] = (slot, static_type)
+        return slot
+
+    def lookup(self, name: str) -> Optional[Tuple[int, StaticType]]:
+        """Returns the slot and static type of a local variable, or None if the name is not a local variable."""
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def compile_statement(self, node: ASTNode, in_block: bool = False) -> None:
+        """
+        Compiles a statement.
+        Args:
+            node (ASTNode): the statement.
+            in_block (bool): whether the statement is directly in a block, where it can declare a variable.
+        """
+        if isinstance(node, NoOperationStatementNode):
+            return
+        if isinstance(node, FunctionCallStatementNode):
+            self.compile_expression(node)
+            self.emit(Opcode.POP)
+            return
+
+        # A declaration that is not in a block (ex. the body of an if statement without braces) declares the variable
+        # in whichever scope is innermost when it runs, which is not always the same scope.
+        if isinstance(node, DeclarationStatementNode) and not in_block:
+            raise UnsupportedNode("declares a variable outside of a block")
+        compiler = getattr(self, "compile_" + type(node).__name__, None)
+        if compiler is None:
+            raise UnsupportedNode(f"uses a {type(node).__name__}")
+        compiler(node)
+
+    def compile_expression(self, node: ASTNode) -> StaticType:
+        """Compiles an expression, which pushes one value, and returns its static type."""
+        compiler = getattr(self, "compile_" + type(node).__name__, None)
+        if compiler is None:
+            raise UnsupportedNode(f"uses a {type(node).__name__}")
+        return compiler(node)
+
+    def compile_NoOperationStatementNode(self, node: NoOperationStatementNode) -> StaticType:
+        """Compiles a NoOperationStatementNode used as an expression, which evaluates to null."""
+        self.emit(Opcode.LOAD_CONST, None)
+        return TokenType.VOIDL
+
+    def compile_ValueLiteralNode(self, node: ValueLiteralNode) -> StaticType:
+        """Compiles a ValueLiteralNode."""
+        if node.type not in SCALAR_TYPES:
+            raise UnsupportedNode(f"uses a {node.type.name.lower()} literal")
+        self.emit(Opcode.LOAD_CONST, node.value)
+        return node.type
+
+    def compile_InitializerListLiteralNode(self, node: InitializerListLiteralNode) -> StaticType:
+        """Compiles an InitializerListLiteralNode."""
+        raw_types = [raw_name(self.compile_expression(element)) for element in node.value]
+        self.emit(Opcode.BUILD_LIST, raw_types)
+        return None
+
+    def compile_LoopInvariantNode(self, node: LoopInvariantNode) -> StaticType:
+        """Compiles a LoopInvariantNode, which reads the slot that the hoisted expression was stored in."""
+        if node not in self.invariants:
+            raise UnsupportedNode("uses a hoisted expression outside of its loop")
+        slot, static_type = self.invariants[node]
+        self.emit(Opcode.LOAD_SLOT, slot)
+        return static_type
+
+    def load_variable(self, name: str, token: Optional[Token], boxed: bool = False) -> StaticType:
+        """
+        Compiles the instructions that push the value of a variable.
+        Args:
+            name (str): the name of the variable.
+            token (Optional[Token]): the token used to report that the variable does not exist.
+            boxed (bool): whether the value must be pushed as a `Value` (ex. when it is indexed).
+        Returns:
+            StaticType: the static type of the variable.
+        """
+        local = self.lookup(name)
+        if local is not None:
+            slot, static_type = local
+            self.emit(Opcode.LOAD_SLOT, slot)
+            if boxed and static_type in RAW_TYPES:
+                self.emit(Opcode.BOX, static_type.name)
+            return static_type
+
+        static_type = self.global_types.get(name)
+        self.emit(Opcode.LOAD_GLOBAL, name, self.token(token), not boxed and static_type in RAW_TYPES)
+        return static_type
+
+    def compile_index(self, node: ASTNode, token: Optional[Token]) -> bool:
+        """
+        Compiles an array index or dimension, which must evaluate to an int or to null.
+        Returns:
+            bool: whether the index is known to be a raw int.
+        """
+        if isinstance(node, SliceNode):
+            raise UnsupportedNode("uses a slice")
+        index_type = self.compile_expression(node)
+        if index_type == TokenType.INTL:
+            return True
+        if index_type in (TokenType.FLOATL, TokenType.STRINGL) or isinstance(index_type, ArrayType):
+            self.error(ErrorCode.MISMATCHED_TYPE, token)
+        else:
+            self.emit(Opcode.INDEX, self.token(token))
+        return False
+
+    def compile_VariableNode(self, node: VariableNode) -> StaticType:
+        """Compiles a VariableNode."""
+        if len(node.indices) == 0:
+            return self.load_variable(node.name, node.token)
+
+        array_type = self.load_variable(node.name, node.token, True)
+        raw_indices = [self.compile_index(index, node.token) for index in node.indices]
+        num_indices = len(node.indices)
+        if not isinstance(array_type, ArrayType) or num_indices > array_type.num_dimensions:
+            self.emit(Opcode.LOAD_ELEMENT, num_indices, self.token(node.token))
+            return None
+
+        # Elements of one-dimensional int and float arrays are read directly from the buffer.
+        element_type = array_type.element_type
+        if array_type.num_dimensions == 1 and raw_indices[0] and element_type in RAW_TYPES:
+            self.emit(Opcode.LOAD_ELEMENT_RAW, self.token(node.token))
+            return element_type
+
+        self.emit(Opcode.LOAD_ELEMENT, num_indices, self.token(node.token))
+        if num_indices < array_type.num_dimensions:
+            return ArrayType(element_type, array_type.num_dimensions - num_indices)
+        if element_type in RAW_TYPES:
+            self.emit(Opcode.UNBOX)
+        return element_type
+
+    def compile_UnaryOperatorNode(self, node: UnaryOperatorNode) -> StaticType:
+        """Compiles a UnaryOperatorNode."""
+        operand_type = self.compile_expression(node.operand)
+        operation = UNARY_OPERATORS.get((node.operator, operand_type))
+        if operation is not None:
+            self.emit(Opcode.UNARY, node.operator.name, operand_type.name)
+            return operation[0]
+        self.emit(Opcode.UNARY_GENERIC, node.operator.name, self.token(node.token), raw_name(operand_type))
+        return None
+
+    def compile_BinaryOperatorNode(self, node: BinaryOperatorNode) -> StaticType:
+        """Compiles a BinaryOperatorNode."""
+        left_type = self.compile_expression(node.left_operand)
+        right_type = self.compile_expression(node.right_operand)
+        result_type = binary_result(node.operator, left_type, right_type)
+        if result_type is not None:
+            self.emit(Opcode.BINARY, node.operator.name, left_type.name, right_type.name)
+            return result_type
+        self.emit(Opcode.BINARY_GENERIC, node.operator.name, self.token(node.token), raw_name(left_type),
+                  raw_name(right_type))
+        return None
+
+    # The operand types of a SpecializedBinaryOperatorNode are checked when it is compiled, like any other operator.
+    compile_SpecializedBinaryOperatorNode = compile_BinaryOperatorNode
+
+    def compile_CastOperatorNode(self, node: CastOperatorNode) -> StaticType:
+        """Compiles a CastOperatorNode."""
+        operand_type = self.compile_expression(node.operand)
+        if node.operator in CASTS and operand_type in SCALAR_TYPES:
+            self.emit(Opcode.CAST, node.operator.name, operand_type.name)
+            return CASTS[node.operator][0]
+
+        self.emit(Opcode.CAST_GENERIC, node.operator.name, self.token(node.token), raw_name(operand_type))
+        if node.operator not in CASTS:
+            return None
+        result_type = CASTS[node.operator][0]
+        if result_type in RAW_TYPES:
+            self.emit(Opcode.UNBOX)
+        return result_type
+
+    def compile_condition(self, node: ASTNode, jump_if: bool) -> int:
+        """
+        Compiles a condition followed by a jump, whose target is patched later.
+        Args:
+            node (ASTNode): the condition.
+            jump_if (bool): whether the jump is taken when the condition is true, rather than false.
+        Returns:
+            int: the index of the jump.
+        """
+        if isinstance(node, BinaryOperatorNode) and node.operator in CONDITIONS:
+            left_type = self.compile_expression(node.left_operand)
+            right_type = self.compile_expression(node.right_operand)
+            if (node.operator, left_type, right_type) in SPECIALIZED_BINARY_OPERATORS:
+                opcode = Opcode.COMPARE_JUMP_IF_TRUE if jump_if else Opcode.COMPARE_JUMP_IF_FALSE
+                return self.emit(opcode, node.operator.name, left_type.name, right_type.name, None)
+            self.emit(Opcode.BINARY_GENERIC, node.operator.name, self.token(node.token), raw_name(left_type),
+                      raw_name(right_type))
+            self.emit(Opcode.UNBOX)
+        elif self.compile_expression(node) not in RAW_TYPES:
+            self.emit(Opcode.UNBOX)
+        return self.emit(Opcode.JUMP_IF_TRUE if jump_if else Opcode.JUMP_IF_FALSE, None)
+
+    def compile_DeclarationStatementNode(self, node: DeclarationStatementNode) -> None:
+        """Compiles a DeclarationStatementNode."""
+        if not isinstance(node.type, TokenType) or node.type not in VARIABLE_TYPES:
+            raise UnsupportedNode(f"declares a {node.type.name.lower()}")
+        name = node.variable.name
+        token = node.variable.token
+        element_type = identifier_to_object(node.type)
+        indices = node.variable.indices
+
+        # The value is evaluated before the variable is declared, so it cannot refer to the variable.
+        has_value = not isinstance(node.expression, NoOperationStatementNode)
+        value_type = self.compile_expression(node.expression) if has_value or len(indices) != 0 else None
+        if name in self.scopes[-1]:
+            self.error(ErrorCode.DUPLICATE_ID, token)
+            return
+
+        if len(indices) == 0:
+            if not has_value:
+                self.emit(Opcode.LOAD_CONST, DEFAULT_VALUES[element_type])
+            elif value_type != element_type:
+                self.emit(Opcode.CONVERT, element_type.name, self.token(token), raw_name(value_type))
+                if element_type in RAW_TYPES:
+                    self.emit(Opcode.UNBOX)
+            self.emit(Opcode.STORE_SLOT, self.declare(name, element_type))
+            return
+
+        for index in indices:
+            self.compile_index(index, token)
+        self.emit(Opcode.NEW_ARRAY, element_type.name, len(indices), self.token(token), raw_name(value_type))
+        self.emit(Opcode.STORE_SLOT, self.declare(name, ArrayType(element_type, len(indices))))
+
+    def compile_AssignmentStatementNode(self, node: AssignmentStatementNode) -> None:
+        """Compiles an AssignmentStatementNode."""
+        if not isinstance(node.variable, VariableNode):
+            raise UnsupportedNode("assigns to a field of a struct")
+        variable = node.variable
+        value_type = self.compile_expression(node.expression)
+        local = self.lookup(variable.name)
+        token = self.token(node.token)
+        variable_token = self.token(variable.token)
+
+        if len(variable.indices) == 0 and local is None:
+            self.emit(Opcode.ASSIGN_GLOBAL, variable.name, node.operator.name, variable_token, token,
+                      raw_name(value_type))
+        elif len(variable.indices) == 0:
+            self.assign_slot(node, local, value_type)
+        else:
+            self.assign_element(node, local, value_type)
+
+    def assign_slot(self, node: AssignmentStatementNode, local: Tuple[int, StaticType],
+                    value_type: StaticType) -> None:
+        """Compiles an assignment to a local variable that is not indexed."""
+        slot, variable_type = local
+        token = self.token(node.token)
+        variable_token = self.token(node.variable.token)
+
+        # Cannot assign a value to an array.
+        if isinstance(variable_type, ArrayType):
+            self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+        elif node.operator == TokenType.ASSIGN:
+            if value_type != variable_type:
+                self.emit(Opcode.CONVERT, variable_type.name, variable_token, raw_name(value_type))
+                if variable_type in RAW_TYPES:
+                    self.emit(Opcode.UNBOX)
+            self.emit(Opcode.STORE_SLOT, slot)
+        elif binary_result(ASSIGNMENT_OPERATORS.get(node.operator), variable_type, value_type) == variable_type:
+            self.emit(Opcode.UPDATE_SLOT, slot, node.operator.name, variable_type.name, value_type.name)
+        else:
+            self.emit(Opcode.UPDATE_SLOT_GENERIC, slot, node.operator.name, token, variable_token,
+                      variable_type.name, raw_name(value_type))
+
+    def assign_element(self, node: AssignmentStatementNode, local: Optional[Tuple[int, StaticType]],
+                       value_type: StaticType) -> None:
+        """Compiles an assignment to an element of an array."""
+        variable = node.variable
+        token = self.token(node.token)
+        variable_token = self.token(variable.token)
+
+        # The existence of a global array is checked at the assignment, before its indices are evaluated.
+        if local is None:
+            self.emit(Opcode.LOAD_GLOBAL, variable.name, token, False)
+            array_type = self.global_types.get(variable.name)
+        else:
+            array_type = self.load_variable(variable.name, variable.token, True)
+        raw_indices = [self.compile_index(index, node.token) for index in variable.indices]
+
+        # Elements of one-dimensional int and float arrays are written directly to the buffer.
+        element_type = array_type.element_type if isinstance(array_type, ArrayType) else None
+        if isinstance(array_type, ArrayType) and array_type.num_dimensions == len(raw_indices) == 1 and \
+                raw_indices[0] and element_type in RAW_TYPES:
+            if node.operator == TokenType.ASSIGN and value_type == element_type:
+                self.emit(Opcode.STORE_ELEMENT_RAW, token, variable_token)
+                return
+            if binary_result(ASSIGNMENT_OPERATORS.get(node.operator), element_type, value_type) == element_type:
+                self.emit(Opcode.UPDATE_ELEMENT_RAW, node.operator.name, element_type.name, value_type.name, token,
+                          variable_token)
+                return
+        self.emit(Opcode.STORE_ELEMENT, len(raw_indices), variable.name, node.operator.name, variable_token, token,
+                  raw_name(value_type))
+
+    def compile_BlockStatementNode(self, node: BlockStatementNode) -> None:
+        """Compiles a BlockStatementNode."""
+        self.scopes.append({})
+        for statement in node.statements:
+            self.compile_statement(statement, True)
+        self.scopes.pop()
+
+    def compile_IfElseStatementNode(self, node: IfElseStatementNode) -> None:
+        """Compiles an IfElseStatementNode."""
+        end_jumps = []
+        for i, (condition, block) in enumerate(node.conditional):
+            skip = self.compile_condition(condition, False)
+            self.compile_statement(block)
+            if i != len(node.conditional) - 1 or node.otherwise is not None:
+                end_jumps.append(self.emit(Opcode.JUMP, None))
+            self.patch(skip)
+        if node.otherwise is not None:
+            self.compile_statement(node.otherwise)
+        for jump in end_jumps:
+            self.patch(jump)
+
+    def compile_SwitchStatementNode(self, node: SwitchStatementNode) -> None:
+        """Compiles a SwitchStatementNode."""
+        if any(isinstance(statement, DeclarationStatementNode) for statement in node.statements):
+            raise UnsupportedNode("declares a variable outside of a block")
+        value_type = self.compile_expression(node.expression)
+
+        if node.jump_table is not None:
+            # The cases are filled in once the position of each statement is known.
+            table = self.emit(Opcode.SWITCH_TABLE, [], [label_type.name for label_type in node.label_types], None,
+                              self.token(node.token), raw_name(value_type))
+        else:
+            # Otherwise the value is compared with each case label in order.
+            slot = self.new_slot()
+            if value_type in RAW_TYPES:
+                self.emit(Opcode.BOX, value_type.name)
+            self.emit(Opcode.STORE_SLOT, slot)
+            case_jumps = []
+            for label, index in node.cases:
+                self.emit(Opcode.LOAD_SLOT, slot)
+                label_type = self.compile_expression(label)
+                case_jumps.append((self.emit(Opcode.CASE_JUMP, self.token(node.token), raw_name(label_type), None),
+                                   index))
+            default_jump = self.emit(Opcode.JUMP, None)
+
+        self.scopes.append({})
+        self.loops.append(Loop(True))
+        positions = []
+        for statement in node.statements:
+            positions.append(self.here())
+            self.compile_statement(statement)
+        positions.append(self.here())
+        default = positions[node.default] if node.default is not None else positions[-1]
+
+        if node.jump_table is not None:
+            operands = self.code.instructions[table][1]
+            operands[0] = [[label, positions[index]] for label, index in node.jump_table.items()]
+            operands[2] = default
+        else:
+            for jump, index in case_jumps:
+                self.patch(jump, positions[index])
+            self.patch(default_jump, default)
+        self.exit_loop()
+        self.scopes.pop()
+
+    def exit_loop(self) -> None:
+        """Leaves the innermost loop or switch statement, patching its break statements to jump to its end."""
+        for jump in self.loops.pop().breaks:
+            self.patch(jump)
+
+    def compile_ForLoopNode(self, node: ForLoopNode) -> None:
+        """Compiles a ForLoopNode. The condition is compiled after the body, so that each iteration takes one jump."""
+        self.scopes.append({})
+        self.compile_statement(node.initialization, True)
+        start = self.emit(Opcode.JUMP, None)
+        body = self.here()
+        self.loops.append(Loop())
+        self.compile_statement(node.block)
+        for jump in self.loops[-1].continues:
+            self.patch(jump)
+        self.compile_statement(node.increment)
+        self.patch(start)
+        self.patch(self.compile_condition(node.condition, True), body)
+        self.exit_loop()
+        self.scopes.pop()
+
+    def compile_WhileLoopNode(self, node: WhileLoopNode) -> None:
+        """Compiles a WhileLoopNode."""
+        start = self.emit(Opcode.JUMP, None)
+        body = self.here()
+        self.loops.append(Loop())
+        self.compile_statement(node.block)
+        for jump in self.loops[-1].continues:
+            self.patch(jump)
+        self.patch(start)
+        self.patch(self.compile_condition(node.condition, True), body)
+        self.exit_loop()
+
+    def compile_DoWhileLoopNode(self, node: DoWhileLoopNode) -> None:
+        """Compiles a DoWhileLoopNode."""
+        body = self.here()
+        self.loops.append(Loop())
+        self.compile_statement(node.block)
+        for jump in self.loops[-1].continues:
+            self.patch(jump)
+        self.patch(self.compile_condition(node.condition, True), body)
+        self.exit_loop()
+
+    def compile_HoistedLoopNode(self, node: HoistedLoopNode) -> None:
+        """Compiles a HoistedLoopNode, storing each hoisted expression in a slot before the loop runs."""
+        for invariant in node.invariants:
+            static_type = self.compile_expression(invariant.expression)
+            slot = self.new_slot()
+            self.emit(Opcode.STORE_SLOT, slot)
+            self.invariants[invariant] = (slot, static_type)
+        self.compile_statement(node.loop)
+
+    def compile_VersionedLoopNode(self, node: VersionedLoopNode) -> None:
+        """
+        Compiles a VersionedLoopNode. Only the checked version of the loop is compiled, since the typed array
+        instructions already skip most of the work that the unchecked version saves.
+        """
+        for bound in (node.start, node.limit):
+            self.compile_expression(bound)
+            self.emit(Opcode.POP)
+        self.compile_statement(node.checked_loop)
+
+    def compile_BreakStatementNode(self, node: BreakStatementNode) -> None:
+        """Compiles a BreakStatementNode."""
+        if len(self.loops) == 0:
+            self.error(ErrorCode.BREAK_OR_CONTINUE_WITHOUT_LOOP, node.token)
+        else:
+            self.loops[-1].breaks.append(self.emit(Opcode.JUMP, None))
+
+    def compile_ContinueStatementNode(self, node: ContinueStatementNode) -> None:
+        """Compiles a ContinueStatementNode, which continues the innermost loop even from inside a switch statement."""
+        loops = [loop for loop in self.loops if not loop.is_switch]
+        if len(loops) == 0:
+            self.error(ErrorCode.BREAK_OR_CONTINUE_WITHOUT_LOOP, node.token)
+        else:
+            loops[-1].continues.append(self.emit(Opcode.JUMP, None))
+
+    def compile_ReturnStatementNode(self, node: ReturnStatementNode) -> None:
+        """Compiles a ReturnStatementNode."""
+        value_type = self.compile_expression(node.expression)
+        return_type = RETURN_TYPES[self.function_type]
+        if value_type != return_type:
+            self.emit(Opcode.CHECK_RETURN, self.function_type.name, self.token(node.token), raw_name(value_type))
+            if return_type in RAW_TYPES:
+                self.emit(Opcode.UNBOX)
+        self.emit(Opcode.RETURN)
+
+    def compile_FunctionCallStatementNode(self, node: FunctionCallStatementNode) -> StaticType:
+        """Compiles a FunctionCallStatementNode."""
+        # A local variable with the name of the function hides it.
+        if self.lookup(node.name) is not None:
+            self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+            return None
+
+        self.emit(Opcode.LOAD_FUNCTION, node.name, self.token(node.token))
+        argument_types = [self.compile_expression(argument) for argument in node.args]
+
+        # The arguments do not need to be checked when they have the types of the arguments of a compiled function.
+        verified = False
+        function = self.functions.get(node.name)
+        if function is not None:
+            parameter_types = [declared_type(argument.type, argument.num_dimensions) for argument in function.args]
+            verified = len(argument_types) == len(parameter_types) and \
+                all(parameter is not None and argument == parameter
+                    for argument, parameter in zip(argument_types, parameter_types))
+            result_type = RETURN_TYPES.get(function.type)
+        elif node.name in LIBRARY_FUNCTIONS and not isinstance(LIBRARY_FUNCTIONS[node.name].type, tuple):
+            result_type = RETURN_TYPES.get(LIBRARY_FUNCTIONS[node.name].type)
+        else:
+            result_type = None
+
+        self.emit(Opcode.CALL, node.name, len(node.args), self.token(node.token),
+                  [raw_name(argument_type) for argument_type in argument_types], verified, raw_name(result_type))
+        return result_type
+
+    def compile_InlinedFunctionCallStatementNode(self, node: InlinedFunctionCallStatementNode) -> StaticType:
+        """
+        Compiles an InlinedFunctionCallStatementNode. The arguments are stored in new slots, and the returned
+        expression is compiled as if it were in the body of the function.
+        """
+        function = self.functions.get(node.name)
+        if function is None or self.lookup(node.name) is not None:
+            return self.compile_FunctionCallStatementNode(node)
+        return_type = RETURN_TYPES.get(function.type)
+        parameter_types = [declared_type(argument.type, argument.num_dimensions) for argument in function.args]
+        if return_type is None or None in parameter_types or \
+                len({argument.name for argument in function.args}) != len(function.args):
+            raise UnsupportedNode(f"inlines a call to `{node.name}`, which cannot be compiled")
+
+        # The function is looked up to check that it exists, as it would be if it were called.
+        self.emit(Opcode.LOAD_FUNCTION, node.name, self.token(node.token))
+        self.emit(Opcode.POP)
+        argument_types = [self.compile_expression(argument) for argument in node.args]
+        if len(argument_types) != len(parameter_types):
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+            return return_type
+
+        # The arguments are popped in reverse order, then checked in order.
+        slots = [self.new_slot() for _ in argument_types]
+        for slot in reversed(slots):
+            self.emit(Opcode.STORE_SLOT, slot)
+        for i, slot in enumerate(slots):
+            if argument_types[i] != parameter_types[i]:
+                self.emit(Opcode.LOAD_SLOT, slot)
+                self.emit(Opcode.BIND, node.name, i, self.token(node.token), raw_name(argument_types[i]))
+                if parameter_types[i] in RAW_TYPES:
+                    self.emit(Opcode.UNBOX)
+                self.emit(Opcode.STORE_SLOT, slot)
+
+        # The expression can only see the arguments and the global variables.
+        scopes = self.scopes
+        self.scopes = [{argument.name: (slot, parameter_type)
+                        for argument, slot, parameter_type in zip(function.args, slots, parameter_types)}]
+        value_type = self.compile_expression(node.expression)
+        self.scopes = scopes
+
+        if value_type != return_type:
+            self.emit(Opcode.CHECK_RETURN, function.type.name, self.token(node.token), raw_name(value_type))
+            if return_type in RAW_TYPES:
+                self.emit(Opcode.UNBOX)
+        return return_type
@@ -18,6 +18,14 @@ class ErrorCode(Enum):
     INVALID_MAIN = "Invalid main function"
     OUT_OF_BOUNDS = "Out of bounds"
     ARRAY_AS_FUNCTION_RETURN = "Array as function return"
+    DUPLICATE_CASE = "Duplicate case label"
+    OVERFLOW = "Integer overflow"
+    INVALID_INPUT = "Invalid input"
+    INVALID_FILE = "Invalid file"
+    INVALID_FORMAT = "Invalid format string"
+    KEY_NOT_FOUND = "Key not found"
+    EMPTY_CONTAINER = "Empty container"
+    NEGATIVE_WEIGHT = "Negative edge weight"
 
 
 class LexerError(Exception):
@@ -33,3 +41,15 @@ class ParserError(Exception):
 class InterpreterError(Exception):
     """Error that occurs in the interpreter."""
     pass
+
+
+class LibraryError(Exception):
+    """
+    Error that occurs in a library function. The interpreter reports it as an `InterpreterError` at the function call.
+
+    Attributes:
+        error_code (ErrorCode): the type of error.
+    """
+
+    def __init__(self, error_code: ErrorCode) -> None:
+        self.error_code = error_code
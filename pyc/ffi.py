@@ -0,0 +1,182 @@
+"""
+ICS3U
+Paul Chen
+This file holds the foreign function interface, which lets python functions be called from PYC programs in the same
+way as built-in functions. A function is registered with the PYC declaration of its signature, and is then called
+directly with python values instead of through a scope: ints, floats and strings are passed as python objects, and
+int and float arrays are passed as memoryviews of their buffers, so that writing to them writes to the PYC array.
+
+Functions are usually registered by plugins, which are modules found through the `pyc.plugins` entry point group, or
+imported with the `--plugin` command line option.
+"""
+
+import importlib
+import importlib.metadata
+import importlib.util
+import os
+from typing import Callable, Dict, List
+
+from ast_nodes import FunctionArgument
+from error import ErrorCode, LibraryError
+from lexer import Lexer
+from library import LIBRARY_FUNCTIONS
+from parser import Parser
+from tokens import TokenType
+from value import ArrayValue, Function, PagedBuffer, Value, build_value, contiguous_strides
+
+# The entry point group that plugins are registered under.
+PLUGIN_GROUP = "pyc.plugins"
+
+# The types of the arguments that can be passed to python. Arrays are passed as memoryviews, so they must hold ints or
+# floats.
+SCALAR_TYPES = (TokenType.INT, TokenType.FLOAT, TokenType.STRING)
+ARRAY_TYPES = (TokenType.INT, TokenType.FLOAT)
+
+# The type of the value built from what a function returns, for each return type.
+RETURN_TYPES = {
+    TokenType.VOID: TokenType.VOIDL,
+    TokenType.INT: TokenType.INTL,
+    TokenType.FLOAT: TokenType.FLOATL,
+    TokenType.STRING: TokenType.STRINGL,
+}
+
+
+class ForeignFunction(Function):
+    """
+    A function that is implemented in python. The interpreter calls it directly instead of running a block.
+
+    Attributes:
+        name (str): the name of the function in PYC programs.
+        function (Callable): the python function.
+    """
+
+    def __init__(self, name: str, token_type: TokenType, args: List[FunctionArgument], function: Callable) -> None:
+        super().__init__(token_type, args, None)
+        self.name = name
+        self.function = function
+
+
+# The registered functions, by name.
+FOREIGN_FUNCTIONS: Dict[str, ForeignFunction] = {}
+
+# The names of the plugins that were already loaded.
+loaded_plugins = set()
+
+
+def register(signature: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator that registers a python function so that PYC programs can call it, ex.
+
+        @ffi.register("float mean(float a[])")
+        def mean(a):
+            return sum(a) / len(a)
+
+    Args:
+        signature (str): the declaration of the function in PYC, without a body.
+    Returns:
+        Callable[[Callable], Callable]: the decorator, which returns the python function unchanged.
+    Raises:
+        ParserError: if the signature is invalid, takes arguments that cannot be passed to python, or has the name of
+            a function that already exists.
+    """
+    parser = Parser(Lexer(signature))
+    token_type, name, args = parser.parse_function_signature()
+    parser.eat_token(TokenType.EOF)
+    for arg in args:
+        if arg.type not in (ARRAY_TYPES if arg.num_dimensions != 0 else SCALAR_TYPES):
+            parser.error(ErrorCode.MISMATCHED_TYPE, name.token)
+    if name.name in LIBRARY_FUNCTIONS or name.name in FOREIGN_FUNCTIONS:
+        parser.error(ErrorCode.DUPLICATE_ID, name.token)
+
+    def decorator(function: Callable) -> Callable:
+        FOREIGN_FUNCTIONS[name.name] = ForeignFunction(name.name, token_type, args, function)
+        return function
+    return decorator
+
+
+def unregister(name: str) -> None:
+    """Removes a registered function."""
+    del FOREIGN_FUNCTIONS[name]
+
+
+def array_views(a: ArrayValue) -> List[memoryview]:
+    """
+    Makes a memoryview that shares the buffer of an int or float array, and has the same shape.
+    Returns:
+        List[memoryview]: the memoryviews made along the way, ending with the one that is passed to python.
+    Raises:
+        LibraryError: if the array is a slice with more than one dimension whose rows are not next to each other.
+    """
+    # Lazily allocated arrays are moved into contiguous memory first.
+    views = [a.buffer.flatten()[:] if isinstance(a.buffer, PagedBuffer) else memoryview(a.buffer)]
+    if len(a.shape) == 1:
+        views.append(views[-1][a.offset:a.offset + a.shape[0] * a.strides[0]:a.strides[0]] if a.shape[0] != 0
+                     else views[-1][0:0])
+    elif a.strides != contiguous_strides(a.shape):
+        views[-1].release()
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+    elif a.size == 0:
+        views.append(views[-1][0:0])
+    else:
+        views.append(views[-1][a.offset:a.offset + a.size])
+        views.append(views[-1].cast("B"))
+        views.append(views[-1].cast(views[0].format, a.shape))
+    return views
+
+
+def call(function: ForeignFunction, values: List[Value]) -> Value:
+    """
+    Calls a registered function with the python values of its arguments, and builds the value it returns.
+    Raises:
+        LibraryError: if an array cannot be passed, or the python function returns a value of the wrong type.
+    """
+    views = []
+    try:
+        args = []
+        for value in values:
+            if value.type == TokenType.ARRAYL:
+                array_view = array_views(value)
+                views.extend(array_view)
+                args.append(array_view[-1])
+            else:
+                args.append(value.value)
+        result = function.function(*args)
+    finally:
+        # The memoryviews are released when the function returns, so that the arrays can still be resized.
+        for view in reversed(views):
+            view.release()
+
+    # An int can be returned from a float function, as it would be in C.
+    if function.type == TokenType.FLOAT and isinstance(result, int) and not isinstance(result, bool):
+        result = float(result)
+    try:
+        return build_value(RETURN_TYPES[function.type], result)
+    except ValueError:
+        raise LibraryError(ErrorCode.MISMATCHED_TYPE)
+
+
+def load_plugin(name: str) -> None:
+    """Imports a plugin, given as the name of a module or as the path of a python file."""
+    if name in loaded_plugins:
+        return
+    if name.endswith(".py"):
+        module_name = os.path.splitext(os.path.basename(name))[0]
+        spec = importlib.util.spec_from_file_location(module_name, name)
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    else:
+        importlib.import_module(name)
+    loaded_plugins.add(name)
+
+
+def load_plugins() -> None:
+    """
+    Loads every plugin registered under the `pyc.plugins` entry point group. An entry point can name a module, whose
+    functions are registered when it is imported, or a function, which is called to register them.
+    """
+    for entry_point in importlib.metadata.entry_points(group=PLUGIN_GROUP):
+        if entry_point.value in loaded_plugins:
+            continue
+        plugin = entry_point.load()
+        loaded_plugins.add(entry_point.value)
+        if callable(plugin):
+            plugin()
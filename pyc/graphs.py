@@ -0,0 +1,123 @@
+"""
+ICS3U
+Paul Chen
+This file holds the graph algorithms that are used by the graph library functions. Graphs are stored in compressed
+sparse row (CSR) form: the edges leaving node `u` are at positions `offsets[u]` to `offsets[u + 1] - 1` of `targets`
+and `weights`. Each algorithm loops over slices of these arrays in python, instead of visiting PYC values.
+"""
+
+import array
+import collections
+import heapq
+import itertools
+from typing import List, Sequence, Tuple
+
+
+def build_csr(n: int, sources: Sequence[int], targets: Sequence[int],
+              weights: Sequence[int]) -> Tuple[array.array, array.array, array.array]:
+    """
+    Builds a graph in CSR form from a list of edges. The edges leaving a node keep the order they were given in.
+    Args:
+        n (int): the number of nodes.
+        sources (Sequence[int]): the node that each edge leaves, from 0 to n - 1.
+        targets (Sequence[int]): the node that each edge leads to, from 0 to n - 1.
+        weights (Sequence[int]): the weight of each edge.
+    Returns:
+        Tuple[array.array, array.array, array.array]: the offsets, targets and weights of the graph.
+    """
+    # Sorting is stable, so the edges are grouped by the node they leave without being reordered otherwise.
+    order = sorted(range(len(sources)), key=sources.__getitem__)
+    counts = collections.Counter(sources)
+    offsets = array.array("q", itertools.accumulate((counts[u] for u in range(n)), initial=0))
+    return (offsets, array.array("q", map(targets.__getitem__, order)),
+            array.array("q", map(weights.__getitem__, order)))
+
+
+def bfs(offsets: Sequence[int], targets: Sequence[int], start: int) -> Tuple[List[int], List[int]]:
+    """
+    Finds the smallest number of edges on a path from `start` to every node.
+    Returns:
+        Tuple[List[int], List[int]]: the number of edges to each node, and the node before it on the path. Both are
+            -1 for nodes that cannot be reached, and the node before `start` is -1.
+    """
+    n = len(offsets) - 1
+    dist = [-1] * n
+    parent = [-1] * n
+    dist[start] = 0
+
+    # Nodes are added to the end of the queue while it is being read, so it is read in order of distance.
+    queue = [start]
+    for u in queue:
+        d = dist[u] + 1
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            if dist[v] == -1:
+                dist[v] = d
+                parent[v] = u
+                queue.append(v)
+    return dist, parent
+
+
+def dijkstra(offsets: Sequence[int], targets: Sequence[int], weights: Sequence[int],
+             start: int) -> Tuple[List[int], List[int]]:
+    """
+    Finds the smallest total weight of a path from `start` to every node, using a binary heap. The weights must not
+    be negative.
+    Returns:
+        Tuple[List[int], List[int]]: the total weight of the path to each node, and the node before it on the path.
+            Both are -1 for nodes that cannot be reached, and the node before `start` is -1.
+    """
+    n = len(offsets) - 1
+    dist = [-1] * n
+    parent = [-1] * n
+
+    # The smallest weight found so far for each node. A node can be in the heap several times, and only its first
+    # time out of the heap is used.
+    best = [None] * n
+    best[start] = 0
+    heap = [(0, start)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if dist[u] != -1:
+            continue
+        dist[u] = d
+        for i in range(offsets[u], offsets[u + 1]):
+            v = targets[i]
+            candidate = d + weights[i]
+            if dist[v] == -1 and (best[v] is None or candidate < best[v]):
+                best[v] = candidate
+                parent[v] = u
+                heapq.heappush(heap, (candidate, v))
+    return dist, parent
+
+
+def components(offsets: Sequence[int], targets: Sequence[int]) -> Tuple[List[int], int]:
+    """
+    Finds the connected components of a graph, ignoring the direction of the edges, using a union-find.
+    Returns:
+        Tuple[List[int], int]: the component of each node, and the number of components. Components are numbered
+            from 0 in order of their smallest node.
+    """
+    n = len(offsets) - 1
+    root = list(range(n))
+
+    def find(u: int) -> int:
+        """Returns the root of the tree holding `u`, halving the path to it along the way."""
+        while root[u] != u:
+            root[u] = root[root[u]]
+            u = root[u]
+        return u
+
+    for u in range(n):
+        for v in targets[offsets[u]:offsets[u + 1]]:
+            a, b = find(u), find(v)
+            # The smaller root is kept, so the root of a tree is always its smallest node.
+            if a < b:
+                root[b] = a
+            elif b < a:
+                root[a] = b
+
+    labels = [0] * n
+    numbers = {}
+    for u in range(n):
+        labels[u] = numbers.setdefault(find(u), len(numbers))
+    return labels, len(numbers)
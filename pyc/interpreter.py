@@ -3,21 +3,28 @@ ICS3U
 Paul Chen
 This file holds the `Interpreter` class that runs an abstract syntax tree.
 """
-from typing import Optional, Callable, Union, List
+from typing import Optional, Callable, FrozenSet, List, Tuple
 
+import ffi
 from ast_nodes import NoOperationStatementNode, BuiltInFunctionCallStatementNode, ASTNode, FunctionCallStatementNode, \
     UnaryOperatorNode, BinaryOperatorNode, CastOperatorNode, ValueLiteralNode, InitializerListLiteralNode, \
     VariableNode, DeclarationStatementNode, AssignmentStatementNode, BlockStatementNode, IfElseStatementNode, \
     ForLoopNode, WhileLoopNode, DoWhileLoopNode, FunctionDeclarationStatementNode, BreakStatementNode, \
-    ContinueStatementNode, ReturnStatementNode, ProgramNode
+    ContinueStatementNode, ReturnStatementNode, ProgramNode, SwitchStatementNode, SpecializedBinaryOperatorNode, \
+    InlinedFunctionCallStatementNode, LoopInvariantNode, HoistedLoopNode, VersionedLoopNode, SliceNode, \
+    FunctionArgument, FieldAccessNode, StructDefinition
 from control_exceptions import BreakException, ContinueException, ReturnException
-from error import ErrorCode, InterpreterError
-from lexer import TokenType
+from error import ErrorCode, InterpreterError, LibraryError
+from lexer import Token, TokenType
 from library import LIBRARY_FUNCTIONS
 from linked_dict import LinkedDict
 from parser import Parser
+from passes import PassManager
+from profiler import Profile, number_nodes
+from streams import output
 from value import build_value, object_to_identifier, Function, identifier_to_object, Value, InitializerListValue, \
-    NullValue
+    NullValue, ArrayValue, VectorValue, MapValue, PriorityQueueValue, BitsetValue, StructValue, StructArrayValue, \
+    GraphValue, VALUE_CLASSES
 
 
 class Interpreter(object):
@@ -27,16 +34,19 @@ class Interpreter(object):
     Attributes:
         parser (Parser): the parser that converts tokens into an abstract syntax tree.
         stack (LinkedDict): data structure that holds all variables in all scopes.
+        pass_manager (Optional[PassManager]): runs the optimization passes on the abstract syntax tree.
     """
 
-    def __init__(self, parser: Parser) -> None:
+    def __init__(self, parser: Parser, pass_manager: Optional[PassManager] = None) -> None:
         """
         Inits interpreter class.
         Args:
             parser (Parser): the parser.
+            pass_manager (Optional[PassManager]): the pass manager, or None to run the tree as it was parsed.
         """
         self.parser = parser
         self.stack = LinkedDict()
+        self.pass_manager = pass_manager
 
     def interpret(self) -> int:
         """
@@ -48,19 +58,33 @@ class Interpreter(object):
         # Runs the parser.
         tree = self.parser.parse()
 
+        # Runs the optimization passes.
+        if self.pass_manager is not None:
+            tree = self.pass_manager.run(tree)
+
         # Adds all library functions.
         for name, func in LIBRARY_FUNCTIONS.items():
-            self.stack.insert(name, Function(func.type, func.args, BuiltInFunctionCallStatementNode(name)))
+            self.stack.insert(name, Function(func.type, func.args, BuiltInFunctionCallStatementNode(name),
+                                             func.variadic))
 
-        # Visits the root node in the abstract syntax tree.
-        self.visit(tree)
+        # Adds the functions registered through the foreign function interface, including those of plugins.
+        ffi.load_plugins()
+        for name, func in ffi.FOREIGN_FUNCTIONS.items():
+            self.stack.insert(name, func)
 
-        # Throws an error if the main function isn't of type int.
-        if self.stack.get("main").type != TokenType.INT:
-            self.error(ErrorCode.INVALID_MAIN, None)
-        else:  # Otherwise runs the main function with no arguments.
-            ret_val = self.visit(FunctionCallStatementNode("main", []))
-            return ret_val.value
+        try:
+            # Visits the root node in the abstract syntax tree.
+            self.visit(tree)
+
+            # Throws an error if the main function isn't of type int.
+            if self.stack.get("main").type != TokenType.INT:
+                self.error(ErrorCode.INVALID_MAIN, None)
+            else:  # Otherwise runs the main function with no arguments.
+                ret_val = self.visit(FunctionCallStatementNode("main", []))
+                return ret_val.value
+        finally:
+            # Writes out everything the program printed, even if it failed.
+            output.flush()
 
     def visit(self, node: ASTNode) -> Optional[Value]:
         """
@@ -96,6 +120,9 @@ class Interpreter(object):
         """
         ret_indices = []
         for i in range(len(indices)):
+            # Slices are only allowed when reading a variable.
+            if isinstance(indices[i], SliceNode):
+                return None
             index_object = self.visit(indices[i])
 
             # Index must be an IntValue or a NullValue.
@@ -106,6 +133,30 @@ class Interpreter(object):
             ret_indices.append(index_object.value)
         return ret_indices
 
+    def array_offset(self, array: Value, indices: List[Optional[int]], unchecked_dimensions: FrozenSet[int],
+                     token: Token) -> int:
+        """
+        Finds the position in the buffer of an array of the element, or sub-array, at the given indices.
+        Args:
+            array (Value): the indexed array.
+            indices (List[Optional[int]]): the subscript indices.
+            unchecked_dimensions (FrozenSet[int]): the dimensions whose bounds are known to be valid.
+            token (Token): the token used to report errors.
+        Returns:
+            int: the position in the buffer.
+        """
+        # If the object is not an array, or has fewer dimensions than indices, raise an error.
+        if array.type != TokenType.ARRAYL or len(indices) > len(array.shape):
+            self.error(ErrorCode.MISMATCHED_TYPE, token)
+
+        offset = array.offset
+        for i in range(len(indices)):
+            # If the index is out of bounds, raise an error.
+            if i not in unchecked_dimensions and (indices[i] is None or not 0 <= indices[i] < array.shape[i]):
+                self.error(ErrorCode.OUT_OF_BOUNDS, token)
+            offset += indices[i] * array.strides[i]
+        return offset
+
     def visit_VariableNode(self, node: VariableNode) -> Value:
         """Visits a VariableNode."""
 
@@ -117,29 +168,71 @@ class Interpreter(object):
         if len(node.indices) == 0:
             return self.stack.get(node.name)
 
-        # Determines the indices of the array to access.
-        indices = self.determine_array_subscript_indices(node.indices)
+        # Determines the indices of the array to access. A slice can only be the last index.
+        array_slice = node.indices[-1] if isinstance(node.indices[-1], SliceNode) else None
+        indices = self.determine_array_subscript_indices(node.indices[:-1] if array_slice else node.indices)
         if indices is None:
             self.error(ErrorCode.MISMATCHED_TYPE, node.token)
 
         # Obtains the variable from the stack.
         obj = self.stack.get(node.name)
+        if array_slice is not None:
+            offset = self.array_offset(obj, indices, node.unchecked_dimensions, node.token)
+            return self.slice_array(obj, offset, len(indices), array_slice)
+        return self.element_value(obj, indices, node)
+
+    def element_value(self, obj: Value, indices: List[Optional[int]], node: VariableNode) -> Value:
+        """Returns the element of an array at the given subscript indices, or a view of the sub-array."""
+        offset = self.array_offset(obj, indices, node.unchecked_dimensions, node.token)
+
+        # Returns the element if all the dimensions are indexed, otherwise a view of the sub-array.
+        if len(indices) == len(obj.shape):
+            return obj.element(offset)
+        return obj.view(offset, len(indices))
+
+    def visit_FieldAccessNode(self, node: FieldAccessNode) -> Value:
+        """Visits a FieldAccessNode."""
+        record = self.visit(node.record)
+        offset, field_type = self.field_layout(record, node)
+        return VALUE_CLASSES[field_type](field_type, record.value[offset])
+
+    def field_layout(self, record: Value, node: FieldAccessNode) -> Tuple[int, TokenType]:
+        """Returns the position and type of a field of a struct instance, throwing an error if it has no such field."""
+        layout = node.layouts.get(record.definition.name) if record.type == TokenType.STRUCTL else None
+        if layout is None:
+            self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+        return layout
 
-        for i in range(len(indices)):
-            # If the object is not an array, or the index is out of bounds, raise an error.
-            if obj.type != TokenType.ARRAYL:
+    def slice_array(self, array: ArrayValue, offset: int, num_indices: int, node: SliceNode) -> ArrayValue:
+        """Returns a view of the part of an array selected by a SliceNode, after indexing `num_indices` dimensions."""
+        # There must be a dimension left to slice.
+        if num_indices == len(array.shape):
+            self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+        length = array.shape[num_indices]
+
+        # Determines the bounds of the slice, which default to the start and end of the dimension.
+        bounds = []
+        for bound, default in ((node.lower, 0), (node.upper, length)):
+            if bound is None:
+                bounds.append(default)
+                continue
+            bound_object = self.visit(bound)
+            if bound_object.type != TokenType.INTL:
                 self.error(ErrorCode.MISMATCHED_TYPE, node.token)
-            if indices[i] not in range(0, len(obj.value)):
-                self.error(ErrorCode.OUT_OF_BOUNDS, node.token)
-
-            # Continue to the next dimension of the array.
-            obj = obj.value[indices[i]]
+            bounds.append(bound_object.value)
 
-        return obj
+        # The slice must fit in the dimension.
+        lower, upper = bounds
+        if not 0 <= lower <= upper <= length:
+            self.error(ErrorCode.OUT_OF_BOUNDS, node.token)
+        return array.slice(offset, num_indices, lower, upper)
 
     def visit_UnaryOperatorNode(self, node: UnaryOperatorNode) -> Value:
         """Visits a UnaryOperatorNode."""
-        expr = self.visit(node.operand)
+        return self.unary_operation(node, self.visit(node.operand))
+
+    def unary_operation(self, node: UnaryOperatorNode, expr: Value) -> Value:
+        """Applies the operator of a UnaryOperatorNode to its evaluated operand."""
         value = expr.unary_operator(node.operator)
 
         # Throws an error if the operation does not exist for a variable type. Ex. -"abc".
@@ -148,11 +241,8 @@ class Interpreter(object):
 
         return value()
 
-    def visit_BinaryOperatorNode(self, node: BinaryOperatorNode) -> Value:
-        """Visits a BinaryOperatorNode."""
-        left_child = self.visit(node.left_operand)
-        right_child = self.visit(node.right_operand)
-
+    def binary_operation(self, node: BinaryOperatorNode, left_child: Value, right_child: Value) -> Value:
+        """Applies the operator of a BinaryOperatorNode to its two evaluated operands."""
         value = left_child.binary_operator(node.operator, right_child)
         # Throws an error if the operation does not exist for the two variable types. Ex. 2 / "a".
         if value is None:
@@ -160,9 +250,30 @@ class Interpreter(object):
 
         return value()
 
+    def visit_BinaryOperatorNode(self, node: BinaryOperatorNode) -> Value:
+        """Visits a BinaryOperatorNode."""
+        left_child = self.visit(node.left_operand)
+        right_child = self.visit(node.right_operand)
+        return self.binary_operation(node, left_child, right_child)
+
+    def visit_SpecializedBinaryOperatorNode(self, node: SpecializedBinaryOperatorNode) -> Value:
+        """Visits a SpecializedBinaryOperatorNode."""
+        left_child = self.visit(node.left_operand)
+        right_child = self.visit(node.right_operand)
+
+        # Computes the result directly if the operands have the expected types.
+        if left_child.type == node.left_type and right_child.type == node.right_type:
+            return VALUE_CLASSES[node.result_type](node.result_type, node.function(left_child.value, right_child.value))
+
+        # Otherwise falls back to the general operation.
+        return self.binary_operation(node, left_child, right_child)
+
     def visit_CastOperatorNode(self, node: CastOperatorNode) -> Value:
         """Visits a CastOperatorNode."""
-        expr = self.visit(node.operand)
+        return self.cast_operation(node, self.visit(node.operand))
+
+    def cast_operation(self, node: CastOperatorNode, expr: Value) -> Value:
+        """Applies the cast of a CastOperatorNode to its evaluated operand."""
         value = expr.cast_operator(node.operator)
 
         # Throws an error if the operation does not exist for a variable type.
@@ -179,50 +290,185 @@ class Interpreter(object):
         if node.variable.name in self.stack.peek():
             self.error(ErrorCode.DUPLICATE_ID, node.variable.token)
 
-        if len(node.variable.indices) == 0:  # If the variable is not an array.
-            try:
-                self.stack.insert(node.variable.name, build_value(identifier_to_object(node.type), expression.value))
-            except ValueError:
+        if node.type == TokenType.MAP:  # If the variable is a map.
+            key_type, value_type = node.type_arguments
+
+            # A map can be initialized with a copy of another map of the same type.
+            if expression.type == TokenType.VOIDL:
+                entries = {}
+            elif expression.type == TokenType.MAPL and expression.has_types(key_type, value_type):
+                entries = dict(expression.value)
+            else:
+                self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+            self.stack.insert(node.variable.name,
+                              MapValue(identifier_to_object(key_type), identifier_to_object(value_type), entries))
+        elif node.type == TokenType.VECTOR:  # If the variable is a vector.
+            element_type = identifier_to_object(node.type_arguments[0])
+
+            # A vector can be initialized with an initializer list, or a copy of a one-dimensional array or vector.
+            if expression.type == TokenType.VOIDL:
+                vector = VectorValue.create(element_type)
+            else:
+                array = self.initializer_list_to_array(expression, element_type, [None], node.variable.token)
+                if array is None:
+                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+                vector = VectorValue(element_type, array.buffer, len(array))
+            self.stack.insert(node.variable.name, vector)
+        elif node.type == TokenType.PRIORITY_QUEUE:  # If the variable is a priority queue.
+            # A priority queue can be initialized with a copy of another priority queue.
+            if expression.type == TokenType.VOIDL:
+                heap = []
+            elif expression.type == TokenType.PRIORITY_QUEUEL:
+                heap = list(expression.value)
+            else:
+                self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+            self.stack.insert(node.variable.name, PriorityQueueValue(heap))
+        elif node.type == TokenType.GRAPH:  # If the variable is a graph.
+            # A graph starts with no nodes, or as a copy of another graph.
+            if expression.type == TokenType.VOIDL:
+                graph = GraphValue()
+            elif expression.type == TokenType.GRAPHL:
+                graph = GraphValue(expression.offsets, expression.value, expression.weights)
+            else:
+                self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+            self.stack.insert(node.variable.name, graph)
+        elif node.type == TokenType.BITSET:  # If the variable is a bitset.
+            # A bitset is declared with its number of bits (ex. bitset b[100];), or as a copy of another bitset.
+            if len(node.variable.indices) == 1 and expression.type == TokenType.VOIDL:
+                dimensions = self.determine_array_subscript_indices(node.variable.indices)
+                if dimensions is None or dimensions[0] is None:
+                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+                if dimensions[0] <= 0:
+                    self.error(ErrorCode.OUT_OF_BOUNDS, node.variable.token)
+                bitset = BitsetValue(dimensions[0])
+            elif len(node.variable.indices) == 0 and expression.type == TokenType.BITSETL:
+                bitset = BitsetValue(expression.size, bytearray(expression.value))
+            else:
                 self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+            self.stack.insert(node.variable.name, bitset)
+        elif node.type == TokenType.STRUCT and len(node.variable.indices) == 0:  # If the variable is a struct.
+            self.stack.insert(node.variable.name,
+                              self.new_struct(node.type_arguments[0], expression, node.variable.token))
+        elif node.type == TokenType.STRUCT:  # If the variable is an array of structs.
+            # Arrays of structs are declared without an initializer list, and hold new instances.
+            dimensions = self.determine_array_subscript_indices(node.variable.indices)
+            if dimensions is None or expression.type != TokenType.VOIDL:
+                self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+            if any(d is None or d <= 0 for d in dimensions):
+                self.error(ErrorCode.OUT_OF_BOUNDS, node.variable.token)
+            self.stack.insert(node.variable.name, StructArrayValue.create(node.type_arguments[0], tuple(dimensions)))
+        elif len(node.variable.indices) == 0:  # If the variable is not an array.
+            self.stack.insert(node.variable.name,
+                              self.converted_value(identifier_to_object(node.type), expression, node.variable.token))
         else:  # If the variable is an array.
 
             # Verifies that the dimensions are valid.
             dimensions = self.determine_array_subscript_indices(node.variable.indices)
             if dimensions is None:
                 self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
-            if any(d is not None and d <= 0 for d in dimensions):
-                self.error(ErrorCode.OUT_OF_BOUNDS, node.variable.token)
+            self.stack.insert(node.variable.name, self.new_array(identifier_to_object(node.type), dimensions,
+                                                                 expression, node.variable.token))
 
-            def create_multidim_array(index: int = 0) -> Union[List, Value]:
-                """Creates a multidimensional array"""
-                if index == len(dimensions):
-                    return build_value(identifier_to_object(node.type))
-                return build_value(TokenType.ARRAYL,
-                                   [create_multidim_array(index + 1) for _ in range(dimensions[index])])
-
-            def verify_initializer_list(curr_list: Union[List, Value], index: int = 0) -> bool:
-                """
-                Verifies that the number of dimensions in the initializer list matches the number given in the
-                declaration. Also verifies that all the arrays in the same dimension are the same size.
-                """
-                if index == len(dimensions):
-                    return curr_list.type == identifier_to_object(node.type)
-                if curr_list.type == TokenType.ARRAYL and dimensions[index] is None:
-                    dimensions[index] = len(curr_list.value)
-                return curr_list.type == TokenType.ARRAYL and len(curr_list.value) == dimensions[index] and \
-                    all(verify_initializer_list(curr_list.value[j], index + 1) for j in range(dimensions[index]))
-
-            # If no initializer list has been provided.
-            if expression.value is None:
-
-                self.stack.insert(node.variable.name, create_multidim_array())
-            # If an initializer list has been provided.
-            else:
+    def new_array(self, element_type: TokenType, dimensions: List[Optional[int]], expression: Value,
+                  token: Token) -> ArrayValue:
+        """
+        Creates a declared array, filled with the default value or copied from an initializer list.
+        Args:
+            element_type (TokenType): the type of the elements.
+            dimensions (List[Optional[int]]): the length of each dimension. Dimensions given as None are taken from
+                the initializer list.
+            expression (Value): the initializer list, or a NullValue if none was provided.
+            token (Token): the token used to report errors.
+        Returns:
+            ArrayValue: the new array.
+        """
+        if any(d is not None and d <= 0 for d in dimensions):
+            self.error(ErrorCode.OUT_OF_BOUNDS, token)
+
+        # If no initializer list has been provided, creates an array filled with the default value.
+        if expression.type == TokenType.VOIDL:
+            if any(d is None for d in dimensions):
+                self.error(ErrorCode.OUT_OF_BOUNDS, token)
+            return ArrayValue.create(element_type, tuple(dimensions))
+
+        # If an initializer list has been provided.
+        array = self.initializer_list_to_array(expression, element_type, dimensions, token)
+        if array is None:
+            self.error(ErrorCode.MISMATCHED_TYPE, token)
+        return array
+
+    def new_struct(self, definition: StructDefinition, expression: Value, token: Token) -> StructValue:
+        """
+        Creates a struct instance. It can be initialized with a copy of another instance of the same struct, or with an
+        initializer list holding the value of each field, in the order in which the fields were declared.
+        """
+        if expression.type == TokenType.VOIDL:
+            return StructValue(definition)
+        elif expression.type == TokenType.STRUCTL and expression.definition.name == definition.name:
+            return StructValue(definition, list(expression.value))
+        elif isinstance(expression, InitializerListValue) and len(expression.value) == len(definition.field_types):
+            return StructValue(definition, [self.converted_value(field_type, value, token).value
+                                            for field_type, value in zip(definition.field_types, expression.value)])
+        self.error(ErrorCode.MISMATCHED_TYPE, token)
+
+    def initializer_list_to_array(self, expression: Value, element_type: TokenType, dimensions: List[Optional[int]],
+                                  token: Token) -> Optional[ArrayValue]:
+        """
+        Copies an initializer list, or an existing array, into a new array.
+        Args:
+            expression (Value): the initializer list or array.
+            element_type (TokenType): the type of the elements of the new array.
+            dimensions (List[Optional[int]]): the length of each dimension. Dimensions given as None are taken from
+                the initializer list.
+            token (Token): the token used to report errors.
+        Returns:
+            Optional[ArrayValue]: the new array, or None if the initializer list does not match the dimensions and type.
+        """
+        dimensions = list(dimensions)
+        elements = []
+
+        def verify_initializer_list(curr_list: Value, index: int = 0) -> bool:
+            """
+            Verifies that the number of dimensions in the initializer list matches the number given in the
+            declaration. Also verifies that all the arrays in the same dimension are the same size, and collects
+            the elements in row-major order into `elements`.
+            """
+            if index == len(dimensions):
+                elements.append(curr_list.value)
+                return curr_list.type == element_type
+
+            # An existing array is copied, so the new array does not share its buffer.
+            if isinstance(curr_list, ArrayValue):
+                if dimensions[index] is None:
+                    dimensions[index] = curr_list.shape[0]
+                if curr_list.element_type != element_type or curr_list.shape != tuple(dimensions[index:]):
+                    return False
+                elements.extend(curr_list.elements())
+                return True
+
+            if curr_list.type == TokenType.ARRAYL and dimensions[index] is None:
+                dimensions[index] = len(curr_list.value)
+            return curr_list.type == TokenType.ARRAYL and len(curr_list.value) == dimensions[index] and \
+                all(verify_initializer_list(curr_list.value[j], index + 1) for j in range(dimensions[index]))
+
+        if not verify_initializer_list(expression):
+            return None
+        try:
+            return ArrayValue.create(element_type, tuple(dimensions), elements)
+        except OverflowError:
+            self.error(ErrorCode.OVERFLOW, token)
 
-                if verify_initializer_list(expression):
-                    self.stack.insert(node.variable.name, expression)
-                else:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+    def converted_value(self, token_type: TokenType, value: Value, token: Token) -> Value:
+        """
+        Returns the value held by a variable of type `token_type` after `value` is stored in it, throwing an error if
+        the types don't match. Strings are stored as they are, so that a string built by concatenation is not joined.
+        """
+        if token_type == TokenType.STRINGL and value.type == TokenType.STRINGL:
+            return value
+        try:
+            return build_value(token_type, value.value)
+        except ValueError:
+            self.error(ErrorCode.MISMATCHED_TYPE, token)
 
     def visit_AssignmentStatementNode(self, node: AssignmentStatementNode) -> None:
         """Visits an AssignmentStatementNode."""
@@ -233,89 +479,119 @@ class Interpreter(object):
         if name not in self.stack:
             self.error(ErrorCode.ID_NOT_FOUND, node.token)
 
-        if len(node.variable.indices) == 0:  # If the variable is not an array.
-            # Cannot assign a value to an array.
-            if self.stack.get(name).type == TokenType.ARRAYL:
-                self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
-
-            # Runs if node.operator is a simple assignment operator.
-            if node.operator == TokenType.ASSIGN:
-                # Set the variable to the new name.
-                try:
-                    self.stack.set(name, build_value(self.stack.get(name).type, val.value))
-                except ValueError:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
-
-            # Runs if node.operator is any other type of assignment operator. Ex. +=, -=...
-            else:
-                # Gets the variable and applies the operation.
-                value = self.stack.get(name).assignment_operator(node.operator, val)
-
-                # Throws an error if the operation is not defined.
-                if value is None:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.token)
-
-                # Sets the variable to the new name.
-                try:
-                    self.stack.set(name, build_value(self.stack.get(name).type, value().value))
-                except ValueError:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+        if isinstance(node.variable, FieldAccessNode):  # If the variable is a field of a struct.
+            self.assign_field(node, val)
+        elif len(node.variable.indices) == 0:  # If the variable is not an array.
+            self.assign_variable(node, val)
         else:  # If the variable is an array.
             # Verifies that the dimensions are valid.
             indices = self.determine_array_subscript_indices(node.variable.indices)
             if indices is None:
                 self.error(ErrorCode.MISMATCHED_TYPE, node.token)
-            if any(d is None for d in indices):
-                self.error(ErrorCode.OUT_OF_BOUNDS, node.token)
-
-            # Current value held in the program.
-            curr = self.stack.get(name)
-            for i in range(len(indices) - 1):
-                # If the object is not an array, or the index is out of bounds, raise an error.
-                if curr.type != TokenType.ARRAYL:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.token)
-                if indices[i] not in range(0, len(curr.value)):
-                    self.error(ErrorCode.OUT_OF_BOUNDS, node.token)
+            self.assign_element(node, self.stack.get(name), indices, val)
 
-                curr = curr.value[indices[i]]
+    def assign_variable(self, node: AssignmentStatementNode, val: Value) -> None:
+        """Assigns a value to a variable that is not indexed."""
+        name = node.variable.name
 
-            # `curr` should be a list that directly holds the element to be modified, as `curr` is an object reference.
+        # Cannot assign a value to an array, a map, a priority queue, a bitset or a graph.
+        if self.stack.get(name).type in (TokenType.ARRAYL, TokenType.MAPL, TokenType.PRIORITY_QUEUEL,
+                                         TokenType.BITSETL, TokenType.GRAPHL):
+            self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
 
-            # If `curr` is not an array of non-array objects, or the index is out of bounds, raise an error.
-            if curr.type != TokenType.ARRAYL or curr.value[indices[-1]].type == TokenType.ARRAYL:
-                self.error(ErrorCode.MISMATCHED_TYPE, node.token)
-            if indices[-1] not in range(0, len(curr.value)):
-                self.error(ErrorCode.OUT_OF_BOUNDS, node.token)
-
-            # Runs if node.operator is a simple assignment operator.
-            if node.operator == TokenType.ASSIGN:
-                # Set the variable to the new value.
-                try:
-                    curr.value[indices[-1]] = build_value(curr.value[indices[-1]].type, val.value)
-                except ValueError:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+        # Assigning to a struct copies the fields of another instance.
+        if self.stack.get(name).type == TokenType.STRUCTL:
+            self.copy_struct(self.stack.get(name), val, node)
 
-            # Runs if node.operator is any other type of assignment operator. Ex. +=, -=...
-            else:
-                # Gets the variable and applies the operation.
-                value = curr.value[indices[-1]].assignment_operator(node.operator, val)
+        # Runs if node.operator is a simple assignment operator.
+        elif node.operator == TokenType.ASSIGN:
+            # Set the variable to the new name.
+            self.stack.set(name, self.converted_value(self.stack.get(name).type, val, node.variable.token))
 
-                # Throws an error if the operation is not defined.
-                if value is None:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+        # Runs if node.operator is any other type of assignment operator. Ex. +=, -=...
+        else:
+            # Gets the variable, applies the operation and sets the variable to the new name.
+            value = self.assignment_operation(node, self.stack.get(name), val)
+            self.stack.set(name, self.converted_value(self.stack.get(name).type, value, node.variable.token))
 
-                # Sets the variable to the new name.
-                try:
-                    curr.value[indices[-1]] = build_value(curr.value[indices[-1]].type, value().value)
-                except ValueError:
-                    self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+    def assignment_operation(self, node: AssignmentStatementNode, current: Value, val: Value) -> Value:
+        """Applies an assignment operator other than `=` (ex. +=) to the current value of a variable or element."""
+        value = current.assignment_operator(node.operator, val)
+
+        # Throws an error if the operation is not defined.
+        if value is None:
+            self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+
+        return value()
+
+    def assign_element(self, node: AssignmentStatementNode, curr: Value, indices: List[Optional[int]],
+                       val: Value) -> None:
+        """Assigns a value to the element of an array, `curr`, at the given subscript indices."""
+        if any(d is None for d in indices):
+            self.error(ErrorCode.OUT_OF_BOUNDS, node.token)
+
+        # Finds the position of the element to be modified in the buffer of the array.
+        offset = self.array_offset(curr, indices, node.variable.unchecked_dimensions, node.token)
+
+        # Only single elements can be assigned to, not sub-arrays.
+        if len(indices) != len(curr.shape):
+            self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+
+        if curr.element_type == TokenType.STRUCTL:
+            self.copy_struct(curr.element(offset), val, node)
+            return
+
+        # Runs if node.operator is a simple assignment operator.
+        if node.operator == TokenType.ASSIGN:
+            value = val.value
+
+        # Runs if node.operator is any other type of assignment operator. Ex. +=, -=...
+        else:
+            # Gets the element and applies the operation.
+            value = self.assignment_operation(node, curr.element(offset), val).value
+
+        # Sets the element to the new value. Buffers that are memoryviews raise a ValueError, rather than an
+        # OverflowError, for ints that do not fit in 64 bits.
+        try:
+            value = build_value(curr.element_type, value).value
+        except ValueError:
+            self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+        try:
+            curr.buffer[offset] = value
+        except (OverflowError, ValueError):
+            self.error(ErrorCode.OVERFLOW, node.variable.token)
+
+    def assign_field(self, node: AssignmentStatementNode, val: Value) -> None:
+        """Assigns a value to a field of a struct instance, with the same type checks as a variable of its type."""
+        record = self.visit(node.variable.record)
+        offset, field_type = self.field_layout(record, node.variable)
+
+        # Runs if node.operator is any other type of assignment operator. Ex. +=, -=...
+        if node.operator != TokenType.ASSIGN:
+            operation = VALUE_CLASSES[field_type](field_type, record.value[offset]).assignment_operator(node.operator,
+                                                                                                        val)
+            if operation is None:
+                self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+            val = operation()
+        record.value[offset] = self.converted_value(field_type, val, node.variable.token).value
+
+    def copy_struct(self, target: StructValue, val: Value, node: AssignmentStatementNode) -> None:
+        """Copies the fields of a struct instance into another instance of the same struct."""
+        if node.operator != TokenType.ASSIGN or val.type != TokenType.STRUCTL or \
+                val.definition.name != target.definition.name:
+            self.error(ErrorCode.MISMATCHED_TYPE, node.variable.token)
+        target.value[:] = val.value
 
     def visit_BlockStatementNode(self, node: BlockStatementNode) -> None:
         """Visits a BlockStatementNode."""
         self.stack.push()
-        for statement in node.statements:
-            self.visit(statement)
-        self.stack.pop()
+        # The scope is removed even if a break, continue or return statement leaves the block early, so that loops
+        # don't leave a scope behind on every iteration that ends with one.
+        try:
+            for statement in node.statements:
+                self.visit(statement)
+        finally:
+            self.stack.pop()
 
     def visit_IfElseStatementNode(self, node: IfElseStatementNode) -> None:
         """Visits an IfElseStatementNode."""
@@ -330,6 +606,43 @@ class Interpreter(object):
         if node.otherwise is not None:
             self.visit(node.otherwise)
 
+    def visit_SwitchStatementNode(self, node: SwitchStatementNode) -> None:
+        """Visits a SwitchStatementNode."""
+        value = self.visit(node.expression)
+
+        # Finds the index of the first statement to run, defaulting to the default case.
+        start = node.default
+        if node.jump_table is not None:
+            # Looks up the value in the jump table if all the case labels are constants.
+            if len(node.jump_table) != 0 and value.type not in node.label_types:
+                self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+            start = node.jump_table.get(value.value, node.default)
+        else:
+            # Otherwise compares the value with each case label in order.
+            for label, index in node.cases:
+                equal = value.binary_operator(TokenType.EQUAL, self.visit(label))
+                if equal is None:
+                    self.error(ErrorCode.MISMATCHED_TYPE, node.token)
+                if equal().value:
+                    start = index
+                    break
+
+        # Runs nothing if no case matches and there is no default case.
+        if start is None:
+            return
+
+        # Runs every statement from the matching case onwards (falling through the following cases) until a
+        # break statement is reached.
+        top = self.stack.top
+        self.stack.push()
+        try:
+            for i in range(start, len(node.statements)):
+                self.visit(node.statements[i])
+        except BreakException:
+            pass
+        finally:
+            self.stack.top = top
+
     def visit_ForLoopNode(self, node: ForLoopNode) -> None:
         """Visits a ForLoopNode."""
         self.stack.push()
@@ -383,6 +696,48 @@ class Interpreter(object):
             except ContinueException:  # Continues the loop.
                 pass
 
+    def visit_LoopInvariantNode(self, node: LoopInvariantNode) -> Value:
+        """Visits a LoopInvariantNode."""
+        return node.value
+
+    def visit_HoistedLoopNode(self, node: HoistedLoopNode) -> None:
+        """Visits a HoistedLoopNode."""
+        # Stores the values from any enclosing run of the same loop (ex. in a recursive function).
+        saved = [invariant.value for invariant in node.invariants]
+
+        # Evaluates the hoisted expressions once, then runs the loop.
+        for invariant in node.invariants:
+            invariant.value = self.visit(invariant.expression)
+        try:
+            self.visit(node.loop)
+        finally:
+            for invariant, value in zip(node.invariants, saved):
+                invariant.value = value
+
+    def visit_VersionedLoopNode(self, node: VersionedLoopNode) -> None:
+        """Visits a VersionedLoopNode."""
+        start = self.visit(node.start)
+        limit = self.visit(node.limit)
+
+        # Runs the loop with all bounds checks unless the loop counter is known to stay in bounds.
+        in_bounds = start.type == TokenType.INTL and limit.type == TokenType.INTL and start.value >= 0
+        if in_bounds:
+            last = limit.value if node.inclusive else limit.value - 1
+            for name, dimension in node.arrays:
+                if name not in self.stack:
+                    in_bounds = False
+                    break
+
+                # Finds the length of the dimension indexed by the loop counter. Vectors can shrink while the loop
+                # runs, so their accesses are always checked.
+                obj = self.stack.get(name)
+                if obj.type != TokenType.ARRAYL or isinstance(obj, VectorValue) or dimension >= len(obj.shape) or \
+                        last >= obj.shape[dimension]:
+                    in_bounds = False
+                    break
+
+        self.visit(node.unchecked_loop if in_bounds else node.checked_loop)
+
     def visit_BreakStatementNode(self, node: BreakStatementNode):
         """Visits a BreakStatementNode."""
         raise BreakException(node.token)
@@ -409,8 +764,8 @@ class Interpreter(object):
         # Otherwise add the function to the scope.
         self.stack.insert(node.variable.name, Function(node.type, node.args, node.body))
 
-    def visit_FunctionCallStatementNode(self, node: FunctionCallStatementNode) -> Optional[Value]:
-        """Visits a FunctionCallStatementNode node."""
+    def get_function(self, node: FunctionCallStatementNode) -> Function:
+        """Gets the function that is called by a FunctionCallStatementNode."""
 
         # Throws an error if the function has not been defined.
         if node.name not in self.stack:
@@ -423,39 +778,115 @@ class Interpreter(object):
         if not isinstance(function, Function):
             self.error(ErrorCode.MISMATCHED_TYPE, node.token)
 
+        return function
+
+    def bind_argument(self, argument: FunctionArgument, value: Value, node: FunctionCallStatementNode) -> Value:
+        """Verifies that a value can be passed as a function argument, and returns the value that is passed."""
+
+        # If the argument is an array, verify that the number of array dimensions is valid,
+        # and that the type is valid.
+        if isinstance(value, InitializerListValue):
+            # An initializer list is copied into a new array of the first type accepted by the argument.
+            arg_types = argument.type if isinstance(argument.type, tuple) else (argument.type,)
+            # Arguments that accept any number of dimensions take one-dimensional initializer lists.
+            num_dimensions = 1 if argument.num_dimensions is None else argument.num_dimensions
+            for arg_type in arg_types:
+                if arg_type in (TokenType.MAP, TokenType.VECTOR, TokenType.PRIORITY_QUEUE, TokenType.BITSET,
+                                TokenType.GRAPH, TokenType.STRUCT):
+                    continue
+                array = self.initializer_list_to_array(value, identifier_to_object(arg_type),
+                                                       [None] * num_dimensions, node.token)
+                if array is not None:
+                    return array
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+
+        # A vector can be passed as a vector, or as a one-dimensional array.
+        elif isinstance(value, VectorValue) and argument.accepts(TokenType.VECTOR):
+            if argument.type_arguments is not None and \
+                    argument.type_arguments[0] != object_to_identifier(value.element_type):
+                self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+        elif value.type == TokenType.ARRAYL:
+            if argument.num_dimensions not in (None, len(value.shape)) or \
+                    not argument.accepts(object_to_identifier(value.element_type)) or \
+                    (value.element_type == TokenType.STRUCTL and
+                     argument.type_arguments[0].name != value.definition.name):
+                self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+
+        # If the argument is a struct, verify that the instance belongs to the same struct.
+        elif value.type == TokenType.STRUCTL:
+            if argument.num_dimensions != 0 or not argument.accepts(TokenType.STRUCT) or \
+                    argument.type_arguments[0].name != value.definition.name:
+                self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+
+        # If the argument is a map, verify that the key and value types are valid.
+        elif value.type == TokenType.MAPL:
+            if not argument.accepts(TokenType.MAP) or \
+                    (argument.type_arguments is not None and not value.has_types(*argument.type_arguments)):
+                self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+
+        # Otherwise, verify that the argument is not an array, and that the type is valid.
+        elif argument.num_dimensions != 0 or not argument.accepts(object_to_identifier(value.type)):
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+
+        return value
+
+    def bind_arguments(self, function: Function, node: FunctionCallStatementNode, ret: List[Value]) -> None:
+        """Verifies the arguments passed to a function, and adds them to the current scope."""
+
+        # Throws an error if the arguments don't line up, otherwise, add them to the current scope.
+        if len(function.args) != len(node.args) and (function.variadic is None or len(node.args) < len(function.args)):
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+        for i in range(len(function.args)):
+            self.stack.insert(function.args[i].name, self.bind_argument(function.args[i], ret[i], node))
+
+        # The extra arguments of a variadic function are passed together in a list.
+        if function.variadic is not None:
+            extra_args = ret[len(function.args):]
+            self.stack.insert(function.variadic.name,
+                              [self.bind_argument(function.variadic, value, node) for value in extra_args])
+
+    def check_return_value(self, function: Function, ret_val: Value, ret_token: Optional[Token]) -> Value:
+        """Verifies that the value returned by a function matches the type of the function."""
+
+        # If the function type and the return type line up, return the return name. Library functions can return
+        # several types, given as a tuple.
+        types = function.type if isinstance(function.type, tuple) else (function.type,)
+        if (ret_val.type == TokenType.VOIDL and TokenType.VOID in types) or \
+                (ret_val.type != TokenType.VOIDL and object_to_identifier(ret_val.type) in types):
+            return ret_val
+        # Otherwise throw an error.
+        else:
+            self.error(ErrorCode.MISMATCHED_TYPE, ret_token)
+
+    def visit_FunctionCallStatementNode(self, node: FunctionCallStatementNode) -> Optional[Value]:
+        """Visits a FunctionCallStatementNode node."""
+
+        # Gets the function object.
+        function = self.get_function(node)
+
         # Determines the name for each function argument.
         ret = [self.visit(e) for e in node.args]
+        return self.call_function(function, node, ret)
+
+    def call_function(self, function: Function, node: FunctionCallStatementNode, ret: List[Value]) -> Value:
+        """Calls a function with the values of its arguments, once they have been evaluated."""
+
+        # Python functions are called directly, without creating a scope.
+        if isinstance(function, ffi.ForeignFunction):
+            return self.call_foreign_function(function, node, ret)
 
         # Temporarily stores the current scope.
         top = self.stack.top
 
         """
-        Creates a new scope from the bottom. Consequently, the code in the 
+        Creates a new scope from the bottom. Consequently, the code in the
         function will not have access to variables defined elsewhere.
         """
         self.stack.top = self.stack.bottom
         self.stack.push()
 
-        # Throws an error if the arguments don't line up, otherwise, add them to the current scope.
-        if len(function.args) != len(node.args):
-            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
-        for i in range(len(function.args)):
-            # If the argument is an array, verify that the number of array dimensions is valid,
-            # and that the type is valid.
-            if ret[i].type == TokenType.ARRAYL:
-                curr = ret[i]
-                for j in range(function.args[i].num_dimensions):
-                    if curr.type != TokenType.ARRAYL:
-                        self.error(ErrorCode.MISMATCHED_ARGS, node.token)
-                    curr = curr.value[j]
-                if object_to_identifier(curr.type) != function.args[i].type:
-                    self.error(ErrorCode.MISMATCHED_ARGS, node.token)
-
-            # Otherwise, only verify that the type is valid.
-            elif object_to_identifier(ret[i].type) != function.args[i].type:
-                self.error(ErrorCode.MISMATCHED_ARGS, node.token)
-
-            self.stack.insert(function.args[i].name, ret[i])
+        # Adds the arguments to the new scope.
+        self.bind_arguments(function, node, ret)
 
         # Declares return name of function, defaults to None.
         ret_val = build_value(TokenType.VOIDL)
@@ -471,18 +902,46 @@ class Interpreter(object):
         except ReturnException as ex:
             ret_val = ex.value
             ret_token = ex.token
+        # If a library function failed, throw the error at the function call.
+        except LibraryError as ex:
+            self.error(ex.error_code, node.token)
 
         # Resets the scope back to its state prior to running the function.
         self.stack.pop()
         self.stack.top = top
 
-        # If the function type and the return type line up, return the return name.
-        if (ret_val.type == TokenType.VOIDL and function.type == TokenType.VOID) or \
-                (ret_val.type != TokenType.VOIDL and object_to_identifier(ret_val.type) == function.type):
-            return ret_val
-        # Otherwise throw an error.
-        else:
-            self.error(ErrorCode.MISMATCHED_TYPE, ret_token)
+        return self.check_return_value(function, ret_val, ret_token)
+
+    def call_foreign_function(self, function: ffi.ForeignFunction, node: FunctionCallStatementNode,
+                              ret: List[Value]) -> Value:
+        """Calls a function registered through the foreign function interface."""
+        if len(function.args) != len(ret):
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+        values = [self.bind_argument(argument, value, node) for argument, value in zip(function.args, ret)]
+        try:
+            return ffi.call(function, values)
+        except LibraryError as ex:
+            self.error(ex.error_code, node.token)
+
+    def visit_InlinedFunctionCallStatementNode(self, node: InlinedFunctionCallStatementNode) -> Value:
+        """Visits an InlinedFunctionCallStatementNode."""
+        function = self.get_function(node)
+        ret = [self.visit(e) for e in node.args]
+        return self.call_inlined_function(function, node, ret)
+
+    def call_inlined_function(self, function: Function, node: InlinedFunctionCallStatementNode,
+                              ret: List[Value]) -> Value:
+        """Evaluates the expression of an inlined function call, once the values of its arguments are evaluated."""
+        # Evaluates the returned expression in the same scope that the function body would have run in.
+        top = self.stack.top
+        self.stack.top = self.stack.bottom
+        self.stack.push()
+        self.bind_arguments(function, node, ret)
+        ret_val = self.visit(node.expression)
+        self.stack.pop()
+        self.stack.top = top
+
+        return self.check_return_value(function, ret_val, node.token)
 
     def visit_BuiltInFunctionCallStatementNode(self, node: BuiltInFunctionCallStatementNode) -> None:
         """Visits a BuiltInFunctionCallStatementNode."""
@@ -500,3 +959,67 @@ class Interpreter(object):
     def error(self, error_code, token):
         """Throws an error and states the current character, line, and column on which the error happened"""
         raise InterpreterError(f"{error_code.value} -> {token}")
+
+
+class ProfilingInterpreter(Interpreter):
+    """
+    Interpreter that records a profile of the program while running it. The profile holds the number of times each
+    node was visited, the operand types seen by each binary operator, the blocks taken by each if-else statement,
+    and the number of calls to each function.
+
+    Attributes:
+        recording (Profile): the profile that is being recorded.
+        node_ids (Dict[int, int]): maps the `id` of each node in the tree to its number in the profile.
+    """
+
+    def __init__(self, parser: Parser) -> None:
+        """
+        Inits profiling interpreter class.
+        Args:
+            parser (Parser): the parser.
+        """
+        super().__init__(parser)
+        self.recording = Profile(Profile.hash_source(parser.lexer.text))
+        self.node_ids = {}
+
+    def visit(self, node: ASTNode) -> Optional[Value]:
+        """Counts the visit to a node, then visits it."""
+        index = self.node_ids.get(id(node))
+        if index is not None:
+            self.recording.node_counts[index] += 1
+        return super().visit(node)
+
+    def binary_operation(self, node: BinaryOperatorNode, left_child: Value, right_child: Value) -> Value:
+        """Records the types of the operands, then applies the operator."""
+        index = self.node_ids.get(id(node))
+        if index is not None:
+            self.recording.operand_types[index][f"{left_child.type.name} {right_child.type.name}"] += 1
+        return super().binary_operation(node, left_child, right_child)
+
+    def visit_IfElseStatementNode(self, node: IfElseStatementNode) -> None:
+        """Visits an IfElseStatementNode and records which block was run."""
+        index = self.node_ids.get(id(node))
+        if index is not None and index not in self.recording.branches:
+            self.recording.branches[index] = [0] * (len(node.conditional) + 1)
+
+        for i, e in enumerate(node.conditional):
+            if self.visit(e[0]).value:
+                if index is not None:
+                    self.recording.branches[index][i] += 1
+                self.visit(e[1])
+                return
+
+        if index is not None:
+            self.recording.branches[index][-1] += 1
+        if node.otherwise is not None:
+            self.visit(node.otherwise)
+
+    def visit_FunctionCallStatementNode(self, node: FunctionCallStatementNode) -> Optional[Value]:
+        """Counts the call to a function, then visits it."""
+        self.recording.function_calls[node.name] += 1
+        return super().visit_FunctionCallStatementNode(node)
+
+    def visit_ProgramNode(self, node: ProgramNode) -> None:
+        """Numbers the nodes in the tree, then visits the ProgramNode."""
+        self.node_ids = number_nodes(node)
+        super().visit_ProgramNode(node)
@@ -0,0 +1,172 @@
+"""
+ICS3U
+Paul Chen
+This file holds the kernels behind the array math library functions. Each kernel works on whole int or float arrays.
+When NumPy is installed, the kernels run on NumPy arrays that share the buffers of the PYC arrays, otherwise they run
+in plain Python.
+"""
+
+import array
+import operator
+from itertools import accumulate
+from typing import Any, Callable, List, Optional, Union
+
+from tokens import TokenType
+from value import ArrayValue
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# The ints in arrays are 64-bit. NumPy wraps around when an int overflows, so it is only used on int arrays when the
+# result is known to be smaller than this, and plain Python, which reports the overflow, is used otherwise.
+INT_LIMIT = 1 << 63
+
+NUMPY_TYPES = {
+    TokenType.INTL: "int64",
+    TokenType.FLOATL: "float64",
+}
+
+
+def to_numpy(a: ArrayValue) -> Optional["numpy.ndarray"]:
+    """Returns a NumPy array that shares the buffer of an array, or None if NumPy cannot be used on the array."""
+    # Lazily allocated arrays are not stored in a single buffer, so they are left to plain Python.
+    if numpy is None or not isinstance(a.buffer, (array.array, memoryview)):
+        return None
+    itemsize = a.buffer.itemsize
+    return numpy.ndarray(a.shape, NUMPY_TYPES[a.element_type], a.buffer, a.offset * itemsize,
+                         tuple(stride * itemsize for stride in a.strides))
+
+
+def magnitude(x: "numpy.ndarray") -> int:
+    """Returns the largest absolute value of the elements of a NumPy int array."""
+    if x.size == 0:
+        return 0
+    return max(-int(x.min()), int(x.max()))
+
+
+def use_numpy(element_type: TokenType, arrays: List[Optional["numpy.ndarray"]],
+              bound: Callable[..., int], reduces: bool = False) -> bool:
+    """
+    Checks if a kernel can run with NumPy.
+    Args:
+        element_type (TokenType): the element type of the arrays.
+        arrays (List[Optional[numpy.ndarray]]): the arrays, as returned by `to_numpy`.
+        bound (Callable[..., int]): takes the magnitude of each array, and returns a bound on the magnitude of any
+            value computed by the kernel. Only used for int arrays.
+        reduces (bool): whether the kernel adds up many elements. NumPy adds floats in a different order than a loop
+            does, which rounds differently, so such kernels only use NumPy on ints.
+    """
+    if any(x is None for x in arrays):
+        return False
+    if element_type == TokenType.FLOATL:
+        return not reduces
+    return bound(*(magnitude(x) for x in arrays)) < INT_LIMIT
+
+
+def elementwise(operation: Callable[[Any, Any], Any], dst: ArrayValue, a: ArrayValue,
+                b: Union[ArrayValue, int, float]) -> None:
+    """
+    Sets each element of `dst` to the result of an operation on the elements of `a` and `b` at the same indices. `b`
+    can also be a single number, which is used for every element. The arrays must have the same shape.
+    Args:
+        operation (Callable[[Any, Any], Any]): `operator.add` or `operator.mul`.
+    Raises:
+        OverflowError: if an int does not fit in 64 bits.
+    """
+    x, out = to_numpy(a), to_numpy(dst)
+    # Adding or multiplying the magnitudes of the operands bounds the magnitude of the result.
+    if isinstance(b, ArrayValue):
+        y = to_numpy(b)
+        arrays = [x, y, out]
+
+        def bound(m: int, n: int, _: int) -> int:
+            return operation(m, n)
+    else:
+        y = b
+        arrays = [x, out]
+
+        def bound(m: int, _: int) -> int:
+            return operation(m, abs(b))
+    if use_numpy(a.element_type, arrays, bound):
+        out[...] = operation(x, y)
+        return
+
+    values = b.elements() if isinstance(b, ArrayValue) else (b for _ in range(a.size))
+    dst.assign([operation(p, q) for p, q in zip(a.elements(), values)])
+
+
+def total(a: ArrayValue) -> Union[int, float]:
+    """Returns the sum of the elements of an array."""
+    x = to_numpy(a)
+    if use_numpy(a.element_type, [x], lambda m: m * a.size, True):
+        return x.sum().item()
+    return sum(a.elements(), 0.0 if a.element_type == TokenType.FLOATL else 0)
+
+
+def minimum(a: ArrayValue) -> Union[int, float]:
+    """Returns the smallest element of an array, which must not be empty."""
+    x = to_numpy(a)
+    return x.min().item() if x is not None else min(a.elements())
+
+
+def maximum(a: ArrayValue) -> Union[int, float]:
+    """Returns the largest element of an array, which must not be empty."""
+    x = to_numpy(a)
+    return x.max().item() if x is not None else max(a.elements())
+
+
+def argmin(a: ArrayValue) -> int:
+    """
+    Returns the position, in row-major order, of the first occurrence of the smallest element of an array, which must
+    not be empty.
+    """
+    x = to_numpy(a)
+    if x is not None:
+        return int(x.argmin())
+    values = list(a.elements())
+    return min(range(len(values)), key=values.__getitem__)
+
+
+def prefix_sum(dst: ArrayValue, a: ArrayValue) -> None:
+    """
+    Sets each element of the one-dimensional array `dst` to the sum of the elements of `a` up to the same index.
+    Raises:
+        OverflowError: if an int does not fit in 64 bits.
+    """
+    x, out = to_numpy(a), to_numpy(dst)
+    if use_numpy(a.element_type, [x, out], lambda m, _: m * len(a)):
+        out[...] = numpy.cumsum(x)
+        return
+    dst.assign(list(accumulate(a.elements())))
+
+
+def dot(a: ArrayValue, b: ArrayValue) -> Union[int, float]:
+    """Returns the dot product of two one-dimensional arrays of the same length."""
+    x, y = to_numpy(a), to_numpy(b)
+    if use_numpy(a.element_type, [x, y], lambda m, n: m * n * len(a), True):
+        return numpy.dot(x, y).item()
+    return sum(map(operator.mul, a.elements(), b.elements()), 0.0 if a.element_type == TokenType.FLOATL else 0)
+
+
+def matmul(dst: ArrayValue, a: ArrayValue, b: ArrayValue) -> None:
+    """
+    Sets `dst` to the matrix product of the two-dimensional arrays `a` and `b`. If `a` is `n` by `m`, `b` must be `m`
+    by `p`, and `dst` must be `n` by `p`.
+    Raises:
+        OverflowError: if an int does not fit in 64 bits.
+    """
+    x, y, out = to_numpy(a), to_numpy(b), to_numpy(dst)
+    if use_numpy(a.element_type, [x, y, out], lambda m, n, _: m * n * a.shape[1], True):
+        # The product is computed before it is written, since `dst` can share its buffer with `a` or `b`.
+        out[...] = numpy.matmul(x, y)
+        return
+
+    # Computes each element of the product from a row of `a` and a column of `b`.
+    row_length, num_columns = a.shape[1], b.shape[1]
+    a_values, b_values = list(a.elements()), list(b.elements())
+    rows = [a_values[i * row_length:(i + 1) * row_length] for i in range(a.shape[0])]
+    columns = [b_values[j::num_columns] for j in range(num_columns)]
+    zero = 0.0 if a.element_type == TokenType.FLOATL else 0
+    dst.assign([sum(map(operator.mul, row, column), zero) for row in rows for column in columns])
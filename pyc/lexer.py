@@ -124,12 +124,23 @@ class Lexer(object):
         # Read the opening quotation mark.
         self.advance()
 
-        # Keep reading characters until the current character is another quotation mark.
+        # Keep reading characters until the current character is another quotation mark. A backslash escapes the
+        # character after it, so `\"` does not end the string.
         result = ""
         while self.current_char is not None and self.current_char != "\"":
+            if self.current_char == "\\" and self.peek() is not None:
+                result += self.current_char
+                self.advance()
             result += self.current_char
             self.advance()
 
+        # Decodes the escape sequences (ex. `\n`, `\t`, `\\`) once, so they are not decoded every time the string
+        # is printed. Characters outside of latin-1 are escaped first, so that they survive the decoding.
+        try:
+            result = result.encode("latin-1", "backslashreplace").decode("unicode_escape")
+        except UnicodeDecodeError:
+            self.error()
+
         # Read the closing quotation mark.
         if self.current_char == "\"":
             self.advance()
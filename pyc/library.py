@@ -4,12 +4,25 @@ Paul Chen
 This file holds all the standard library functions that are implemented in the interpreter.
 """
 
+import array
+import bisect
+import functools
+import heapq
+import mmap
+import operator
+import re
+import struct
 import sys
+from typing import Tuple, Union
 
+import graphs
+import kernels
 from ast_nodes import FunctionArgument
 from control_exceptions import ReturnException
+from error import ErrorCode, LibraryError
+from streams import output, reader
 from tokens import TokenType
-from value import build_value
+from value import build_value, BUFFER_TYPECODES
 
 
 class LibraryFunction(object):
@@ -18,12 +31,16 @@ class LibraryFunction(object):
 
     Attributes:
         name (str): the name of the function.
-        type (TokenType): the return type of the function.
+        type (Union[TokenType, Tuple[TokenType, ...]]): the return type of the function. Functions that can return
+            several types give them as a tuple.
         args (list[FunctionArgument]): the function arguments.
+        variadic (Optional[FunctionArgument]): if set, the function takes any number of extra arguments matching
+            this argument. They are passed together as a list under its name.
     """
     name = None
     type = None
     args = None
+    variadic = None
 
     @staticmethod
     def run(scopes):
@@ -39,37 +56,10 @@ class Print(LibraryFunction):
 
     @staticmethod
     def run(stack):
-        print(bytes(stack.get("p").value, "utf-8").decode("unicode_escape"), end="", flush=True)
+        output.write(stack.get("p").value)
         raise ReturnException(build_value(TokenType.VOIDL))
 
 
-def next_token():
-    """Reads a token from stdin."""
-    token = ""
-    while True:
-        c = sys.stdin.read(1)
-        if not c.isspace():
-            token += c
-            break
-    while True:
-        c = sys.stdin.read(1)
-        if c.isspace():
-            break
-        token += c
-    return token
-
-
-def next_line():
-    """Reads up to the next newline in stdin."""
-    line = ""
-    while True:
-        c = sys.stdin.read(1)
-        if c == "\n":
-            break
-        line += c
-    return line
-
-
 """
 The next four classes are for adding functions to take ints, floats, and strings as input.
 """
@@ -82,7 +72,8 @@ class Scan(LibraryFunction):
 
     @staticmethod
     def run(stack):
-        raise ReturnException(build_value(TokenType.STRINGL, next_token()))
+        output.flush()
+        raise ReturnException(build_value(TokenType.STRINGL, reader.next_token()))
 
 
 class GetLine(LibraryFunction):
@@ -92,7 +83,1205 @@ class GetLine(LibraryFunction):
 
     @staticmethod
     def run(stack):
-        raise ReturnException(build_value(TokenType.STRINGL, next_line()))
+        output.flush()
+        raise ReturnException(build_value(TokenType.STRINGL, reader.next_line()))
+
+
+def scan_array(stack, convert) -> None:
+    """Reads `n` tokens into the array `a`, converting them with `convert`, and returns the number of tokens read."""
+    array = stack.get("a")
+    n = stack.get("n").value
+    if not 0 <= n <= len(array):
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+
+    output.flush()
+    try:
+        values = [convert(token) for token in reader.next_tokens(n)]
+        array.store(values)
+    except ValueError:
+        raise LibraryError(ErrorCode.INVALID_INPUT)
+    except OverflowError:
+        raise LibraryError(ErrorCode.OVERFLOW)
+    raise ReturnException(build_value(TokenType.INTL, len(values)))
+
+
+"""
+The next three classes read and print whole arrays in a single call.
+"""
+
+
+class ScanInts(LibraryFunction):
+    """
+    Library function that reads `n` ints into the start of an array. Returns the number of ints read, which is less
+    than `n` at the end of the input.
+    """
+    name = "scan_ints"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.INT, "a", 1), FunctionArgument(TokenType.INT, "n")]
+
+    @staticmethod
+    def run(stack):
+        scan_array(stack, int)
+
+
+class ScanFloats(LibraryFunction):
+    """
+    Library function that reads `n` floats into the start of an array. Returns the number of floats read, which is
+    less than `n` at the end of the input.
+    """
+    name = "scan_floats"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.FLOAT, "a", 1), FunctionArgument(TokenType.INT, "n")]
+
+    @staticmethod
+    def run(stack):
+        scan_array(stack, float)
+
+
+class PrintArray(LibraryFunction):
+    """Library function that prints the elements of an array, with a separator between them."""
+    name = "print_array"
+    type = TokenType.VOID
+    args = [FunctionArgument((TokenType.INT, TokenType.FLOAT, TokenType.STRING), "a", 1),
+            FunctionArgument(TokenType.STRING, "sep")]
+
+    @staticmethod
+    def run(stack):
+        output.write(stack.get("sep").value.join(map(str, stack.get("a").elements())))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+# A conversion specifier: flags, width, precision and conversion type, ex. "%-8.3f".
+FORMAT_SPECIFIER = re.compile(r"%([-+ 0#]*)(\d*)(?:\.(\d*))?(.)")
+
+# The types of values accepted by each conversion type.
+FORMAT_CONVERSIONS = {
+    **dict.fromkeys("diouxXc", (TokenType.INTL,)),
+    **dict.fromkeys("eEfFgG", (TokenType.INTL, TokenType.FLOATL)),
+    "s": (TokenType.STRINGL,),
+}
+
+
+@functools.lru_cache(maxsize=256)
+def parse_format(fmt: str) -> Tuple[str, Tuple[Tuple[TokenType, ...], ...]]:
+    """
+    Parses a printf format string.
+    Returns:
+        Tuple[str, Tuple[Tuple[TokenType, ...], ...]]: the format string with literal percent signs escaped, which can
+            be used with the `%` operator, and the types of values accepted by each conversion, in order.
+    """
+    pieces = []
+    conversions = []
+    pos = 0
+    while True:
+        start = fmt.find("%", pos)
+        if start == -1:
+            pieces.append(fmt[pos:])
+            break
+        pieces.append(fmt[pos:start])
+        match = FORMAT_SPECIFIER.match(fmt, start)
+        if match is None:
+            raise LibraryError(ErrorCode.INVALID_FORMAT)
+        conversion = match.group(4)
+        if conversion == "%":
+            if match.group(0) != "%%":
+                raise LibraryError(ErrorCode.INVALID_FORMAT)
+            pieces.append("%%")
+        elif conversion in FORMAT_CONVERSIONS:
+            pieces.append(match.group(0))
+            conversions.append(FORMAT_CONVERSIONS[conversion])
+        else:
+            raise LibraryError(ErrorCode.INVALID_FORMAT)
+        pos = match.end()
+    return "".join(pieces), tuple(conversions)
+
+
+class Printf(LibraryFunction):
+    """
+    Library function that prints its arguments formatted by a C-style format string, ex. printf("%d %.2f\\n", n, x).
+    Ints, floats and strings are formatted directly, without being cast to strings first.
+    """
+    name = "printf"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.STRING, "fmt")]
+    variadic = FunctionArgument((TokenType.INT, TokenType.FLOAT, TokenType.STRING), "args")
+
+    @staticmethod
+    def run(stack):
+        fmt, conversions = parse_format(stack.get("fmt").value)
+        values = stack.get("args")
+        if len(values) != len(conversions):
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        for value, accepted in zip(values, conversions):
+            if value.type not in accepted:
+                raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        try:
+            output.write(fmt % tuple(value.value for value in values))
+        except OverflowError:
+            # A %c conversion of an int that is not a character.
+            raise LibraryError(ErrorCode.OVERFLOW)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+"""
+The next seven classes look inside strings. Each one is a single call to a python string method, so the work is not
+done character by character. Positions in strings are numbered from 0.
+"""
+
+
+class Len(LibraryFunction):
+    """Library function that returns the number of characters in a string."""
+    name = "len"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.STRING, "s")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, len(stack.get("s").value)))
+
+
+class Substr(LibraryFunction):
+    """
+    Library function that returns the `n` characters of a string starting at position `i`, or fewer if the string
+    ends first. `i` can be at most the length of the string.
+    """
+    name = "substr"
+    type = TokenType.STRING
+    args = [FunctionArgument(TokenType.STRING, "s"), FunctionArgument(TokenType.INT, "i"),
+            FunctionArgument(TokenType.INT, "n")]
+
+    @staticmethod
+    def run(stack):
+        s = stack.get("s").value
+        start = stack.get("i").value
+        n = stack.get("n").value
+        if not 0 <= start <= len(s) or n < 0:
+            raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+        raise ReturnException(build_value(TokenType.STRINGL, s[start:start + n]))
+
+
+class CharCode(LibraryFunction):
+    """Library function that returns the character code of the character at position `i` of a string."""
+    name = "char_code"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.STRING, "s"), FunctionArgument(TokenType.INT, "i")]
+
+    @staticmethod
+    def run(stack):
+        s = stack.get("s").value
+        i = stack.get("i").value
+        if not 0 <= i < len(s):
+            raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+        raise ReturnException(build_value(TokenType.INTL, ord(s[i])))
+
+
+class Find(LibraryFunction):
+    """Library function that returns the position of the first occurrence of `t` in a string, or -1 if there is none."""
+    name = "find"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.STRING, "s"), FunctionArgument(TokenType.STRING, "t")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, stack.get("s").value.find(stack.get("t").value)))
+
+
+class Replace(LibraryFunction):
+    """Library function that returns a copy of a string with every occurrence of `old` replaced by `new`."""
+    name = "replace"
+    type = TokenType.STRING
+    args = [FunctionArgument(TokenType.STRING, "s"), FunctionArgument(TokenType.STRING, "old"),
+            FunctionArgument(TokenType.STRING, "new")]
+
+    @staticmethod
+    def run(stack):
+        old = stack.get("old").value
+        # An empty string occurs between every pair of characters, so it cannot be replaced.
+        if old == "":
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        replaced = stack.get("s").value.replace(old, stack.get("new").value)
+        raise ReturnException(build_value(TokenType.STRINGL, replaced))
+
+
+class SplitInts(LibraryFunction):
+    """
+    Library function that reads the ints in a string, separated by whitespace, into the start of an array. Returns the
+    number of ints read. The array must be long enough to hold all of them.
+    """
+    name = "split_ints"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.STRING, "s"), FunctionArgument(TokenType.INT, "a", 1)]
+
+    @staticmethod
+    def run(stack):
+        array = stack.get("a")
+        tokens = stack.get("s").value.split()
+        if len(tokens) > len(array):
+            raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+        try:
+            values = list(map(int, tokens))
+            array.store(values)
+        except ValueError:
+            raise LibraryError(ErrorCode.INVALID_INPUT)
+        except OverflowError:
+            raise LibraryError(ErrorCode.OVERFLOW)
+        raise ReturnException(build_value(TokenType.INTL, len(values)))
+
+
+class ToInt(LibraryFunction):
+    """
+    Library function that converts a string holding an int, with optional whitespace around it, into an int. A string
+    that does not hold an int is reported as invalid input.
+    """
+    name = "to_int"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.STRING, "s")]
+
+    @staticmethod
+    def run(stack):
+        try:
+            value = int(stack.get("s").value)
+        except ValueError:
+            raise LibraryError(ErrorCode.INVALID_INPUT)
+        raise ReturnException(build_value(TokenType.INTL, value))
+
+
+"""
+The next two classes save arrays to binary files and load them back. A file starts with a header made of
+`ARRAY_FILE_HEADER` followed by the length of each dimension as 64-bit ints, then holds the elements in row-major
+order, in the byte order of the machine that saved it. The header is a multiple of 8 bytes long, so the elements are
+aligned when the file is memory-mapped.
+"""
+
+ARRAY_FILE_MAGIC = b"PYCARRAY"
+
+# Magic bytes, type code of the elements ("q" or "d"), byte order ("<" or ">"), number of dimensions, padding.
+ARRAY_FILE_HEADER = struct.Struct("<8sccB5x")
+
+BYTE_ORDER = b"<" if sys.byteorder == "little" else b">"
+
+
+class ArraySave(LibraryFunction):
+    """Library function that saves an int or float array to a binary file."""
+    name = "array_save"
+    type = TokenType.VOID
+    args = [FunctionArgument((TokenType.INT, TokenType.FLOAT), "a", None), FunctionArgument(TokenType.STRING, "path")]
+
+    @staticmethod
+    def run(stack):
+        source = stack.get("a")
+        typecode = BUFFER_TYPECODES[source.element_type]
+        if source.owns_buffer() and isinstance(source.buffer, array.array):
+            data = source.buffer
+        else:
+            data = array.array(typecode, source.elements())
+
+        try:
+            with open(stack.get("path").value, "wb") as file:
+                file.write(ARRAY_FILE_HEADER.pack(ARRAY_FILE_MAGIC, typecode.encode(), BYTE_ORDER, len(source.shape)))
+                file.write(struct.pack(f"<{len(source.shape)}q", *source.shape))
+                data.tofile(file)
+        except OSError:
+            raise LibraryError(ErrorCode.INVALID_FILE)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class ArrayLoad(LibraryFunction):
+    """
+    Library function that loads a file saved by `array_save` into an array with the same shape and element type. The
+    file is memory-mapped, so the elements are not read or copied until they are used. Writing to the array does not
+    change the file.
+    """
+    name = "array_load"
+    type = TokenType.VOID
+    args = [FunctionArgument((TokenType.INT, TokenType.FLOAT), "a", None), FunctionArgument(TokenType.STRING, "path")]
+
+    @staticmethod
+    def run(stack):
+        target = stack.get("a")
+        typecode = BUFFER_TYPECODES[target.element_type]
+
+        try:
+            with open(stack.get("path").value, "rb") as file:
+                header = file.read(ARRAY_FILE_HEADER.size)
+                if len(header) != ARRAY_FILE_HEADER.size:
+                    raise LibraryError(ErrorCode.INVALID_FILE)
+                magic, file_typecode, byte_order, num_dimensions = ARRAY_FILE_HEADER.unpack(header)
+                if magic != ARRAY_FILE_MAGIC or byte_order != BYTE_ORDER:
+                    raise LibraryError(ErrorCode.INVALID_FILE)
+                shape = file.read(8 * num_dimensions)
+                if len(shape) != 8 * num_dimensions:
+                    raise LibraryError(ErrorCode.INVALID_FILE)
+
+                # The shape and type of the saved array must match the declaration of the array it is loaded into.
+                if file_typecode != typecode.encode() or struct.unpack(f"<{num_dimensions}q", shape) != target.shape:
+                    raise LibraryError(ErrorCode.MISMATCHED_TYPE)
+
+                # Copy-on-write mapping, so writes to the array stay in memory.
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            raise LibraryError(ErrorCode.INVALID_FILE)
+
+        elements = memoryview(mapping)[ARRAY_FILE_HEADER.size + 8 * num_dimensions:]
+        if len(elements) != target.size * array.array(typecode).itemsize:
+            raise LibraryError(ErrorCode.INVALID_FILE)
+        elements = elements.cast(typecode)
+
+        # An array that is the whole of its buffer uses the mapping as its buffer. A view, like a row of a larger
+        # array, has the elements copied into it instead.
+        if target.owns_buffer():
+            target.buffer = elements
+        else:
+            for position, value in zip(target.positions(), elements):
+                target.buffer[position] = value
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+"""
+The next five classes sort, search, fill and copy arrays. They work on the buffer of the array directly, so they also
+work on rows and slices of larger arrays, and on vectors.
+"""
+
+ALL_ELEMENT_TYPES = (TokenType.INT, TokenType.FLOAT, TokenType.STRING)
+
+
+def element_count(stack, array_name: str = "a") -> int:
+    """Returns the number of elements `n` that a function works on, after checking that it fits in the array."""
+    count = stack.get("n").value
+    if not 0 <= count <= len(stack.get(array_name)):
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+    return count
+
+
+class Sort(LibraryFunction):
+    """Library function that sorts the first `n` elements of an array in ascending order."""
+    name = "sort"
+    type = TokenType.VOID
+    args = [FunctionArgument(ALL_ELEMENT_TYPES, "a", 1), FunctionArgument(TokenType.INT, "n")]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        a.store(sorted(a.load(element_count(stack))))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class SortDesc(LibraryFunction):
+    """Library function that sorts the first `n` elements of an array in descending order."""
+    name = "sort_desc"
+    type = TokenType.VOID
+    args = [FunctionArgument(ALL_ELEMENT_TYPES, "a", 1), FunctionArgument(TokenType.INT, "n")]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        a.store(sorted(a.load(element_count(stack)), reverse=True))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class LowerBound(LibraryFunction):
+    """
+    Library function that binary searches the first `n` elements of an array, which must be sorted in ascending
+    order. Returns the index of the first element that is not less than `x`, or `n` if there is none.
+    """
+    name = "lower_bound"
+    type = TokenType.INT
+    args = [FunctionArgument(ALL_ELEMENT_TYPES, "a", 1), FunctionArgument(TokenType.INT, "n"),
+            FunctionArgument(ALL_ELEMENT_TYPES, "x")]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        x = stack.get("x")
+        count = element_count(stack)
+
+        # Strings can only be compared with strings, and numbers with numbers.
+        if (x.type == TokenType.STRINGL) != (a.element_type == TokenType.STRINGL):
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+
+        # Searches the buffer in place when the elements are next to each other.
+        if a.strides[0] == 1:
+            index = bisect.bisect_left(a.buffer, x.value, a.offset, a.offset + count) - a.offset
+        else:
+            index = bisect.bisect_left(a.load(count), x.value)
+        raise ReturnException(build_value(TokenType.INTL, index))
+
+
+class Fill(LibraryFunction):
+    """Library function that sets every element of an array, with any number of dimensions, to a value."""
+    name = "fill"
+    type = TokenType.VOID
+    args = [FunctionArgument(ALL_ELEMENT_TYPES, "a", None), FunctionArgument(ALL_ELEMENT_TYPES, "v")]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        v = stack.get("v")
+        if v.type != a.element_type:
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        try:
+            a.fill(v.value)
+        except OverflowError:
+            raise LibraryError(ErrorCode.OVERFLOW)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class Copy(LibraryFunction):
+    """
+    Library function that copies the first `n` elements of the array `src` into the start of the array `dst`. Both
+    arrays must have the same element type. The arrays can overlap.
+    """
+    name = "copy"
+    type = TokenType.VOID
+    args = [FunctionArgument(ALL_ELEMENT_TYPES, "dst", 1), FunctionArgument(ALL_ELEMENT_TYPES, "src", 1),
+            FunctionArgument(TokenType.INT, "n")]
+
+    @staticmethod
+    def run(stack):
+        dst = stack.get("dst")
+        src = stack.get("src")
+        if dst.element_type != src.element_type:
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        element_count(stack, "src")
+        dst.store(src.load(element_count(stack, "dst")))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+"""
+The next ten classes do math on whole int or float arrays. The work is done by the kernels in `kernels.py`, which use
+NumPy when it is installed. The arrays passed to a function must all have the same element type, and the results are
+written to the array `dst` (or `c`), which can be one of the inputs.
+"""
+
+NUMERIC_TYPES = (TokenType.INT, TokenType.FLOAT)
+
+
+def check_arrays(*arrays, same_shape: bool = True) -> None:
+    """Checks that arrays have the same element type and, if `same_shape` is set, the same shape."""
+    if any(a.element_type != arrays[0].element_type or (same_shape and a.shape != arrays[0].shape) for a in arrays):
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+
+
+def run_kernel(kernel, *args) -> None:
+    """Runs a kernel that writes to an array, converting int overflows into errors."""
+    try:
+        kernel(*args)
+    except OverflowError:
+        raise LibraryError(ErrorCode.OVERFLOW)
+
+
+class ArrayAdd(LibraryFunction):
+    """Library function that sets each element of `dst` to the sum of the elements of `a` and `b` at the same index."""
+    name = "array_add"
+    type = TokenType.VOID
+    args = [FunctionArgument(NUMERIC_TYPES, "dst", None), FunctionArgument(NUMERIC_TYPES, "a", None),
+            FunctionArgument(NUMERIC_TYPES, "b", None)]
+
+    @staticmethod
+    def run(stack):
+        dst, a, b = stack.get("dst"), stack.get("a"), stack.get("b")
+        check_arrays(dst, a, b)
+        run_kernel(kernels.elementwise, operator.add, dst, a, b)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class ArrayMul(LibraryFunction):
+    """
+    Library function that sets each element of `dst` to the product of the elements of `a` and `b` at the same index.
+    """
+    name = "array_mul"
+    type = TokenType.VOID
+    args = [FunctionArgument(NUMERIC_TYPES, "dst", None), FunctionArgument(NUMERIC_TYPES, "a", None),
+            FunctionArgument(NUMERIC_TYPES, "b", None)]
+
+    @staticmethod
+    def run(stack):
+        dst, a, b = stack.get("dst"), stack.get("a"), stack.get("b")
+        check_arrays(dst, a, b)
+        run_kernel(kernels.elementwise, operator.mul, dst, a, b)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class ArrayScale(LibraryFunction):
+    """
+    Library function that sets each element of `dst` to the element of `a` at the same index multiplied by `k`, which
+    must have the element type of the arrays.
+    """
+    name = "array_scale"
+    type = TokenType.VOID
+    args = [FunctionArgument(NUMERIC_TYPES, "dst", None), FunctionArgument(NUMERIC_TYPES, "a", None),
+            FunctionArgument(NUMERIC_TYPES, "k")]
+
+    @staticmethod
+    def run(stack):
+        dst, a, k = stack.get("dst"), stack.get("a"), stack.get("k")
+        check_arrays(dst, a)
+        if k.type != a.element_type:
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        run_kernel(kernels.elementwise, operator.mul, dst, a, k.value)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class ArraySum(LibraryFunction):
+    """Library function that returns the sum of the elements of an array. The sum of an empty array is 0."""
+    name = "array_sum"
+    type = NUMERIC_TYPES
+    args = [FunctionArgument(NUMERIC_TYPES, "a", None)]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        raise ReturnException(build_value(a.element_type, kernels.total(a)))
+
+
+class ArrayMin(LibraryFunction):
+    """Library function that returns the smallest element of an array."""
+    name = "array_min"
+    type = NUMERIC_TYPES
+    args = [FunctionArgument(NUMERIC_TYPES, "a", None)]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        if a.size == 0:
+            raise LibraryError(ErrorCode.EMPTY_CONTAINER)
+        raise ReturnException(build_value(a.element_type, kernels.minimum(a)))
+
+
+class ArrayMax(LibraryFunction):
+    """Library function that returns the largest element of an array."""
+    name = "array_max"
+    type = NUMERIC_TYPES
+    args = [FunctionArgument(NUMERIC_TYPES, "a", None)]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        if a.size == 0:
+            raise LibraryError(ErrorCode.EMPTY_CONTAINER)
+        raise ReturnException(build_value(a.element_type, kernels.maximum(a)))
+
+
+class ArrayArgmin(LibraryFunction):
+    """
+    Library function that returns the index of the first occurrence of the smallest element of an array. The elements
+    of arrays with more than one dimension are counted in row-major order, so in a 3 by 4 array, `a[1][2]` is at 6.
+    """
+    name = "array_argmin"
+    type = TokenType.INT
+    args = [FunctionArgument(NUMERIC_TYPES, "a", None)]
+
+    @staticmethod
+    def run(stack):
+        a = stack.get("a")
+        if a.size == 0:
+            raise LibraryError(ErrorCode.EMPTY_CONTAINER)
+        raise ReturnException(build_value(TokenType.INTL, kernels.argmin(a)))
+
+
+class PrefixSum(LibraryFunction):
+    """
+    Library function that sets each element of `dst` to the sum of the elements of `a` up to and including the same
+    index.
+    """
+    name = "prefix_sum"
+    type = TokenType.VOID
+    args = [FunctionArgument(NUMERIC_TYPES, "dst", 1), FunctionArgument(NUMERIC_TYPES, "a", 1)]
+
+    @staticmethod
+    def run(stack):
+        dst, a = stack.get("dst"), stack.get("a")
+        check_arrays(dst, a)
+        run_kernel(kernels.prefix_sum, dst, a)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class Dot(LibraryFunction):
+    """Library function that returns the dot product of two arrays of the same length."""
+    name = "dot"
+    type = NUMERIC_TYPES
+    args = [FunctionArgument(NUMERIC_TYPES, "a", 1), FunctionArgument(NUMERIC_TYPES, "b", 1)]
+
+    @staticmethod
+    def run(stack):
+        a, b = stack.get("a"), stack.get("b")
+        check_arrays(a, b)
+        raise ReturnException(build_value(a.element_type, kernels.dot(a, b)))
+
+
+class Matmul(LibraryFunction):
+    """
+    Library function that sets `c` to the matrix product of `a` and `b`. If `a` is `n` by `m`, `b` must be `m` by `p`,
+    and `c` must be `n` by `p`.
+    """
+    name = "matmul"
+    type = TokenType.VOID
+    args = [FunctionArgument(NUMERIC_TYPES, "c", 2), FunctionArgument(NUMERIC_TYPES, "a", 2),
+            FunctionArgument(NUMERIC_TYPES, "b", 2)]
+
+    @staticmethod
+    def run(stack):
+        c, a, b = stack.get("c"), stack.get("a"), stack.get("b")
+        check_arrays(c, a, b, same_shape=False)
+        if a.shape[1] != b.shape[0] or c.shape != (a.shape[0], b.shape[1]):
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        run_kernel(kernels.matmul, c, a, b)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+"""
+The next five classes operate on maps. Keys must have the key type of the map, and values the value type, otherwise
+the function throws a mismatched arguments error.
+"""
+
+
+def map_key(stack) -> Union[int, str]:
+    """Returns the raw value of the key `k` passed to a map function, after checking its type against the map `m`."""
+    key = stack.get("k")
+    if key.type != stack.get("m").key_type:
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+    return key.value
+
+
+class MapGet(LibraryFunction):
+    """Library function that returns the value stored under a key of a map. The key must be in the map."""
+    name = "map_get"
+    type = (TokenType.INT, TokenType.FLOAT, TokenType.STRING)
+    args = [FunctionArgument(TokenType.MAP, "m"), FunctionArgument((TokenType.INT, TokenType.STRING), "k")]
+
+    @staticmethod
+    def run(stack):
+        m = stack.get("m")
+        try:
+            value = m.value[map_key(stack)]
+        except KeyError:
+            raise LibraryError(ErrorCode.KEY_NOT_FOUND)
+        raise ReturnException(build_value(m.value_type, value))
+
+
+class MapPut(LibraryFunction):
+    """Library function that stores a value under a key of a map, replacing the value already stored there."""
+    name = "map_put"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.MAP, "m"), FunctionArgument((TokenType.INT, TokenType.STRING), "k"),
+            FunctionArgument((TokenType.INT, TokenType.FLOAT, TokenType.STRING), "v")]
+
+    @staticmethod
+    def run(stack):
+        m = stack.get("m")
+        value = stack.get("v")
+        if value.type != m.value_type:
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        m.value[map_key(stack)] = value.value
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class MapContains(LibraryFunction):
+    """Library function that returns 1 if a key is in a map, otherwise 0."""
+    name = "map_contains"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.MAP, "m"), FunctionArgument((TokenType.INT, TokenType.STRING), "k")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, int(map_key(stack) in stack.get("m").value)))
+
+
+class MapRemove(LibraryFunction):
+    """Library function that removes a key from a map. Returns 1 if the key was in the map, otherwise 0."""
+    name = "map_remove"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.MAP, "m"), FunctionArgument((TokenType.INT, TokenType.STRING), "k")]
+
+    @staticmethod
+    def run(stack):
+        m = stack.get("m")
+        key = map_key(stack)
+        removed = key in m.value
+        if removed:
+            del m.value[key]
+        raise ReturnException(build_value(TokenType.INTL, int(removed)))
+
+
+class MapSize(LibraryFunction):
+    """Library function that returns the number of keys in a map."""
+    name = "map_size"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.MAP, "m")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, len(stack.get("m").value)))
+
+
+"""
+The next five classes operate on priority queues of `(priority, payload)` pairs of ints. Pairs with the same priority
+come out in order of their payload.
+"""
+
+
+def queue_front(stack) -> Tuple[int, int]:
+    """Returns the pair with the smallest priority in the priority queue `q`, which must not be empty."""
+    heap = stack.get("q").value
+    if len(heap) == 0:
+        raise LibraryError(ErrorCode.EMPTY_CONTAINER)
+    return heap[0]
+
+
+class PqPush(LibraryFunction):
+    """Library function that adds a payload with a priority to a priority queue."""
+    name = "pq_push"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.PRIORITY_QUEUE, "q"), FunctionArgument(TokenType.INT, "priority"),
+            FunctionArgument(TokenType.INT, "payload")]
+
+    @staticmethod
+    def run(stack):
+        heapq.heappush(stack.get("q").value, (stack.get("priority").value, stack.get("payload").value))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class PqPop(LibraryFunction):
+    """Library function that removes the pair with the smallest priority from a priority queue. Returns its payload."""
+    name = "pq_pop"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.PRIORITY_QUEUE, "q")]
+
+    @staticmethod
+    def run(stack):
+        queue_front(stack)
+        raise ReturnException(build_value(TokenType.INTL, heapq.heappop(stack.get("q").value)[1]))
+
+
+class PqPeek(LibraryFunction):
+    """Library function that returns the payload of the pair with the smallest priority in a priority queue."""
+    name = "pq_peek"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.PRIORITY_QUEUE, "q")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, queue_front(stack)[1]))
+
+
+class PqPeekPriority(LibraryFunction):
+    """Library function that returns the smallest priority in a priority queue."""
+    name = "pq_peek_priority"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.PRIORITY_QUEUE, "q")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, queue_front(stack)[0]))
+
+
+class PqSize(LibraryFunction):
+    """Library function that returns the number of pairs in a priority queue."""
+    name = "pq_size"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.PRIORITY_QUEUE, "q")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, len(stack.get("q").value)))
+
+
+"""
+The next three classes operate on vectors. Elements are read and written with subscripts, like arrays.
+"""
+
+
+class VecPush(LibraryFunction):
+    """Library function that adds an element to the end of a vector. The element must have the type of the vector."""
+    name = "vec_push"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.VECTOR, "v"),
+            FunctionArgument((TokenType.INT, TokenType.FLOAT, TokenType.STRING), "x")]
+
+    @staticmethod
+    def run(stack):
+        v = stack.get("v")
+        x = stack.get("x")
+        if x.type != v.element_type:
+            raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+        try:
+            v.push(x.value)
+        except OverflowError:
+            raise LibraryError(ErrorCode.OVERFLOW)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class VecPop(LibraryFunction):
+    """Library function that removes the last element of a vector and returns it."""
+    name = "vec_pop"
+    type = (TokenType.INT, TokenType.FLOAT, TokenType.STRING)
+    args = [FunctionArgument(TokenType.VECTOR, "v")]
+
+    @staticmethod
+    def run(stack):
+        v = stack.get("v")
+        if len(v) == 0:
+            raise LibraryError(ErrorCode.EMPTY_CONTAINER)
+        raise ReturnException(build_value(v.element_type, v.pop()))
+
+
+class VecLen(LibraryFunction):
+    """Library function that returns the number of elements in a vector."""
+    name = "vec_len"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.VECTOR, "v")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, len(stack.get("v"))))
+
+
+"""
+The next eleven classes operate on bitsets. Indices outside of the bitset, and negative steps or shifts, throw an out
+of bounds error. The functions that combine bitsets take bitsets with the same number of bits, and write the result to
+`dst`, which can be one of the inputs.
+"""
+
+
+def bit_index(stack) -> int:
+    """Returns the index `i` of a bit, after checking that it is inside the bitset `b`."""
+    index = stack.get("i").value
+    if not 0 <= index < stack.get("b").size:
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+    return index
+
+
+def check_bitsets(*bitsets) -> None:
+    """Checks that bitsets have the same number of bits."""
+    if any(b.size != bitsets[0].size for b in bitsets):
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+
+
+class BsSet(LibraryFunction):
+    """Library function that sets bit `i` of a bitset."""
+    name = "bs_set"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "b"), FunctionArgument(TokenType.INT, "i")]
+
+    @staticmethod
+    def run(stack):
+        stack.get("b").set(bit_index(stack))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class BsClear(LibraryFunction):
+    """Library function that clears bit `i` of a bitset."""
+    name = "bs_clear"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "b"), FunctionArgument(TokenType.INT, "i")]
+
+    @staticmethod
+    def run(stack):
+        stack.get("b").clear(bit_index(stack))
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class BsTest(LibraryFunction):
+    """Library function that returns 1 if bit `i` of a bitset is set, and 0 otherwise."""
+    name = "bs_test"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.BITSET, "b"), FunctionArgument(TokenType.INT, "i")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, stack.get("b").test(bit_index(stack))))
+
+
+class BsCount(LibraryFunction):
+    """Library function that returns the number of bits of a bitset that are set."""
+    name = "bs_count"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.BITSET, "b")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, stack.get("b").count()))
+
+
+class BsSize(LibraryFunction):
+    """Library function that returns the number of bits in a bitset."""
+    name = "bs_size"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.BITSET, "b")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, stack.get("b").size))
+
+
+def stride(stack, value: bool) -> None:
+    """Sets or clears every `k`-th bit of the bitset `b`, starting from bit `i`."""
+    start, step = stack.get("i").value, stack.get("k").value
+    if start < 0 or step <= 0:
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+    stack.get("b").set_stride(start, step, value)
+
+
+class BsSetStride(LibraryFunction):
+    """Library function that sets the bits `i`, `i + k`, `i + 2k`, ... of a bitset, up to its end."""
+    name = "bs_set_stride"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "b"), FunctionArgument(TokenType.INT, "i"),
+            FunctionArgument(TokenType.INT, "k")]
+
+    @staticmethod
+    def run(stack):
+        stride(stack, True)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class BsClearStride(LibraryFunction):
+    """
+    Library function that clears the bits `i`, `i + k`, `i + 2k`, ... of a bitset, up to its end. In a sieve of
+    Eratosthenes, `bs_clear_stride(b, p * p, p)` crosses out the multiples of `p`.
+    """
+    name = "bs_clear_stride"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "b"), FunctionArgument(TokenType.INT, "i"),
+            FunctionArgument(TokenType.INT, "k")]
+
+    @staticmethod
+    def run(stack):
+        stride(stack, False)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class BsOr(LibraryFunction):
+    """Library function that sets `dst` to the bitwise or of the bitsets `a` and `b`."""
+    name = "bs_or"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "dst"), FunctionArgument(TokenType.BITSET, "a"),
+            FunctionArgument(TokenType.BITSET, "b")]
+
+    @staticmethod
+    def run(stack):
+        dst, a, b = stack.get("dst"), stack.get("a"), stack.get("b")
+        check_bitsets(dst, a, b)
+        dst.assign_int(a.to_int() | b.to_int())
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class BsAnd(LibraryFunction):
+    """Library function that sets `dst` to the bitwise and of the bitsets `a` and `b`."""
+    name = "bs_and"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "dst"), FunctionArgument(TokenType.BITSET, "a"),
+            FunctionArgument(TokenType.BITSET, "b")]
+
+    @staticmethod
+    def run(stack):
+        dst, a, b = stack.get("dst"), stack.get("a"), stack.get("b")
+        check_bitsets(dst, a, b)
+        dst.assign_int(a.to_int() & b.to_int())
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+def shift_amount(stack) -> int:
+    """Returns the number of bits `k` to shift by, after checking the bitsets `dst` and `a`."""
+    check_bitsets(stack.get("dst"), stack.get("a"))
+    amount = stack.get("k").value
+    if amount < 0:
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+    # Shifting by the size of the bitset already clears every bit.
+    return min(amount, stack.get("a").size)
+
+
+class BsShl(LibraryFunction):
+    """
+    Library function that sets bit `i + k` of `dst` to bit `i` of `a`, and clears the first `k` bits of `dst`. Bits
+    shifted past the end are lost. In a subset sum, `bs_shl(t, dp, w); bs_or(dp, dp, t);` adds an item of weight `w`.
+    """
+    name = "bs_shl"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "dst"), FunctionArgument(TokenType.BITSET, "a"),
+            FunctionArgument(TokenType.INT, "k")]
+
+    @staticmethod
+    def run(stack):
+        amount = shift_amount(stack)
+        stack.get("dst").assign_int(stack.get("a").to_int() << amount)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class BsShr(LibraryFunction):
+    """Library function that sets bit `i` of `dst` to bit `i + k` of `a`, and clears the last `k` bits of `dst`."""
+    name = "bs_shr"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.BITSET, "dst"), FunctionArgument(TokenType.BITSET, "a"),
+            FunctionArgument(TokenType.INT, "k")]
+
+    @staticmethod
+    def run(stack):
+        amount = shift_amount(stack)
+        stack.get("dst").assign_int(stack.get("a").to_int() >> amount)
+        raise ReturnException(build_value(TokenType.VOIDL))
+
+
+"""
+The next seven classes build graphs and run graph algorithms on them. A graph is built from arrays of edges in a single
+call, and the algorithms in `graphs.py` write their results into int arrays with one element per node. Nodes are
+numbered from 0.
+"""
+
+
+def build_graph(stack, undirected: bool) -> None:
+    """Builds the graph `g` with `n` nodes from the edge arrays `from` and `to`, and the optional weight array."""
+    n = stack.get("n").value
+    sources = list(stack.get("from").elements())
+    targets = list(stack.get("to").elements())
+    extra = stack.get("w")
+    if len(extra) > 1:
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+    weights = list(extra[0].elements()) if len(extra) == 1 else [1] * len(sources)
+    if not len(sources) == len(targets) == len(weights):
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+    nodes = sources + targets
+    if n < 0 or (len(nodes) != 0 and not 0 <= min(nodes) <= max(nodes) < n):
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+
+    # An undirected edge is stored as an edge in each direction.
+    if undirected:
+        sources, targets, weights = sources + targets, targets + sources, weights + weights
+    g = stack.get("g")
+    g.offsets, g.value, g.weights = graphs.build_csr(n, sources, targets, weights)
+    raise ReturnException(build_value(TokenType.VOIDL))
+
+
+def start_node(stack) -> int:
+    """Returns the start node `s` of a search, and checks that the result arrays have one element per node."""
+    g = stack.get("g")
+    s = stack.get("s").value
+    extra = stack.get("parent")
+    if len(extra) > 1:
+        raise LibraryError(ErrorCode.MISMATCHED_ARGS)
+    if not 0 <= s < g.size or any(len(a) != g.size for a in [stack.get("dist")] + extra):
+        raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+    return s
+
+
+def store_search(stack, dist, parent) -> None:
+    """Stores the results of a search in `dist`, and in the optional `parent` array."""
+    try:
+        stack.get("dist").store(dist)
+        for a in stack.get("parent"):
+            a.store(parent)
+    except OverflowError:
+        raise LibraryError(ErrorCode.OVERFLOW)
+    raise ReturnException(build_value(TokenType.VOIDL))
+
+
+class GraphBuild(LibraryFunction):
+    """
+    Library function that builds a graph with `n` nodes, replacing its edges, from arrays of directed edges: edge `i`
+    goes from `from[i]` to `to[i]`, with weight `w[i]`. The weights are optional, and are 1 if not given.
+    """
+    name = "graph_build"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.GRAPH, "g"), FunctionArgument(TokenType.INT, "n"),
+            FunctionArgument(TokenType.INT, "from", 1), FunctionArgument(TokenType.INT, "to", 1)]
+    variadic = FunctionArgument(TokenType.INT, "w", 1)
+
+    @staticmethod
+    def run(stack):
+        build_graph(stack, False)
+
+
+class GraphBuildUndirected(LibraryFunction):
+    """Library function that builds a graph like `graph_build`, with every edge going in both directions."""
+    name = "graph_build_undirected"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.GRAPH, "g"), FunctionArgument(TokenType.INT, "n"),
+            FunctionArgument(TokenType.INT, "from", 1), FunctionArgument(TokenType.INT, "to", 1)]
+    variadic = FunctionArgument(TokenType.INT, "w", 1)
+
+    @staticmethod
+    def run(stack):
+        build_graph(stack, True)
+
+
+class GraphNodes(LibraryFunction):
+    """Library function that returns the number of nodes in a graph."""
+    name = "graph_nodes"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.GRAPH, "g")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, stack.get("g").size))
+
+
+class GraphEdges(LibraryFunction):
+    """Library function that returns the number of directed edges in a graph."""
+    name = "graph_edges"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.GRAPH, "g")]
+
+    @staticmethod
+    def run(stack):
+        raise ReturnException(build_value(TokenType.INTL, len(stack.get("g").value)))
+
+
+class Bfs(LibraryFunction):
+    """
+    Library function that stores the smallest number of edges on a path from node `s` to each node in `dist`, or -1
+    if there is no path. The optional `parent` array gets the node before each node on its path.
+    """
+    name = "bfs"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.GRAPH, "g"), FunctionArgument(TokenType.INT, "s"),
+            FunctionArgument(TokenType.INT, "dist", 1)]
+    variadic = FunctionArgument(TokenType.INT, "parent", 1)
+
+    @staticmethod
+    def run(stack):
+        g = stack.get("g")
+        store_search(stack, *graphs.bfs(g.offsets, g.value, start_node(stack)))
+
+
+class Dijkstra(LibraryFunction):
+    """
+    Library function that stores the smallest total weight of a path from node `s` to each node in `dist`, or -1 if
+    there is no path. The weights must not be negative. The optional `parent` array gets the node before each node on
+    its path.
+    """
+    name = "dijkstra"
+    type = TokenType.VOID
+    args = [FunctionArgument(TokenType.GRAPH, "g"), FunctionArgument(TokenType.INT, "s"),
+            FunctionArgument(TokenType.INT, "dist", 1)]
+    variadic = FunctionArgument(TokenType.INT, "parent", 1)
+
+    @staticmethod
+    def run(stack):
+        g = stack.get("g")
+        s = start_node(stack)
+        if len(g.weights) != 0 and min(g.weights) < 0:
+            raise LibraryError(ErrorCode.NEGATIVE_WEIGHT)
+        store_search(stack, *graphs.dijkstra(g.offsets, g.value, g.weights, s))
+
+
+class Components(LibraryFunction):
+    """
+    Library function that stores the connected component of each node in `label`, ignoring the direction of the
+    edges, and returns the number of components. Components are numbered from 0 in order of their smallest node.
+    """
+    name = "components"
+    type = TokenType.INT
+    args = [FunctionArgument(TokenType.GRAPH, "g"), FunctionArgument(TokenType.INT, "label", 1)]
+
+    @staticmethod
+    def run(stack):
+        g = stack.get("g")
+        label = stack.get("label")
+        if len(label) != g.size:
+            raise LibraryError(ErrorCode.OUT_OF_BOUNDS)
+        labels, count = graphs.components(g.offsets, g.value)
+        label.store(labels)
+        raise ReturnException(build_value(TokenType.INTL, count))
 
 
 # Add all functions defined earlier into a dictionary.
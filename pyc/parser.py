@@ -4,12 +4,34 @@ Paul Chen
 This file holds the `Parser` class that converts tokens into an abstract syntax tree.
 """
 
-from typing import Callable, List, Tuple, Union
+from typing import Callable, List, Optional, Tuple, Union
 
 import ast_nodes
 from error import ErrorCode, ParserError
 from lexer import Lexer
 from tokens import Token, TokenType
+from value import identifier_to_object
+
+# Maps the container types, which cannot be declared as arrays, to the types accepted by each of their type arguments.
+CONTAINER_TYPES = {
+    TokenType.MAP: ((TokenType.INT, TokenType.STRING), (TokenType.INT, TokenType.FLOAT, TokenType.STRING)),
+    TokenType.VECTOR: ((TokenType.INT, TokenType.FLOAT, TokenType.STRING),),
+    TokenType.PRIORITY_QUEUE: (),
+    TokenType.GRAPH: (),
+}
+
+# The keywords that can start a declaration. The other types are read as identifiers (see `TYPE_NAMES`).
+DECLARATION_TYPES = (TokenType.INT, TokenType.FLOAT, TokenType.STRING)
+
+# Maps the types that are not keywords to their token types. Like struct names, they are read as identifiers and only
+# name a type where a type is expected, so they can still be used as variable names.
+TYPE_NAMES = {
+    "map": TokenType.MAP,
+    "priority_queue": TokenType.PRIORITY_QUEUE,
+    "vector": TokenType.VECTOR,
+    "bitset": TokenType.BITSET,
+    "graph": TokenType.GRAPH,
+}
 
 
 class Parser(object):
@@ -21,6 +43,7 @@ class Parser(object):
     Attributes:
         lexer (Lexer): the lexer that converts the code into tokens.
         current_token (Token): the current token.
+        structs (Dict[str, StructDefinition]): the structs declared so far, by name.
     """
 
     def __init__(self, lexer: Lexer) -> None:
@@ -31,6 +54,7 @@ class Parser(object):
         """
         self.lexer = lexer
         self.current_token = self.lexer.get_next_token()
+        self.structs = {}
 
     def eat_token(self, token_type: Union[TokenType, Tuple[TokenType, ...]]) -> None:
         """
@@ -51,13 +75,17 @@ class Parser(object):
         """
         return self.lexer.peek_nth_next_token(n)
 
+    def is_type_name(self, name: str) -> bool:
+        """Returns whether an identifier names a type, either a struct or one of `TYPE_NAMES`."""
+        return name in self.structs or name in TYPE_NAMES
+
     def parse_term(self) -> ast_nodes.ASTNode:
         """
         term:
             [MINUS | BIT_NOT | LOGICAL_NOT], ((INT | FLOAT | STRING) |
             (LRPAR, expression, LRPAR)) |
             function_call |
-            variable |
+            field_access |
             list
             ;
         """
@@ -98,7 +126,7 @@ class Parser(object):
 
         # If the next token is a variable.
         else:
-            return self.parse_variable()
+            return self.parse_field_access()
 
     def parse_initializer_list(self) -> ast_nodes.InitializerListLiteralNode:
         """list: LCPAR, [expression, {COMMA, expression}], RCPAR;"""
@@ -113,20 +141,50 @@ class Parser(object):
         return ast_nodes.InitializerListLiteralNode(list_elements)
 
     def parse_variable(self) -> ast_nodes.VariableNode:
-        """variable: TYPE, [LSPAR, expression, RSPAR];"""
+        """variable: TYPE, {LSPAR, expression, RSPAR}, [LSPAR, [expression], COLON, [expression], RSPAR];"""
         token = self.current_token
         self.eat_token(TokenType.TYPE)
         indices = []
         while self.current_token.type == TokenType.LSPAR:
             self.eat_token(TokenType.LSPAR)
-            if self.current_token.type != TokenType.RSPAR:
+            if self.current_token.type not in (TokenType.RSPAR, TokenType.COLON):
                 expr_index = self.parse_expression()
             else:
                 expr_index = ast_nodes.NoOperationStatementNode()
+
+            # Parses a slice, which must be the last index. Ex. `a[lo:hi]`, `a[:hi]`, `a[lo:]`.
+            if self.current_token.type == TokenType.COLON:
+                slice_token = self.current_token
+                self.eat_token(TokenType.COLON)
+                lower = None if isinstance(expr_index, ast_nodes.NoOperationStatementNode) else expr_index
+                upper = self.parse_expression() if self.current_token.type != TokenType.RSPAR else None
+                self.eat_token(TokenType.RSPAR)
+                indices.append(ast_nodes.SliceNode(lower, upper, slice_token))
+                break
+
             self.eat_token(TokenType.RSPAR)
             indices.append(expr_index)
         return ast_nodes.VariableNode(token.type, token.value, indices, token)
 
+    def parse_field_access(self) -> Union[ast_nodes.VariableNode, ast_nodes.FieldAccessNode]:
+        """field_access: variable, [DOT, TYPE];"""
+        variable = self.parse_variable()
+        if self.current_token.type != TokenType.DOT:
+            return variable
+        self.eat_token(TokenType.DOT)
+        field = self.current_token
+        self.eat_token(TokenType.TYPE)
+
+        # Finds the position of the field in every struct that has it. A slice of an array has no fields.
+        layouts = {definition.name: (definition.offsets[field.value],
+                                     definition.field_types[definition.offsets[field.value]])
+                   for definition in self.structs.values() if field.value in definition.offsets}
+        if len(layouts) == 0:
+            self.error(ErrorCode.ID_NOT_FOUND, field)
+        if len(variable.indices) != 0 and isinstance(variable.indices[-1], ast_nodes.SliceNode):
+            self.error(ErrorCode.MISMATCHED_TYPE, field)
+        return ast_nodes.FieldAccessNode(variable, field.value, layouts, field)
+
     def operation(self, operations: Tuple[TokenType, ...], lower_prec: Callable) -> ast_nodes.ASTNode:
         """
         Function that handles a series of binary operations with the same precedence (Ex. "*", "/", and "%").
@@ -174,27 +232,69 @@ class Parser(object):
     # The function `parse_expression` points to the operator with the lowest precedence.
     parse_expression = parse_logical_operation
 
+    def parse_type(self) -> Tuple[TokenType, Optional[Tuple[Union[TokenType, ast_nodes.StructDefinition], ...]]]:
+        """
+        type:
+            INT | FLOAT | STRING | TYPE |
+            (TYPE, LESS, (INT | FLOAT | STRING), {COMMA, (INT | FLOAT | STRING)}, GREATER);
+        Returns:
+            Tuple[TokenType, Optional[Tuple[Union[TokenType, StructDefinition], ...]]]: the type, and its type
+                arguments if it has any. The type of a struct is STRUCT, and its type argument is its definition.
+        """
+        # Reads the name of a struct, or of a type that is not a keyword.
+        token = self.current_token
+        if token.type == TokenType.TYPE and token.value in self.structs:
+            self.eat_token(TokenType.TYPE)
+            return TokenType.STRUCT, (self.structs[token.value],)
+        if token.type == TokenType.TYPE and token.value in TYPE_NAMES:
+            token_type = TYPE_NAMES[token.value]
+            self.eat_token(TokenType.TYPE)
+        else:
+            token_type = token.type
+            self.eat_token(DECLARATION_TYPES)
+        if not CONTAINER_TYPES.get(token_type):
+            return token_type, None
+
+        # Reads the type arguments, ex. `<int, string>`.
+        type_arguments = []
+        self.eat_token(TokenType.LESS)
+        for i, accepted_types in enumerate(CONTAINER_TYPES[token_type]):
+            if i != 0:
+                self.eat_token(TokenType.COMMA)
+            type_arguments.append(self.current_token.type)
+            self.eat_token(accepted_types)
+        self.eat_token(TokenType.GREATER)
+        return token_type, tuple(type_arguments)
+
     def parse_declaration_statement(self) -> ast_nodes.DeclarationStatementNode:
-        """declaration_statement: (INT | FLOAT | STRING), variable, [ASSIGN, expression]; """
-        token_type = self.current_token.type
-        self.eat_token((TokenType.INT, TokenType.FLOAT, TokenType.STRING))
+        """
+        declaration_statement: type, variable, [ASSIGN, expression];
+        """
+        token_type, type_arguments = self.parse_type()
         name = self.parse_variable()
+
+        # Containers cannot be declared as arrays, and bitsets can only be given a number of bits.
+        if (token_type in CONTAINER_TYPES and len(name.indices) != 0) or \
+                (token_type == TokenType.BITSET and len(name.indices) > 1):
+            self.error(ErrorCode.MISMATCHED_TYPE, name.token)
+
         if self.current_token.type == TokenType.SEMI:
-            return ast_nodes.DeclarationStatementNode(token_type, name, ast_nodes.NoOperationStatementNode())
+            return ast_nodes.DeclarationStatementNode(token_type, name, ast_nodes.NoOperationStatementNode(),
+                                                      type_arguments)
         else:
             self.eat_token(TokenType.ASSIGN)
             expr = self.parse_expression()
-            return ast_nodes.DeclarationStatementNode(token_type, name, expr)
+            return ast_nodes.DeclarationStatementNode(token_type, name, expr, type_arguments)
 
     def parse_assignment_statement(self) -> ast_nodes.AssignmentStatementNode:
         """
         assignment_statement
-            variable,
+            field_access,
             (ASSIGN | PLUS_ASSIGN | MINUS_ASSIGN | MUL_ASSIGN | DIV_ASSIGN | MOD_ASSIGN | BIT_AND_ASSIGN |
             BIT_OR_ASSIGN | BIT_XOR_ASSIGN | BIT_LSHIFT_ASSIGN | BIT_RSHIFT_ASSIGN),
             expression;
         """
-        variable = self.parse_variable()
+        variable = self.parse_field_access()
         token = self.current_token
 
         # Runs if the next token is an assignment statement operator.
@@ -210,9 +310,12 @@ class Parser(object):
         node = ast_nodes.NoOperationStatementNode()
         if self.current_token.type == TokenType.TYPE and self.peek_nth_next_token(0).type == TokenType.LRPAR:
             node = self.parse_function_call_statement()
+        elif self.current_token.type == TokenType.TYPE and self.is_type_name(self.current_token.value) and \
+                self.peek_nth_next_token(0).type in (TokenType.TYPE, TokenType.LESS):
+            node = self.parse_declaration_statement()
         elif self.current_token.type == TokenType.TYPE:
             node = self.parse_assignment_statement()
-        elif self.current_token.type in (TokenType.INT, TokenType.FLOAT, TokenType.STRING):
+        elif self.current_token.type in DECLARATION_TYPES:
             node = self.parse_declaration_statement()
         else:
             self.error(ErrorCode.UNEXPECTED_TOKEN, self.current_token)
@@ -221,13 +324,16 @@ class Parser(object):
     def parse_statement(self) -> ast_nodes.ASTNode:
         """
         statement:
-            (block | while_statement | do_while_statement | for_statement | if_else_statement | SEMI |
+            (block | while_statement | do_while_statement | for_statement | if_else_statement |
+            switch_statement | SEMI |
             (line_statement, SEMI), break_statement, continue_statement, return_statement);
         """
         if self.current_token.type == TokenType.LCPAR:
             node = self.parse_block_statement()
         elif self.current_token.type == TokenType.IF:
             node = self.parse_if_else_statement()
+        elif self.current_token.type == TokenType.SWITCH:
+            node = self.parse_switch_statement()
         elif self.current_token.type == TokenType.FOR:
             node = self.parse_for_loop()
         elif self.current_token.type == TokenType.WHILE:
@@ -293,8 +399,85 @@ class Parser(object):
                 break
         return ast_nodes.IfElseStatementNode(block_list, last_block)
 
+    @staticmethod
+    def constant_value(node: ast_nodes.ASTNode) -> Optional[Tuple[TokenType, Union[int, float, str]]]:
+        """
+        Returns the type and value of an expression if it is a compile-time constant (a literal, optionally
+        negated), otherwise returns None.
+        """
+        if isinstance(node, ast_nodes.ValueLiteralNode):
+            return node.type, node.value
+        if isinstance(node, ast_nodes.UnaryOperatorNode) and node.operator == TokenType.MINUS:
+            constant = Parser.constant_value(node.operand)
+            if constant is not None and constant[0] in (TokenType.INTL, TokenType.FLOATL):
+                return constant[0], -constant[1]
+        return None
+
+    def parse_switch_statement(self) -> ast_nodes.SwitchStatementNode:
+        """
+        switch_statement:
+            SWITCH, LRPAR, expression, RRPAR, LCPAR,
+                {(CASE, expression, COLON) | (DEFAULT, COLON) | statement},
+            RCPAR;
+        """
+        switch_token = self.current_token
+        self.eat_token(TokenType.SWITCH)
+        self.eat_token(TokenType.LRPAR)
+        expression = self.parse_expression()
+        self.eat_token(TokenType.RRPAR)
+        self.eat_token(TokenType.LCPAR)
+
+        cases = []
+        default = None
+        statements = []
+        while self.current_token.type != TokenType.RCPAR:
+            token = self.current_token
+
+            # Reads a case label, which points to the next statement in the body.
+            if token.type == TokenType.CASE:
+                self.eat_token(TokenType.CASE)
+                cases.append((self.parse_expression(), len(statements), token))
+                self.eat_token(TokenType.COLON)
+
+            # Reads the default label.
+            elif token.type == TokenType.DEFAULT:
+                if default is not None:
+                    self.error(ErrorCode.DUPLICATE_CASE, token)
+                self.eat_token(TokenType.DEFAULT)
+                self.eat_token(TokenType.COLON)
+                default = len(statements)
+
+            # Reads a statement in the body.
+            else:
+                statements.append(self.parse_statement())
+        self.eat_token(TokenType.RCPAR)
+
+        # If every case label is a constant, build a jump table that maps each label to its first statement.
+        jump_table = {}
+        label_types = ()
+        for label, index, token in cases:
+            constant = self.constant_value(label)
+            if constant is None:
+                jump_table = None
+                label_types = ()
+                break
+
+            # Numeric labels cannot be mixed with string labels.
+            types = (TokenType.STRINGL,) if constant[0] == TokenType.STRINGL else (TokenType.INTL, TokenType.FLOATL)
+            if label_types and types != label_types:
+                self.error(ErrorCode.MISMATCHED_TYPE, token)
+            label_types = types
+
+            if constant[1] in jump_table:
+                self.error(ErrorCode.DUPLICATE_CASE, token)
+            jump_table[constant[1]] = index
+
+        return ast_nodes.SwitchStatementNode(expression, [(label, index) for label, index, _ in cases], default,
+                                             statements, jump_table, label_types, switch_token)
+
     def parse_for_loop(self) -> ast_nodes.ForLoopNode:
         """for_loop: FOR, LRPAR, line_statement, expression, line_statement, RRPAR, block; """
+        token = self.current_token
         self.eat_token(TokenType.FOR)
         self.eat_token(TokenType.LRPAR)
         init = self.parse_single_line_statement()
@@ -304,19 +487,21 @@ class Parser(object):
         inc = self.parse_single_line_statement()
         self.eat_token(TokenType.RRPAR)
         block = self.parse_statement()
-        return ast_nodes.ForLoopNode(init, expr, inc, block)
+        return ast_nodes.ForLoopNode(init, expr, inc, block, token)
 
     def parse_while_loop(self) -> ast_nodes.WhileLoopNode:
         """while_loop: WHILE, LRPAR, expression, RRPAR, block; """
+        token = self.current_token
         self.eat_token(TokenType.WHILE)
         self.eat_token(TokenType.LRPAR)
         expr = self.parse_expression()
         self.eat_token(TokenType.RRPAR)
         block = self.parse_statement()
-        return ast_nodes.WhileLoopNode(expr, block)
+        return ast_nodes.WhileLoopNode(expr, block, token)
 
     def parse_do_while_loop(self) -> ast_nodes.DoWhileLoopNode:
         """do_while_loop: DO, statement, WHILE, LRPAR, expression, RRPAR, SEMI; """
+        token = self.current_token
         self.eat_token(TokenType.DO)
         block = self.parse_statement()
         self.eat_token(TokenType.WHILE)
@@ -324,7 +509,7 @@ class Parser(object):
         expr = self.parse_expression()
         self.eat_token(TokenType.RRPAR)
         self.eat_token(TokenType.SEMI)
-        return ast_nodes.DoWhileLoopNode(expr, block)
+        return ast_nodes.DoWhileLoopNode(expr, block, token)
 
     def parse_break_statement(self) -> ast_nodes.BreakStatementNode:
         """break_statement: BREAK, SEMI;"""
@@ -352,13 +537,33 @@ class Parser(object):
             self.eat_token(TokenType.SEMI)
             return ast_nodes.ReturnStatementNode(expr, curr_token)
 
+    def parse_function_argument(self) -> ast_nodes.FunctionArgument:
+        """function_argument: type, variable;"""
+        arg_type, type_arguments = self.parse_type()
+        var = self.parse_variable()
+        if (arg_type in CONTAINER_TYPES or arg_type == TokenType.BITSET) and len(var.indices) != 0:
+            self.error(ErrorCode.MISMATCHED_TYPE, var.token)
+        return ast_nodes.FunctionArgument(arg_type, var.name, len(var.indices), type_arguments)
+
     def parse_function_declaration_statement(self) -> ast_nodes.FunctionDeclarationStatementNode:
         """
-        function_declaration:
+        function_declaration: function_signature, block;
+        """
+        token_type, name, args = self.parse_function_signature()
+
+        # Reads the main function body.
+        body = self.parse_block_statement()
+
+        return ast_nodes.FunctionDeclarationStatementNode(token_type, name, args, body)
+
+    def parse_function_signature(self) -> Tuple[TokenType, ast_nodes.VariableNode, List[ast_nodes.FunctionArgument]]:
+        """
+        function_signature:
             (VOID | INT | FLOAT | STRING), variable, LRPAR,
-                ([(INT | FLOAT | STRING), variable, [COMMA, ((INT | FLOAT | STRING), variable)]]),
-            RRPAR,
-            block;
+                ([function_argument, {COMMA, function_argument}]),
+            RRPAR;
+        Returns:
+            Tuple[TokenType, VariableNode, List[FunctionArgument]]: the return type, name and arguments of the function.
         """
         # Read the type and name of function.
         token_type = self.current_token.type
@@ -375,25 +580,15 @@ class Parser(object):
         if self.current_token.type != TokenType.RRPAR:
 
             # Reads the first function argument.
-            arg_type = self.current_token.type
-            self.eat_token((TokenType.INT, TokenType.FLOAT, TokenType.STRING))
-            var = self.parse_variable()
-            args.append(ast_nodes.FunctionArgument(arg_type, var.name, len(var.indices)))
+            args.append(self.parse_function_argument())
 
             # Keeps reading all the other ones.
             while self.current_token.type != TokenType.RRPAR:
                 self.eat_token(TokenType.COMMA)
-                arg_type = self.current_token.type
-                self.eat_token((TokenType.INT, TokenType.FLOAT, TokenType.STRING))
-                var = self.parse_variable()
-                args.append(ast_nodes.FunctionArgument(arg_type, var.name, len(var.indices)))
+                args.append(self.parse_function_argument())
 
         self.eat_token(TokenType.RRPAR)
-
-        # Reads the main function body.
-        body = self.parse_block_statement()
-
-        return ast_nodes.FunctionDeclarationStatementNode(token_type, name, args, body)
+        return token_type, name, args
 
     def parse_function_call_statement(self) -> ast_nodes.FunctionCallStatementNode:
         """
@@ -413,11 +608,42 @@ class Parser(object):
         self.eat_token(TokenType.RRPAR)
         return ast_nodes.FunctionCallStatementNode(variable.name, args, variable.token)
 
+    def parse_struct_declaration(self) -> ast_nodes.StructDefinition:
+        """struct_declaration: STRUCT, TYPE, LCPAR, {(INT | FLOAT | STRING), TYPE, SEMI}, RCPAR, SEMI;"""
+        self.eat_token(TokenType.STRUCT)
+        name = self.current_token
+        self.eat_token(TokenType.TYPE)
+        if name.value in self.structs:
+            self.error(ErrorCode.DUPLICATE_ID, name)
+
+        # Reads the fields, which are stored in the order in which they are declared.
+        field_names = []
+        field_types = []
+        self.eat_token(TokenType.LCPAR)
+        while self.current_token.type != TokenType.RCPAR:
+            field_type = self.current_token.type
+            self.eat_token((TokenType.INT, TokenType.FLOAT, TokenType.STRING))
+            field = self.current_token
+            self.eat_token(TokenType.TYPE)
+            if field.value in field_names:
+                self.error(ErrorCode.DUPLICATE_ID, field)
+            field_names.append(field.value)
+            field_types.append(identifier_to_object(field_type))
+            self.eat_token(TokenType.SEMI)
+        self.eat_token(TokenType.RCPAR)
+        self.eat_token(TokenType.SEMI)
+
+        self.structs[name.value] = ast_nodes.StructDefinition(name.value, field_names, field_types)
+        return self.structs[name.value]
+
     def parse_program(self) -> ast_nodes.ProgramNode:
-        """program: {function_declaration | declaration_statement}"""
+        """program: {function_declaration | declaration_statement | struct_declaration}"""
         statements = []
         while self.current_token.type != TokenType.EOF:
-            if self.peek_nth_next_token(1).type == TokenType.LRPAR:
+            # Structs are only needed while parsing, since their definitions are stored in the nodes that use them.
+            if self.current_token.type == TokenType.STRUCT:
+                self.parse_struct_declaration()
+            elif self.peek_nth_next_token(1).type == TokenType.LRPAR:
                 statements.append(self.parse_function_declaration_statement())
             else:
                 statements.append(self.parse_declaration_statement())
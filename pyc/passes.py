@@ -0,0 +1,559 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `PassManager` class and the optimization passes that it runs on the abstract syntax tree, after
+the parser has built it and before the interpreter runs it.
+"""
+
+import copy
+import time
+from typing import List, Optional, Set, Tuple
+
+import ast_nodes
+from library import LIBRARY_FUNCTIONS
+from parser import Parser
+from profiler import HOT_THRESHOLD, Profile
+from tokens import Token, TokenType
+from value import SPECIALIZED_BINARY_OPERATORS, build_value
+
+
+class Remark(object):
+    """
+    Class that represents a note about an optimization made by a pass.
+
+    Attributes:
+        pass_name (str): the name of the pass that made the optimization.
+        message (str): description of the optimization.
+        token (Optional[Token]): the token closest to the optimized code, used to print its position.
+    """
+
+    def __init__(self, pass_name: str, message: str, token: Optional[Token] = None) -> None:
+        self.pass_name = pass_name
+        self.message = message
+        self.token = token
+
+    def __str__(self) -> str:
+        """String representation of the class instance."""
+        position = f"{self.token.line}:{self.token.column}" if self.token is not None else "?:?"
+        return f"position={position} [{self.pass_name}] {self.message}"
+
+    __repr__ = __str__
+
+
+def describe(node: ast_nodes.ASTNode) -> str:
+    """Returns a short piece of code that represents an expression, used in remarks."""
+    if isinstance(node, ast_nodes.ValueLiteralNode):
+        return f"\"{node.value}\"" if node.type == TokenType.STRINGL else str(node.value)
+    elif isinstance(node, ast_nodes.VariableNode):
+        return node.name + "".join(f"[{describe(index)}]" for index in node.indices)
+    elif isinstance(node, ast_nodes.FieldAccessNode):
+        return f"{describe(node.record)}.{node.field}"
+    elif isinstance(node, ast_nodes.SliceNode):
+        return ":".join(describe(bound) if bound is not None else "" for bound in (node.lower, node.upper))
+    elif isinstance(node, ast_nodes.UnaryOperatorNode):
+        return f"{node.operator.value}{describe(node.operand)}"
+    elif isinstance(node, ast_nodes.CastOperatorNode):
+        return f"({node.operator.value}) {describe(node.operand)}"
+    elif isinstance(node, ast_nodes.BinaryOperatorNode):
+        operands = [describe(node.left_operand), describe(node.right_operand)]
+        for i, operand in enumerate((node.left_operand, node.right_operand)):
+            if isinstance(operand, ast_nodes.BinaryOperatorNode):
+                operands[i] = f"({operands[i]})"
+        return f"{operands[0]} {node.operator.value} {operands[1]}"
+    elif isinstance(node, ast_nodes.FunctionCallStatementNode):
+        return f"{node.name}({', '.join(describe(arg) for arg in node.args)})"
+    elif isinstance(node, ast_nodes.LoopInvariantNode):
+        return describe(node.expression)
+    return type(node).__name__
+
+
+class OptimizationPass(object):
+    """
+    Class that represents an optimization pass. Every subclass is added to the pass registry, and the passes run
+    in the order in which they are defined.
+
+    Attributes:
+        name (str): the name of the pass.
+        level (int): the lowest optimization level at which the pass runs.
+        requires_profile (bool): whether the pass only runs when a profile is provided.
+    """
+    name = None
+    level = 0
+    requires_profile = False
+
+    @classmethod
+    def is_enabled(cls, manager: "PassManager") -> bool:
+        """Checks if the pass should be run by a pass manager."""
+        return manager.level >= cls.level and (not cls.requires_profile or manager.profile is not None)
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        """The body of the pass, which returns the optimized tree."""
+        return tree
+
+
+"""
+The next few functions are used by several passes to find out which variables a piece of code can change.
+"""
+
+
+def changed_names(node: ast_nodes.ASTNode) -> Set[str]:
+    """Returns the names of all the variables that are assigned or declared inside a node."""
+    names = set()
+    for child in ast_nodes.walk(node):
+        if isinstance(child, ast_nodes.AssignmentStatementNode):
+            names.add(child.variable.name)
+        elif isinstance(child, ast_nodes.DeclarationStatementNode):
+            names.add(child.variable.name)
+    return names
+
+
+def declared_names(node: ast_nodes.ASTNode) -> Set[str]:
+    """Returns the names of all the variables that are declared inside a node."""
+    return {child.variable.name for child in ast_nodes.walk(node)
+            if isinstance(child, ast_nodes.DeclarationStatementNode)}
+
+
+def calls_user_function(node: ast_nodes.ASTNode) -> bool:
+    """Checks if a node calls a function that is not a library function. Such a function could change globals."""
+    return any(isinstance(child, ast_nodes.FunctionCallStatementNode) and child.name not in LIBRARY_FUNCTIONS
+               for child in ast_nodes.walk(node))
+
+
+def global_names(tree: ast_nodes.ProgramNode) -> Set[str]:
+    """Returns the names of all the global variables in a program."""
+    return {node.variable.name for node in tree.functions if isinstance(node, ast_nodes.DeclarationStatementNode)}
+
+
+def is_invariant(node: ast_nodes.ASTNode, changed: Set[str]) -> bool:
+    """
+    Checks if an expression always has the same value while none of the variables in `changed` are modified. Only
+    expressions made of literals, scalar variables and operators qualify, since array elements can be modified
+    through a reference and functions can have side effects.
+    """
+    if isinstance(node, (ast_nodes.ValueLiteralNode, ast_nodes.LoopInvariantNode)):
+        return True
+    elif isinstance(node, ast_nodes.VariableNode):
+        return len(node.indices) == 0 and node.name not in changed
+    elif isinstance(node, (ast_nodes.UnaryOperatorNode, ast_nodes.CastOperatorNode)):
+        return is_invariant(node.operand, changed)
+    elif isinstance(node, ast_nodes.BinaryOperatorNode):
+        return is_invariant(node.left_operand, changed) and is_invariant(node.right_operand, changed)
+    return False
+
+
+def loop_changed_names(tree: ast_nodes.ProgramNode, loop: ast_nodes.ASTNode) -> Set[str]:
+    """
+    Returns the names of the variables that may change while a loop runs. If the loop calls a user-defined function,
+    every global variable may change as well.
+    """
+    changed = changed_names(loop)
+    if calls_user_function(loop):
+        changed |= global_names(tree)
+    return changed
+
+
+class ConstantFoldingPass(OptimizationPass):
+    """Pass that evaluates operators whose operands are all literals, and replaces them with the result."""
+    name = "constant-folding"
+    level = 1
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        def literal(node: ast_nodes.ASTNode):
+            return build_value(node.type, node.value)
+
+        def fold(node: ast_nodes.ASTNode) -> ast_nodes.ASTNode:
+            # Finds the operation that can be computed ahead of time.
+            operation = None
+            if type(node) is ast_nodes.UnaryOperatorNode and isinstance(node.operand, ast_nodes.ValueLiteralNode):
+                operation = literal(node.operand).unary_operator(node.operator)
+            elif type(node) is ast_nodes.CastOperatorNode and isinstance(node.operand, ast_nodes.ValueLiteralNode):
+                operation = literal(node.operand).cast_operator(node.operator)
+            elif type(node) is ast_nodes.BinaryOperatorNode and \
+                    isinstance(node.left_operand, ast_nodes.ValueLiteralNode) and \
+                    isinstance(node.right_operand, ast_nodes.ValueLiteralNode):
+                # Leaves large shifts to run time, since their results can be huge.
+                if node.operator != TokenType.BIT_LSHIFT or node.right_operand.value <= 64:
+                    operation = literal(node.left_operand).binary_operator(node.operator, literal(node.right_operand))
+
+            # Leaves operations that fail to run time, so that they throw their error at the right moment.
+            if operation is None:
+                return node
+            try:
+                result = operation()
+            except (ArithmeticError, ValueError):
+                return node
+
+            folded = ast_nodes.ValueLiteralNode(Token(result.type, result.value, node.token.line, node.token.column))
+            if type(node) is not ast_nodes.UnaryOperatorNode:
+                manager.remark(ConstantFoldingPass.name, f"folded `{describe(node)}` into `{describe(folded)}`",
+                               node.token)
+            return folded
+
+        return ast_nodes.transform(tree, fold)
+
+
+class BranchOrderingPass(OptimizationPass):
+    """
+    Pass that reorders the conditions of if-else statements so that the most frequently taken block is tested first.
+    Only statements whose conditions compare the same variable with different constants are reordered, since their
+    conditions have no side effects and can never be true at the same time.
+    """
+    name = "branch-ordering"
+    requires_profile = True
+
+    @staticmethod
+    def is_exclusive_chain(node: ast_nodes.IfElseStatementNode) -> bool:
+        """Checks if the conditions of an if-else statement can be tested in any order."""
+        name = None
+        constants = set()
+        constant_types = set()
+        for condition, _ in node.conditional:
+            if not isinstance(condition, ast_nodes.BinaryOperatorNode) or condition.operator != TokenType.EQUAL:
+                return False
+            variable = condition.left_operand
+            if not isinstance(variable, ast_nodes.VariableNode) or len(variable.indices) != 0:
+                return False
+            if name is not None and variable.name != name:
+                return False
+            name = variable.name
+
+            constant = Parser.constant_value(condition.right_operand)
+            if constant is None or constant[1] in constants:
+                return False
+            constants.add(constant[1])
+            constant_types.add(constant[0] == TokenType.STRINGL)
+        return len(constant_types) == 1
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        for node in ast_nodes.walk(tree):
+            index = manager.node_id(node)
+            if not isinstance(node, ast_nodes.IfElseStatementNode) or index is None:
+                continue
+            counts = manager.profile.branches.get(index)
+            if counts is None or len(counts) != len(node.conditional) + 1 or \
+                    not BranchOrderingPass.is_exclusive_chain(node):
+                continue
+
+            order = sorted(range(len(node.conditional)), key=lambda i: -counts[i])
+            if order != list(range(len(node.conditional))):
+                node.conditional = [node.conditional[i] for i in order]
+                manager.remark(BranchOrderingPass.name, f"tested `{describe(node.conditional[0][0])}` first",
+                               node.conditional[0][0].token)
+        return tree
+
+
+class OperatorSpecializationPass(OptimizationPass):
+    """Pass that replaces hot binary operators with operators specialized for the operand types seen most often."""
+    name = "operator-specialization"
+    requires_profile = True
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        profile = manager.profile
+
+        def specialize(node: ast_nodes.ASTNode) -> ast_nodes.ASTNode:
+            index = manager.node_id(node)
+            if type(node) is not ast_nodes.BinaryOperatorNode or index is None:
+                return node
+            if profile.node_counts.get(index, 0) < HOT_THRESHOLD or len(profile.operand_types.get(index, {})) == 0:
+                return node
+
+            # Uses the pair of operand types that was seen most often.
+            types = max(profile.operand_types[index].items(), key=lambda item: item[1])[0]
+            left_type, right_type = (TokenType[name] for name in types.split())
+            specialized = SPECIALIZED_BINARY_OPERATORS.get((node.operator, left_type, right_type))
+            if specialized is None:
+                return node
+            manager.remark(OperatorSpecializationPass.name,
+                           f"specialized `{describe(node)}` for {left_type.name} and {right_type.name} operands",
+                           node.token)
+            return ast_nodes.SpecializedBinaryOperatorNode(node, left_type, right_type, *specialized)
+
+        return ast_nodes.transform(tree, specialize)
+
+
+class InliningPass(OptimizationPass):
+    """
+    Pass that inlines calls to functions whose body is a single return statement. The returned expression is copied
+    into every call, which saves running the function block and raising a `ReturnException` on each call. With a
+    profile, only functions that were called often are inlined, unless the optimization level is 2.
+    """
+    name = "inlining"
+    level = 2
+
+    @classmethod
+    def is_enabled(cls, manager: "PassManager") -> bool:
+        return manager.level >= cls.level or manager.profile is not None
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        hot_only = manager.level < InliningPass.level
+
+        # Finds every name that is used by a variable, since a variable can hide a function with the same name.
+        variable_names = changed_names(tree)
+        for node in tree.functions:
+            if isinstance(node, ast_nodes.FunctionDeclarationStatementNode):
+                variable_names.update(arg.name for arg in node.args)
+
+        # Finds the functions that can be inlined.
+        expressions = {}
+        for node in tree.functions:
+            if not isinstance(node, ast_nodes.FunctionDeclarationStatementNode) or node.type == TokenType.VOID:
+                continue
+            if node.variable.name in variable_names:
+                continue
+            if hot_only and manager.profile.function_calls.get(node.variable.name, 0) < HOT_THRESHOLD:
+                continue
+            statements = node.body.statements
+            if len(statements) != 1 or not isinstance(statements[0], ast_nodes.ReturnStatementNode):
+                continue
+            if not isinstance(statements[0].expression, ast_nodes.NoOperationStatementNode):
+                expressions[node.variable.name] = statements[0].expression
+
+        def inline(node: ast_nodes.ASTNode) -> ast_nodes.ASTNode:
+            if type(node) is not ast_nodes.FunctionCallStatementNode or node.name not in expressions:
+                return node
+            manager.remark(InliningPass.name, f"inlined call to `{node.name}`", node.token)
+            return ast_nodes.InlinedFunctionCallStatementNode(node, copy.deepcopy(expressions[node.name]))
+
+        return ast_nodes.transform(tree, inline)
+
+
+class BoundsCheckEliminationPass(OptimizationPass):
+    """
+    Pass that removes the bounds checks on array accesses indexed by the counter of a for loop, such as `a[i]` in
+    `for (int i = 0; i < n; i += 1)`. The loop is split into two versions, and the version without the checks runs
+    only if the start and the limit of the counter fit inside the arrays when the loop starts.
+    """
+    name = "bounds-check-elimination"
+    level = 2
+
+    @staticmethod
+    def counter_range(node: ast_nodes.ForLoopNode) -> Optional[Tuple[str, ast_nodes.ASTNode, ast_nodes.ASTNode,
+                                                                     bool]]:
+        """
+        Finds the loop counter of a for loop that counts upwards from `start` to `limit`.
+        Returns:
+            Optional[Tuple[str, ASTNode, ASTNode, bool]]: the name of the counter, the start and limit expressions,
+                and whether the limit is inclusive. Returns None if the loop does not have this form.
+        """
+        # Reads the initialization, either `int i = start` or `i = start`.
+        init = node.initialization
+        if isinstance(init, ast_nodes.DeclarationStatementNode) and init.type == TokenType.INT and \
+                len(init.variable.indices) == 0:
+            counter, start = init.variable.name, init.expression
+        elif isinstance(init, ast_nodes.AssignmentStatementNode) and init.operator == TokenType.ASSIGN and \
+                len(init.variable.indices) == 0:
+            counter, start = init.variable.name, init.expression
+        else:
+            return None
+
+        def is_counter(expr: ast_nodes.ASTNode) -> bool:
+            return isinstance(expr, ast_nodes.VariableNode) and expr.name == counter and len(expr.indices) == 0
+
+        # Reads the condition, either `i < limit`, `i <= limit`, `limit > i` or `limit >= i`.
+        condition = node.condition
+        if not isinstance(condition, ast_nodes.BinaryOperatorNode):
+            return None
+        if condition.operator in (TokenType.LESS, TokenType.LESS_EQUAL) and is_counter(condition.left_operand):
+            limit, inclusive = condition.right_operand, condition.operator == TokenType.LESS_EQUAL
+        elif condition.operator in (TokenType.GREATER, TokenType.GREATER_EQUAL) and \
+                is_counter(condition.right_operand):
+            limit, inclusive = condition.left_operand, condition.operator == TokenType.GREATER_EQUAL
+        else:
+            return None
+
+        # Reads the increment, either `i += step` or `i = i + step`, where `step` is a positive int literal.
+        increment = node.increment
+        if not isinstance(increment, ast_nodes.AssignmentStatementNode) or not is_counter(increment.variable):
+            return None
+        step = None
+        if increment.operator == TokenType.PLUS_ASSIGN:
+            step = increment.expression
+        elif increment.operator == TokenType.ASSIGN and isinstance(increment.expression, ast_nodes.BinaryOperatorNode) \
+                and increment.expression.operator == TokenType.PLUS and is_counter(increment.expression.left_operand):
+            step = increment.expression.right_operand
+        if not isinstance(step, ast_nodes.ValueLiteralNode) or step.type != TokenType.INTL or step.value <= 0:
+            return None
+
+        return counter, start, limit, inclusive
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        def counter_dimensions(node: ast_nodes.VariableNode, counter: str) -> Set[int]:
+            """Returns the dimensions of an array access that are indexed by the loop counter."""
+            return {i for i, index in enumerate(node.indices) if isinstance(index, ast_nodes.VariableNode) and
+                    index.name == counter and len(index.indices) == 0}
+
+        def eliminate(node: ast_nodes.ASTNode) -> ast_nodes.ASTNode:
+            if type(node) is not ast_nodes.ForLoopNode:
+                return node
+            counter_range = BoundsCheckEliminationPass.counter_range(node)
+            if counter_range is None:
+                return node
+            counter, start, limit, inclusive = counter_range
+
+            # The counter must only be changed by the increment, and the start and limit must not change.
+            changed = loop_changed_names(tree, node.block)
+            if counter in changed or not is_invariant(start, {counter}) or \
+                    not is_invariant(limit, changed | {counter}):
+                return node
+
+            # Finds the array accesses that are indexed by the counter. Arrays cannot be reassigned, so only arrays
+            # that are declared inside the loop are skipped.
+            declared = declared_names(node.block)
+            arrays = set()
+            accesses = []
+            for child in ast_nodes.walk(node.block):
+                if isinstance(child, ast_nodes.VariableNode) and child.name not in declared:
+                    dimensions = counter_dimensions(child, counter)
+                    arrays.update((child.name, dimension) for dimension in dimensions)
+                    if len(dimensions) != 0:
+                        accesses.append(child)
+            if len(arrays) == 0:
+                return node
+
+            # Builds the version of the loop without the bounds checks on the counter.
+            unchecked_loop = copy.deepcopy(node)
+            for child in ast_nodes.walk(unchecked_loop.block):
+                if isinstance(child, ast_nodes.VariableNode) and child.name not in declared:
+                    child.unchecked_dimensions = child.unchecked_dimensions | counter_dimensions(child, counter)
+
+            for access in accesses:
+                manager.remark(BoundsCheckEliminationPass.name, f"removed bounds check on `{describe(access)}`",
+                               access.token)
+            return ast_nodes.VersionedLoopNode(copy.deepcopy(start), copy.deepcopy(limit), inclusive,
+                                               sorted(arrays), node, unchecked_loop)
+
+        return ast_nodes.transform(tree, eliminate)
+
+
+class LoopInvariantHoistingPass(OptimizationPass):
+    """
+    Pass that hoists the parts of a loop condition that do not change while the loop runs (ex. `n * 2` in
+    `i < n * 2`), so that they are evaluated once instead of on every iteration.
+    """
+    name = "loop-invariant-hoisting"
+    level = 2
+
+    @staticmethod
+    def run(tree: ast_nodes.ProgramNode, manager: "PassManager") -> ast_nodes.ProgramNode:
+        def hoist(node: ast_nodes.ASTNode) -> ast_nodes.ASTNode:
+            if type(node) not in (ast_nodes.ForLoopNode, ast_nodes.WhileLoopNode):
+                return node
+            changed = loop_changed_names(tree, node)
+            invariants = []
+
+            def hoist_from(expr: ast_nodes.ASTNode) -> ast_nodes.ASTNode:
+                """Replaces the largest loop-invariant operations in an expression with LoopInvariantNodes."""
+                if isinstance(expr, (ast_nodes.UnaryOperatorNode, ast_nodes.CastOperatorNode)):
+                    if is_invariant(expr, changed):
+                        invariants.append(ast_nodes.LoopInvariantNode(expr))
+                        return invariants[-1]
+                    expr.operand = hoist_from(expr.operand)
+                elif isinstance(expr, ast_nodes.BinaryOperatorNode):
+                    if is_invariant(expr, changed):
+                        invariants.append(ast_nodes.LoopInvariantNode(expr))
+                        return invariants[-1]
+                    expr.left_operand = hoist_from(expr.left_operand)
+                    expr.right_operand = hoist_from(expr.right_operand)
+                return expr
+
+            # The condition runs at least once, so evaluating its invariant parts before the loop is always safe.
+            node.condition = hoist_from(node.condition)
+            if len(invariants) == 0:
+                return node
+            for invariant in invariants:
+                manager.remark(LoopInvariantHoistingPass.name,
+                               f"hoisted `{describe(invariant.expression)}` out of the loop", node.token)
+            return ast_nodes.HoistedLoopNode(invariants, node)
+
+        return ast_nodes.transform(tree, hoist)
+
+
+# Add all passes defined earlier into a dictionary, in the order in which they run.
+OPTIMIZATION_PASSES = {
+    optimization_pass.name: optimization_pass
+    for optimization_pass in OptimizationPass.__subclasses__()
+}
+
+
+class PassManager(object):
+    """
+    Class that runs the optimization passes enabled by an optimization level on the abstract syntax tree.
+
+    Level 0 runs no passes (except the ones that use a profile, when one is provided), which gives the fastest start.
+    Level 1 runs passes that are cheap to run. Level 2 also runs passes that take longer to run but make loops and
+    function calls faster.
+
+    Attributes:
+        level (int): the optimization level.
+        profile (Optional[Profile]): profile of a previous run of the program.
+        timings (List[Tuple[str, float]]): the name of each pass that was run, and the number of seconds it took.
+        remarks (List[Remark]): notes about the optimizations made by the passes.
+        node_ids (Dict[int, int]): maps the `id` of each node in the parsed tree to its number in the profile.
+        nodes (List[ASTNode]): the nodes of the parsed tree, kept so that their `id`s are not reused.
+    """
+
+    def __init__(self, level: int = 0, profile: Optional[Profile] = None) -> None:
+        """
+        Inits pass manager class.
+        Args:
+            level (int): the optimization level.
+            profile (Optional[Profile]): profile of a previous run of the program.
+        """
+        self.level = level
+        self.profile = profile
+        self.timings = []
+        self.remarks = []
+        self.node_ids = {}
+        self.nodes = []
+
+    def enabled_passes(self) -> List[type]:
+        """Returns the passes that are enabled, in the order in which they run."""
+        return [optimization_pass for optimization_pass in OPTIMIZATION_PASSES.values()
+                if optimization_pass.is_enabled(self)]
+
+    def node_id(self, node: ast_nodes.ASTNode) -> Optional[int]:
+        """Returns the number of a node in the profile, or None if the node was not in the parsed tree."""
+        return self.node_ids.get(id(node))
+
+    def remark(self, pass_name: str, message: str, token: Optional[Token] = None) -> None:
+        """Records a note about an optimization, unless the same note has already been recorded."""
+        remark = Remark(pass_name, message, token)
+        if all(str(remark) != str(other) for other in self.remarks):
+            self.remarks.append(remark)
+
+    def run(self, tree: ast_nodes.ProgramNode) -> ast_nodes.ProgramNode:
+        """
+        Runs the enabled passes on a tree.
+        Args:
+            tree (ProgramNode): the abstract syntax tree.
+        Returns:
+            ProgramNode: the optimized tree.
+        """
+        if self.profile is not None:
+            self.nodes = list(ast_nodes.walk(tree))
+            self.node_ids = {id(node): i for i, node in enumerate(self.nodes)}
+
+        for optimization_pass in self.enabled_passes():
+            start = time.perf_counter()
+            tree = optimization_pass.run(tree, self)
+            self.timings.append((optimization_pass.name, time.perf_counter() - start))
+        return tree
+
+    def timing_report(self) -> str:
+        """Returns a report of the time taken by each pass."""
+        lines = [f"Optimization passes (-O{self.level}):"]
+        for name, seconds in self.timings:
+            lines.append(f"  {name:<28} {seconds * 1000:>9.3f} ms")
+        lines.append(f"  {'total':<28} {sum(seconds for _, seconds in self.timings) * 1000:>9.3f} ms")
+        return "\n".join(lines)
+
+    def remark_report(self) -> str:
+        """Returns a report of the optimizations made by the passes."""
+        return "\n".join([f"Optimization remarks ({len(self.remarks)}):"] +
+                         [f"  {remark}" for remark in self.remarks])
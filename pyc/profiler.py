@@ -0,0 +1,87 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `Profile` class, which records how a program behaved when it was run. The profile is used by the
+optimization passes in `passes.py` to optimize the same program before it is run again.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+from typing import Dict, Optional
+
+import ast_nodes
+
+# Number of times a node has to run before it is considered hot.
+HOT_THRESHOLD = 100
+
+
+class Profile(object):
+    """
+    Class that holds the profile of a run of a program. Nodes are identified by their position in a pre-order walk
+    of the abstract syntax tree (see `number_nodes`), which is the same every time the same program is parsed.
+
+    Attributes:
+        source_hash (str): hash of the source code of the profiled program.
+        node_counts (Dict[int, int]): number of times each node was visited.
+        operand_types (Dict[int, Dict[str, int]]): for each BinaryOperatorNode, the number of times each pair of
+            operand types was seen. Pairs are stored as strings, ex. "INTL INTL".
+        branches (Dict[int, List[int]]): for each IfElseStatementNode, the number of times each block was run. The
+            last element counts the runs where no condition was met.
+        function_calls (Dict[str, int]): number of times each function was called.
+    """
+
+    def __init__(self, source_hash: str) -> None:
+        self.source_hash = source_hash
+        self.node_counts = defaultdict(int)
+        self.operand_types = defaultdict(lambda: defaultdict(int))
+        self.branches = {}
+        self.function_calls = defaultdict(int)
+
+    @staticmethod
+    def hash_source(code: str) -> str:
+        """Returns the hash of the source code of a program."""
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    def matches(self, code: str) -> bool:
+        """Checks if the profile was recorded from the given source code."""
+        return self.source_hash == Profile.hash_source(code)
+
+    def save(self, path: str) -> None:
+        """Saves the profile to a JSON file."""
+        with open(path, "w") as file:
+            json.dump({
+                "source_hash": self.source_hash,
+                "node_counts": self.node_counts,
+                "operand_types": self.operand_types,
+                "branches": self.branches,
+                "function_calls": self.function_calls,
+            }, file, indent=1)
+
+    @staticmethod
+    def load(path: str) -> Optional["Profile"]:
+        """
+        Loads a profile from a JSON file, returning None if it cannot be read (ex. it is missing, truncated or is not a
+        saved profile).
+        """
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+            profile = Profile(data["source_hash"])
+            profile.node_counts.update({int(k): v for k, v in data["node_counts"].items()})
+            for k, v in data["operand_types"].items():
+                profile.operand_types[int(k)].update(v)
+            profile.branches = {int(k): v for k, v in data["branches"].items()}
+            profile.function_calls.update(data["function_calls"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+        return profile
+
+
+def number_nodes(tree: ast_nodes.ASTNode) -> Dict[int, int]:
+    """
+    Numbers the nodes of a tree in pre-order.
+    Returns:
+        Dict[int, int]: maps the `id` of each node to its number.
+    """
+    return {id(node): i for i, node in enumerate(ast_nodes.walk(tree))}
@@ -0,0 +1,192 @@
+"""
+ICS3U
+Paul Chen
+This file holds the buffered standard input and output used by the library functions in `library.py`.
+"""
+
+import mmap
+import os
+import re
+import stat
+import sys
+from typing import List
+
+# Number of characters that are held in the output buffer before it is written out.
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+# Number of bytes read from stdin at a time.
+INPUT_BUFFER_SIZE = 1 << 16
+
+# Matches a token, which is a run of characters that are not whitespace, followed by the whitespace character that
+# ends it (both characters of a "\r\n"). Used to find where a token ends in the input.
+TOKEN_PATTERN = re.compile(rb"(\S+)(?:\r\n|\s)?")
+
+
+class OutputBuffer(object):
+    """
+    Class that collects the text printed by a program and writes it to stdout in large pieces. The buffer is flushed
+    when it is full, before the program reads input, and when the program ends or fails.
+
+    Attributes:
+        parts (List[str]): the text that has not been written yet.
+        size (int): the number of characters in `parts`.
+        unbuffered (bool): whether every piece of text is written out immediately, for interactive sessions.
+    """
+
+    def __init__(self, unbuffered: bool = False) -> None:
+        self.parts = []
+        self.size = 0
+        self.unbuffered = unbuffered
+
+    def write(self, text: str) -> None:
+        """Adds text to the buffer, writing it out if the buffer is full."""
+        self.parts.append(text)
+        self.size += len(text)
+        if self.unbuffered or self.size >= OUTPUT_BUFFER_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes out the text held in the buffer."""
+        if self.parts:
+            # `sys.stdout` is looked up on every flush, so the output follows any redirection of stdout.
+            sys.stdout.write("".join(self.parts))
+            self.parts = []
+            self.size = 0
+        sys.stdout.flush()
+
+
+class InputReader(object):
+    """
+    Class that reads stdin in large blocks and splits it into tokens and lines. When stdin is a regular file, the
+    whole file is memory-mapped instead of being read. Tokens are split off a whole batch of complete lines at a
+    time, so most calls to `next_token` only take the next token from a list. At the end of the input, `next_token`
+    and `next_line` return an empty string.
+
+    Attributes:
+        stream (Optional[TextIO]): the stream being read. The reader starts over if `sys.stdin` is replaced.
+        data (Union[bytes, mmap.mmap]): the input that has been read, from `pos` onwards.
+        pos (int): the position in `data` of the next byte to read, or of the start of the current batch of tokens.
+        eof (bool): whether `data` holds the rest of the input.
+        tokens (List[bytes]): the current batch of tokens.
+        token_index (int): the number of tokens of the batch that have been read.
+        batch_end (int): the position in `data` right after the whitespace that ends the last token of the batch.
+    """
+
+    def __init__(self) -> None:
+        self.stream = None
+        self.data = b""
+        self.pos = 0
+        self.eof = False
+        self.tokens = []
+        self.token_index = 0
+        self.batch_end = 0
+
+    def reset(self, stream) -> None:
+        """Starts reading a new stream, memory-mapping it if it is a regular file."""
+        self.__init__()
+        self.stream = stream
+        try:
+            fileno = stream.fileno()
+            if stat.S_ISREG(os.fstat(fileno).st_mode) and os.fstat(fileno).st_size > 0:
+                self.data = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+                self.pos = os.lseek(fileno, 0, os.SEEK_CUR)
+                self.eof = True
+        except (AttributeError, OSError, ValueError):
+            # The stream is not backed by a file (ex. a pipe, a terminal, or an `io.StringIO`).
+            pass
+
+    def fill(self) -> None:
+        """Reads the next block of stdin, dropping the part of `data` that has already been read."""
+        if hasattr(self.stream, "buffer"):
+            # `read1` returns whatever is available, so interactive input is not held back until the block is full.
+            block = self.stream.buffer.read1(INPUT_BUFFER_SIZE)
+        else:
+            block = self.stream.read(INPUT_BUFFER_SIZE).encode("utf-8")
+        if not block:
+            self.eof = True
+        self.data = self.data[self.pos:] + block
+        self.pos = 0
+
+    def sync(self) -> None:
+        """Moves `pos` past the tokens of the current batch that have been read, and drops the batch."""
+        if self.token_index == len(self.tokens):
+            if self.tokens:
+                self.pos = self.batch_end
+        else:
+            # Only part of the batch has been read, so the end of the last token read is searched for.
+            matches = TOKEN_PATTERN.finditer(self.data, self.pos)
+            for _ in range(self.token_index):
+                self.pos = next(matches).end()
+        self.tokens = []
+        self.token_index = 0
+
+    def next_batch(self) -> bool:
+        """
+        Splits the next batch of complete lines into tokens.
+        Returns:
+            bool: False if the input has no tokens left.
+        """
+        self.sync()
+        while True:
+            # The batch ends at a newline, so that no token or "\r\n" is cut in half by the end of a block.
+            limit = self.data.rfind(b"\n", self.pos, self.pos + INPUT_BUFFER_SIZE) + 1
+            if limit == 0:
+                # The first line is longer than a block.
+                limit = self.data.find(b"\n", self.pos) + 1
+            if limit == 0:
+                limit = len(self.data) if self.eof else -1
+            if limit != -1:
+                self.tokens = self.data[self.pos:limit].split()
+                if self.tokens:
+                    # Finds the end of the last token, and the whitespace character that ends it.
+                    last = self.tokens[-1]
+                    self.batch_end = self.data.rfind(last, self.pos, limit) + len(last)
+                    if self.data[self.batch_end:self.batch_end + 2] == b"\r\n":
+                        self.batch_end += 2
+                    elif self.batch_end < len(self.data):
+                        self.batch_end += 1
+                    return True
+                self.pos = limit
+            if self.eof and self.pos >= len(self.data):
+                return False
+            self.fill()
+
+    def next_token(self) -> str:
+        """Reads a token from stdin, along with the whitespace character that ends it."""
+        if sys.stdin is not self.stream:
+            self.reset(sys.stdin)
+        if self.token_index == len(self.tokens) and not self.next_batch():
+            return ""
+        self.token_index += 1
+        return self.tokens[self.token_index - 1].decode("utf-8", "replace")
+
+    def next_tokens(self, n: int) -> List[bytes]:
+        """Reads up to `n` tokens from stdin, as bytes. Fewer tokens are returned at the end of the input."""
+        if sys.stdin is not self.stream:
+            self.reset(sys.stdin)
+        tokens = []
+        while len(tokens) < n and (self.token_index < len(self.tokens) or self.next_batch()):
+            batch = self.tokens[self.token_index:self.token_index + n - len(tokens)]
+            self.token_index += len(batch)
+            tokens.extend(batch)
+        return tokens
+
+    def next_line(self) -> str:
+        """Reads up to the next newline in stdin. The last line of the input does not need to end with a newline."""
+        if sys.stdin is not self.stream:
+            self.reset(sys.stdin)
+        self.sync()
+        while True:
+            end = self.data.find(b"\n", self.pos)
+            if end != -1 or self.eof:
+                if end == -1:
+                    end = len(self.data)
+                line = self.data[self.pos:end]
+                self.pos = min(end + 1, len(self.data))
+                return line.rstrip(b"\r").decode("utf-8", "replace")
+            self.fill()
+
+
+# The output buffer and input reader shared by all library functions.
+output = OutputBuffer()
+reader = InputReader()
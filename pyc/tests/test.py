@@ -1,14 +1,26 @@
+import array
 import io
+import os
 import sys
+import tempfile
 import unittest
 
+import ffi
+from error import InterpreterError, ParserError
 from lexer import Lexer
 from parser import Parser
-from interpreter import Interpreter
+from interpreter import Interpreter, ProfilingInterpreter
+from closure import ClosureInterpreter
+from vm import VirtualMachine
+from tiered import TieredInterpreter
+from bytecode import BYTECODE_VERSION, BytecodeProgram, disassemble
+from passes import PassManager
+from profiler import Profile
 
 
 class TestInterpreter(unittest.TestCase):
-    def feed_input_and_output_file(self, code_file, input_file, output_file, exit_code):
+    def feed_input_and_output_file(self, code_file, input_file, output_file, exit_code,
+                                   interpreter_class=Interpreter, **kwargs):
         code = open(code_file, "r")
         program_input = open(input_file, "r")
         expected_output = open(output_file, "r")
@@ -17,7 +29,7 @@ class TestInterpreter(unittest.TestCase):
         sys.stdout = io.StringIO()
         lexer = Lexer(code.read())
         parser = Parser(lexer)
-        interpreter = Interpreter(parser)
+        interpreter = interpreter_class(parser, **kwargs)
         result = interpreter.interpret()
 
         self.assertEqual(sys.stdout.getvalue(), expected_output.read())
@@ -29,6 +41,7 @@ class TestInterpreter(unittest.TestCase):
         code.close()
         program_input.close()
         expected_output.close()
+        return interpreter
 
     def test_io(self):
         self.feed_input_and_output_file(
@@ -86,6 +99,327 @@ class TestInterpreter(unittest.TestCase):
             "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_functions.out",
             0)
 
+    def test_arrays(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_arrays.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_arrays.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_arrays.out",
+            0)
+
+    def test_lazy_arrays(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_lazy_arrays.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_lazy_arrays.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_lazy_arrays.out",
+            0)
+
+    def test_slices(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_slices.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_slices.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_slices.out",
+            0)
+
+    def test_output(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_output.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_output.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_output.out",
+            0)
+
+        # Output printed before an error is still written.
+        sys.stdout = io.StringIO()
+        interpreter = Interpreter(Parser(Lexer("int main() { print(\"before\"); int a[1]; a[1] = 0; return 0; }")))
+        with self.assertRaises(InterpreterError):
+            interpreter.interpret()
+        self.assertEqual(sys.stdout.getvalue(), "before")
+        sys.stdout = sys.__stdout__
+
+    def test_input(self):
+        files = ("C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_input.pysc",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_input.in",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_input.out")
+        self.feed_input_and_output_file(*files, 0)
+
+        # Reads the same input from a regular file, which is memory-mapped.
+        sys.stdout = io.StringIO()
+        with open(files[1], "r") as program_input, open(files[0], "r") as code:
+            sys.stdin = program_input
+            Interpreter(Parser(Lexer(code.read()))).interpret()
+        with open(files[2], "r") as expected_output:
+            self.assertEqual(sys.stdout.getvalue(), expected_output.read())
+        sys.stdin = sys.__stdin__
+        sys.stdout = sys.__stdout__
+
+    def test_bulk_io(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bulk_io.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bulk_io.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bulk_io.out",
+            0)
+
+    def test_array_file(self):
+        code_file = "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_file.pysc"
+        input_file = "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_file.in"
+        output_file = "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_file.out"
+        array_file, array_path = tempfile.mkstemp(suffix=".bin")
+        os.close(array_file)
+
+        # The path of the file that the arrays are saved to is given on the first line of the input.
+        with open(code_file, "r") as code, open(input_file, "r") as program_input, \
+                open(output_file, "r") as expected_output:
+            sys.stdin = io.StringIO(array_path + "\n" + program_input.read())
+            sys.stdout = io.StringIO()
+            interpreter = Interpreter(Parser(Lexer(code.read())))
+            self.assertEqual(interpreter.interpret(), 0)
+            self.assertEqual(sys.stdout.getvalue(), expected_output.read())
+
+        # Loading into an array of a different shape is an error.
+        interpreter = Interpreter(Parser(Lexer("int main() { float a[2]; array_load(a, getline()); return 0; }")))
+        sys.stdin = io.StringIO(array_path + "\n")
+        with self.assertRaises(InterpreterError):
+            interpreter.interpret()
+
+        sys.stdin = sys.__stdin__
+        sys.stdout = sys.__stdout__
+        del interpreter
+        os.remove(array_path)
+
+    def test_priority_queue(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_priority_queue.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_priority_queue.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_priority_queue.out",
+            0)
+
+    def test_ropes(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_ropes.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_ropes.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_ropes.out",
+            0)
+
+    def test_array_algorithms(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_algorithms.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_algorithms.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_algorithms.out",
+            0)
+
+    def test_array_math(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_math.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_math.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_array_math.out",
+            0)
+
+    def test_bitsets(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bitsets.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bitsets.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bitsets.out",
+            0)
+
+    def test_structs(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_structs.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_structs.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_structs.out",
+            0)
+
+    def test_strings(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_strings.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_strings.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_strings.out",
+            0)
+
+    def test_graphs(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_graphs.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_graphs.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_graphs.out",
+            0)
+
+    def test_ffi(self):
+        # Registers the python functions that the test program calls.
+        @ffi.register("int py_gcd(int a, int b)")
+        def gcd(a, b):
+            while b != 0:
+                a, b = b, a % b
+            return a
+
+        @ffi.register("string py_repeat(string s, int n)")
+        def repeat(s, n):
+            return s * n
+
+        @ffi.register("float py_mean(float a[])")
+        def mean(a):
+            return sum(a) / len(a)
+
+        @ffi.register("void py_sort(int a[])")
+        def sort(a):
+            a[:] = array.array("q", sorted(a))
+
+        @ffi.register("void py_fill_rows(int a[][])")
+        def fill_rows(a):
+            for i in range(a.shape[0]):
+                for j in range(a.shape[1]):
+                    a[i, j] = i * 10 + j
+
+        @ffi.register("int py_sum(int a[])")
+        def total(a):
+            return sum(a)
+
+        @ffi.register("int py_bad()")
+        def bad():
+            return "not an int"
+
+        try:
+            self.feed_input_and_output_file(
+                "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_ffi.pysc",
+                "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_ffi.in",
+                "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_ffi.out",
+                0)
+
+            # The arguments and the value returned are checked against the signature.
+            for code in ("py_gcd(1);", "py_gcd(1.5, 2);", "py_bad();"):
+                with self.assertRaises(InterpreterError):
+                    Interpreter(Parser(Lexer(f"int main() {{ {code} return 0; }}"))).interpret()
+
+            # Signatures cannot take types that python does not receive, or reuse names.
+            for signature in ("void f(string a[])", "void f(map<int, int> m)", "int print(string s)",
+                              "int py_gcd(int a)"):
+                with self.assertRaises(ParserError):
+                    ffi.register(signature)
+        finally:
+            for name in ("py_gcd", "py_repeat", "py_mean", "py_sort", "py_fill_rows", "py_sum", "py_bad"):
+                ffi.unregister(name)
+
+    def test_closure_engine(self):
+        files = ("C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_closure.pysc",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_closure.in",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_closure.out")
+
+        # Both engines must give the same output at every optimization level.
+        for interpreter_class in (Interpreter, ClosureInterpreter):
+            for level in range(3):
+                self.feed_input_and_output_file(*files, 0, interpreter_class, pass_manager=PassManager(level))
+
+    def test_bytecode_engine(self):
+        files = ("C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bytecode.pysc",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bytecode.in",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_bytecode.out")
+
+        for interpreter_class in (Interpreter, VirtualMachine):
+            for level in range(3):
+                self.feed_input_and_output_file(*files, 0, interpreter_class, pass_manager=PassManager(level))
+
+        # The first run saves the compiled program, and the second run loads it.
+        cache_file, cache_path = tempfile.mkstemp(suffix=".json")
+        os.close(cache_file)
+        os.remove(cache_path)
+        for _ in range(2):
+            self.feed_input_and_output_file(*files, 0, VirtualMachine, cache_path=cache_path)
+        program = BytecodeProgram.load(cache_path)
+
+        # A cache file that cannot be read is compiled again and overwritten.
+        for contents in ("garbage", "[1, 2]", '{"version": %d}' % BYTECODE_VERSION):
+            with open(cache_path, "w") as file:
+                file.write(contents)
+            self.assertIsNone(BytecodeProgram.load(cache_path))
+            self.feed_input_and_output_file(*files, 0, VirtualMachine, cache_path=cache_path)
+            self.assertIsNotNone(BytecodeProgram.load(cache_path))
+        os.remove(cache_path)
+
+        listing = disassemble(program)
+        self.assertIn("function fib (1 arguments, 1 slots):", listing)
+        self.assertIn("function sum_vector: run by the tree-walking interpreter", listing)
+
+    def test_tiered_engine(self):
+        files = ("C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_tiered.pysc",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_tiered.in",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_tiered.out")
+
+        for level in range(3):
+            self.feed_input_and_output_file(*files, 0, Interpreter, pass_manager=PassManager(level))
+            self.feed_input_and_output_file(*files, 0, TieredInterpreter, pass_manager=PassManager(level))
+            self.feed_input_and_output_file(*files, 0, TieredInterpreter, pass_manager=PassManager(level), threshold=2)
+
+        # Passing a vector in place of an array changes the type of a variable of a compiled loop.
+        interpreter = self.feed_input_and_output_file(*files, 0, TieredInterpreter, threshold=2)
+        self.assertIn("function fib: compiled", interpreter.log)
+        self.assertIn("for loop at 29:8: types changed, will be compiled again", interpreter.log)
+
+    def test_vectors(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_vectors.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_vectors.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_vectors.out",
+            0)
+
+    def test_maps(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_maps.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_maps.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_maps.out",
+            0)
+
+    def test_printf(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_printf.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_printf.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_printf.out",
+            0)
+
+    def test_switch(self):
+        self.feed_input_and_output_file(
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_switch.pysc",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_switch.in",
+            "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_switch.out",
+            0)
+
+    def test_profile(self):
+        files = ("C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_profile.pysc",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_profile.in",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_profile.out")
+
+        # Records a profile, then runs the program again using the saved profile.
+        recorder = self.feed_input_and_output_file(*files, 0, ProfilingInterpreter)
+        profile_file, profile_path = tempfile.mkstemp(suffix=".json")
+        os.close(profile_file)
+        recorder.recording.save(profile_path)
+        profile = Profile.load(profile_path)
+
+        self.assertTrue(profile.matches(recorder.parser.lexer.text))
+        self.feed_input_and_output_file(*files, 0, pass_manager=PassManager(profile=profile))
+
+        # A profile that cannot be read is not loaded.
+        with open(profile_path, "r") as file:
+            saved = file.read()
+        for content in (saved[:len(saved) // 2], "[1, 2]", '{"source_hash": "x"}', '{"node_counts": {"a": 1}}'):
+            with open(profile_path, "w") as file:
+                file.write(content)
+            self.assertIsNone(Profile.load(profile_path))
+        os.remove(profile_path)
+        self.assertIsNone(Profile.load(profile_path))
+
+    def test_optimization(self):
+        files = ("C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_optimization.pysc",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_optimization.in",
+                 "C:\\Users\\paulc\\Code\\pyc\\pyc\\tests\\test_files\\test_optimization.out")
+
+        # Every optimization level must give the same output.
+        for level in range(3):
+            pass_manager = PassManager(level)
+            self.feed_input_and_output_file(*files, 0, pass_manager=pass_manager)
+
+        # Checks that each pass enabled at the highest level made an optimization.
+        self.assertEqual({name for name, _ in pass_manager.timings},
+                         {"constant-folding", "inlining", "bounds-check-elimination", "loop-invariant-hoisting"})
+        self.assertEqual({remark.pass_name for remark in pass_manager.remarks},
+                         {name for name, _ in pass_manager.timings})
+
 
 if __name__ == '__main__':
     unittest.main()
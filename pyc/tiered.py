@@ -0,0 +1,199 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `TieredInterpreter` class, an execution engine that starts by walking the syntax tree and compiles
+the loops and functions that run often into python functions. Each loop and user function counts how many times it
+runs. Once a count reaches the threshold, the loop or function is translated into python source code by the
+`PythonGenerator` in `codegen.py`, compiled by python into a code object, and run in place of the tree from then on.
+
+A loop is compiled in the middle of running, at the start of an iteration, so the compiled loop starts at the check
+of its condition. It is specialized on the types that its variables have when it is compiled, and checks them every
+time it starts. If one of them has changed, the loop runs in the tree-walking interpreter again and is compiled anew
+once it becomes hot, at most `MAX_RECOMPILATIONS` more times.
+"""
+
+from typing import List, Optional, Union
+
+from ast_nodes import ASTNode, BlockStatementNode, ForLoopNode, WhileLoopNode, DoWhileLoopNode, \
+    FunctionCallStatementNode, ProgramNode, walk
+from codegen import GUARD_FAILED, CompiledRegion, PythonGenerator, describe_loop
+from compiler import ArrayType, RAW_TYPES, UnsupportedNode
+from control_exceptions import BreakException, ContinueException
+from error import ErrorCode
+from interpreter import Interpreter
+from parser import Parser
+from passes import PassManager
+from value import Function, Value, ArrayValue, VALUE_CLASSES
+
+# The number of iterations of a loop, or calls of a function, after which it is compiled.
+COMPILE_THRESHOLD = 100
+
+# The number of times a loop is compiled again after its types change, before it is left to the tree-walking
+# interpreter.
+MAX_RECOMPILATIONS = 2
+
+
+class TieredInterpreter(Interpreter):
+    """
+    Interpreter that compiles the loops and functions that run often into python functions.
+
+    Attributes:
+        threshold (int): the number of iterations or calls after which a loop or function is compiled.
+        counts (Dict[Union[ASTNode, Function], int]): the number of iterations of each loop, and the number of calls
+            of each function, since it was last compiled.
+        regions (Dict[Union[ASTNode, Function], Optional[CompiledRegion]]): the compiled function of each compiled
+            loop and function, or None if it could not be compiled.
+        recompilations (Dict[ASTNode, int]): the number of times each loop was compiled again after its types changed.
+        log (List[str]): a line for each loop and function that was compiled, or could not be compiled.
+        loads_arrays (bool): whether the program calls `array_load`, which replaces the buffer of an array.
+    """
+
+    def __init__(self, parser: Parser, pass_manager: Optional[PassManager] = None,
+                 threshold: int = COMPILE_THRESHOLD) -> None:
+        """
+        Inits tiered interpreter class.
+        Args:
+            parser (Parser): the parser.
+            pass_manager (Optional[PassManager]): the pass manager, or None to run the tree as it was parsed.
+            threshold (int): the number of iterations or calls after which a loop or function is compiled.
+        """
+        super().__init__(parser, pass_manager)
+        self.threshold = threshold
+        self.counts = {}
+        self.regions = {}
+        self.recompilations = {}
+        self.log = []
+        self.loads_arrays = False
+
+    def visit_ProgramNode(self, node: ProgramNode) -> None:
+        """Visits a ProgramNode."""
+        self.loads_arrays = any(isinstance(child, FunctionCallStatementNode) and child.name == "array_load"
+                                for child in walk(node))
+        super().visit_ProgramNode(node)
+
+    def tier_up(self, key: Union[ASTNode, Function]) -> Optional[CompiledRegion]:
+        """Compiles a loop or function that became hot, returning None if it cannot be compiled."""
+        generator = PythonGenerator(self, self.loads_arrays)
+        if isinstance(key, Function):
+            name = next(name for name, value in self.stack.bottom.hmap.items() if value is key)
+            description = f"function {name}"
+        else:
+            description = describe_loop(key)
+        try:
+            if isinstance(key, Function):
+                region = generator.compile_function(name, key)
+            else:
+                region = generator.compile_loop(key, self.stack)
+        except UnsupportedNode as ex:
+            self.log.append(f"{description}: not compiled ({ex})")
+            region = None
+        else:
+            self.log.append(f"{description}: compiled")
+        self.regions[key] = region
+        return region
+
+    def guard_failed(self, node: ASTNode) -> None:
+        """Drops a compiled loop whose types changed, so that it is compiled again once it becomes hot."""
+        self.counts[node] = 0
+        self.recompilations[node] = self.recompilations.get(node, 0) + 1
+        if self.recompilations[node] > MAX_RECOMPILATIONS:
+            self.log.append(f"{describe_loop(node)}: types changed, left to the tree-walking interpreter")
+            self.regions[node] = None
+        else:
+            self.log.append(f"{describe_loop(node)}: types changed, will be compiled again")
+            del self.regions[node]
+
+    def run_loop(self, node: Union[ForLoopNode, WhileLoopNode, DoWhileLoopNode], increment: Optional[ASTNode]) -> None:
+        """
+        Runs a loop from the check of its condition, with its compiled function if it has one. Otherwise counts the
+        iterations, and compiles the loop once it becomes hot.
+        Args:
+            node (Union[ForLoopNode, WhileLoopNode, DoWhileLoopNode]): the loop.
+            increment (Optional[ASTNode]): the statement that runs after each iteration, for a for loop.
+        """
+        region = self.regions.get(node)
+        if region is not None:
+            if region.function(self.stack) is not GUARD_FAILED:
+                return
+            self.guard_failed(node)
+
+        # Loops until the condition is false.
+        while self.visit(node.condition).value:
+            try:  # Visits the looping block.
+                self.visit(node.block)
+            except BreakException:  # Breaks out of the loop.
+                break
+            except ContinueException:  # Continues the loop.
+                pass
+            if increment is not None:
+                self.visit(increment)
+
+            # Counts the iteration until the loop is compiled, then runs the rest of the loop with the compiled code.
+            if node not in self.regions:
+                self.counts[node] = self.counts.get(node, 0) + 1
+                if self.counts[node] >= self.threshold:
+                    region = self.tier_up(node)
+                    if region is not None:
+                        if region.function(self.stack) is not GUARD_FAILED:
+                            return
+                        self.guard_failed(node)
+
+    def visit_ForLoopNode(self, node: ForLoopNode) -> None:
+        """Visits a ForLoopNode."""
+        self.stack.push()
+
+        # Runs the initialization statement.
+        self.visit(node.initialization)
+        self.run_loop(node, node.increment)
+        self.stack.pop()
+
+    def visit_WhileLoopNode(self, node: WhileLoopNode) -> None:
+        """Visits a WhileLoopNode."""
+        self.run_loop(node, None)
+
+    def visit_DoWhileLoopNode(self, node: DoWhileLoopNode) -> None:
+        """Visits a DoWhileLoopNode."""
+
+        # Runs the block first no matter what.
+        try:
+            self.visit(node.block)
+        except BreakException:
+            return
+        except ContinueException:
+            pass
+        self.run_loop(node, None)
+
+    def call_function(self, function: Function, node: FunctionCallStatementNode, ret: List[Value]) -> Value:
+        """Calls a function, with its compiled function if it has one. Counts the calls of user functions."""
+        if type(function.block) is not BlockStatementNode:
+            return super().call_function(function, node, ret)
+        if function not in self.regions:
+            self.counts[function] = self.counts.get(function, 0) + 1
+            if self.counts[function] < self.threshold:
+                return super().call_function(function, node, ret)
+            self.tier_up(function)
+        region = self.regions[function]
+        if region is None:
+            return super().call_function(function, node, ret)
+        return self.run_compiled_function(region, function, node, ret)
+
+    def run_compiled_function(self, region: CompiledRegion, function: Function, node: FunctionCallStatementNode,
+                              ret: List[Value]) -> Value:
+        """Calls a compiled function, with the same checks on its arguments as the tree-walking interpreter."""
+        if len(function.args) != len(ret):
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+
+        args = []
+        for argument, value, argument_type in zip(function.args, ret, region.argument_types):
+            value = self.bind_argument(argument, value, node)
+
+            # The compiled function holds arrays in python variables, which other containers (ex. a vector passed as
+            # an array) do not fit.
+            if isinstance(argument_type, ArrayType) and type(value) is not ArrayValue:
+                return super().call_function(function, node, ret)
+            args.append(value.value if argument_type in RAW_TYPES else value)
+
+        result = region.function(*args)
+        if region.return_type in RAW_TYPES:
+            return VALUE_CLASSES[region.return_type](region.return_type, result)
+        return result
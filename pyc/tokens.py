@@ -75,7 +75,9 @@ class TokenType(Enum):
     LCPAR = "{"
     RCPAR = "}"
     SEMI = ";"
+    COLON = ":"
     COMMA = ","
+    DOT = "."
 
     # Keywords.
     INT = "int"
@@ -90,6 +92,15 @@ class TokenType(Enum):
     BREAK = "break"
     CONTINUE = "continue"
     RETURN = "return"
+    SWITCH = "switch"
+    CASE = "case"
+    DEFAULT = "default"
+    MAP = "map"
+    PRIORITY_QUEUE = "priority_queue"
+    VECTOR = "vector"
+    BITSET = "bitset"
+    GRAPH = "graph"
+    STRUCT = "struct"
 
     # Other.
     EOF = "EOF"
@@ -98,6 +109,11 @@ class TokenType(Enum):
     FLOATL = "FLOATL"
     STRINGL = "STRINGL"
     ARRAYL = "ARRAYL"
+    MAPL = "MAPL"
+    PRIORITY_QUEUEL = "PRIORITY_QUEUEL"
+    BITSETL = "BITSETL"
+    GRAPHL = "GRAPHL"
+    STRUCTL = "STRUCTL"
     VOIDL = "VOIDL"
 
 
@@ -142,7 +158,9 @@ SYMBOLS = {
     "{": TokenType.LCPAR,
     "}": TokenType.RCPAR,
     ";": TokenType.SEMI,
-    ",": TokenType.COMMA
+    ":": TokenType.COLON,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT
 }
 
 RESERVED_KEYWORDS = {
@@ -157,5 +175,9 @@ RESERVED_KEYWORDS = {
     "do": TokenType.DO,
     "break": TokenType.BREAK,
     "continue": TokenType.CONTINUE,
-    "return": TokenType.RETURN
+    "return": TokenType.RETURN,
+    "switch": TokenType.SWITCH,
+    "case": TokenType.CASE,
+    "default": TokenType.DEFAULT,
+    "struct": TokenType.STRUCT
 }
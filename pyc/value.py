@@ -3,9 +3,11 @@ ICS3U
 Paul Chen
 This file holds the `Value` class and declares all possible types used by the interpreter (int, float, string, list).
 """
-from typing import Any, Callable, List, Optional, Union
+import array
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
 
-from ast_nodes import BlockStatementNode, BuiltInFunctionCallStatementNode, FunctionArgument, ASTNode
+from ast_nodes import BlockStatementNode, BuiltInFunctionCallStatementNode, FunctionArgument, ASTNode, \
+    StructDefinition
 from tokens import TokenType, TokenType as Tt
 
 
@@ -102,7 +104,12 @@ def object_to_identifier(obj: TokenType) -> TokenType:
     conversion = {
         Tt.INTL: Tt.INT,
         Tt.FLOATL: Tt.FLOAT,
-        Tt.STRINGL: Tt.STRING
+        Tt.STRINGL: Tt.STRING,
+        Tt.MAPL: Tt.MAP,
+        Tt.PRIORITY_QUEUEL: Tt.PRIORITY_QUEUE,
+        Tt.BITSETL: Tt.BITSET,
+        Tt.GRAPHL: Tt.GRAPH,
+        Tt.STRUCTL: Tt.STRUCT
     }
     if obj not in conversion:
         raise KeyError()
@@ -266,11 +273,51 @@ class FloatValue(Value):
 
 
 class StringValue(Value):
+    """
+    Class that represents a string. A string built by concatenation is held as a rope: a list of pieces that is only
+    joined into a single python string when its value is needed (ex. when it is printed, compared or cast). Appending
+    to the end of a string adds a piece to the list, so building a string piece by piece takes linear time.
+
+    The list of pieces can be shared by several strings, each using a different number of pieces from the start of
+    the list. A string can only add to the end of the list if no other string has added to it already, otherwise it
+    copies its own pieces first.
+
+    Attributes:
+        type (TokenType): always `TokenType.STRINGL`.
+        flat (Optional[str]): the value of the string, or None if the pieces have not been joined yet.
+        pieces (Optional[List[str]]): the pieces of the string, or None if the string was never concatenated.
+        num_pieces (int): the number of pieces, from the start of `pieces`, that make up the string.
+    """
     default = ""
 
+    def __init__(self, token_type: TokenType, value: Optional[str], pieces: Optional[List[str]] = None,
+                 num_pieces: int = 0) -> None:
+        self.type = token_type
+        self.flat = value
+        self.pieces = pieces
+        self.num_pieces = num_pieces
+
+    @property
+    def value(self) -> str:
+        """The value of the string, joining its pieces the first time it is needed."""
+        if self.flat is None:
+            self.flat = "".join(self.pieces[:self.num_pieces])
+        return self.flat
+
+    def concatenate(self, obj: "StringValue") -> "StringValue":
+        """Returns the concatenation of two strings, adding the second string to the pieces of the first."""
+        if self.pieces is None:
+            pieces = [self.flat]
+        elif self.num_pieces == len(self.pieces):
+            pieces = self.pieces
+        else:
+            pieces = self.pieces[:self.num_pieces]
+        pieces.append(obj.value)
+        return StringValue(Tt.STRINGL, None, pieces, len(pieces))
+
     def binary_operator(self, operator: TokenType, obj: Value) -> Optional[Callable]:
         operations = {
-            (Tt.PLUS, Tt.STRINGL): lambda: bv(Tt.STRINGL, str(self.value + obj.value)),
+            (Tt.PLUS, Tt.STRINGL): lambda: self.concatenate(obj),
             (Tt.EQUAL, Tt.STRINGL): lambda: bv(Tt.INTL, int(self.value == obj.value)),
             (Tt.NOT_EQUAL, Tt.STRINGL): lambda: bv(Tt.INTL, int(self.value != obj.value)),
         }
@@ -278,7 +325,7 @@ class StringValue(Value):
 
     def assignment_operator(self, operator: TokenType, obj: Value) -> Optional[Callable]:
         operations = {
-            (Tt.PLUS_ASSIGN, Tt.STRINGL): lambda: bv(Tt.STRINGL, str(self.value + obj.value)),
+            (Tt.PLUS_ASSIGN, Tt.STRINGL): lambda: self.concatenate(obj),
         }
         return operations.get((operator, obj.type), None)
 
@@ -295,10 +342,632 @@ class InitializerListValue(Value):
     pass
 
 
+# Maps the element type of an array to the type code of the `array.array` that stores it. Strings are stored in a list.
+BUFFER_TYPECODES = {
+    Tt.INTL: "q",
+    Tt.FLOATL: "d",
+}
+
+
+# Arrays with more elements than this are allocated lazily, one page at a time (see `PagedBuffer`).
+PAGE_BITS = 12
+PAGE_SIZE = 1 << PAGE_BITS
+
+
+class PagedBuffer(object):
+    """
+    Flat buffer that is split into pages of `PAGE_SIZE` elements. A page is only allocated the first time one of its
+    elements is written to, and reading an element of a page that was never written to gives the default value. This
+    makes declaring a large array take constant time, and the memory used grows with the parts of the array that
+    are actually written.
+
+    Attributes:
+        typecode (Optional[str]): the type code of the `array.array` of each page, or None to store pages in lists.
+        size (int): the number of elements in the buffer.
+        default (Any): the value of the elements that were never written to.
+        pages (Dict[int, Union[array.array, list, memoryview]]): the allocated pages, indexed by page number.
+        flat (Optional[memoryview]): the contiguous memory holding every page, once the buffer has been flattened.
+    """
+
+    def __init__(self, typecode: Optional[str], size: int, default: Any) -> None:
+        self.typecode = typecode
+        self.size = size
+        self.default = default
+        self.pages = {}
+        self.flat = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def page_ranges(self, start: int, stop: int) -> Iterator[Tuple[int, int, int]]:
+        """Splits the positions from `start` up to `stop` by page, yielding the page number and the range in it."""
+        while start < stop:
+            page_number = start >> PAGE_BITS
+            page_stop = min(stop, (page_number + 1) << PAGE_BITS)
+            yield page_number, start & (PAGE_SIZE - 1), page_stop - (page_number << PAGE_BITS)
+            start = page_stop
+
+    def flatten(self) -> memoryview:
+        """
+        Moves the elements of a buffer of ints or floats into a single `array.array`, and returns a memoryview of it.
+        Every page becomes a memoryview of its part of the array, so the buffer and the returned memoryview share
+        their elements from then on.
+        """
+        num_pages = (self.size + PAGE_SIZE - 1) >> PAGE_BITS
+        # The pages are only replaced if they were freed since the buffer was last flattened.
+        if self.flat is not None and len(self.pages) == num_pages:
+            return self.flat
+
+        flat = memoryview(array.array(self.typecode, bytes(self.size * array.array(self.typecode).itemsize)))
+        pages = {}
+        for page_number in range(num_pages):
+            start = page_number << PAGE_BITS
+            stop = min(self.size, start + PAGE_SIZE)
+            page = self.pages.get(page_number)
+            if page is not None:
+                flat[start:stop] = page[:stop - start]
+            pages[page_number] = flat[start:stop]
+        self.pages = pages
+        self.flat = flat
+        return flat
+
+    def allocate_page(self, page_number: int) -> Union[array.array, list]:
+        """Allocates a page filled with the default value."""
+        if self.typecode is None:
+            page = [self.default] * PAGE_SIZE
+        else:
+            page = array.array(self.typecode, bytes(PAGE_SIZE * array.array(self.typecode).itemsize))
+        self.pages[page_number] = page
+        return page
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.size)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+
+            # Copies a contiguous slice a page at a time.
+            result = []
+            for page_number, lower, upper in self.page_ranges(start, stop):
+                page = self.pages.get(page_number)
+                result.extend(page[lower:upper] if page is not None else [self.default] * (upper - lower))
+            return result
+        page = self.pages.get(index >> PAGE_BITS)
+        if page is None:
+            if not 0 <= index < self.size:
+                raise IndexError("buffer index out of range")
+            return self.default
+        return page[index & (PAGE_SIZE - 1)]
+
+    def __setitem__(self, index: Union[int, slice], value: Any) -> None:
+        if isinstance(index, slice):
+            # Writes a contiguous slice a page at a time. The values must be an `array.array` of the same type code
+            # as the pages, or a list if the pages are lists, with one value for each position in the slice.
+            start, stop, step = index.indices(self.size)
+            if step != 1 or len(value) != stop - start:
+                raise ValueError("only contiguous slices of the same length can be assigned")
+            for page_number, lower, upper in self.page_ranges(start, stop):
+                page = self.pages.get(page_number)
+                if page is None:
+                    page = self.allocate_page(page_number)
+                position = (page_number << PAGE_BITS) + lower - start
+                page[lower:upper] = value[position:position + upper - lower]
+            return
+
+        page = self.pages.get(index >> PAGE_BITS)
+        if page is None:
+            if not 0 <= index < self.size:
+                raise IndexError("buffer index out of range")
+            # Allocates the page the first time it is written to.
+            page = self.allocate_page(index >> PAGE_BITS)
+        page[index & (PAGE_SIZE - 1)] = value
+
+
+def contiguous_strides(shape: Tuple[int, ...]) -> Tuple[int, ...]:
+    """
+    Returns the strides of an array whose elements are stored contiguously in row-major order. The stride of a
+    dimension is the distance in the buffer between two elements whose indices differ by one in that dimension.
+    """
+    strides = [1] * len(shape)
+    for i in range(len(shape) - 2, -1, -1):
+        strides[i] = strides[i + 1] * shape[i + 1]
+    return tuple(strides)
+
+
+class ArrayValue(Value):
+    """
+    Class that represents an array. All the elements of the array are stored in a single flat buffer in row-major
+    order: an `array.array` of 64-bit ints or floats for int and float arrays, and a list for string arrays. Large
+    arrays that are declared without an initializer list use a `PagedBuffer` instead. The element at indices
+    `(i, j, ...)` is stored at `offset + i * strides[0] + j * strides[1] + ...`.
+
+    A sub-array, like `a[0]` for a two-dimensional array `a`, is a view that shares the buffer of its parent, so
+    writing to the view writes to the parent.
+
+    Attributes:
+        type (TokenType): always `TokenType.ARRAYL`.
+        element_type (TokenType): the type of the elements (INTL, FLOATL or STRINGL).
+        buffer (Union[array.array, list, PagedBuffer, memoryview]): the flat buffer holding the elements. Arrays loaded
+            from a file hold a `memoryview` of the memory-mapped file.
+        shape (Tuple[int, ...]): the length of each dimension.
+        strides (Tuple[int, ...]): the distance in the buffer between consecutive indices of each dimension.
+        offset (int): the position in the buffer of the first element.
+    """
+
+    def __init__(self, element_type: TokenType, buffer: Union[array.array, list, PagedBuffer, memoryview],
+                 shape: Tuple[int, ...], strides: Optional[Tuple[int, ...]] = None, offset: int = 0) -> None:
+        self.type = Tt.ARRAYL
+        self.element_type = element_type
+        self.buffer = buffer
+        self.shape = tuple(shape)
+        self.strides = contiguous_strides(self.shape) if strides is None else tuple(strides)
+        self.offset = offset
+
+    @staticmethod
+    def create(element_type: TokenType, shape: Tuple[int, ...], elements: Optional[List[Any]] = None) -> "ArrayValue":
+        """
+        Creates an array with its own buffer.
+        Args:
+            element_type (TokenType): the type of the elements.
+            shape (Tuple[int, ...]): the length of each dimension.
+            elements (Optional[List[Any]]): the values of the elements in row-major order. Defaults to the default
+                value of the element type, in which case arrays larger than a page are allocated lazily.
+        Returns:
+            ArrayValue: the new array.
+        Raises:
+            OverflowError: if an int does not fit in 64 bits.
+        """
+        size = 1
+        for length in shape:
+            size *= length
+        if elements is None and size > PAGE_SIZE:
+            buffer = PagedBuffer(BUFFER_TYPECODES.get(element_type), size, build_value(element_type).value)
+        elif element_type in BUFFER_TYPECODES:
+            typecode = BUFFER_TYPECODES[element_type]
+            if elements is None:
+                buffer = array.array(typecode, bytes(size * array.array(typecode).itemsize))
+            else:
+                buffer = array.array(typecode, elements)
+        else:
+            buffer = [build_value(element_type).value] * size if elements is None else list(elements)
+        return ArrayValue(element_type, buffer, shape)
+
+    @property
+    def value(self) -> List[Any]:
+        """The elements of the array as nested lists of python values."""
+        return [self.view(self.offset + i * self.strides[0], 1).value if len(self.shape) > 1
+                else self.buffer[self.offset + i * self.strides[0]] for i in range(self.shape[0])]
+
+    def __len__(self) -> int:
+        """Returns the length of the first dimension."""
+        return self.shape[0]
+
+    @property
+    def size(self) -> int:
+        """The total number of elements in the array."""
+        size = 1
+        for length in self.shape:
+            size *= length
+        return size
+
+    def owns_buffer(self) -> bool:
+        """Checks if the array is the whole of its buffer, in row-major order, rather than a view of part of it."""
+        return self.offset == 0 and self.strides == contiguous_strides(self.shape) and len(self.buffer) == self.size
+
+    def positions(self) -> Iterator[int]:
+        """Yields the position in the buffer of every element, in row-major order."""
+        if len(self.shape) == 1:
+            yield from range(self.offset, self.offset + self.shape[0] * self.strides[0], self.strides[0]) \
+                if self.shape[0] != 0 else ()
+        else:
+            for i in range(self.shape[0]):
+                yield from self.view(self.offset + i * self.strides[0], 1).positions()
+
+    def element(self, offset: int) -> Value:
+        """Returns the element stored at a position in the buffer."""
+        return VALUE_CLASSES[self.element_type](self.element_type, self.buffer[offset])
+
+    def view(self, offset: int, num_indices: int) -> "ArrayValue":
+        """Returns the sub-array that starts at a position in the buffer, after indexing `num_indices` dimensions."""
+        return ArrayValue(self.element_type, self.buffer, self.shape[num_indices:], self.strides[num_indices:], offset)
+
+    def slice(self, offset: int, num_indices: int, lower: int, upper: int) -> "ArrayValue":
+        """
+        Returns the part of a dimension of the array that goes from `lower` up to, but not including, `upper`, after
+        indexing `num_indices` dimensions to reach the position `offset` in the buffer. The slice shares the buffer.
+        """
+        return ArrayValue(self.element_type, self.buffer, (upper - lower,) + self.shape[num_indices + 1:],
+                          self.strides[num_indices:], offset + lower * self.strides[num_indices])
+
+    def load(self, count: int) -> List[Any]:
+        """Reads the values of the first `count` elements of a one-dimensional array."""
+        if count == 0:
+            return []
+        return list(self.buffer[self.offset:self.offset + count * self.strides[0]:self.strides[0]])
+
+    def store(self, values: List[Any]) -> None:
+        """
+        Writes values to the first elements of a one-dimensional array.
+        Raises:
+            OverflowError: if an int does not fit in 64 bits.
+        """
+        start = self.offset
+        if self.strides[0] == 1 and isinstance(self.buffer, array.array):
+            self.buffer[start:start + len(values)] = array.array(self.buffer.typecode, values)
+        elif self.strides[0] == 1 and isinstance(self.buffer, list):
+            self.buffer[start:start + len(values)] = values
+        elif self.strides[0] == 1 and isinstance(self.buffer, PagedBuffer):
+            if self.buffer.typecode is not None:
+                values = array.array(self.buffer.typecode, values)
+            self.buffer[start:start + len(values)] = values
+        else:
+            # Checks every value before writing any of them, like the slice assignments above.
+            if self.element_type in BUFFER_TYPECODES:
+                array.array(BUFFER_TYPECODES[self.element_type], values)
+            for i, value in enumerate(values):
+                self.buffer[start + i * self.strides[0]] = value
+
+    def fill(self, value: Any) -> None:
+        """
+        Sets every element of the array to a value.
+        Raises:
+            OverflowError: if an int does not fit in 64 bits.
+        """
+        if self.element_type in BUFFER_TYPECODES:
+            filler = array.array(BUFFER_TYPECODES[self.element_type], [value])
+        else:
+            filler = [value]
+
+        # Setting a whole lazily allocated array back to its default value frees its pages.
+        if isinstance(self.buffer, PagedBuffer) and self.owns_buffer() and value == self.buffer.default:
+            self.buffer.pages.clear()
+        elif len(self.shape) == 1 and (isinstance(self.buffer, (array.array, list)) or
+                                       (isinstance(self.buffer, PagedBuffer) and self.strides[0] == 1)):
+            stop = self.offset + self.shape[0] * self.strides[0]
+            if self.shape[0] != 0:
+                self.buffer[self.offset:stop:self.strides[0]] = filler * self.shape[0]
+        elif self.owns_buffer() and isinstance(self.buffer, (array.array, list, PagedBuffer)):
+            self.buffer[0:self.size] = filler * self.size
+        else:
+            for position in self.positions():
+                self.buffer[position] = value
+
+    def assign(self, values: List[Any]) -> None:
+        """
+        Writes values to all the elements of the array, in row-major order.
+        Raises:
+            OverflowError: if an int does not fit in 64 bits.
+        """
+        if self.element_type in BUFFER_TYPECODES:
+            values = array.array(BUFFER_TYPECODES[self.element_type], values)
+        if len(self.shape) == 1:
+            self.store(values)
+        elif self.owns_buffer() and isinstance(self.buffer, (array.array, list, PagedBuffer)):
+            self.buffer[0:self.size] = values
+        else:
+            # Writes each row separately, since the rows of a view are not next to each other in the buffer.
+            row_size = self.size // self.shape[0] if self.shape[0] != 0 else 0
+            for i in range(self.shape[0]):
+                self.view(self.offset + i * self.strides[0], 1).assign(values[i * row_size:(i + 1) * row_size])
+
+    def elements(self) -> Iterator[Any]:
+        """Yields the values of all the elements in row-major order."""
+        if len(self.shape) == 1:
+            stop = self.offset + self.shape[0] * self.strides[0]
+            yield from self.buffer[self.offset:stop:self.strides[0]] if self.shape[0] != 0 else ()
+        else:
+            for i in range(self.shape[0]):
+                yield from self.view(self.offset + i * self.strides[0], 1).elements()
+
+
+class VectorValue(ArrayValue):
+    """
+    Class that represents a vector, a one-dimensional array that can grow and shrink. Vectors are arrays, so they are
+    indexed, bounds-checked and passed to functions that take one-dimensional arrays in the same way. The buffer has
+    room for more elements than the vector holds, and its size is doubled when it is full, so pushing an element
+    takes amortized constant time.
+    """
+
+    def __init__(self, element_type: TokenType, buffer: Union[array.array, list], length: int) -> None:
+        super().__init__(element_type, buffer, (length,))
+
+    @staticmethod
+    def create(element_type: TokenType, elements: Optional[List[Any]] = None) -> "VectorValue":
+        """
+        Creates a vector holding the given elements, or an empty vector.
+        Raises:
+            OverflowError: if an int does not fit in 64 bits.
+        """
+        elements = [] if elements is None else elements
+        if element_type in BUFFER_TYPECODES:
+            buffer = array.array(BUFFER_TYPECODES[element_type], elements)
+        else:
+            buffer = list(elements)
+        return VectorValue(element_type, buffer, len(elements))
+
+    def push(self, value: Any) -> None:
+        """
+        Adds an element to the end of the vector.
+        Raises:
+            OverflowError: if an int does not fit in 64 bits.
+        """
+        length = self.shape[0]
+        if length == len(self.buffer):
+            # Doubles the size of the buffer, filling the new part with the default value.
+            default = build_value(self.element_type).value
+            if isinstance(self.buffer, array.array):
+                self.buffer.extend(array.array(self.buffer.typecode, [default]) * max(length, 1))
+            else:
+                self.buffer.extend([default] * max(length, 1))
+        self.buffer[length] = value
+        self.shape = (length + 1,)
+
+    def pop(self) -> Any:
+        """Removes the last element of the vector, which must not be empty, and returns its value."""
+        length = self.shape[0] - 1
+        value = self.buffer[length]
+        self.buffer[length] = build_value(self.element_type).value
+        self.shape = (length,)
+        return value
+
+
+class StructValue(Value):
+    """
+    Class that represents an instance of a struct. Its fields are stored in a list, at the positions given by the
+    definition of the struct. Like arrays, instances are passed to functions by reference, and an instance read from
+    an array of structs shares its list with the array.
+
+    Attributes:
+        type (TokenType): always `TokenType.STRUCTL`.
+        definition (StructDefinition): the definition of the struct.
+        value (List[Any]): the values of the fields.
+    """
+
+    def __init__(self, definition: StructDefinition, fields: Optional[List[Any]] = None) -> None:
+        self.type = Tt.STRUCTL
+        self.definition = definition
+        self.value = default_fields(definition) if fields is None else fields
+
+
+def default_fields(definition: StructDefinition) -> List[Any]:
+    """Returns the fields of a new instance of a struct, which all hold the default value of their type."""
+    return [build_value(field_type).value for field_type in definition.field_types]
+
+
+class StructArrayValue(ArrayValue):
+    """
+    Class that represents an array of structs. Each element of the buffer is the list of fields of one instance, so
+    reading an element gives an instance that refers to the array, and sub-arrays and slices share the buffer like
+    other arrays.
+
+    Attributes:
+        definition (StructDefinition): the definition of the struct.
+    """
+
+    def __init__(self, definition: StructDefinition, buffer: List[List[Any]], shape: Tuple[int, ...],
+                 strides: Optional[Tuple[int, ...]] = None, offset: int = 0) -> None:
+        super().__init__(Tt.STRUCTL, buffer, shape, strides, offset)
+        self.definition = definition
+
+    @staticmethod
+    def create(definition: StructDefinition, shape: Tuple[int, ...]) -> "StructArrayValue":
+        """Creates an array of new instances of a struct."""
+        size = 1
+        for length in shape:
+            size *= length
+        fields = default_fields(definition)
+        return StructArrayValue(definition, [list(fields) for _ in range(size)], shape)
+
+    def element(self, offset: int) -> StructValue:
+        return StructValue(self.definition, self.buffer[offset])
+
+    def view(self, offset: int, num_indices: int) -> "StructArrayValue":
+        return StructArrayValue(self.definition, self.buffer, self.shape[num_indices:], self.strides[num_indices:],
+                                offset)
+
+    def slice(self, offset: int, num_indices: int, lower: int, upper: int) -> "StructArrayValue":
+        return StructArrayValue(self.definition, self.buffer, (upper - lower,) + self.shape[num_indices + 1:],
+                                self.strides[num_indices:], offset + lower * self.strides[num_indices])
+
+
+class MapValue(Value):
+    """
+    Class that represents a map from int or string keys to int, float or string values, backed by a dictionary of the
+    raw python keys and values. Like arrays, maps are passed to functions by reference.
+
+    Attributes:
+        type (TokenType): always `TokenType.MAPL`.
+        key_type (TokenType): the type of the keys (INTL or STRINGL).
+        value_type (TokenType): the type of the values (INTL, FLOATL or STRINGL).
+        value (Dict[Union[int, str], Union[int, float, str]]): the entries of the map.
+    """
+
+    def __init__(self, key_type: TokenType, value_type: TokenType,
+                 entries: Optional[Dict[Union[int, str], Union[int, float, str]]] = None) -> None:
+        self.type = Tt.MAPL
+        self.key_type = key_type
+        self.value_type = value_type
+        self.value = {} if entries is None else entries
+
+    def has_types(self, key_type: TokenType, value_type: TokenType) -> bool:
+        """Checks if the map has the given key and value types, given as keywords (ex. INT, STRING)."""
+        return object_to_identifier(self.key_type) == key_type and object_to_identifier(self.value_type) == value_type
+
+
+class PriorityQueueValue(Value):
+    """
+    Class that represents a priority queue of `(priority, payload)` pairs of ints, where the pair with the smallest
+    priority comes out first. The pairs are stored as tuples in a binary heap maintained by `heapq`. Like arrays,
+    priority queues are passed to functions by reference.
+
+    Attributes:
+        type (TokenType): always `TokenType.PRIORITY_QUEUEL`.
+        value (List[Tuple[int, int]]): the heap of pairs.
+    """
+
+    def __init__(self, heap: Optional[List[Tuple[int, int]]] = None) -> None:
+        self.type = Tt.PRIORITY_QUEUEL
+        self.value = [] if heap is None else heap
+
+
+class GraphValue(Value):
+    """
+    Class that represents a directed graph with int edge weights, stored in compressed sparse row (CSR) form: the
+    edges leaving node `u` are at positions `offsets[u]` to `offsets[u + 1] - 1` of `value` and `weights`. A graph
+    is built from arrays of edges in a single call, and the arrays are replaced rather than changed when it is rebuilt,
+    so copies of a graph can share them. Like arrays, graphs are passed to functions by reference.
+
+    Attributes:
+        type (TokenType): always `TokenType.GRAPHL`.
+        value (array.array): the node that each edge leads to, grouped by the node the edge leaves.
+        offsets (array.array): the position of the first edge leaving each node, followed by the number of edges.
+        weights (array.array): the weight of each edge.
+    """
+
+    def __init__(self, offsets: Optional[array.array] = None, targets: Optional[array.array] = None,
+                 weights: Optional[array.array] = None) -> None:
+        self.type = Tt.GRAPHL
+        self.offsets = array.array("q", [0]) if offsets is None else offsets
+        self.value = array.array("q") if targets is None else targets
+        self.weights = array.array("q") if weights is None else weights
+
+    @property
+    def size(self) -> int:
+        """The number of nodes."""
+        return len(self.offsets) - 1
+
+
+# Tables for `bytes.translate` that set or clear one bit of every byte, and that count the bits set in every byte.
+SET_BIT_TABLES = [bytes(byte | 1 << bit for byte in range(256)) for bit in range(8)]
+CLEAR_BIT_TABLES = [bytes(byte & ~(1 << bit) for byte in range(256)) for bit in range(8)]
+BIT_COUNT_TABLE = bytes(bin(byte).count("1") for byte in range(256))
+
+
+class BitsetValue(Value):
+    """
+    Class that represents a bitset, a fixed number of bits that are all cleared when it is declared. Bit `i` is stored
+    in bit `i % 8` of byte `i // 8` of a bytearray, so the bits of the bitset are the bits of the little-endian int
+    read from the bytearray. The unused bits of the last byte are always cleared. Like arrays, bitsets are passed to
+    functions by reference.
+
+    Attributes:
+        type (TokenType): always `TokenType.BITSETL`.
+        value (bytearray): the bits.
+        size (int): the number of bits.
+    """
+
+    def __init__(self, size: int, buffer: Optional[bytearray] = None) -> None:
+        self.type = Tt.BITSETL
+        self.size = size
+        self.value = bytearray((size + 7) // 8) if buffer is None else buffer
+
+    def test(self, index: int) -> int:
+        """Returns 1 if a bit is set, and 0 otherwise."""
+        return self.value[index >> 3] >> (index & 7) & 1
+
+    def set(self, index: int) -> None:
+        """Sets a bit."""
+        self.value[index >> 3] |= 1 << (index & 7)
+
+    def clear(self, index: int) -> None:
+        """Clears a bit."""
+        self.value[index >> 3] &= ~(1 << (index & 7))
+
+    def count(self) -> int:
+        """Returns the number of bits that are set."""
+        return sum(self.value.translate(BIT_COUNT_TABLE))
+
+    def set_stride(self, start: int, step: int, value: bool) -> None:
+        """Sets or clears the bits `start`, `start + step`, `start + 2 * step`, ... up to the end of the bitset."""
+        # Bits that are `8 * step` apart are at the same position in bytes that are `step` apart, so the bits that
+        # start at each of the first eight bits are updated with one `translate` of a slice of the bytearray.
+        tables = SET_BIT_TABLES if value else CLEAR_BIT_TABLES
+        for index in range(start, min(start + 8 * step, self.size), step):
+            first_byte = index >> 3
+            self.value[first_byte::step] = self.value[first_byte::step].translate(tables[index & 7])
+        self.clear_unused_bits()
+
+    def to_int(self) -> int:
+        """Returns the bits as an int, where bit `i` of the int is bit `i` of the bitset."""
+        return int.from_bytes(self.value, "little")
+
+    def assign_int(self, bits: int) -> None:
+        """Sets the bits from an int, ignoring the bits of the int past the end of the bitset."""
+        bits &= (1 << self.size) - 1
+        self.value[:] = bits.to_bytes(len(self.value), "little")
+
+    def clear_unused_bits(self) -> None:
+        """Clears the bits of the last byte that are past the end of the bitset."""
+        if self.size & 7:
+            self.value[-1] &= (1 << (self.size & 7)) - 1
+
+
 class NullValue(Value):
     pass
 
 
+"""
+The next dictionary maps a binary operator and the types of its two operands to the type of the result and a function
+that computes the result from the raw python values. It mirrors the `binary_operator` methods above, and lets
+operations whose operand types are known in advance skip the lookup of their operation.
+"""
+
+
+def _build_specialized_binary_operators() -> Dict[Tuple[TokenType, TokenType, TokenType], Tuple[TokenType, Callable]]:
+    """Builds the `SPECIALIZED_BINARY_OPERATORS` dictionary."""
+    comparisons = {
+        Tt.LOGICAL_AND: lambda a, b: int(a and b),
+        Tt.LOGICAL_OR: lambda a, b: int(a or b),
+        Tt.EQUAL: lambda a, b: int(a == b),
+        Tt.NOT_EQUAL: lambda a, b: int(a != b),
+        Tt.LESS: lambda a, b: int(a < b),
+        Tt.GREATER: lambda a, b: int(a > b),
+        Tt.LESS_EQUAL: lambda a, b: int(a <= b),
+        Tt.GREATER_EQUAL: lambda a, b: int(a >= b),
+    }
+    int_operations = {
+        Tt.PLUS: lambda a, b: a + b,
+        Tt.MINUS: lambda a, b: a - b,
+        Tt.MUL: lambda a, b: a * b,
+        Tt.DIV: lambda a, b: int(a / b),
+        Tt.MOD: lambda a, b: a % b,
+        Tt.BIT_AND: lambda a, b: a & b,
+        Tt.BIT_OR: lambda a, b: a | b,
+        Tt.BIT_XOR: lambda a, b: a ^ b,
+        Tt.BIT_LSHIFT: lambda a, b: a << b,
+        Tt.BIT_RSHIFT: lambda a, b: a >> b,
+    }
+    float_operations = {
+        Tt.PLUS: lambda a, b: float(a + b),
+        Tt.MINUS: lambda a, b: float(a - b),
+        Tt.MUL: lambda a, b: float(a * b),
+        Tt.DIV: lambda a, b: float(a / b),
+    }
+
+    operations = {}
+    for left, right in ((Tt.INTL, Tt.INTL), (Tt.INTL, Tt.FLOATL), (Tt.FLOATL, Tt.INTL), (Tt.FLOATL, Tt.FLOATL)):
+        arithmetic = (int_operations, Tt.INTL) if left == right == Tt.INTL else (float_operations, Tt.FLOATL)
+        for operator, function in arithmetic[0].items():
+            operations[(operator, left, right)] = (arithmetic[1], function)
+        for operator, function in comparisons.items():
+            operations[(operator, left, right)] = (Tt.INTL, function)
+
+    # String concatenation is left out, since `StringValue.concatenate` avoids copying the left-side string.
+    operations[(Tt.EQUAL, Tt.STRINGL, Tt.STRINGL)] = (Tt.INTL, comparisons[Tt.EQUAL])
+    operations[(Tt.NOT_EQUAL, Tt.STRINGL, Tt.STRINGL)] = (Tt.INTL, comparisons[Tt.NOT_EQUAL])
+    return operations
+
+
+SPECIALIZED_BINARY_OPERATORS = _build_specialized_binary_operators()
+
+# Maps each type to the subclass of `Value` that holds it.
+VALUE_CLASSES = {
+    Tt.INTL: IntValue,
+    Tt.FLOATL: FloatValue,
+    Tt.STRINGL: StringValue,
+}
+
+
 class Function(object):
     """
     A class that represents a function that will be stored by the interpreter.
@@ -307,10 +976,14 @@ class Function(object):
         type (TokenType): the type of the function.
         args (List[Union[FunctionArgument]]): the list of args.
         block (Union[BuiltInFunctionCallStatementNode, BlockStatementNode]): the main body of the function.
+        variadic (Optional[FunctionArgument]): if the function takes a variable number of arguments, the argument
+            that every extra argument has to match.
     """
 
     def __init__(self, token_type: TokenType, args: List[Union[FunctionArgument]],
-                 block: Union[BuiltInFunctionCallStatementNode, BlockStatementNode]) -> None:
+                 block: Union[BuiltInFunctionCallStatementNode, BlockStatementNode],
+                 variadic: Optional[FunctionArgument] = None) -> None:
         self.type = token_type
         self.args = args
         self.block = block
+        self.variadic = variadic
@@ -0,0 +1,539 @@
+"""
+ICS3U
+Paul Chen
+This file holds the `VirtualMachine` class, a third execution engine. Before the program runs, its functions are
+compiled into bytecode by `compiler.py`, and each function is then run by a single loop over its instructions, with
+its local variables in numbered slots and its intermediate values on an operand stack. Calls between compiled
+functions push a frame onto a list instead of recursing in python.
+
+The compiled program can be saved to a file and loaded on the next run of the same program, which skips compiling it.
+Functions that could not be compiled are run by the tree-walking interpreter, and the two can call each other.
+"""
+
+import operator
+import os
+from typing import Any, Callable, List, Optional
+
+from ast_nodes import VariableNode, BinaryOperatorNode, AssignmentStatementNode, FunctionCallStatementNode, \
+    FunctionDeclarationStatementNode, ProgramNode
+from bytecode import Opcode, CodeObject, BytecodeProgram
+from closure import CONDITIONS, UNARY_OPERATORS, CASTS, ASSIGNMENT_OPERATORS, NULL
+from compiler import BytecodeCompiler, RAW_TYPES
+from error import ErrorCode
+from interpreter import Interpreter
+from parser import Parser
+from passes import PassManager
+from tokens import TokenType
+from value import Function, Value, StringValue, SPECIALIZED_BINARY_OPERATORS, VALUE_CLASSES, build_value
+
+# The opcodes as ints, which are faster to compare than enum members.
+LOAD_CONST = Opcode.LOAD_CONST.value
+LOAD_SLOT = Opcode.LOAD_SLOT.value
+STORE_SLOT = Opcode.STORE_SLOT.value
+LOAD_GLOBAL = Opcode.LOAD_GLOBAL.value
+ASSIGN_GLOBAL = Opcode.ASSIGN_GLOBAL.value
+POP = Opcode.POP.value
+BOX = Opcode.BOX.value
+UNBOX = Opcode.UNBOX.value
+INDEX = Opcode.INDEX.value
+CONVERT = Opcode.CONVERT.value
+BINARY = Opcode.BINARY.value
+BINARY_GENERIC = Opcode.BINARY_GENERIC.value
+UNARY = Opcode.UNARY.value
+UNARY_GENERIC = Opcode.UNARY_GENERIC.value
+CAST = Opcode.CAST.value
+CAST_GENERIC = Opcode.CAST_GENERIC.value
+UPDATE_SLOT = Opcode.UPDATE_SLOT.value
+UPDATE_SLOT_GENERIC = Opcode.UPDATE_SLOT_GENERIC.value
+LOAD_ELEMENT = Opcode.LOAD_ELEMENT.value
+LOAD_ELEMENT_RAW = Opcode.LOAD_ELEMENT_RAW.value
+STORE_ELEMENT = Opcode.STORE_ELEMENT.value
+STORE_ELEMENT_RAW = Opcode.STORE_ELEMENT_RAW.value
+UPDATE_ELEMENT_RAW = Opcode.UPDATE_ELEMENT_RAW.value
+NEW_ARRAY = Opcode.NEW_ARRAY.value
+BUILD_LIST = Opcode.BUILD_LIST.value
+JUMP = Opcode.JUMP.value
+JUMP_IF_FALSE = Opcode.JUMP_IF_FALSE.value
+JUMP_IF_TRUE = Opcode.JUMP_IF_TRUE.value
+COMPARE_JUMP_IF_FALSE = Opcode.COMPARE_JUMP_IF_FALSE.value
+COMPARE_JUMP_IF_TRUE = Opcode.COMPARE_JUMP_IF_TRUE.value
+SWITCH_TABLE = Opcode.SWITCH_TABLE.value
+CASE_JUMP = Opcode.CASE_JUMP.value
+RAISE = Opcode.RAISE.value
+LOAD_FUNCTION = Opcode.LOAD_FUNCTION.value
+CALL = Opcode.CALL.value
+BIND = Opcode.BIND.value
+CHECK_RETURN = Opcode.CHECK_RETURN.value
+RETURN = Opcode.RETURN.value
+
+# The python operators that compute the same result as a binary operator on raw ints and floats. Division is left out,
+# since dividing two ints rounds towards zero.
+PYTHON_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.MUL: operator.mul,
+    TokenType.MOD: operator.mod,
+    TokenType.BIT_AND: operator.and_,
+    TokenType.BIT_OR: operator.or_,
+    TokenType.BIT_XOR: operator.xor,
+    TokenType.BIT_LSHIFT: operator.lshift,
+    TokenType.BIT_RSHIFT: operator.rshift,
+}
+
+# The dimensions whose bounds are known to be valid, which is none of them for the generic array instructions.
+NO_DIMENSIONS = frozenset()
+
+
+def raw_type(name: Optional[str]) -> Optional[TokenType]:
+    """Converts the name of a raw type, as stored in an operand, back into its type."""
+    return None if name is None else TokenType[name]
+
+
+def box(value_type: Optional[TokenType], value: Any) -> Value:
+    """Converts a raw value of the given type into a `Value`, leaving values that are not raw unchanged."""
+    return value if value_type is None else VALUE_CLASSES[value_type](value_type, value)
+
+
+def binary_function(operator_type: TokenType, left_type: TokenType, right_type: TokenType) -> Callable[[Any, Any], Any]:
+    """Returns the function that applies a binary operator to two operands of the given types, as held on the stack."""
+    if left_type == right_type == TokenType.STRINGL:
+        if operator_type == TokenType.PLUS:
+            return StringValue.concatenate
+        comparison = SPECIALIZED_BINARY_OPERATORS[(operator_type, left_type, right_type)][1]
+        return lambda a, b: comparison(a.value, b.value)
+    if operator_type in PYTHON_OPERATORS:
+        return PYTHON_OPERATORS[operator_type]
+    if operator_type == TokenType.DIV and TokenType.FLOATL in (left_type, right_type):
+        return operator.truediv
+    return SPECIALIZED_BINARY_OPERATORS[(operator_type, left_type, right_type)][1]
+
+
+def comparison_function(operator_type: TokenType, left_type: TokenType,
+                        right_type: TokenType) -> Callable[[Any, Any], bool]:
+    """Returns the function that checks whether a condition holds for two operands of the given types."""
+    condition = CONDITIONS[operator_type]
+    if left_type == right_type == TokenType.STRINGL:
+        return lambda a, b: condition(a.value, b.value)
+    return condition
+
+
+def cast_function(operator_type: TokenType, operand_type: TokenType) -> Callable[[Any], Any]:
+    """Returns the function that casts an operand of the given type, as held on the stack."""
+    result_type, convert = CASTS[operator_type]
+    if operand_type == TokenType.STRINGL:
+        if result_type == TokenType.STRINGL:
+            return lambda a: StringValue(TokenType.STRINGL, convert(a.value))
+        return lambda a: convert(a.value)
+    if result_type == TokenType.STRINGL:
+        return lambda a: StringValue(TokenType.STRINGL, convert(a))
+    return convert
+
+
+class LinkedCode(object):
+    """
+    A compiled function whose operands have been replaced by the objects that the virtual machine uses, ex. tokens
+    instead of their indices, and python functions instead of the names of operators.
+
+    Attributes:
+        name (str): the name of the function.
+        instructions (List[tuple]): the instructions, each a tuple starting with the opcode as an int.
+        num_slots (int): the number of slots in a frame of the function.
+        argument_types (List[Optional[TokenType]]): the raw type of each argument, or None if it is a `Value`.
+        return_type (Optional[TokenType]): the raw type of the returned value, or None if it is a `Value`.
+    """
+
+    def __init__(self, code: CodeObject, instructions: List[tuple]) -> None:
+        self.name = code.name
+        self.instructions = instructions
+        self.num_slots = code.num_slots
+        self.argument_types = [raw_type(name) for name in code.argument_types]
+        self.return_type = raw_type(code.return_type)
+
+
+class VirtualMachine(Interpreter):
+    """
+    Interpreter that compiles the functions of a program into bytecode before running them.
+
+    Attributes:
+        cache_path (Optional[str]): the file that the compiled program is saved to and loaded from, if any.
+        declarations (Dict[str, FunctionDeclarationStatementNode]): the functions declared by the program, by name.
+        linked (Dict[str, LinkedCode]): the compiled functions, by name.
+        codes (Dict[Function, LinkedCode]): the compiled function of each declared function.
+    """
+
+    def __init__(self, parser: Parser, pass_manager: Optional[PassManager] = None,
+                 cache_path: Optional[str] = None) -> None:
+        """
+        Inits virtual machine class.
+        Args:
+            parser (Parser): the parser.
+            pass_manager (Optional[PassManager]): the pass manager, or None to run the tree as it was parsed.
+            cache_path (Optional[str]): the file to save the compiled program to, and load it from on later runs.
+        """
+        super().__init__(parser, pass_manager)
+        self.cache_path = cache_path
+        self.declarations = {}
+        self.linked = {}
+        self.codes = {}
+
+    def compile(self, tree: ProgramNode) -> BytecodeProgram:
+        """
+        Compiles a tree into bytecode, or loads the program compiled from the same source code and passes by an
+        earlier run, if it was saved to the cache file.
+        Args:
+            tree (ProgramNode): the abstract syntax tree, after the optimization passes ran on it.
+        Returns:
+            BytecodeProgram: the compiled program.
+        """
+        # A tree optimized with a profile depends on more than the source code, so it is not cached.
+        pass_manager = self.pass_manager
+        pass_names = [] if pass_manager is None else [p.name for p in pass_manager.enabled_passes()]
+        use_cache = self.cache_path is not None and (pass_manager is None or pass_manager.profile is None)
+        key = BytecodeProgram.make_key(self.parser.lexer.text, pass_names)
+
+        if use_cache and os.path.exists(self.cache_path):
+            program = BytecodeProgram.load(self.cache_path)
+            if program is not None and program.key == key:
+                return program
+        program = BytecodeCompiler(tree).compile(key)
+        if use_cache:
+            program.save(self.cache_path)
+        return program
+
+    def visit_ProgramNode(self, node: ProgramNode) -> None:
+        """Compiles and links the functions of the program, then declares them and the global variables."""
+        for function in node.functions:
+            if isinstance(function, FunctionDeclarationStatementNode):
+                self.declarations.setdefault(function.variable.name, function)
+        program = self.compile(node)
+        self.linked = {name: self.link(code) for name, code in program.functions.items()}
+        super().visit_ProgramNode(node)
+
+    def visit_FunctionDeclarationStatementNode(self, node: FunctionDeclarationStatementNode) -> None:
+        """Declares a function, and remembers its compiled code if it has any."""
+        super().visit_FunctionDeclarationStatementNode(node)
+        code = self.linked.get(node.variable.name)
+        if code is not None and self.declarations.get(node.variable.name) is node:
+            self.codes[self.stack.get(node.variable.name)] = code
+
+    def link(self, code: CodeObject) -> LinkedCode:
+        """Replaces the operands of the instructions of a compiled function with the objects used to run them."""
+        instructions = []
+        tokens = code.tokens
+
+        def token(index: Optional[int]):
+            return None if index is None else tokens[index]
+
+        for opcode, operands in code.instructions:
+            if opcode == Opcode.LOAD_CONST:
+                value = operands[0]
+                if value is None:
+                    value = NULL
+                elif isinstance(value, str):
+                    value = StringValue(TokenType.STRINGL, value)
+                linked = (value,)
+            elif opcode == Opcode.LOAD_GLOBAL:
+                linked = (operands[0], token(operands[1]), operands[2])
+            elif opcode == Opcode.ASSIGN_GLOBAL:
+                name, operator_name, variable_token, assignment_token, raw = operands
+                node = AssignmentStatementNode(VariableNode(None, name, [], token(variable_token)),
+                                               TokenType[operator_name], None, token(assignment_token))
+                linked = (node, raw_type(raw))
+            elif opcode == Opcode.BOX:
+                linked = (TokenType[operands[0]],)
+            elif opcode == Opcode.CONVERT:
+                linked = (TokenType[operands[0]], token(operands[1]), raw_type(operands[2]))
+            elif opcode == Opcode.NEW_ARRAY:
+                linked = (TokenType[operands[0]], operands[1], token(operands[2]), raw_type(operands[3]))
+            elif opcode == Opcode.INDEX or opcode == Opcode.LOAD_ELEMENT_RAW:
+                linked = (token(operands[0]),)
+            elif opcode == Opcode.BINARY:
+                linked = (binary_function(*(TokenType[name] for name in operands)),)
+            elif opcode == Opcode.BINARY_GENERIC:
+                operator_name, operator_token, left, right = operands
+                node = BinaryOperatorNode(None, TokenType[operator_name], None, token(operator_token))
+                linked = (node, raw_type(left), raw_type(right))
+            elif opcode == Opcode.UNARY:
+                linked = (UNARY_OPERATORS[(TokenType[operands[0]], TokenType[operands[1]])][1],)
+            elif opcode == Opcode.CAST:
+                linked = (cast_function(TokenType[operands[0]], TokenType[operands[1]]),)
+            elif opcode in (Opcode.UNARY_GENERIC, Opcode.CAST_GENERIC):
+                linked = (TokenType[operands[0]], token(operands[1]), raw_type(operands[2]))
+            elif opcode == Opcode.UPDATE_SLOT:
+                slot, operator_name, left, right = operands
+                linked = (slot, binary_function(ASSIGNMENT_OPERATORS[TokenType[operator_name]], TokenType[left],
+                                                TokenType[right]))
+            elif opcode == Opcode.UPDATE_SLOT_GENERIC:
+                slot, operator_name, operator_token, variable_token, variable_type, raw = operands
+                linked = (slot, TokenType[operator_name], token(operator_token), token(variable_token),
+                          TokenType[variable_type], raw_type(raw))
+            elif opcode == Opcode.LOAD_ELEMENT:
+                linked = (operands[0], token(operands[1]))
+            elif opcode == Opcode.STORE_ELEMENT:
+                count, name, operator_name, variable_token, assignment_token, raw = operands
+                node = AssignmentStatementNode(VariableNode(None, name, [], token(variable_token)),
+                                               TokenType[operator_name], None, token(assignment_token))
+                linked = (count, node, raw_type(raw))
+            elif opcode == Opcode.STORE_ELEMENT_RAW:
+                linked = (token(operands[0]), token(operands[1]))
+            elif opcode == Opcode.UPDATE_ELEMENT_RAW:
+                operator_name, left, right, assignment_token, variable_token = operands
+                linked = (binary_function(ASSIGNMENT_OPERATORS[TokenType[operator_name]], TokenType[left],
+                                          TokenType[right]), token(assignment_token), token(variable_token))
+            elif opcode == Opcode.BUILD_LIST:
+                linked = ([raw_type(name) for name in operands[0]],)
+            elif opcode in (Opcode.COMPARE_JUMP_IF_FALSE, Opcode.COMPARE_JUMP_IF_TRUE):
+                operator_name, left, right, target = operands
+                linked = (comparison_function(TokenType[operator_name], TokenType[left], TokenType[right]), target)
+            elif opcode == Opcode.SWITCH_TABLE:
+                cases, label_types, default, switch_token, raw = operands
+                linked = ({label: target for label, target in cases}, tuple(TokenType[name] for name in label_types),
+                          default, token(switch_token), raw_type(raw))
+            elif opcode == Opcode.CASE_JUMP:
+                linked = (token(operands[0]), raw_type(operands[1]), operands[2])
+            elif opcode == Opcode.RAISE:
+                linked = (ErrorCode[operands[0]], token(operands[1]))
+            elif opcode == Opcode.LOAD_FUNCTION:
+                linked = (FunctionCallStatementNode(operands[0], [], token(operands[1])),)
+            elif opcode == Opcode.CALL:
+                name, count, call_token, raw_types, verified, unbox = operands
+                linked = (FunctionCallStatementNode(name, [None] * count, token(call_token)), count,
+                          [raw_type(raw) for raw in raw_types], verified, unbox is not None)
+            elif opcode == Opcode.BIND:
+                name, index, call_token, raw = operands
+                node = FunctionCallStatementNode(name, [], token(call_token))
+                linked = (self.declarations[name].args[index], node, raw_type(raw))
+            elif opcode == Opcode.CHECK_RETURN:
+                function_type, return_token, raw = operands
+                linked = (Function(TokenType[function_type], [], None), token(return_token), raw_type(raw))
+            else:
+                linked = tuple(operands)
+            instructions.append((opcode.value,) + linked)
+        return LinkedCode(code, instructions)
+
+    def call_function(self, function: Function, node: FunctionCallStatementNode, ret: List[Value]) -> Value:
+        """Calls a function, running its bytecode if it was compiled."""
+        code = self.codes.get(function)
+        if code is None:
+            return super().call_function(function, node, ret)
+
+        # Checks the arguments in the same way as `bind_arguments`, and puts them in the first slots of the frame.
+        if len(function.args) != len(ret):
+            self.error(ErrorCode.MISMATCHED_ARGS, node.token)
+        slots = [None] * code.num_slots
+        for i, argument in enumerate(function.args):
+            value = self.bind_argument(argument, ret[i], node)
+            slots[i] = value if code.argument_types[i] is None else value.value
+
+        # The function can only see the global variables, which are in the bottom scope.
+        top = self.stack.top
+        self.stack.top = self.stack.bottom
+        try:
+            result = self.execute(code, slots)
+        finally:
+            self.stack.top = top
+        return box(code.return_type, result)
+
+    def execute(self, code: LinkedCode, slots: List[Any]) -> Any:
+        """
+        Runs a compiled function until it returns.
+        Args:
+            code (LinkedCode): the function.
+            slots (List[Any]): the slots of its frame, with the arguments in the first slots.
+        Returns:
+            Any: the returned value, which is raw if the function returns a raw type.
+        """
+        frames = []
+        instructions = code.instructions
+        stack = []
+        pc = 0
+        global_values = self.stack.bottom.hmap
+        codes = self.codes
+
+        while True:
+            instruction = instructions[pc]
+            opcode = instruction[0]
+            pc += 1
+
+            if opcode == LOAD_SLOT:
+                stack.append(slots[instruction[1]])
+            elif opcode == LOAD_CONST:
+                stack.append(instruction[1])
+            elif opcode == STORE_SLOT:
+                slots[instruction[1]] = stack.pop()
+            elif opcode == BINARY:
+                right = stack.pop()
+                stack[-1] = instruction[1](stack[-1], right)
+            elif opcode == COMPARE_JUMP_IF_TRUE:
+                right = stack.pop()
+                if instruction[1](stack.pop(), right):
+                    pc = instruction[2]
+            elif opcode == COMPARE_JUMP_IF_FALSE:
+                right = stack.pop()
+                if not instruction[1](stack.pop(), right):
+                    pc = instruction[2]
+            elif opcode == UPDATE_SLOT:
+                slot = instruction[1]
+                slots[slot] = instruction[2](slots[slot], stack.pop())
+            elif opcode == JUMP:
+                pc = instruction[1]
+            elif opcode == LOAD_ELEMENT_RAW:
+                index = stack.pop()
+                array = stack[-1]
+                if not 0 <= index < array.shape[0]:
+                    self.error(ErrorCode.OUT_OF_BOUNDS, instruction[1])
+                stack[-1] = array.buffer[array.offset + index * array.strides[0]]
+            elif opcode == STORE_ELEMENT_RAW:
+                index = stack.pop()
+                array = stack.pop()
+                if not 0 <= index < array.shape[0]:
+                    self.error(ErrorCode.OUT_OF_BOUNDS, instruction[1])
+                try:
+                    array.buffer[array.offset + index * array.strides[0]] = stack.pop()
+                except (OverflowError, ValueError):
+                    self.error(ErrorCode.OVERFLOW, instruction[2])
+            elif opcode == UPDATE_ELEMENT_RAW:
+                index = stack.pop()
+                array = stack.pop()
+                if not 0 <= index < array.shape[0]:
+                    self.error(ErrorCode.OUT_OF_BOUNDS, instruction[2])
+                position = array.offset + index * array.strides[0]
+                buffer = array.buffer
+                try:
+                    buffer[position] = instruction[1](buffer[position], stack.pop())
+                except (OverflowError, ValueError):
+                    self.error(ErrorCode.OVERFLOW, instruction[3])
+            elif opcode == JUMP_IF_FALSE:
+                if not stack.pop():
+                    pc = instruction[1]
+            elif opcode == JUMP_IF_TRUE:
+                if stack.pop():
+                    pc = instruction[1]
+            elif opcode == UNARY:
+                stack[-1] = instruction[1](stack[-1])
+            elif opcode == UNBOX:
+                stack[-1] = stack[-1].value
+            elif opcode == BOX:
+                value_type = instruction[1]
+                stack[-1] = VALUE_CLASSES[value_type](value_type, stack[-1])
+            elif opcode == LOAD_FUNCTION:
+                stack.append(self.get_function(instruction[1]))
+            elif opcode == CALL:
+                node, count, raw_types, verified, unbox = instruction[1:]
+                if count == 0:
+                    args = []
+                else:
+                    args = stack[-count:]
+                    del stack[-count:]
+                function = stack.pop()
+                callee = codes.get(function)
+                if callee is not None and verified:
+                    # Calls between compiled functions push a frame instead of recursing.
+                    frames.append((instructions, stack, slots, pc))
+                    instructions = callee.instructions
+                    slots = args + [None] * (callee.num_slots - count)
+                    stack = []
+                    pc = 0
+                    continue
+                result = self.call_function(function, node, [box(t, arg) for t, arg in zip(raw_types, args)])
+                stack.append(result.value if unbox else result)
+            elif opcode == RETURN:
+                result = stack.pop()
+                if len(frames) == 0:
+                    return result
+                instructions, stack, slots, pc = frames.pop()
+                stack.append(result)
+            elif opcode == LOAD_GLOBAL:
+                name = instruction[1]
+                if name not in global_values:
+                    self.error(ErrorCode.ID_NOT_FOUND, instruction[2])
+                value = global_values[name]
+                stack.append(value.value if instruction[3] else value)
+            elif opcode == POP:
+                stack.pop()
+            elif opcode == INDEX:
+                index = stack[-1]
+                if index.type != TokenType.INTL and index.type != TokenType.VOIDL:
+                    self.error(ErrorCode.MISMATCHED_TYPE, instruction[1])
+                stack[-1] = index.value
+            elif opcode == LOAD_ELEMENT:
+                count = instruction[1]
+                indices = stack[-count:]
+                del stack[-count:]
+                array = stack[-1]
+                offset = self.array_offset(array, indices, NO_DIMENSIONS, instruction[2])
+                stack[-1] = array.element(offset) if count == len(array.shape) else array.view(offset, count)
+            elif opcode == STORE_ELEMENT:
+                count, node, value_type = instruction[1:]
+                indices = stack[-count:]
+                del stack[-count:]
+                array = stack.pop()
+                self.assign_element(node, array, indices, box(value_type, stack.pop()))
+            elif opcode == CONVERT:
+                stack[-1] = self.converted_value(instruction[1], box(instruction[3], stack[-1]), instruction[2])
+            elif opcode == BINARY_GENERIC:
+                right = box(instruction[3], stack.pop())
+                stack[-1] = self.binary_operation(instruction[1], box(instruction[2], stack[-1]), right)
+            elif opcode == CAST:
+                stack[-1] = instruction[1](stack[-1])
+            elif opcode == UNARY_GENERIC or opcode == CAST_GENERIC:
+                operand = box(instruction[3], stack[-1])
+                if opcode == UNARY_GENERIC:
+                    operation = operand.unary_operator(instruction[1])
+                else:
+                    operation = operand.cast_operator(instruction[1])
+                if operation is None:
+                    self.error(ErrorCode.MISMATCHED_TYPE, instruction[2])
+                stack[-1] = operation()
+            elif opcode == UPDATE_SLOT_GENERIC:
+                slot, operator_type, operator_token, variable_token, variable_type, value_type = instruction[1:]
+                raw = variable_type if variable_type in RAW_TYPES else None
+                operation = box(raw, slots[slot]).assignment_operator(operator_type, box(value_type, stack.pop()))
+                if operation is None:
+                    self.error(ErrorCode.MISMATCHED_TYPE, operator_token)
+                value = self.converted_value(variable_type, operation(), variable_token)
+                slots[slot] = value if raw is None else value.value
+            elif opcode == ASSIGN_GLOBAL:
+                node = instruction[1]
+                value = box(instruction[2], stack.pop())
+                if node.variable.name not in global_values:
+                    self.error(ErrorCode.ID_NOT_FOUND, node.token)
+                self.assign_variable(node, value)
+            elif opcode == NEW_ARRAY:
+                element_type, count, token, value_type = instruction[1:]
+                dimensions = stack[-count:]
+                del stack[-count:]
+                stack[-1] = self.new_array(element_type, dimensions, box(value_type, stack[-1]), token)
+            elif opcode == BUILD_LIST:
+                raw_types = instruction[1]
+                count = len(raw_types)
+                if count == 0:
+                    elements = []
+                else:
+                    elements = [box(t, element) for t, element in zip(raw_types, stack[-count:])]
+                    del stack[-count:]
+                stack.append(build_value(TokenType.ARRAYL, elements))
+            elif opcode == SWITCH_TABLE:
+                cases, label_types, default, token, value_type = instruction[1:]
+                value = stack.pop()
+                if value_type is None:
+                    value_type = value.type
+                    value = value.value
+                if len(cases) != 0 and value_type not in label_types:
+                    self.error(ErrorCode.MISMATCHED_TYPE, token)
+                pc = cases.get(value, default)
+            elif opcode == CASE_JUMP:
+                label = box(instruction[2], stack.pop())
+                equal = stack.pop().binary_operator(TokenType.EQUAL, label)
+                if equal is None:
+                    self.error(ErrorCode.MISMATCHED_TYPE, instruction[1])
+                if equal().value:
+                    pc = instruction[3]
+            elif opcode == BIND:
+                stack[-1] = self.bind_argument(instruction[1], box(instruction[3], stack[-1]), instruction[2])
+            elif opcode == CHECK_RETURN:
+                stack[-1] = self.check_return_value(instruction[1], box(instruction[3], stack[-1]), instruction[2])
+            elif opcode == RAISE:
+                self.error(instruction[1], instruction[2])
+            else:
+                raise Exception(f"Unknown opcode {opcode}")